@@ -1,8 +1,8 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from core.llm import get_solar_chat
+from core.llm import get_solar_chat, report_llm_outcome
 from utils.json_parser import parse_json
 from utils.validator import validate_action_missions, validate_if_then_plan, validate_learning_frame
 
@@ -73,6 +73,27 @@ def node10_learning_tutor(state: Dict[str, Any]) -> Dict[str, Any]:
     Node10: N8/N9 결과를 기반으로 투자 학습 튜터 출력을 생성합니다.
     행동경제학 기반 넛지(If-Then 플랜, 프레이밍 효과)를 포함합니다.
     """
+    messages, learning_pattern, n8_loss_cause = _build_messages(state)
+    try:
+        response = get_solar_chat("n10_tutor").bind(max_tokens=4096).invoke(messages)
+    except Exception as exc:
+        return {"n10_loss_review_report": _fallback(f"LLM 호출 실패: {exc}", learning_pattern, n8_loss_cause)}
+    return _build_report(response, learning_pattern, n8_loss_cause)
+
+
+async def anode10_learning_tutor(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Node10 비동기 버전: LLM 호출을 ainvoke로 수행합니다.
+    """
+    messages, learning_pattern, n8_loss_cause = _build_messages(state)
+    try:
+        response = await get_solar_chat("n10_tutor").bind(max_tokens=4096).ainvoke(messages)
+    except Exception as exc:
+        return {"n10_loss_review_report": _fallback(f"LLM 호출 실패: {exc}", learning_pattern, n8_loss_cause)}
+    return _build_report(response, learning_pattern, n8_loss_cause)
+
+
+def _build_messages(state: Dict[str, Any]) -> Tuple[List[Any], Dict[str, Any], Dict[str, Any]]:
     # N9에서 받은 learning_pattern_analysis
     learning_pattern = state.get("learning_pattern_analysis", {})
     n8_loss_cause = state.get("n8_loss_cause_analysis", {})
@@ -86,25 +107,23 @@ def node10_learning_tutor(state: Dict[str, Any]) -> Dict[str, Any]:
         state=state,
     )
 
-    llm = get_solar_chat()
-    llm_with_config = llm.bind(max_tokens=4096)
-
     messages = [
         SystemMessage(content=NODE10_REPORT_PROMPT),
         HumanMessage(content=f"다음 핵심 정보를 기반으로 분석해주세요:\n{optimized_payload}"),
     ]
-
-    try:
-        response = llm_with_config.invoke(messages)
-        raw = response.content if isinstance(response.content, str) else str(response.content)
-    except Exception as exc:
-        return {"n10_loss_review_report": _fallback(f"LLM 호출 실패: {exc}", learning_pattern, n8_loss_cause)}
-
+    return messages, learning_pattern, n8_loss_cause
 
 
+def _build_report(
+    response: Any,
+    learning_pattern: Dict[str, Any],
+    n8_loss_cause: Dict[str, Any],
+) -> Dict[str, Any]:
+    raw = response.content if isinstance(response.content, str) else str(response.content)
     parsed = parse_json(raw)
 
     if not isinstance(parsed, dict):
+        report_llm_outcome(response, "parse_fail")
         return {"n10_loss_review_report": _fallback("JSON 파싱 실패", learning_pattern, n8_loss_cause)}
 
     return {"n10_loss_review_report": _normalize(parsed, learning_pattern, n8_loss_cause)}
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from core.llm import get_solar_chat
 from utils.json_parser import parse_json
+from utils.safety import contains_advice
+
+# 스트리밍 시 내보내는 필드 순서
+STREAM_FIELDS = ("summary", "detail")
+# 조언 패턴이 flush 경계에 걸쳐 잘리지 않도록 마지막 몇 글자는 다음 flush까지 보류합니다.
+_STREAM_HOLDBACK_CHARS = 12
+_STREAM_MIN_FLUSH_CHARS = 8
+BLOCKED_MESSAGE = "투자 조언으로 해석될 수 있는 내용이 감지되어 답변을 중단했습니다."
 
 
 def _compact_json(value: Any) -> str:
@@ -53,6 +61,136 @@ def node11_investment_expert(state: Dict[str, Any]) -> Dict[str, Any]:
             "used_analysis": False,
         }
 
+    llm = get_solar_chat("n11_expert")
+    try:
+        response = llm.invoke(_build_messages(state, question))
+        raw = response.content if isinstance(response.content, str) else str(response.content)
+    except Exception as exc:
+        raw = f'{{"summary": "", "detail": "답변을 생성하지 못했습니다. ({exc})"}}'
+
+    summary, detail = _parse_answer(raw)
+
+    print("[N11] response generated")
+    return {
+        "n11_chat_response": {
+            "summary": summary,
+            "detail": detail,
+        },
+        "used_analysis": True,
+    }
+
+
+async def astream_investment_expert(state: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    N11 스트리밍 버전: 모델 토큰을 받는 대로 JSON의 summary → detail 순서로 조각(delta)을 내보냅니다.
+
+    이벤트:
+    - {"event": "summary" | "detail", "delta": str}
+    - {"event": "blocked", "message": str}  누적 텍스트에서 투자 조언이 감지되면 생성을 중단합니다.
+    - {"event": "result", "summary": str, "detail": str}  최종 파싱 결과 (항상 마지막)
+    """
+    question = (state.get("user_message") or "").strip()
+    if not question:
+        yield {"event": "result", "summary": "", "detail": "질문이 비어 있습니다."}
+        return
+
+    llm = get_solar_chat("n11_expert")
+    raw = ""
+    sent = {field: "" for field in STREAM_FIELDS}
+    try:
+        async for chunk in llm.astream(_build_messages(state, question)):
+            raw += chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+            for event in _flush_fields(raw, sent, final=False):
+                yield event
+                if event["event"] == "blocked":
+                    return
+    except Exception as exc:
+        raw = raw or f'{{"summary": "", "detail": "답변을 생성하지 못했습니다. ({exc})"}}'
+
+    for event in _flush_fields(raw, sent, final=True):
+        yield event
+        if event["event"] == "blocked":
+            return
+
+    summary, detail = _parse_answer(raw)
+    if contains_advice(f"{summary}\n{detail}"):
+        yield {"event": "blocked", "message": BLOCKED_MESSAGE}
+        return
+    print("[N11] streamed response generated")
+    yield {"event": "result", "summary": summary, "detail": detail}
+
+
+def _flush_fields(raw: str, sent: Dict[str, str], final: bool) -> List[Dict[str, Any]]:
+    """
+    지금까지 받은 raw에서 필드별로 아직 보내지 않은 텍스트를 꺼냅니다.
+    flush 전에 (이미 보낸 텍스트 + 이번 조각) 전체에 contains_advice를 적용합니다.
+    """
+    events: List[Dict[str, Any]] = []
+    for field in STREAM_FIELDS:
+        value, complete = extract_partial_field(raw, field)
+        if value is None:
+            # 앞 필드가 끝나기 전에는 다음 필드를 내보내지 않습니다.
+            break
+        flush_upto = len(value) if complete or final else len(value) - _STREAM_HOLDBACK_CHARS
+        delta = value[len(sent[field]):flush_upto]
+        if delta and (complete or final or len(delta) >= _STREAM_MIN_FLUSH_CHARS):
+            accumulated = "\n".join(sent[name] for name in STREAM_FIELDS) + delta
+            if contains_advice(accumulated) or contains_advice(value):
+                events.append({"event": "blocked", "message": BLOCKED_MESSAGE})
+                return events
+            sent[field] += delta
+            events.append({"event": field, "delta": delta})
+        if not complete:
+            break
+    return events
+
+
+_JSON_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "/": "/", "\\": "\\", '"': '"'}
+
+
+def extract_partial_field(raw: str, field: str) -> Tuple[Optional[str], bool]:
+    """
+    아직 완성되지 않은 JSON 텍스트에서 문자열 필드 값을 읽습니다.
+    반환: (지금까지의 값 | 필드가 아직 시작되지 않았으면 None, 값이 닫혔는지 여부)
+    """
+    key_at = raw.find(f'"{field}"')
+    if key_at < 0:
+        return None, False
+    cursor = key_at + len(field) + 2
+    while cursor < len(raw) and raw[cursor] in " \t\r\n:":
+        cursor += 1
+    if cursor >= len(raw) or raw[cursor] != '"':
+        return None, False
+
+    chars: List[str] = []
+    cursor += 1
+    while cursor < len(raw):
+        ch = raw[cursor]
+        if ch == '"':
+            return "".join(chars), True
+        if ch == "\\":
+            if cursor + 1 >= len(raw):
+                break
+            code = raw[cursor + 1]
+            if code == "u":
+                if cursor + 6 > len(raw):
+                    break
+                try:
+                    chars.append(chr(int(raw[cursor + 2:cursor + 6], 16)))
+                except ValueError:
+                    pass
+                cursor += 6
+                continue
+            chars.append(_JSON_ESCAPES.get(code, code))
+            cursor += 2
+            continue
+        # 모델이 문자열 안에 줄바꿈을 그대로 넣는 경우도 값으로 취급합니다. (_sanitize_json_text와 동일)
+        chars.append(ch)
+        cursor += 1
+    return "".join(chars), False
+
+
+def _build_messages(state: Dict[str, Any], question: str) -> List[Any]:
     analysis_result = state.get("analysis_result") or {}
     chat_history: List[Dict[str, Any]] = state.get("chat_history") or []
 
@@ -79,14 +217,10 @@ def node11_investment_expert(state: Dict[str, Any]) -> Dict[str, Any]:
         f"사용자 질문: {question}"
     )
     messages.append(HumanMessage(content=prompt))
+    return messages
 
-    llm = get_solar_chat()
-    try:
-        response = llm.invoke(messages)
-        raw = response.content if isinstance(response.content, str) else str(response.content)
-    except Exception as exc:
-        raw = f'{{"summary": "", "detail": "답변을 생성하지 못했습니다. ({exc})"}}'
 
+def _parse_answer(raw: str) -> Tuple[str, str]:
     parsed = parse_json(raw)
     if parsed is None and raw.strip().startswith("{"):
         try:
@@ -94,17 +228,5 @@ def node11_investment_expert(state: Dict[str, Any]) -> Dict[str, Any]:
         except Exception:
             parsed = None
     if isinstance(parsed, dict):
-        summary = str(parsed.get("summary", "")).strip()
-        detail = str(parsed.get("detail", "")).strip()
-    else:
-        summary = ""
-        detail = raw
-
-    print("[N11] response generated")
-    return {
-        "n11_chat_response": {
-            "summary": summary,
-            "detail": detail,
-        },
-        "used_analysis": True,
-    }
+        return str(parsed.get("summary", "")).strip(), str(parsed.get("detail", "")).strip()
+    return "", raw
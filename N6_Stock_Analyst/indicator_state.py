@@ -0,0 +1,348 @@
+"""
+N6 보유 중(holding) 포지션용 증분 지표 상태
+- 보유 중 포지션은 매도일이 항상 오늘이라 재확인할 때마다 확장 구간 전체로 지표를 다시 계산했습니다.
+  여기서는 티커/매수일/시계열 첫 날짜별로 running 상태를 저장해 두고, 마지막 실행 이후 새로 생긴 봉만 반영합니다.
+  - EMA(fast/slow)와 MACD signal EMA, Wilder RSI 평균 이득/손실
+  - 볼린저 밴드용 최근 period개 종가 (스냅샷 때 period개만 직접 계산)
+  - 거래량 합/개수/마지막 값, 매수일 이후 시작가/최고가/최저가
+- 정의는 indicators.py / perform_technical_analysis의 전체 재계산과 같습니다. (부동소수점 합산 순서 차이만 있음)
+- 저장하는 상태는 확정된 봉(오늘 - INDICATOR_STATE_FINAL_LAG_DAYS 이전)까지만 반영합니다.
+  그 이후의 최근 봉(장중 값이 바뀔 수 있음)은 저장하지 않고 매번 불러온 상태에 덧붙여 계산합니다.
+- 저장된 마지막 봉의 종가가 새 데이터와 다르면(분할 조정 등) 상태를 버리고 처음부터 다시 만듭니다.
+
+선택 환경 변수:
+- INDICATOR_STATE_ENABLED (기본값: true)
+- INDICATOR_STATE_PATH (기본값: ./data/indicator_state.sqlite3)
+- INDICATOR_STATE_FINAL_LAG_DAYS (기본값: 2)
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+# perform_technical_analysis 기본값과 같은 지표 파라미터
+BOLLINGER_PERIOD = 20
+BOLLINGER_STD_DEV = 2
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+# 저장된 마지막 종가와 새 데이터 종가의 허용 상대 오차
+_CLOSE_MATCH_RTOL = 1e-9
+# 최근 저장한 상태(JSON)를 메모리에 둘 개수 (SQLite 조회 생략)
+_MEMORY_ENTRIES = 1024
+
+
+def _number(value: Any) -> float:
+    return math.nan if value is None else float(value)
+
+
+class _RunningEma:
+    """첫 값은 앞 period개의 단순 평균, 이후 ema += (x - ema) * 2 / (period + 1)"""
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> Optional[float]:
+        self.count += 1
+        if self.value is None:
+            self.seed_sum += x
+            if self.count == self.period:
+                self.value = self.seed_sum / self.period
+        else:
+            self.value = (x - self.value) * (2 / (self.period + 1)) + self.value
+        return self.value
+
+
+class _RunningWilder:
+    """첫 값은 앞 period개의 단순 평균, 이후 avg = (avg * (period - 1) + x) / period"""
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> None:
+        self.count += 1
+        if self.value is None:
+            self.seed_sum += x
+            if self.count == self.period:
+                self.value = self.seed_sum / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + x) / self.period
+
+
+class IndicatorState:
+    def __init__(self, ticker: str, anchor_date: str, first_date: str) -> None:
+        self.ticker = ticker
+        self.anchor_date = anchor_date
+        self.first_date = first_date
+        self.last_date: Optional[str] = None
+        self.last_close: Optional[float] = None
+        self.bars = 0
+        self.window: Deque[float] = deque(maxlen=BOLLINGER_PERIOD)
+        self.fast = _RunningEma(MACD_FAST)
+        self.slow = _RunningEma(MACD_SLOW)
+        self.signal = _RunningEma(MACD_SIGNAL)
+        self.macd: Optional[float] = None
+        self.avg_gain = _RunningWilder(RSI_PERIOD)
+        self.avg_loss = _RunningWilder(RSI_PERIOD)
+        self.volume_sum = 0.0
+        self.volume_count = 0
+        self.last_volume: Optional[float] = None
+        self.start_price: Optional[float] = None
+        self.highest: Optional[float] = None
+        self.lowest: Optional[float] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.ticker}|{self.anchor_date}|{self.first_date}"
+
+    def update(self, date: str, high: Any, low: Any, close: Any, volume: Any) -> None:
+        """봉 하나를 반영합니다. (date는 last_date보다 뒤여야 함)"""
+        price = _number(close)
+        if self.last_close is not None:
+            change = price - self.last_close
+            self.avg_gain.update(change if change > 0 else 0.0)
+            self.avg_loss.update(0.0 if change > 0 else abs(change))
+        self.window.append(price)
+        fast = self.fast.update(price)
+        slow = self.slow.update(price)
+        if fast is not None and slow is not None:
+            self.macd = fast - slow
+            self.signal.update(self.macd)
+
+        self.volume_count += 1
+        self.volume_sum += 0.0 if volume is None else float(volume)
+        self.last_volume = None if volume is None else float(volume)
+
+        if date >= self.anchor_date:
+            if self.start_price is None:
+                self.start_price = price
+            if high is not None:
+                self.highest = float(high) if self.highest is None else max(self.highest, float(high))
+            if low is not None:
+                self.lowest = float(low) if self.lowest is None else min(self.lowest, float(low))
+
+        self.bars += 1
+        self.last_date = date
+        self.last_close = price
+
+    def snapshot(self) -> Dict[str, Any]:
+        """perform_technical_analysis가 쓰는 마지막 지표 값 (데이터 부족한 지표는 None)"""
+        bollinger = None
+        if self.bars >= BOLLINGER_PERIOD:
+            window = list(self.window)
+            middle = sum(window) / BOLLINGER_PERIOD
+            std = (sum((x - middle) ** 2 for x in window) / BOLLINGER_PERIOD) ** 0.5
+            bollinger = {"upper": middle + std * BOLLINGER_STD_DEV, "lower": middle - std * BOLLINGER_STD_DEV}
+
+        rsi = None
+        if self.bars >= RSI_PERIOD + 1:
+            avg_gain, avg_loss = self.avg_gain.value, self.avg_loss.value
+            rsi = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+
+        macd = None
+        if self.bars >= MACD_SLOW + MACD_SIGNAL:
+            macd = {"macd": self.macd, "signal": self.signal.value}
+
+        return {
+            "bars": self.bars,
+            "last_close": self.last_close,
+            "bollinger": bollinger,
+            "rsi": rsi,
+            "macd": macd,
+            "average_volume": self.volume_sum / self.volume_count if self.volume_count else 0,
+            "last_volume": self.last_volume,
+            "start_price": self.start_price,
+            "highest": self.highest,
+            "lowest": self.lowest,
+        }
+
+    def to_json(self) -> str:
+        payload = {name: value for name, value in self.__dict__.items() if name != "window"}
+        payload["window"] = list(self.window)
+        for name in ("fast", "slow", "signal", "avg_gain", "avg_loss"):
+            payload[name] = dict(getattr(self, name).__dict__)
+        return json.dumps(payload)
+
+    @classmethod
+    def from_json(cls, text: str) -> "IndicatorState":
+        payload = json.loads(text)
+        state = cls(payload["ticker"], payload["anchor_date"], payload["first_date"])
+        for name in ("fast", "slow", "signal", "avg_gain", "avg_loss"):
+            getattr(state, name).__dict__.update(payload.pop(name))
+        state.window.extend(payload.pop("window"))
+        state.__dict__.update(payload)
+        return state
+
+
+class IndicatorStateStore:
+    """티커/매수일/첫 날짜별 IndicatorState를 SQLite에 JSON으로 저장합니다."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.final_lag_days = int(os.getenv("INDICATOR_STATE_FINAL_LAG_DAYS", "2"))
+        self.counters = {"incremental": 0, "rebuilt": 0, "new_bars": 0, "reused_bars": 0, "errors": 0}
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS indicator_state (
+                    key TEXT PRIMARY KEY,
+                    updated_at REAL NOT NULL,
+                    payload TEXT NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _remember(self, key: str, payload: str) -> None:
+        with self._lock:
+            self._memory[key] = payload
+            self._memory.move_to_end(key)
+            while len(self._memory) > _MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[IndicatorState]:
+        """저장된 상태 (호출마다 새 객체이므로 그대로 갱신해도 됩니다)"""
+        with self._lock:
+            payload = self._memory.get(key)
+        try:
+            if payload is None:
+                with self._connect() as conn:
+                    row = conn.execute("SELECT payload FROM indicator_state WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                payload = row[0]
+                self._remember(key, payload)
+            return IndicatorState.from_json(payload)
+        except Exception as exc:
+            print(f"[WARNING] Indicator state lookup failed: {exc}")
+            self._count("errors")
+            return None
+
+    def put(self, state: IndicatorState) -> None:
+        payload = state.to_json()
+        self._remember(state.key, payload)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO indicator_state (key, updated_at, payload) VALUES (?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET updated_at = excluded.updated_at, payload = excluded.payload
+                    """,
+                    (state.key, time.time(), payload),
+                )
+        except Exception as exc:
+            print(f"[WARNING] Indicator state save failed: {exc}")
+            self._count("errors")
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def advance(self, stock_data: Dict[str, Any], anchor_date: str) -> Optional[IndicatorState]:
+        """
+        저장된 상태에 stock_data의 새 봉만 반영한 현재 상태 (stock_data 마지막 봉까지)
+        확정된 봉까지 반영한 상태는 다시 저장합니다. 데이터가 없으면 None.
+        """
+        dates: List[str] = stock_data.get("dates") or []
+        closes = stock_data.get("close") or []
+        if not dates or len(closes) != len(dates):
+            return None
+        highs = stock_data.get("high") or [None] * len(dates)
+        lows = stock_data.get("low") or [None] * len(dates)
+        volumes = stock_data.get("volume") or [None] * len(dates)
+        ticker = str(stock_data.get("ticker") or "")
+
+        fresh = IndicatorState(ticker, anchor_date, dates[0])
+        state = self.get(fresh.key)
+        start = 0
+        if state is not None and state.last_date is not None:
+            position = bisect.bisect_left(dates, state.last_date)
+            stored_close = state.last_close
+            if (
+                position < len(dates)
+                and dates[position] == state.last_date
+                and stored_close is not None
+                and math.isclose(_number(closes[position]), stored_close, rel_tol=_CLOSE_MATCH_RTOL)
+            ):
+                start = position + 1
+            else:
+                state = None
+        self._count("incremental" if state is not None else "rebuilt")
+        if state is None:
+            state = fresh
+        self._count("reused_bars", start)
+        self._count("new_bars", len(dates) - start)
+
+        finalized = (datetime.now(timezone.utc).date() - timedelta(days=self.final_lag_days)).strftime("%Y-%m-%d")
+        changed = False
+        index = start
+        while index < len(dates) and dates[index] <= finalized:
+            state.update(dates[index], highs[index], lows[index], closes[index], volumes[index])
+            index += 1
+            changed = True
+        if changed:
+            self.put(state)
+        # 확정되지 않은 최근 봉은 저장하지 않고 이번 결과에만 반영합니다. (put은 이미 직렬화를 끝냄)
+        for position in range(index, len(dates)):
+            state.update(dates[position], highs[position], lows[position], closes[position], volumes[position])
+        return state
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"enabled": True, "path": self.path, **self.counters}
+
+
+_store: Optional[IndicatorStateStore] = None
+_store_ready = False
+_store_lock = threading.Lock()
+
+
+def get_indicator_state_stats() -> Dict[str, Any]:
+    store = get_indicator_state_store()
+    return store.stats() if store is not None else {"enabled": False}
+
+
+def get_indicator_state_store() -> Optional[IndicatorStateStore]:
+    """INDICATOR_STATE_ENABLED=false이면 None (매번 전체 재계산)"""
+    global _store, _store_ready
+    if not _store_ready:
+        with _store_lock:
+            if not _store_ready:
+                if os.getenv("INDICATOR_STATE_ENABLED", "true").lower() in ("1", "true", "yes"):
+                    path = os.getenv(
+                        "INDICATOR_STATE_PATH",
+                        str(Path(__file__).resolve().parent.parent / "data" / "indicator_state.sqlite3"),
+                    )
+                    try:
+                        _store = IndicatorStateStore(path)
+                    except Exception as exc:
+                        print(f"[WARNING] Indicator state store disabled: {exc}")
+                _store_ready = True
+    return _store
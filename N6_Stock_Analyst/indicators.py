@@ -0,0 +1,123 @@
+"""
+N6 기술 지표 계산 (NumPy float64 배열 기반)
+- 볼린저 밴드: 누적합(cumsum)으로 이동 합/제곱합을 구해 O(n)으로 계산합니다.
+  큰 누적합에서 생기는 정밀도 손실을 막기 위해 블록마다 기준값을 빼고 누적합을 다시 시작합니다.
+- RSI(Wilder 평활), EMA/MACD: y[i] = decay * y[i-1] + u[i] 점화식을 블록 단위 벡터 연산으로 풉니다.
+- 결과는 기존 순수 Python 반복문 구현과 같은 길이/정의이며, 값은 부동소수점 합산 순서 차이(상대 1e-9 이내)만 있습니다.
+  그래서 MACD == signal 같은 동률은 그대로 유지되지 않을 수 있으며, 임계값 비교는 해석 쪽(n6.py)에서 오차 범위를 두고 합니다.
+  (tests/test_indicators.py와 benchmarks/bench_indicators.py가 기존 구현을 기준으로 확인합니다)
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# 볼린저 밴드 누적합을 다시 시작하는 간격 (윈도우 수)
+_ROLLING_BLOCK = 2048
+# 분산 / (기준값 대비 제곱 평균)이 이 값 이하인 윈도우는 누적합 대신 직접 다시 계산합니다.
+_UNSTABLE_VARIANCE_RATIO = 1e-6
+# 점화식 블록에서 decay^-k가 넘지 않게 할 상한 (e^200, float64 범위 안에서 여유 있게)
+_MAX_LOG_GROWTH = 200.0
+
+
+def _as_array(values: Sequence[float]) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _linear_recurrence(inputs: np.ndarray, decay: float, initial: float) -> np.ndarray:
+    """
+    y[i] = decay * y[i-1] + inputs[i] (y[-1] = initial)
+    블록 안에서는 y[k] = decay^(k+1) * (initial + sum_{j<=k} inputs[j] * decay^-(j+1)) 로 한 번에 계산합니다.
+    """
+    out = np.empty(len(inputs), dtype=np.float64)
+    if decay == 0.0:
+        out[:] = inputs
+        return out
+    block = max(1, min(len(inputs), int(_MAX_LOG_GROWTH / -math.log(decay)))) if decay < 1.0 else len(inputs)
+    powers = decay ** np.arange(1, block + 1, dtype=np.float64)
+    state = initial
+    for start in range(0, len(inputs), block):
+        chunk = inputs[start : start + block]
+        scale = powers[: len(chunk)]
+        values = scale * (state + np.cumsum(chunk / scale))
+        out[start : start + len(chunk)] = values
+        state = float(values[-1])
+    return out
+
+
+def ema(values: Sequence[float], period: int) -> np.ndarray:
+    """첫 값은 앞 period개의 단순 평균, 이후 multiplier = 2 / (period + 1). 길이 len(values) - period + 1"""
+    data = _as_array(values)
+    multiplier = 2 / (period + 1)
+    first = float(data[:period].sum()) / period
+    rest = _linear_recurrence(data[period:] * multiplier, 1 - multiplier, first)
+    return np.concatenate(([first], rest))
+
+
+def bollinger_bands(prices: Sequence[float], period: int = 20, std_dev: float = 2) -> Optional[Dict[str, np.ndarray]]:
+    """{'upper', 'middle', 'lower'} 각 길이 len(prices) - period + 1 (데이터 부족 시 None)"""
+    data = _as_array(prices)
+    windows = len(data) - period + 1
+    if windows < 1:
+        return None
+    middle = np.empty(windows, dtype=np.float64)
+    variance = np.empty(windows, dtype=np.float64)
+    # 윈도우별 (기준값 대비) 제곱 평균: 분산 계산의 상쇄 오차 크기를 가늠하는 데 씁니다.
+    magnitude = np.empty(windows, dtype=np.float64)
+    for start in range(0, windows, _ROLLING_BLOCK):
+        stop = min(start + _ROLLING_BLOCK, windows)
+        segment = data[start : stop + period - 1]
+        # 분산은 평행이동에 불변이므로 블록 평균을 빼서 누적합 크기를 줄입니다.
+        shift = float(segment.mean())
+        centered = segment - shift
+        sums = np.concatenate(([0.0], np.cumsum(centered)))
+        squares = np.concatenate(([0.0], np.cumsum(centered * centered)))
+        window_mean = (sums[period:] - sums[:-period]) / period
+        mean_square = (squares[period:] - squares[:-period]) / period
+        middle[start:stop] = window_mean + shift
+        variance[start:stop] = mean_square - window_mean * window_mean
+        magnitude[start:stop] = mean_square
+    # 가격이 거의 변하지 않는 윈도우는 상쇄 오차가 분산보다 커질 수 있어 그 윈도우만 두 단계로 다시 계산합니다.
+    unstable = np.flatnonzero(variance <= _UNSTABLE_VARIANCE_RATIO * magnitude)
+    if unstable.size:
+        rows = np.lib.stride_tricks.sliding_window_view(data, period)[unstable]
+        row_mean = rows.sum(axis=1) / period
+        middle[unstable] = row_mean
+        variance[unstable] = ((rows - row_mean[:, None]) ** 2).sum(axis=1) / period
+    std = np.sqrt(np.maximum(variance, 0.0))
+    return {"upper": middle + std * std_dev, "middle": middle, "lower": middle - std * std_dev}
+
+
+def rsi(prices: Sequence[float], period: int = 14) -> Optional[np.ndarray]:
+    """Wilder RSI (0~100), 길이 len(prices) - period (데이터 부족 시 None)"""
+    data = _as_array(prices)
+    if len(data) < period + 1:
+        return None
+    changes = np.diff(data)
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes > 0, 0.0, np.abs(changes))
+    decay = (period - 1) / period
+    averages = []
+    for series in (gains, losses):
+        # 첫 값은 단순 평균, 이후 avg = (avg * (period - 1) + x) / period
+        first = float(series[:period].sum()) / period
+        averages.append(np.concatenate(([first], _linear_recurrence(series[period:] / period, decay, first))))
+    avg_gain, avg_loss = averages
+    rs = np.divide(avg_gain, avg_loss, out=np.zeros_like(avg_gain), where=avg_loss != 0)
+    return np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + rs))
+
+
+def macd(prices: Sequence[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Optional[Dict[str, np.ndarray]]:
+    """{'macd', 'signal', 'histogram'} 각 길이 len(prices) - slow - signal + 2 (데이터 부족 시 None)"""
+    data = _as_array(prices)
+    if len(data) < slow + signal:
+        return None
+    fast_ema = ema(data, fast)
+    slow_ema = ema(data, slow)
+    macd_line = fast_ema[slow - fast :] - slow_ema
+    signal_line = ema(macd_line, signal)
+    final_macd = macd_line[signal - 1 :]
+    return {"macd": final_macd, "signal": signal_line, "histogram": final_macd - signal_line}
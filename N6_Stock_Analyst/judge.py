@@ -2,10 +2,27 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
+from core.llm import report_llm_outcome
 from utils.json_parser import parse_json
 
 
 def judge_n6_quality(llm: Any, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        response = llm.invoke(_build_judge_prompt(analysis))
+    except Exception as exc:
+        return _judge_failed(exc)
+    return _parse_judge_response(response)
+
+
+async def ajudge_n6_quality(llm: Any, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        response = await llm.ainvoke(_build_judge_prompt(analysis))
+    except Exception as exc:
+        return _judge_failed(exc)
+    return _parse_judge_response(response)
+
+
+def _build_judge_prompt(analysis: Dict[str, Any]) -> str:
     payload = {
         "summary": analysis.get("summary"),
         "price_move": analysis.get("price_move"),
@@ -15,7 +32,7 @@ def judge_n6_quality(llm: Any, analysis: Dict[str, Any]) -> Dict[str, Any]:
         "risk_notes": analysis.get("risk_notes"),
         "llm_chart_analysis": analysis.get("llm_chart_analysis"),
     }
-    prompt = (
+    return (
         "You are a strict evaluator of technical analysis outputs.\n"
         "Score each item between 0 and 1 and return JSON only with keys:\n"
         "consistency, indicator_coverage, trend_consistency, advice_free, clarity, notes.\n"
@@ -27,21 +44,16 @@ def judge_n6_quality(llm: Any, analysis: Dict[str, Any]) -> Dict[str, Any]:
         f"INPUT:\n{payload}"
     )
 
+
+def _parse_judge_response(response: Any) -> Dict[str, Any]:
     try:
-        response = llm.invoke(prompt)
         content = response.content if isinstance(response.content, str) else str(response.content)
         parsed = parse_json(content)
         if not isinstance(parsed, dict):
             raise ValueError("Judge output is not a dict.")
     except Exception as exc:
-        return {
-            "consistency": 0.0,
-            "indicator_coverage": 0.0,
-            "trend_consistency": 0.0,
-            "advice_free": 0.0,
-            "clarity": 0.0,
-            "notes": f"judge_failed: {exc}",
-        }
+        report_llm_outcome(response, "parse_fail")
+        return _judge_failed(exc)
 
     return {
         "consistency": round(_clamp01(parsed.get("consistency")) * 100, 1),
@@ -53,6 +65,17 @@ def judge_n6_quality(llm: Any, analysis: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _judge_failed(exc: Exception) -> Dict[str, Any]:
+    return {
+        "consistency": 0.0,
+        "indicator_coverage": 0.0,
+        "trend_consistency": 0.0,
+        "advice_free": 0.0,
+        "clarity": 0.0,
+        "notes": f"judge_failed: {exc}",
+    }
+
+
 def _clamp01(value: Any) -> float:
     try:
         return max(0.0, min(1.0, float(value)))
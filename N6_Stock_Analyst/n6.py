@@ -1,56 +1,107 @@
-from typing import Any, Dict, Optional, List
+from typing import TYPE_CHECKING, Any, Dict, Optional, List
+import asyncio
 import re
 from datetime import datetime, timedelta, timezone
 
-import yfinance as yf
-from curl_cffi import requests as curl_requests
-
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from core.llm import get_solar_chat
+from core.llm import get_solar_chat, report_llm_outcome
 from core.db import build_chroma_where, query_chroma_collection
 from langsmith import traceable
 from langsmith.run_helpers import get_current_run_tree
-from .judge import judge_n6_quality
+from .judge import ajudge_n6_quality, judge_n6_quality
+# indicators는 numpy를 모듈 로드 시 한 번 import 합니다. 지연 import(chromadb, yfinance/pandas)가 노드 실행 중
+# 여러 to_thread 워커에서 numpy를 동시에 처음 import하면 초기화가 덜 끝난 모듈을 볼 수 있습니다.
+# (예: "module 'numpy' has no attribute 'matrix'")
+from .indicators import bollinger_bands, macd, rsi
+from .quality_evaluator import evaluate_n6_quality, get_n6_quality_evaluator
+from .ticker_index import get_ticker_index
+
+if TYPE_CHECKING:
+    from .indicator_state import IndicatorState
 
 
 _TICKER_TOKEN_RE = re.compile(r"[A-Za-z0-9.\-]+")
+# 지표 계산(누적합/점화식) 오차 수준의 차이는 임계값 비교에서 동률로 봅니다. (상대 오차, 기준: 가격 또는 RSI 100)
+_INDICATOR_TIE_RTOL = 1e-9
 
 
 def resolve_ticker(stock_name: str) -> str:
     """
     종목명을 티커로 변환합니다.
-    - 이미 티커처럼 보이면 그대로 사용
+    - 로컬 종목 인덱스(ticker_index)에서 종목코드/티커/이름/별칭/유사 이름으로 먼저 찾기
+    - 인덱스에 없고 이미 티커처럼 보이면 그대로 사용
     - 숫자 6자리면 KRX 기본(.KS)으로 가정
-    - 그렇지 않으면 LLM으로 티커 추정
+    - 그렇지 않으면 LLM으로 티커 추정 (결과는 인덱스가 기억해 같은 이름은 다시 묻지 않음)
     """
     raw = (stock_name or "").strip()
+    local = _resolve_ticker_locally(raw)
+    if local is not None:
+        return local
+
+    try:
+        response = get_solar_chat("n6_ticker").invoke(_ticker_messages(raw))
+        ticker = _parse_ticker_response(response, raw)
+    except Exception:
+        get_ticker_index().record_llm_result(raw, None)
+        return raw
+    get_ticker_index().record_llm_result(raw, ticker if ticker != raw else None)
+    return ticker
+
+
+async def aresolve_ticker(stock_name: str) -> str:
+    """resolve_ticker 비동기 버전 (LLM 추정 시 ainvoke 사용)"""
+    raw = (stock_name or "").strip()
+    local = _resolve_ticker_locally(raw)
+    if local is not None:
+        return local
+
+    try:
+        response = await get_solar_chat("n6_ticker").ainvoke(_ticker_messages(raw))
+        ticker = _parse_ticker_response(response, raw)
+    except Exception:
+        get_ticker_index().record_llm_result(raw, None)
+        return raw
+    get_ticker_index().record_llm_result(raw, ticker if ticker != raw else None)
+    return ticker
+
+
+def _resolve_ticker_locally(raw: str) -> Optional[str]:
+    """LLM 없이 판별 가능한 경우의 티커 (불가하면 None)"""
     if not raw:
         return raw
 
+    indexed = get_ticker_index().resolve(raw)
+    if indexed is not None:
+        return indexed
+
     if re.fullmatch(r"\d{6}", raw):
         return f"{raw}.KS"
 
     if re.fullmatch(r"[A-Za-z0-9.\-]+", raw):
         return raw.upper()
+    return None
 
-    try:
-        llm = get_solar_chat()
-        messages = [
-            SystemMessage(
-                content=(
-                    "You convert company names to tickers. "
-                    "Return a single ticker token only (e.g., AAPL, TSLA, 005930.KS)."
-                )
-            ),
-            HumanMessage(content=f"Company name: {raw}"),
-        ]
-        response = llm.invoke(messages)
-        text = response.content if isinstance(response.content, str) else str(response.content)
-        match = _TICKER_TOKEN_RE.search(text)
-        return match.group(0).upper() if match else raw
-    except Exception:
+
+def _ticker_messages(raw: str) -> List[Any]:
+    return [
+        SystemMessage(
+            content=(
+                "You convert company names to tickers. "
+                "Return a single ticker token only (e.g., AAPL, TSLA, 005930.KS)."
+            )
+        ),
+        HumanMessage(content=f"Company name: {raw}"),
+    ]
+
+
+def _parse_ticker_response(response: Any, raw: str) -> str:
+    text = response.content if isinstance(response.content, str) else str(response.content)
+    match = _TICKER_TOKEN_RE.search(text)
+    if not match:
+        report_llm_outcome(response, "fallback")
         return raw
+    return match.group(0).upper()
 
 
 def generate_llm_chart_analysis(payload: Dict[str, Any]) -> Optional[str]:
@@ -58,29 +109,41 @@ def generate_llm_chart_analysis(payload: Dict[str, Any]) -> Optional[str]:
     기술적 분석 결과를 LLM에 전달해 요약/해석을 생성합니다.
     """
     try:
-        llm = get_solar_chat()
-        messages = [
-            SystemMessage(
-                content=(
-                    "You are a technical analysis summarizer. "
-                    "Summarize chart/indicator context factually without investment advice."
-                )
-            ),
-            HumanMessage(
-                content=(
-                    "Given the structured technical data, write a brief analysis in Korean. "
-                    "No buy/sell recommendations.\n"
-                    f"{payload}"
-                )
-            ),
-        ]
-        response = llm.invoke(messages)
+        response = get_solar_chat("n6_chart").invoke(_chart_analysis_messages(payload))
         text = response.content if isinstance(response.content, str) else str(response.content)
         return text.strip()
     except Exception:
         return None
 
 
+async def agenerate_llm_chart_analysis(payload: Dict[str, Any]) -> Optional[str]:
+    """generate_llm_chart_analysis 비동기 버전"""
+    try:
+        response = await get_solar_chat("n6_chart").ainvoke(_chart_analysis_messages(payload))
+        text = response.content if isinstance(response.content, str) else str(response.content)
+        return text.strip()
+    except Exception:
+        return None
+
+
+def _chart_analysis_messages(payload: Dict[str, Any]) -> List[Any]:
+    return [
+        SystemMessage(
+            content=(
+                "You are a technical analysis summarizer. "
+                "Summarize chart/indicator context factually without investment advice."
+            )
+        ),
+        HumanMessage(
+            content=(
+                "Given the structured technical data, write a brief analysis in Korean. "
+                "No buy/sell recommendations.\n"
+                f"{payload}"
+            )
+        ),
+    ]
+
+
 def _collect_rag_docs(result: Dict[str, Any]) -> list[str]:
     docs = result.get("documents")
     if not isinstance(docs, list) or not docs:
@@ -119,55 +182,105 @@ def node6_stock_analyst(state: Dict[str, Any]) -> Dict[str, Any]:
     stock_name = state.get("layer1_stock")
     buy_date = state.get("layer2_buy_date")
     sell_date = state.get("layer2_sell_date")
-    decision_basis = state.get("layer3_decision_basis")
 
-    run = get_current_run_tree()
-    if run:
-        run.add_metadata(
-            {
-                "ticker": stock_name,
-                "buy_date": buy_date,
-                "sell_date": sell_date,
-                "decision_basis": decision_basis,
-            }
-        )
+    run = _start_n6_run(state)
 
     # 입력 검증
     if not stock_name or not buy_date or not sell_date:
         return {"n6_stock_analysis": fallback_result("필수 입력값이 누락되었습니다.")}
 
     try:
-        ticker = resolve_ticker(stock_name)
-        # 주가 데이터 가져오기
-        stock_data = fetch_stock_data(ticker, buy_date, sell_date)
+        # 배치 분석에서는 종목/기간이 겹치는 거래끼리 한 번 조회한 주가 데이터를 공유합니다.
+        prefetched = state.get("n6_prefetched_stock_data")
+        if isinstance(prefetched, dict) and prefetched.get("close"):
+            ticker = prefetched.get("ticker") or resolve_ticker(stock_name)
+            stock_data = prefetched
+        else:
+            ticker = resolve_ticker(stock_name)
+            # 주가 데이터 가져오기
+            stock_data = fetch_stock_data(ticker, buy_date, sell_date)
         if not stock_data:
             return {"n6_stock_analysis": fallback_result("주가 데이터를 가져올 수 없습니다.")}
 
         # 기술적 분석 수행
-        analysis_result = perform_technical_analysis(stock_data, buy_date, sell_date)
+        analysis_result = _analyze_technicals(state, stock_data, buy_date, sell_date)
         analysis_result["stock_analysis"]["ticker"] = ticker
         analysis_result["stock_analysis"]["resolved_from"] = stock_name
 
         rag_context = _build_rag_context(ticker, buy_date, sell_date)
         llm_analysis = generate_llm_chart_analysis(
-            {
-                "ticker": ticker,
-                "period": analysis_result["stock_analysis"].get("period"),
-                "summary": analysis_result["stock_analysis"].get("summary"),
-                "price_move": analysis_result["stock_analysis"].get("price_move"),
-                "trend": analysis_result["stock_analysis"].get("trend"),
-                "indicators": analysis_result["stock_analysis"].get("indicators"),
-                "volume_analysis": analysis_result["stock_analysis"].get("volume_analysis"),
-                "risk_notes": analysis_result["stock_analysis"].get("risk_notes"),
-                "rag_context": rag_context,
-            }
+            _chart_analysis_payload(ticker, analysis_result["stock_analysis"], rag_context)
+        )
+        if llm_analysis:
+            analysis_result["stock_analysis"]["llm_chart_analysis"] = llm_analysis
+
+        # 품질 평가(judge + 메트릭)는 기본적으로 샘플링해 백그라운드에서 처리합니다. (quality_evaluator.py)
+        if get_n6_quality_evaluator().inline:
+            try:
+                llm = get_solar_chat("n6_judge")
+                analysis_result["stock_analysis"]["judge_metrics"] = judge_n6_quality(
+                    llm, analysis_result["stock_analysis"]
+                )
+            except Exception as exc:
+                analysis_result["stock_analysis"]["judge_metrics"] = {
+                    "notes": f"judge_failed: {exc}"
+                }
+
+        return _finish_n6(state, analysis_result, run)
+
+    except Exception as e:
+        result = {"n6_stock_analysis": fallback_result(f"분석 중 오류 발생: {str(e)}")}
+        if run:
+            run.add_outputs(result)
+        return result
+
+
+@traceable(name="N6_Stock_Analyst")
+async def anode6_stock_analyst(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Node6 비동기 버전
+    - 주가 조회/Chroma 조회/지표 계산 등 블로킹 작업은 스레드로, LLM 호출은 ainvoke로 수행합니다.
+    """
+    stock_name = state.get("layer1_stock")
+    buy_date = state.get("layer2_buy_date")
+    sell_date = state.get("layer2_sell_date")
+
+    run = _start_n6_run(state)
+
+    if not stock_name or not buy_date or not sell_date:
+        return {"n6_stock_analysis": fallback_result("필수 입력값이 누락되었습니다.")}
+
+    try:
+        prefetched = state.get("n6_prefetched_stock_data")
+        if isinstance(prefetched, dict) and prefetched.get("close"):
+            ticker = prefetched.get("ticker") or await aresolve_ticker(stock_name)
+            stock_data = prefetched
+        else:
+            ticker = await aresolve_ticker(stock_name)
+            stock_data = await asyncio.to_thread(fetch_stock_data, ticker, buy_date, sell_date)
+        if not stock_data:
+            return {"n6_stock_analysis": fallback_result("주가 데이터를 가져올 수 없습니다.")}
+
+        analysis_result, rag_context = await asyncio.gather(
+            asyncio.to_thread(_analyze_technicals, state, stock_data, buy_date, sell_date),
+            asyncio.to_thread(_build_rag_context, ticker, buy_date, sell_date),
+        )
+        analysis_result["stock_analysis"]["ticker"] = ticker
+        analysis_result["stock_analysis"]["resolved_from"] = stock_name
+
+        llm_analysis = await agenerate_llm_chart_analysis(
+            _chart_analysis_payload(ticker, analysis_result["stock_analysis"], rag_context)
         )
         if llm_analysis:
             analysis_result["stock_analysis"]["llm_chart_analysis"] = llm_analysis
 
+        if not get_n6_quality_evaluator().inline:
+            # 검증 + 평가 큐 등록만 하므로 바로 처리합니다.
+            return _finish_n6(state, analysis_result, run)
+
         try:
-            llm = get_solar_chat()
-            analysis_result["stock_analysis"]["judge_metrics"] = judge_n6_quality(
+            llm = get_solar_chat("n6_judge")
+            analysis_result["stock_analysis"]["judge_metrics"] = await ajudge_n6_quality(
                 llm, analysis_result["stock_analysis"]
             )
         except Exception as exc:
@@ -175,51 +288,86 @@ def node6_stock_analyst(state: Dict[str, Any]) -> Dict[str, Any]:
                 "notes": f"judge_failed: {exc}"
             }
 
-        # 결과 검증
-        from utils.validator import validate_node6
+        # 메트릭 저장은 파일 I/O가 있어 스레드에서 처리
+        return await asyncio.to_thread(_finish_n6, state, analysis_result, run)
 
-        if not validate_node6(analysis_result):
-            result = {"n6_stock_analysis": fallback_result("분석 결과 검증에 실패했습니다.")}
-            if run:
-                run.add_outputs(result)
-            return result
+    except Exception as e:
+        result = {"n6_stock_analysis": fallback_result(f"분석 중 오류 발생: {str(e)}")}
+        if run:
+            run.add_outputs(result)
+        return result
 
-        try:
-            from metrics.n6_metrics import evaluate_n6_metrics, persist_n6_metrics
-            from metrics.n6_prompt_optimizer import apply_n6_prompt_optimization
 
-            report = evaluate_n6_metrics(analysis_result, state.get("request_id"))
-            analysis_result["stock_analysis"]["metrics_summary"] = report.get("summary", {})
-            persist_n6_metrics(report)
-            apply_n6_prompt_optimization(report)
-        except Exception as exc:
-            analysis_result["stock_analysis"]["metrics_summary"] = {
-                "error": f"n6 metrics failed: {exc}"
+def _start_n6_run(state: Dict[str, Any]) -> Any:
+    run = get_current_run_tree()
+    if run:
+        run.add_metadata(
+            {
+                "ticker": state.get("layer1_stock"),
+                "buy_date": state.get("layer2_buy_date"),
+                "sell_date": state.get("layer2_sell_date"),
+                "decision_basis": state.get("layer3_decision_basis"),
             }
+        )
+    return run
 
-        result = {"n6_stock_analysis": analysis_result}
-        if run:
-            run.add_metadata(
-                {
-                    "n6_metrics_summary": analysis_result["stock_analysis"].get("metrics_summary"),
-                    "n6_judge_metrics": analysis_result["stock_analysis"].get("judge_metrics"),
-                }
-            )
-            run.add_outputs(result)
-        return result
 
-    except Exception as e:
-        result = {"n6_stock_analysis": fallback_result(f"분석 중 오류 발생: {str(e)}")}
+def _chart_analysis_payload(ticker: str, stock_analysis: Dict[str, Any], rag_context: str) -> Dict[str, Any]:
+    return {
+        "ticker": ticker,
+        "period": stock_analysis.get("period"),
+        "summary": stock_analysis.get("summary"),
+        "price_move": stock_analysis.get("price_move"),
+        "trend": stock_analysis.get("trend"),
+        "indicators": stock_analysis.get("indicators"),
+        "volume_analysis": stock_analysis.get("volume_analysis"),
+        "risk_notes": stock_analysis.get("risk_notes"),
+        "rag_context": rag_context,
+    }
+
+
+def _finish_n6(state: Dict[str, Any], analysis_result: Dict[str, Any], run: Any) -> Dict[str, Any]:
+    """결과 검증 + N6 품질 평가(인라인이면 메트릭 평가/저장, 아니면 샘플링해 평가 큐에 등록) + 트레이싱 출력"""
+    from utils.validator import validate_node6
+
+    if not validate_node6(analysis_result):
+        result = {"n6_stock_analysis": fallback_result("분석 결과 검증에 실패했습니다.")}
         if run:
             run.add_outputs(result)
         return result
 
+    evaluator = get_n6_quality_evaluator()
+    if evaluator.inline:
+        try:
+            report = evaluate_n6_quality(analysis_result, state.get("request_id"), with_judge=False)
+            analysis_result["stock_analysis"]["metrics_summary"] = report.get("summary", {})
+        except Exception as exc:
+            analysis_result["stock_analysis"]["metrics_summary"] = {
+                "error": f"n6 metrics failed: {exc}"
+            }
+    else:
+        analysis_result["stock_analysis"]["quality_evaluation"] = evaluator.submit(
+            analysis_result, state.get("request_id")
+        )
+
+    result = {"n6_stock_analysis": analysis_result}
+    if run:
+        run.add_metadata(
+            {
+                "n6_metrics_summary": analysis_result["stock_analysis"].get("metrics_summary"),
+                "n6_judge_metrics": analysis_result["stock_analysis"].get("judge_metrics"),
+                "n6_quality_evaluation": analysis_result["stock_analysis"].get("quality_evaluation"),
+            }
+        )
+        run.add_outputs(result)
+    return result
 
 
 def fetch_stock_data(stock_name: str, start_date: str, end_date: str) -> Optional[Dict[str, Any]]:
     """
     Yahoo chart API를 curl_cffi로 호출하고, 실패 시 yfinance로 fallback
     볼린저밴드 계산을 위해 매수/매도일 기준 ±1개월 데이터를 수집합니다.
+    로컬 주가 저장소(price_store)가 켜져 있으면 저장소에 없는 날짜 구간만 네트워크로 조회합니다.
 
     Args:
         stock_name: 종목명 또는 티커 (예: AAPL, TSLA, 005930.KS)
@@ -231,45 +379,109 @@ def fetch_stock_data(stock_name: str, start_date: str, end_date: str) -> Optiona
     """
     try:
         # 볼린저밴드 계산을 위해 기간 확장 (±1개월)
-        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-
-        extended_start = (start_dt - timedelta(days=30)).strftime("%Y-%m-%d")
-        extended_end = (end_dt + timedelta(days=30)).strftime("%Y-%m-%d")
+        extended_start, extended_end = extend_date_window(start_date, end_date)
 
-        chart = _fetch_yahoo_chart(stock_name, extended_start, extended_end)
-        if chart:
-            chart["start_date"] = start_date
-            chart["end_date"] = end_date
-            chart["extended_start"] = extended_start
-            chart["extended_end"] = extended_end
-            return chart
+        from .price_store import get_price_store
 
-        ticker = yf.Ticker(stock_name)
-        hist = ticker.history(start=extended_start, end=extended_end)
+        store = get_price_store()
+        if store is not None:
+            chart = store.get_range(stock_name, extended_start, extended_end, _fetch_price_range)
+        else:
+            chart = _fetch_price_range(stock_name, extended_start, extended_end)
 
-        if hist.empty:
+        if not chart or not chart.get("close"):
             return None
 
-        return {
-            "ticker": stock_name,
-            "start_date": start_date,  # 원래 매수일 유지
-            "end_date": end_date,  # 원래 매도일 유지
-            "extended_start": extended_start,  # 확장된 시작일
-            "extended_end": extended_end,  # 확장된 종료일
-            "open": hist["Open"].tolist(),
-            "high": hist["High"].tolist(),
-            "low": hist["Low"].tolist(),
-            "close": hist["Close"].tolist(),
-            "volume": hist["Volume"].tolist(),
-            "dates": hist.index.strftime("%Y-%m-%d").tolist(),
-        }
+        chart["ticker"] = stock_name
+        chart["start_date"] = start_date  # 원래 매수일 유지
+        chart["end_date"] = end_date  # 원래 매도일 유지
+        chart["extended_start"] = extended_start  # 확장된 시작일
+        chart["extended_end"] = extended_end  # 확장된 종료일
+        return chart
     except Exception as e:
         print(f"주가 데이터 가져오기 실패: {e}")
         return None
 
 
-def _fetch_yahoo_chart(stock_name: str, start_date: str, end_date: str) -> Optional[Dict[str, Any]]:
+def _fetch_price_range(stock_name: str, start_date: str, end_date: str) -> Optional[Dict[str, Any]]:
+    """
+    [start_date, end_date] (양 끝 포함) 일봉 조회. chart API → yfinance 순서로 시도합니다.
+    거래일이 없는 구간(휴장 등)은 빈 리스트로, 두 경로 모두 실패하면 None을 돌려줍니다.
+    """
+    chart = _fetch_yahoo_chart(stock_name, start_date, end_date, allow_empty=True)
+    if chart and chart["close"]:
+        return chart
+
+    history = _fetch_yfinance_history(stock_name, start_date, end_date)
+    if history is not None and (history["close"] or chart is None):
+        return history
+    return chart
+
+
+def _fetch_yfinance_history(stock_name: str, start_date: str, end_date: str) -> Optional[Dict[str, Any]]:
+    try:
+        # yfinance(pandas 포함)는 import 비용이 커서 chart API가 실패했을 때만 import 합니다.
+        import yfinance as yf
+
+        # yfinance의 end는 포함되지 않으므로 하루 늘립니다.
+        end_exclusive = (datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        hist = yf.Ticker(stock_name).history(start=start_date, end=end_exclusive)
+    except Exception as exc:
+        print(f"yfinance fetch failed: {exc}")
+        return None
+
+    if hist.empty:
+        return {"ticker": stock_name, "open": [], "high": [], "low": [], "close": [], "volume": [], "dates": []}
+    return {
+        "ticker": stock_name,
+        "open": hist["Open"].tolist(),
+        "high": hist["High"].tolist(),
+        "low": hist["Low"].tolist(),
+        "close": hist["Close"].tolist(),
+        "volume": hist["Volume"].tolist(),
+        "dates": hist.index.strftime("%Y-%m-%d").tolist(),
+    }
+
+
+def extend_date_window(start_date: str, end_date: str, days: int = 30) -> tuple[str, str]:
+    """
+    지표 계산용 확장 기간 (매수일 - days, 매도일 + days)
+    """
+    start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+    end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+    return (
+        (start_dt - timedelta(days=days)).strftime("%Y-%m-%d"),
+        (end_dt + timedelta(days=days)).strftime("%Y-%m-%d"),
+    )
+
+
+def slice_stock_data(stock_data: Dict[str, Any], start_date: str, end_date: str) -> Optional[Dict[str, Any]]:
+    """
+    더 넓은 기간으로 조회한 주가 데이터에서 fetch_stock_data(start_date, end_date)와 같은 구간만 잘라냅니다.
+    """
+    extended_start, extended_end = extend_date_window(start_date, end_date)
+    dates = stock_data.get("dates") or []
+    indexes = [i for i, d in enumerate(dates) if extended_start <= d <= extended_end]
+    if not indexes:
+        return None
+
+    sliced: Dict[str, Any] = {
+        "ticker": stock_data.get("ticker"),
+        "start_date": start_date,
+        "end_date": end_date,
+        "extended_start": extended_start,
+        "extended_end": extended_end,
+    }
+    for key in ("open", "high", "low", "close", "volume", "dates"):
+        values = stock_data.get(key) or []
+        sliced[key] = [values[i] for i in indexes if i < len(values)]
+    return sliced
+
+
+def _fetch_yahoo_chart(
+    stock_name: str, start_date: str, end_date: str, allow_empty: bool = False
+) -> Optional[Dict[str, Any]]:
+    """allow_empty=True이면 정상 응답이지만 해당 구간에 봉이 없을 때 빈 리스트 결과를 돌려줍니다. (오류는 None)"""
     start_ts = _to_unix_date(start_date)
     end_ts = _to_unix_date(end_date)
     if start_ts is None or end_ts is None:
@@ -286,6 +498,8 @@ def _fetch_yahoo_chart(stock_name: str, start_date: str, end_date: str) -> Optio
     }
 
     try:
+        from curl_cffi import requests as curl_requests
+
         response = curl_requests.get(url, params=params, impersonate="chrome120", timeout=20)
         if response.status_code != 200:
             print(f"Yahoo chart API error: {response.status_code}")
@@ -300,6 +514,8 @@ def _fetch_yahoo_chart(stock_name: str, start_date: str, end_date: str) -> Optio
         timestamps = data.get("timestamp") or []
         indicators = data.get("indicators", {}).get("quote", [])
         if not timestamps or not indicators:
+            if allow_empty:
+                return {"ticker": stock_name, "open": [], "high": [], "low": [], "close": [], "volume": [], "dates": []}
             return None
 
         quote = indicators[0]
@@ -339,7 +555,53 @@ def _to_unix_date(date_str: str) -> Optional[int]:
         return None
 
 
-def perform_technical_analysis(stock_data: Dict[str, Any], buy_date: str, sell_date: str) -> Dict[str, Any]:
+def _analyze_technicals(
+    state: Dict[str, Any], stock_data: Dict[str, Any], buy_date: str, sell_date: str
+) -> Dict[str, Any]:
+    """보유 중(holding) 포지션은 저장된 증분 지표 상태에 새 봉만 반영해 분석합니다."""
+    indicator_state = None
+    if state.get("position_status") == "holding":
+        from .indicator_state import get_indicator_state_store
+
+        store = get_indicator_state_store()
+        if store is not None:
+            try:
+                indicator_state = store.advance(stock_data, buy_date)
+            except Exception as exc:
+                print(f"[WARNING] Incremental indicator update failed, recomputing: {exc}")
+    return perform_technical_analysis(stock_data, buy_date, sell_date, indicator_state)
+
+
+def _indicator_snapshot(
+    indicator_state: Optional["IndicatorState"], dates: List[str], buy_date: str, sell_date: str
+) -> Optional[Dict[str, Any]]:
+    """상태가 이 데이터/기간(매수일 고정, 마지막 봉이 매도일 이전)에 맞을 때만 마지막 지표 값"""
+    if indicator_state is None or not dates or dates[-1] > sell_date:
+        return None
+    if (
+        indicator_state.anchor_date != buy_date
+        or indicator_state.first_date != dates[0]
+        or indicator_state.last_date != dates[-1]
+        or indicator_state.bars != len(dates)
+    ):
+        return None
+    snapshot = indicator_state.snapshot()
+    if snapshot["start_price"] is None or snapshot["highest"] is None or snapshot["lowest"] is None:
+        return None
+    return snapshot
+
+
+def _exceeds(value: float, threshold: float, scale: float) -> bool:
+    """value > threshold 이되, 차이가 scale * _INDICATOR_TIE_RTOL 이하면 동률(False)로 봅니다."""
+    return value - threshold > _INDICATOR_TIE_RTOL * max(abs(scale), 1.0)
+
+
+def perform_technical_analysis(
+    stock_data: Dict[str, Any],
+    buy_date: str,
+    sell_date: str,
+    indicator_state: Optional["IndicatorState"] = None,
+) -> Dict[str, Any]:
     """
     기술적 분석을 수행하는 함수
 
@@ -347,6 +609,8 @@ def perform_technical_analysis(stock_data: Dict[str, Any], buy_date: str, sell_d
         stock_data: fetch_stock_data에서 가져온 주가 데이터
         buy_date: 매수일
         sell_date: 매도일
+        indicator_state: stock_data 마지막 봉까지 반영한 증분 지표 상태 (보유 중 포지션, indicator_state.py)
+            주어지고 이 기간에 쓸 수 있으면 전체 구간을 다시 계산하지 않고 상태의 마지막 값을 사용합니다.
 
     Returns:
         구조화된 기술적 분석 결과
@@ -383,33 +647,68 @@ def perform_technical_analysis(stock_data: Dict[str, Any], buy_date: str, sell_d
             }
         }
 
-    # 실제 매수/매도일의 인덱스 찾기
-    try:
-        buy_idx = dates.index(buy_date)
-        sell_idx = dates.index(sell_date)
-    except ValueError:
-        # 정확한 날짜가 없으면 가장 가까운 날짜 찾기
-        buy_idx = 0
-        sell_idx = len(close_prices) - 1
-        for i, date in enumerate(dates):
-            if date >= buy_date:
-                buy_idx = i
-                break
-        for i in range(len(dates) - 1, -1, -1):
-            if dates[i] <= sell_date:
-                sell_idx = i
-                break
-
-    # 가격 분석 (실제 매수/매도일 기준)
-    start_price = close_prices[buy_idx]
-    end_price = close_prices[sell_idx]
-    pct_change = ((end_price - start_price) / start_price) * 100
+    snapshot = _indicator_snapshot(indicator_state, dates, buy_date, sell_date)
+    if snapshot is not None:
+        start_price = snapshot["start_price"]
+        end_price = snapshot["last_close"]
+        highest = snapshot["highest"]
+        lowest = snapshot["lowest"]
+        last_bands = snapshot["bollinger"]
+        current_rsi = snapshot["rsi"]
+        last_macd = snapshot["macd"]
+        avg_volume = snapshot["average_volume"]
+        last_volume = snapshot["last_volume"]
+        bar_count = snapshot["bars"]
+    else:
+        # 실제 매수/매도일의 인덱스 찾기
+        try:
+            buy_idx = dates.index(buy_date)
+            sell_idx = dates.index(sell_date)
+        except ValueError:
+            # 정확한 날짜가 없으면 가장 가까운 날짜 찾기
+            buy_idx = 0
+            sell_idx = len(close_prices) - 1
+            for i, date in enumerate(dates):
+                if date >= buy_date:
+                    buy_idx = i
+                    break
+            for i in range(len(dates) - 1, -1, -1):
+                if dates[i] <= sell_date:
+                    sell_idx = i
+                    break
+
+        # 가격 분석 (실제 매수/매도일 기준)
+        start_price = close_prices[buy_idx]
+        end_price = close_prices[sell_idx]
+
+        # 매수/매도 기간의 최고/최저가
+        period_high_prices = high_prices[buy_idx:sell_idx+1]
+        period_low_prices = low_prices[buy_idx:sell_idx+1]
+        highest = max(period_high_prices) if period_high_prices else max(high_prices)
+        lowest = min(period_low_prices) if period_low_prices else min(low_prices)
+
+        # 볼린저 밴드 계산
+        bb_result = calculate_bollinger_bands(close_prices)
+        last_bands = None
+        if bb_result and bb_result.get('upper') and bb_result.get('lower'):
+            last_bands = {"upper": bb_result['upper'][-1], "lower": bb_result['lower'][-1]}
+
+        # RSI 계산
+        rsi_values = calculate_rsi(close_prices)
+        current_rsi = rsi_values[-1] if rsi_values else None
+
+        # MACD 계산
+        macd_result = calculate_macd(close_prices)
+        last_macd = None
+        if macd_result and macd_result.get('macd') and macd_result.get('signal'):
+            last_macd = {"macd": macd_result['macd'][-1], "signal": macd_result['signal'][-1]}
+
+        # 거래량 분석
+        avg_volume = sum(volumes) / len(volumes) if volumes else 0
+        last_volume = volumes[-1] if volumes else None
+        bar_count = len(close_prices)
 
-    # 매수/매도 기간의 최고/최저가
-    period_high_prices = high_prices[buy_idx:sell_idx+1]
-    period_low_prices = low_prices[buy_idx:sell_idx+1]
-    highest = max(period_high_prices) if period_high_prices else max(high_prices)
-    lowest = min(period_low_prices) if period_low_prices else min(low_prices)
+    pct_change = ((end_price - start_price) / start_price) * 100
 
     # 추세 판단 (간단한 로직)
     if pct_change > 5:
@@ -419,28 +718,19 @@ def perform_technical_analysis(stock_data: Dict[str, Any], buy_date: str, sell_d
     else:
         trend = "sideways"
 
-    # 볼린저 밴드 계산
-    bb_result = calculate_bollinger_bands(close_prices)
-
-    # RSI 계산
-    rsi_values = calculate_rsi(close_prices)
-    current_rsi = rsi_values[-1] if rsi_values else None
-
-    # MACD 계산
-    macd_result = calculate_macd(close_prices)
-
     # 지표 해석
     indicators = []
 
     # 볼린저 밴드 해석
-    if bb_result and bb_result.get('upper') and bb_result.get('lower'):
+    if last_bands:
         last_price = close_prices[-1]
-        upper_band = bb_result['upper'][-1]
-        lower_band = bb_result['lower'][-1]
+        upper_band = last_bands['upper']
+        lower_band = last_bands['lower']
 
-        if last_price > upper_band:
+        # 가격이 밴드와 (오차 범위 안에서) 같으면 돌파/이탈이 아님 (예: 가격이 변하지 않아 밴드 폭이 0)
+        if _exceeds(last_price, upper_band, last_price):
             bb_interp = "상단 밴드 돌파 - 과매수 구간"
-        elif last_price < lower_band:
+        elif _exceeds(lower_band, last_price, last_price):
             bb_interp = "하단 밴드 이탈 - 과매도 구간"
         else:
             bb_interp = "밴드 내 정상 범위"
@@ -453,9 +743,9 @@ def perform_technical_analysis(stock_data: Dict[str, Any], buy_date: str, sell_d
 
     # RSI 해석
     if current_rsi:
-        if current_rsi > 70:
+        if _exceeds(current_rsi, 70, 100):
             rsi_interp = "과매수 구간"
-        elif current_rsi < 30:
+        elif _exceeds(30, current_rsi, 100):
             rsi_interp = "과매도 구간"
         else:
             rsi_interp = "중립 구간"
@@ -467,14 +757,12 @@ def perform_technical_analysis(stock_data: Dict[str, Any], buy_date: str, sell_d
         })
 
     # MACD 해석
-    if macd_result and macd_result.get('macd') and macd_result.get('signal'):
-        macd_line = macd_result['macd']
-        signal_line = macd_result['signal']
-
-        current_macd = macd_line[-1]
-        current_signal = signal_line[-1]
+    if last_macd:
+        current_macd = last_macd['macd']
+        current_signal = last_macd['signal']
 
-        if current_macd > current_signal:
+        # MACD와 signal이 (오차 범위 안에서) 같으면 기존처럼 골든크로스로 보지 않음 (예: 가격이 변하지 않아 둘 다 0)
+        if _exceeds(current_macd, current_signal, close_prices[-1]):
             macd_interp = "골든크로스 - 상승 신호"
         else:
             macd_interp = "데드크로스 - 하락 신호"
@@ -485,20 +773,17 @@ def perform_technical_analysis(stock_data: Dict[str, Any], buy_date: str, sell_d
             "interpretation": macd_interp
         })
 
-    # 거래량 분석
-    avg_volume = sum(volumes) / len(volumes) if volumes else 0
-
     # 리스크 노트 생성
     risk_notes = []
     if abs(pct_change) > 20:
         risk_notes.append("높은 변동성 구간")
-    if current_rsi and current_rsi > 70:
+    if current_rsi and _exceeds(current_rsi, 70, 100):
         risk_notes.append("과매수 구간 - 조정 가능성")
-    if current_rsi and current_rsi < 30:
+    if current_rsi and _exceeds(30, current_rsi, 100):
         risk_notes.append("과매도 구간 - 반등 가능성")
 
     # 불확실성 레벨 판단
-    if len(close_prices) < 20:
+    if bar_count < 20:
         uncertainty = "high"
     elif abs(pct_change) > 15:
         uncertainty = "medium"
@@ -530,7 +815,7 @@ def perform_technical_analysis(stock_data: Dict[str, Any], buy_date: str, sell_d
             ],
             "volume_analysis": {
                 "average_volume": f"{avg_volume:.0f}",
-                "trend": "증가" if volumes and volumes[-1] > avg_volume else "감소",
+                "trend": "증가" if last_volume is not None and last_volume > avg_volume else "감소",
                 "anomalies": []
             },
             "risk_notes": risk_notes if risk_notes else ["정상 범위"],
@@ -553,49 +838,15 @@ def calculate_bollinger_bands(prices: List[float], period: int = 20, std_dev: in
     Returns:
         {'upper': 상단밴드, 'middle': 중간밴드(SMA), 'lower': 하단밴드}
     """
-    if len(prices) < period:
+    bands = bollinger_bands(prices, period, std_dev)
+    if bands is None:
         return None
-
-    upper_band = []
-    middle_band = []
-    lower_band = []
-
-    for i in range(len(prices)):
-        if i < period - 1:
-            upper_band.append(None)
-            middle_band.append(None)
-            lower_band.append(None)
-        else:
-            # 이동평균 계산
-            window = prices[i - period + 1:i + 1]
-            sma = sum(window) / period
-
-            # 표준편차 계산
-            variance = sum((x - sma) ** 2 for x in window) / period
-            std = variance ** 0.5
-
-            middle_band.append(sma)
-            upper_band.append(sma + (std * std_dev))
-            lower_band.append(sma - (std * std_dev))
-
-    # None이 아닌 값만 반환
-    valid_upper = [x for x in upper_band if x is not None]
-    valid_middle = [x for x in middle_band if x is not None]
-    valid_lower = [x for x in lower_band if x is not None]
-
-    if not valid_upper:
-        return None
-
-    return {
-        'upper': valid_upper,
-        'middle': valid_middle,
-        'lower': valid_lower
-    }
+    return {name: values.tolist() for name, values in bands.items()}
 
 
 def calculate_rsi(prices: List[float], period: int = 14) -> Optional[List[float]]:
     """
-    RSI (Relative Strength Index) 계산
+    RSI (Relative Strength Index) 계산 (Wilder 평활)
 
     Args:
         prices: 종가 리스트
@@ -604,49 +855,8 @@ def calculate_rsi(prices: List[float], period: int = 14) -> Optional[List[float]
     Returns:
         RSI 값 리스트 (0~100)
     """
-    if len(prices) < period + 1:
-        return None
-
-    rsi_values = []
-    gains = []
-    losses = []
-
-    # 가격 변화 계산
-    for i in range(1, len(prices)):
-        change = prices[i] - prices[i - 1]
-        if change > 0:
-            gains.append(change)
-            losses.append(0)
-        else:
-            gains.append(0)
-            losses.append(abs(change))
-
-    # 첫 RSI 계산 (단순 평균)
-    avg_gain = sum(gains[:period]) / period
-    avg_loss = sum(losses[:period]) / period
-
-    if avg_loss == 0:
-        rsi = 100
-    else:
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-
-    rsi_values.append(rsi)
-
-    # 이후 RSI 계산 (평활 이동평균)
-    for i in range(period, len(gains)):
-        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-
-        if avg_loss == 0:
-            rsi = 100
-        else:
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
-
-        rsi_values.append(rsi)
-
-    return rsi_values
+    values = rsi(prices, period)
+    return values.tolist() if values is not None else None
 
 
 def calculate_macd(prices: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Optional[Dict[str, List[float]]]:
@@ -662,55 +872,10 @@ def calculate_macd(prices: List[float], fast: int = 12, slow: int = 26, signal:
     Returns:
         {'macd': MACD 라인, 'signal': 시그널 라인, 'histogram': 히스토그램}
     """
-    if len(prices) < slow + signal:
+    lines = macd(prices, fast, slow, signal)
+    if lines is None:
         return None
-
-    # EMA 계산 함수
-    def calculate_ema(data: List[float], period: int) -> List[float]:
-        ema = []
-        multiplier = 2 / (period + 1)
-
-        # 첫 EMA는 SMA로 시작
-        sma = sum(data[:period]) / period
-        ema.append(sma)
-
-        # 이후 EMA 계산
-        for i in range(period, len(data)):
-            ema_value = (data[i] - ema[-1]) * multiplier + ema[-1]
-            ema.append(ema_value)
-
-        return ema
-
-    # Fast EMA와 Slow EMA 계산
-    fast_ema = calculate_ema(prices, fast)
-    slow_ema = calculate_ema(prices, slow)
-
-    # MACD 라인 계산 (Fast EMA - Slow EMA)
-    # slow EMA 길이에 맞춰 조정
-    offset = slow - fast
-    macd_line = []
-    for i in range(len(slow_ema)):
-        macd_value = fast_ema[i + offset] - slow_ema[i]
-        macd_line.append(macd_value)
-
-    # Signal 라인 계산 (MACD의 EMA)
-    signal_line = calculate_ema(macd_line, signal)
-
-    # Histogram 계산 (MACD - Signal)
-    histogram = []
-    signal_offset = signal - 1
-    for i in range(len(signal_line)):
-        hist_value = macd_line[i + signal_offset] - signal_line[i]
-        histogram.append(hist_value)
-
-    # 길이 맞추기
-    final_macd = macd_line[signal_offset:]
-
-    return {
-        'macd': final_macd,
-        'signal': signal_line,
-        'histogram': histogram
-    }
+    return {name: values.tolist() for name, values in lines.items()}
 
 
 def fallback_result(error_message: str = "데이터를 확보하지 못했습니다.") -> Dict[str, Any]:
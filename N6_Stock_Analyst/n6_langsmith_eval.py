@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Dict
 from pathlib import Path
+import os
 import sys
 
 from langsmith import Client
@@ -10,6 +11,9 @@ from langsmith.evaluation import evaluate
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(PROJECT_ROOT))
 
+# n6_judge_evaluator가 출력의 judge_metrics를 읽으므로 모든 실행을 요청 경로에서 평가합니다.
+os.environ.setdefault("N6_QUALITY_INLINE", "true")
+
 from N6_Stock_Analyst.n6 import node6_stock_analyst
 from metrics.n6_metrics import evaluate_n6_metrics
 
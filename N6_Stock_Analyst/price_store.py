@@ -0,0 +1,316 @@
+"""
+N6 주가(OHLCV) 로컬 저장소
+- 티커별로 열(column) 단위 배열(dates/open/high/low/close/volume)을 npz 파일 하나에 저장하고,
+  실제로 조회한 날짜 구간(coverage)을 함께 기록합니다.
+- 요청 구간 중 coverage에 없는 부분 구간만 네트워크(Yahoo chart API → yfinance)로 가져와 병합합니다.
+  주말만 남은 빈 구간은 조회하지 않습니다. 같은 종목/기간을 다시 분석하면 네트워크를 타지 않습니다.
+- 확정된 과거 구간(오늘 - PRICE_STORE_FINAL_LAG_DAYS 이전)은 영구 coverage로 기록하고,
+  최근/미래 구간은 PRICE_STORE_RECENT_TTL_SECONDS 동안만 유효한 coverage로 기록합니다. (장중 값/신규 봉 반영)
+- 조회 실패한 구간은 coverage에 기록하지 않고, 가진 데이터만으로 응답합니다.
+- 같은 티커 조회는 프로세스 안에서 lock으로 직렬화하고(중복 조회 방지), 파일은 임시 파일 + rename으로 교체합니다.
+  여러 워커 프로세스가 같은 디렉터리를 쓰면 파일 락(fcntl) 안에서 최신 파일에 병합해 저장합니다.
+
+선택 환경 변수:
+- PRICE_STORE_ENABLED (기본값: true)
+- PRICE_STORE_DIR (기본값: ./data/price_store)
+- PRICE_STORE_FINAL_LAG_DAYS (기본값: 2, 이 일수보다 오래된 구간만 영구 coverage로 기록)
+- PRICE_STORE_RECENT_TTL_SECONDS (기본값: 3600)
+- PRICE_STORE_MEMORY_TICKERS (기본값: 256, 메모리에 올려 둘 티커 수)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# (ticker, start, end) -> {"open": [...], ..., "dates": [...]} (빈 리스트 가능), 실패 시 None
+RangeFetcher = Callable[[str, str, str], Optional[Dict[str, Any]]]
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+_SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def _parse_day(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _format_day(value: date) -> str:
+    return value.strftime("%Y-%m-%d")
+
+
+def _to_array(values: List[Any]) -> np.ndarray:
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def _to_list(values: np.ndarray, integer: bool = False) -> List[Any]:
+    if integer:
+        return [None if np.isnan(value) else int(value) for value in values]
+    return [None if np.isnan(value) else float(value) for value in values]
+
+
+class _TickerData:
+    def __init__(self, dates: np.ndarray, columns: Dict[str, np.ndarray], coverage: List[Dict[str, Any]]) -> None:
+        self.dates = dates
+        self.columns = columns
+        self.coverage = coverage
+
+    @classmethod
+    def empty(cls) -> "_TickerData":
+        return cls(np.array([], dtype="<U10"), {name: np.array([], dtype=np.float64) for name in PRICE_COLUMNS}, [])
+
+    def merge(self, start: str, end: str, fetched: Dict[str, Any]) -> None:
+        """[start, end] 구간의 기존 행을 조회 결과로 교체합니다. (같은 날짜는 새 값 우선)"""
+        new_dates = np.array(fetched.get("dates") or [], dtype="<U10")
+        count = len(new_dates)
+        new_columns = {}
+        for name in PRICE_COLUMNS:
+            values = list(fetched.get(name) or [])[:count]
+            new_columns[name] = _to_array(values + [None] * (count - len(values)))
+        keep = (self.dates < start) | (self.dates > end)
+        dates = np.concatenate((new_dates, self.dates[keep]))
+        # np.unique는 처음 나온 위치를 고르므로 새 값이 우선합니다. (결과는 날짜순 정렬)
+        self.dates, order = np.unique(dates, return_index=True)
+        for name in PRICE_COLUMNS:
+            self.columns[name] = np.concatenate((new_columns[name], self.columns[name][keep]))[order]
+
+    def slice(self, start: str, end: str) -> Dict[str, Any]:
+        mask = (self.dates >= start) & (self.dates <= end)
+        result: Dict[str, Any] = {
+            name: _to_list(self.columns[name][mask], integer=name == "volume") for name in PRICE_COLUMNS
+        }
+        result["dates"] = self.dates[mask].tolist()
+        return result
+
+
+class PriceStore:
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = Path(
+            directory
+            or os.getenv(
+                "PRICE_STORE_DIR",
+                str(Path(__file__).resolve().parent.parent / "data" / "price_store"),
+            )
+        )
+        self.final_lag_days = int(os.getenv("PRICE_STORE_FINAL_LAG_DAYS", "2"))
+        self.recent_ttl = float(os.getenv("PRICE_STORE_RECENT_TTL_SECONDS", "3600"))
+        self.memory_tickers = max(1, int(os.getenv("PRICE_STORE_MEMORY_TICKERS", "256")))
+        # ticker → (파일 mtime_ns, 데이터)
+        self._memory: "OrderedDict[str, Tuple[int, _TickerData]]" = OrderedDict()
+        self._ticker_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "partial": 0, "misses": 0, "fetches": 0, "fetch_failures": 0}
+
+    # ---- 파일 ----
+    def _path(self, ticker: str) -> Path:
+        safe = _SAFE_NAME_RE.sub("_", ticker)
+        if safe != ticker:
+            safe = f"{safe}-{hashlib.sha1(ticker.encode('utf-8')).hexdigest()[:8]}"
+        return self.directory / f"{safe}.npz"
+
+    def _ticker_lock(self, ticker: str) -> threading.Lock:
+        with self._lock:
+            return self._ticker_locks.setdefault(ticker, threading.Lock())
+
+    @contextmanager
+    def _file_lock(self, ticker: str) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._path(ticker).with_suffix(".lock"), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _load(self, ticker: str) -> _TickerData:
+        path = self._path(ticker)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return _TickerData.empty()
+        with self._lock:
+            cached = self._memory.get(ticker)
+            if cached is not None and cached[0] == mtime:
+                self._memory.move_to_end(ticker)
+                return cached[1]
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                data = _TickerData(
+                    archive["dates"],
+                    {name: archive[name] for name in PRICE_COLUMNS},
+                    json.loads(str(archive["coverage"])),
+                )
+        except Exception as exc:
+            print(f"[WARNING] Price store file unreadable ({path.name}): {exc}")
+            return _TickerData.empty()
+        self._remember(ticker, mtime, data)
+        return data
+
+    def _remember(self, ticker: str, mtime: int, data: _TickerData) -> None:
+        with self._lock:
+            self._memory[ticker] = (mtime, data)
+            self._memory.move_to_end(ticker)
+            while len(self._memory) > self.memory_tickers:
+                self._memory.popitem(last=False)
+
+    def _save(self, ticker: str, data: _TickerData) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(ticker)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as handle:
+            np.savez(
+                handle,
+                dates=data.dates,
+                coverage=np.array(json.dumps(data.coverage)),
+                **data.columns,
+            )
+        os.replace(tmp, path)
+        self._remember(ticker, path.stat().st_mtime_ns, data)
+
+    # ---- coverage ----
+    def _active_intervals(self, coverage: List[Dict[str, Any]], now: float) -> List[Tuple[date, date]]:
+        intervals = sorted(
+            (_parse_day(item["start"]), _parse_day(item["end"]))
+            for item in coverage
+            if item.get("expires_at") is None or item["expires_at"] > now
+        )
+        merged: List[Tuple[date, date]] = []
+        for start, end in intervals:
+            if merged and start <= merged[-1][1] + timedelta(days=1):
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def missing_ranges(self, coverage: List[Dict[str, Any]], start: str, end: str, now: float) -> List[Tuple[str, str]]:
+        """[start, end] 중 coverage에 없는 부분 구간 (주말만 남은 구간 제외)"""
+        cursor, last = _parse_day(start), _parse_day(end)
+        gaps: List[Tuple[date, date]] = []
+        for covered_start, covered_end in self._active_intervals(coverage, now):
+            if covered_end < cursor:
+                continue
+            if covered_start > last:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start - timedelta(days=1)))
+            cursor = max(cursor, covered_end + timedelta(days=1))
+        if cursor <= last:
+            gaps.append((cursor, last))
+        return [
+            (_format_day(gap_start), _format_day(gap_end))
+            for gap_start, gap_end in gaps
+            if any((gap_start + timedelta(days=offset)).weekday() < 5 for offset in range((gap_end - gap_start).days + 1))
+        ]
+
+    def _record_coverage(self, coverage: List[Dict[str, Any]], start: str, end: str, now: float) -> List[Dict[str, Any]]:
+        finalized = datetime.now(timezone.utc).date() - timedelta(days=self.final_lag_days)
+        first, last = _parse_day(start), _parse_day(end)
+        entries = [item for item in coverage if item.get("expires_at") is None or item["expires_at"] > now]
+        if first <= finalized:
+            entries.append({"start": start, "end": _format_day(min(last, finalized)), "expires_at": None})
+        if last > finalized:
+            recent_start = _format_day(max(first, finalized + timedelta(days=1)))
+            entries.append({"start": recent_start, "end": end, "expires_at": now + self.recent_ttl})
+        # 영구 구간은 합쳐서 기록이 계속 늘어나지 않게 합니다.
+        permanent = self._active_intervals([item for item in entries if item.get("expires_at") is None], now)
+        return [
+            *({"start": _format_day(s), "end": _format_day(e), "expires_at": None} for s, e in permanent),
+            *(item for item in entries if item.get("expires_at") is not None),
+        ]
+
+    # ---- 조회 ----
+    def get_range(self, ticker: str, start: str, end: str, fetcher: RangeFetcher) -> Dict[str, Any]:
+        """[start, end] 구간의 OHLCV (dates 오름차순). 빠진 부분 구간만 fetcher로 가져와 저장합니다."""
+        with self._ticker_lock(ticker):
+            now = time.time()
+            data = self._load(ticker)
+            gaps = self.missing_ranges(data.coverage, start, end, now)
+            if not gaps:
+                self._count("hits")
+                return {"ticker": ticker, **data.slice(start, end)}
+            self._count("misses" if len(data.dates) == 0 and not data.coverage else "partial")
+
+            fetched: List[Tuple[str, str, Dict[str, Any]]] = []
+            for gap_start, gap_end in gaps:
+                self._count("fetches")
+                result = fetcher(ticker, gap_start, gap_end)
+                if result is None:
+                    self._count("fetch_failures")
+                    print(f"[WARNING] Price fetch failed for {ticker} {gap_start}~{gap_end}; serving stored rows")
+                    continue
+                fetched.append((gap_start, gap_end, result))
+
+            if fetched:
+                try:
+                    with self._file_lock(ticker):
+                        # 다른 프로세스가 그 사이 저장했을 수 있으므로 최신 파일에 병합합니다.
+                        data = self._load(ticker)
+                        merged = _TickerData(data.dates, dict(data.columns), list(data.coverage))
+                        for gap_start, gap_end, result in fetched:
+                            merged.merge(gap_start, gap_end, result)
+                            merged.coverage = self._record_coverage(merged.coverage, gap_start, gap_end, now)
+                        self._save(ticker, merged)
+                        data = merged
+                except Exception as exc:
+                    print(f"[WARNING] Price store write failed ({ticker}): {exc}")
+                    for gap_start, gap_end, result in fetched:
+                        data = _TickerData(data.dates, dict(data.columns), list(data.coverage))
+                        data.merge(gap_start, gap_end, result)
+            return {"ticker": ticker, **data.slice(start, end)}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            cached = len(self._memory)
+        lookups = counters["hits"] + counters["partial"] + counters["misses"]
+        return {
+            "enabled": True,
+            "directory": str(self.directory),
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else None,
+            "memory_tickers": cached,
+        }
+
+
+_store: Optional[PriceStore] = None
+_store_ready = False
+_store_lock = threading.Lock()
+
+
+def get_price_store() -> Optional[PriceStore]:
+    """PRICE_STORE_ENABLED=false이면 None (매번 네트워크 조회)"""
+    global _store, _store_ready
+    if not _store_ready:
+        with _store_lock:
+            if not _store_ready:
+                if os.getenv("PRICE_STORE_ENABLED", "true").lower() in ("1", "true", "yes"):
+                    _store = PriceStore()
+                _store_ready = True
+    return _store
+
+
+def get_price_store_stats() -> Dict[str, Any]:
+    store = get_price_store()
+    return store.stats() if store is not None else {"enabled": False}
@@ -0,0 +1,170 @@
+"""
+N6 품질 평가 파이프라인 (샘플링 + 백그라운드 평가)
+- 기존에는 N6 실행마다 judge_n6_quality(Solar 호출 1회) → evaluate_n6_metrics → persist_n6_metrics(JSON + CSV)
+  → apply_n6_prompt_optimization을 응답 경로에서 순서대로 처리한 뒤에야 N8이 시작됐습니다.
+- 이제 완료된 분석 결과 중 N6_QUALITY_SAMPLE_RATE 비율만 bounded 큐에 넣고,
+  백그라운드 워커 스레드 하나가 꺼내 judge/메트릭 평가/저장/프롬프트 최적화를 수행합니다.
+  (워커가 하나라 프롬프트/히스토리 파일 갱신도 프로세스 안에서 직렬화됩니다)
+- 샘플링은 request_id 해시 기준이라 같은 요청은 항상 같은 결과(평가/제외)가 나옵니다. request_id가 없으면 무작위.
+- 큐가 가득 차면 응답을 기다리게 하지 않고 그 건은 평가를 건너뜁니다. (dropped로 집계)
+- judge 결과는 응답 대신 저장되는 메트릭 리포트(judge_metrics)에 남습니다.
+  응답의 stock_analysis.quality_evaluation에는 queued / not_sampled / dropped가 기록됩니다.
+- N6_QUALITY_INLINE=true이면 기존처럼 모든 실행을 요청 경로에서 평가합니다. (LangSmith 평가 스크립트 등)
+
+선택 환경 변수:
+- N6_QUALITY_SAMPLE_RATE (기본값: 0.1, 0~1)
+- N6_QUALITY_MAX_PENDING (기본값: 100, 평가 대기 큐 크기)
+- N6_QUALITY_INLINE (기본값: false)
+- N6_QUALITY_DRAIN_TIMEOUT (기본값: 10, API 종료 시 남은 평가를 기다리는 시간)
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import os
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+_POLL_SECONDS = 1.0
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+def evaluate_n6_quality(
+    analysis_result: Dict[str, Any], request_id: Optional[str], with_judge: bool = True
+) -> Dict[str, Any]:
+    """judge(선택) → 메트릭 평가 → 저장 → 프롬프트 최적화. 메트릭 리포트를 돌려줍니다."""
+    from core.llm import get_solar_chat
+    from metrics.n6_metrics import evaluate_n6_metrics, persist_n6_metrics
+    from metrics.n6_prompt_optimizer import apply_n6_prompt_optimization
+
+    from .judge import judge_n6_quality
+
+    stock_analysis = analysis_result["stock_analysis"]
+    if with_judge:
+        try:
+            stock_analysis["judge_metrics"] = judge_n6_quality(get_solar_chat("n6_judge"), stock_analysis)
+        except Exception as exc:
+            stock_analysis["judge_metrics"] = {"notes": f"judge_failed: {exc}"}
+
+    report = evaluate_n6_metrics(analysis_result, request_id)
+    if "judge_metrics" in stock_analysis:
+        report["judge_metrics"] = stock_analysis["judge_metrics"]
+    persist_n6_metrics(report)
+    apply_n6_prompt_optimization(report)
+    return report
+
+
+class N6QualityEvaluator:
+    def __init__(self) -> None:
+        self.inline = _env_flag("N6_QUALITY_INLINE", "false")
+        self.sample_rate = min(1.0, max(0.0, float(os.getenv("N6_QUALITY_SAMPLE_RATE", "0.1"))))
+        self.max_pending = max(1, int(os.getenv("N6_QUALITY_MAX_PENDING", "100")))
+        self._queue: "queue.Queue[Tuple[Dict[str, Any], Optional[str]]]" = queue.Queue(maxsize=self.max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.counters = {"submitted": 0, "not_sampled": 0, "queued": 0, "dropped": 0, "evaluated": 0, "failed": 0}
+        self.last_summary: Optional[Dict[str, Any]] = None
+        self.last_evaluated_at: Optional[float] = None
+        self.total_eval_seconds = 0.0
+
+    def should_sample(self, request_id: Optional[str]) -> bool:
+        if self.sample_rate >= 1.0:
+            return True
+        if self.sample_rate <= 0.0:
+            return False
+        if request_id:
+            bucket = int(hashlib.sha1(request_id.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+            return bucket < self.sample_rate
+        return random.random() < self.sample_rate
+
+    def submit(self, analysis_result: Dict[str, Any], request_id: Optional[str]) -> str:
+        """샘플링되면 평가 큐에 넣습니다. 반환값: queued | not_sampled | dropped"""
+        self._count("submitted")
+        if not self.should_sample(request_id):
+            self._count("not_sampled")
+            return "not_sampled"
+        self._ensure_worker()
+        try:
+            # 그래프가 이후 노드에서 결과를 바꿔도 평가 대상은 N6 완료 시점 그대로 유지합니다.
+            self._queue.put_nowait((copy.deepcopy(analysis_result), request_id))
+        except queue.Full:
+            self._count("dropped")
+            return "dropped"
+        self._count("queued")
+        return "queued"
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="n6-quality-evaluator", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                analysis_result, request_id = self._queue.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            started = time.perf_counter()
+            try:
+                report = evaluate_n6_quality(analysis_result, request_id)
+            except Exception as exc:
+                print(f"[WARNING] N6 quality evaluation failed: {exc}")
+                self._count("failed")
+            else:
+                with self._lock:
+                    self.counters["evaluated"] += 1
+                    self.last_summary = report.get("summary")
+                    self.last_evaluated_at = time.time()
+                    self.total_eval_seconds += time.perf_counter() - started
+            finally:
+                self._queue.task_done()
+
+    def drain(self, timeout: float) -> bool:
+        """대기 중인 평가가 끝날 때까지 최대 timeout초 기다립니다. (종료 시/벤치마크용)"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                print(f"[WARNING] N6 quality evaluator drain timed out ({self._queue.unfinished_tasks} pending)")
+                return False
+            time.sleep(0.05)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            evaluated = counters["evaluated"]
+            return {
+                "inline": self.inline,
+                "sample_rate": self.sample_rate,
+                "max_pending": self.max_pending,
+                "pending": self._queue.qsize(),
+                **counters,
+                "avg_eval_seconds": round(self.total_eval_seconds / evaluated, 3) if evaluated else None,
+                "last_summary": self.last_summary,
+                "last_evaluated_at": self.last_evaluated_at,
+            }
+
+
+_evaluator: Optional[N6QualityEvaluator] = None
+_evaluator_lock = threading.Lock()
+
+
+def get_n6_quality_evaluator() -> N6QualityEvaluator:
+    global _evaluator
+    if _evaluator is None:
+        with _evaluator_lock:
+            if _evaluator is None:
+                _evaluator = N6QualityEvaluator()
+    return _evaluator
@@ -0,0 +1,253 @@
+"""
+N6 로컬 종목 인덱스 (종목명/별칭 → 티커)
+- 번들 CSV(tickers.csv: ticker,name,name_en,market,aliases)를 처음 사용할 때 한 번 읽어 메모리 인덱스를 만듭니다.
+  (KRX 주요 종목 + 미국 주요 상장 종목, aliases는 '|'로 구분)
+- 조회 순서: 6자리 종목코드 → 티커 → 정규화한 이름/별칭 → LLM으로 알아낸 이름(프로세스 메모리) → trigram 유사도
+  정규화: NFKC + 소문자 + 법인 표기((주), 주식회사, Inc, Corp 등)와 공백/기호 제거 (예: "삼성 전자" = "삼성전자")
+- 유사도(trigram Dice)는 최고 점수가 TICKER_INDEX_FUZZY_MIN 이상이고 2위와 차이가 충분할 때만 채택합니다.
+  입력이 후보 이름을 통째로 포함하고 더 긴 경우(예: "삼성전자우", "SK하이닉스우" = 이름 + 우/우B/2우B 등)는
+  다른 종목(우선주 등)일 수 있으므로 오타로 보지 않고 채택하지 않습니다. (LLM fallback으로 넘어감)
+  대문자 티커처럼 입력한 값(예: "XYZ")은 유사도 매칭을 하지 않습니다. (기존처럼 그대로 티커로 사용)
+- 같은 입력의 조회 결과는 프로세스 안에서 memo 합니다.
+- search()는 /v1/tickers/search 자동완성용으로 접두어/부분 문자열/유사도 점수 순 후보를 돌려줍니다.
+
+선택 환경 변수:
+- TICKER_INDEX_PATH (기본값: N6_Stock_Analyst/tickers.csv)
+- TICKER_INDEX_FUZZY_MIN (기본값: 0.5)
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_DEFAULT_PATH = Path(__file__).resolve().parent / "tickers.csv"
+_CORPORATE_MARKS_RE = re.compile(r"\(주\)|㈜|주식회사|\b(?:inc|corp|corporation|co|ltd|plc|company)\b\.?")
+_NON_WORD_RE = re.compile(r"[^0-9a-z가-힣]")
+_TICKER_SHAPED_RE = re.compile(r"[A-Z0-9.\-]+")
+_CODE_RE = re.compile(r"\d{6}")
+# 1위와 2위 유사도 차이가 이보다 작으면 애매하다고 보고 채택하지 않습니다.
+_FUZZY_MARGIN = 0.1
+_MEMO_SIZE = 4096
+
+
+def normalize_name(text: str) -> str:
+    lowered = unicodedata.normalize("NFKC", text or "").lower()
+    return _NON_WORD_RE.sub("", _CORPORATE_MARKS_RE.sub("", lowered))
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TickerIndex:
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = Path(path or os.getenv("TICKER_INDEX_PATH", str(_DEFAULT_PATH)))
+        self.fuzzy_min = float(os.getenv("TICKER_INDEX_FUZZY_MIN", "0.5"))
+        self.entries: List[Dict[str, str]] = []
+        self._by_ticker: Dict[str, int] = {}
+        self._by_code: Dict[str, int] = {}
+        # 정규화한 이름/별칭 → (entry 번호, "name" | "alias")
+        self._by_key: Dict[str, Tuple[int, str]] = {}
+        self._key_grams: Dict[str, Set[str]] = {}
+        self._gram_keys: Dict[str, Set[str]] = {}
+        self._learned: Dict[str, str] = {}
+        self._memo: "OrderedDict[str, Tuple[Optional[str], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {
+            "lookups": 0,
+            "memo_hits": 0,
+            "code": 0,
+            "ticker": 0,
+            "name": 0,
+            "alias": 0,
+            "learned": 0,
+            "fuzzy": 0,
+            "misses": 0,
+            "llm_fallbacks": 0,
+        }
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8", newline="") as handle:
+                rows = list(csv.DictReader(handle))
+        except Exception as exc:
+            print(f"[WARNING] Ticker index not loaded ({self.path}): {exc}")
+            return
+        for row in rows:
+            ticker = (row.get("ticker") or "").strip().upper()
+            if not ticker:
+                continue
+            position = len(self.entries)
+            self.entries.append(
+                {
+                    "ticker": ticker,
+                    "name": (row.get("name") or "").strip(),
+                    "name_en": (row.get("name_en") or "").strip(),
+                    "market": (row.get("market") or "").strip(),
+                }
+            )
+            self._by_ticker[ticker] = position
+            code = ticker.split(".", 1)[0]
+            if _CODE_RE.fullmatch(code):
+                self._by_code[code] = position
+            names = [row.get("name") or "", row.get("name_en") or ""]
+            aliases = (row.get("aliases") or "").split("|")
+            for kind, values in (("name", names), ("alias", aliases)):
+                for value in values:
+                    key = normalize_name(value)
+                    if key and key not in self._by_key:
+                        self._add_key(key, position, kind)
+
+    def _add_key(self, key: str, position: int, kind: str) -> None:
+        self._by_key[key] = (position, kind)
+        grams = _trigrams(key)
+        self._key_grams[key] = grams
+        for gram in grams:
+            self._gram_keys.setdefault(gram, set()).add(key)
+
+    # ---- 조회 ----
+    def resolve(self, query: str) -> Optional[str]:
+        """인덱스로 판별한 티커 (없으면 None)"""
+        raw = (query or "").strip()
+        if not raw:
+            return None
+        with self._lock:
+            self.counters["lookups"] += 1
+            memo = self._memo.get(raw)
+            if memo is not None:
+                self._memo.move_to_end(raw)
+                self.counters["memo_hits"] += 1
+                self.counters[memo[1]] += 1
+                return memo[0]
+        ticker, kind = self._resolve_uncached(raw)
+        with self._lock:
+            self.counters[kind] += 1
+            self._memo[raw] = (ticker, kind)
+            while len(self._memo) > _MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return ticker
+
+    def _resolve_uncached(self, raw: str) -> Tuple[Optional[str], str]:
+        if _CODE_RE.fullmatch(raw):
+            position = self._by_code.get(raw)
+            return (self.entries[position]["ticker"], "code") if position is not None else (None, "misses")
+
+        upper = raw.upper()
+        if upper in self._by_ticker:
+            return upper, "ticker"
+
+        key = normalize_name(raw)
+        if not key:
+            return None, "misses"
+        if key in self._by_key:
+            position, kind = self._by_key[key]
+            return self.entries[position]["ticker"], kind
+        if key in self._learned:
+            return self._learned[key], "learned"
+        if _TICKER_SHAPED_RE.fullmatch(raw):
+            return None, "misses"
+
+        ranked = self._fuzzy_scores(key)
+        if ranked:
+            best_ticker, best, best_key = ranked[0]
+            second = ranked[1][1] if len(ranked) > 1 else 0.0
+            # 후보 이름 + 덧붙은 토큰(우, 2우B, 우선주 ...)은 오타가 아니라 다른 종목일 수 있음
+            if best >= self.fuzzy_min and best - second >= _FUZZY_MARGIN and best_key not in key:
+                return best_ticker, "fuzzy"
+        return None, "misses"
+
+    def _fuzzy_scores(self, key: str) -> List[Tuple[str, float, str]]:
+        """티커별 최고 trigram Dice 점수와 그 점수를 낸 이름/별칭 key (점수 내림차순)"""
+        grams = _trigrams(key)
+        overlaps: Counter = Counter()
+        for gram in grams:
+            overlaps.update(self._gram_keys.get(gram, ()))
+        best: Dict[str, Tuple[float, str]] = {}
+        for candidate, shared in overlaps.items():
+            score = 2 * shared / (len(grams) + len(self._key_grams[candidate]))
+            ticker = self.entries[self._by_key[candidate][0]]["ticker"]
+            if score > best.get(ticker, (0.0, ""))[0]:
+                best[ticker] = (score, candidate)
+        return sorted(
+            ((ticker, score, candidate) for ticker, (score, candidate) in best.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    def record_llm_result(self, query: str, ticker: Optional[str]) -> None:
+        """LLM fallback 결과를 기억해 같은 이름은 다음부터 인덱스에서 바로 찾습니다."""
+        key = normalize_name(query)
+        with self._lock:
+            self.counters["llm_fallbacks"] += 1
+            if ticker and key:
+                self._learned[key] = ticker
+                self._memo.pop((query or "").strip(), None)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """자동완성 후보: 정확히 일치 > 접두어 > 부분 문자열 > 유사도 순"""
+        raw = (query or "").strip()
+        key = normalize_name(raw)
+        if not key:
+            return []
+        upper = raw.upper()
+        scores: Dict[str, float] = {}
+
+        def offer(ticker: str, score: float) -> None:
+            if score > scores.get(ticker, 0.0):
+                scores[ticker] = score
+
+        for ticker in self._by_ticker:
+            if ticker == upper:
+                offer(ticker, 1.0)
+            elif ticker.startswith(upper):
+                offer(ticker, 0.85)
+        for candidate, (position, _) in self._by_key.items():
+            ticker = self.entries[position]["ticker"]
+            if candidate == key:
+                offer(ticker, 1.0)
+            elif candidate.startswith(key):
+                # 입력이 후보 이름의 더 많은 부분을 덮을수록 위로
+                offer(ticker, 0.8 + 0.1 * len(key) / len(candidate))
+            elif key in candidate:
+                offer(ticker, 0.6 + 0.1 * len(key) / len(candidate))
+        for ticker, score, _ in self._fuzzy_scores(key):
+            if score >= self.fuzzy_min:
+                offer(ticker, 0.5 * score)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[: max(0, limit)]
+        return [{**self.entries[self._by_ticker[ticker]], "score": round(score, 3)} for ticker, score in ranked]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            learned = len(self._learned)
+        lookups = counters["lookups"]
+        return {
+            "entries": len(self.entries),
+            "path": str(self.path),
+            **counters,
+            "learned_names": learned,
+            "hit_rate": round((lookups - counters["misses"]) / lookups, 4) if lookups else None,
+        }
+
+
+_index: Optional[TickerIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_ticker_index() -> TickerIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = TickerIndex()
+    return _index
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
+import asyncio
 import json
 import os
 
-from core.llm import get_solar_chat, get_upstage_embeddings
+from core.llm import get_solar_chat, get_upstage_embeddings, report_llm_outcome
 from core.db import build_chroma_where, query_chroma_collection
 from .prompt import NODE7_SUMMARY_PROMPT
 from .search_tool import search_news_with_serper
@@ -46,6 +47,41 @@ def _build_rag_context(ticker: str, buy_date: str, sell_date: str | None) -> str
     return "\n".join(sections)
 
 
+def fetch_news_results(
+    ticker: str, buy_date: str, sell_date: str | None
+) -> tuple[list[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Serper 뉴스 검색 (국문 검색 → 결과 없으면 영문 fallback 검색)
+    Returns: (뉴스 목록, 트레이싱 메타데이터)
+    """
+    search_query = (
+        f"{ticker} 주가 OR {ticker} 실적 OR {ticker} 공시 OR {ticker} 가이던스 OR "
+        f'{ticker} "stock price" OR {ticker} earnings OR {ticker} filing OR {ticker} guidance'
+    )
+    print(f"[*] N7 searching for: {search_query} around {buy_date}")
+
+    news_results = search_news_with_serper(
+        search_query,
+        date_range=buy_date,
+        end_date=sell_date,
+        num_results=3,
+    )
+    meta: Dict[str, Any] = {"query": search_query, "fallback_used": False}
+    if not news_results:
+        fallback_query = f"{ticker} 실적 OR 가이던스 OR 리스크 OR 악재 OR 호재"
+        print(f"[INFO] N7 fallback search (en/us): {fallback_query} around {buy_date}")
+        news_results = search_news_with_serper(
+            fallback_query,
+            date_range=buy_date,
+            end_date=sell_date,
+            num_results=3,
+            gl="us",
+            hl="en",
+        )
+        meta.update({"fallback_used": True, "fallback_query": fallback_query})
+    return news_results or [], meta
+
+
 @traceable(name="N7_News_Summarizer")
 def node7_news_summarizer(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -56,23 +92,83 @@ def node7_news_summarizer(state: Dict[str, Any]) -> Dict[str, Any]:
     4. LLM을 사용하여 팩트 체크 및 시황 요약 수행
     5. 분석 결과를 Supabase에 저장
     """
+    ticker, buy_date, sell_date, user_reason = _read_inputs(state)
+    run = _start_n7_run(ticker, buy_date, sell_date, user_reason)
 
-    ticker = state.get("layer1_stock", "Unknown")
-    buy_date = state.get("layer2_buy_date", "Unknown")
-    sell_date = state.get("layer2_sell_date") or None
-    user_reason = state.get("layer3_decision_basis", "판단 근거 없음")
+    news_results = _search_news(state, ticker, buy_date, sell_date, run)
+    if not news_results:
+        return _empty_result(state, ticker, buy_date, user_reason, run)
 
-    search_query = (
-        f"{ticker} 주가 OR {ticker} 실적 OR {ticker} 공시 OR {ticker} 가이던스 OR "
-        f'{ticker} "stock price" OR {ticker} earnings OR {ticker} filing OR {ticker} guidance'
+    rag_context = _build_rag_context(ticker, buy_date, sell_date)
+    _store_news_vectors(news_results)
+
+    llm = get_solar_chat("n7_summary")
+    prompt = _build_prompt(ticker, buy_date, sell_date, user_reason, news_results, rag_context)
+    response = None
+    try:
+        response = llm.invoke(prompt)
+        analysis_json = _parse_analysis(response.content)
+    except Exception as e:
+        print(f"[ERROR] LLM analysis failed: {e}")
+        if response is not None:
+            report_llm_outcome(response, "parse_fail")
+        analysis_json = _failed_analysis(user_reason)
+
+    return _finish_n7(state, llm, news_results, analysis_json, run)
+
+
+@traceable(name="N7_News_Summarizer")
+async def anode7_news_summarizer(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    N7 비동기 버전
+    - Serper 검색/Chroma 조회·저장/Supabase 저장은 스레드로, 요약 LLM 호출은 ainvoke로 수행합니다.
+    """
+    ticker, buy_date, sell_date, user_reason = _read_inputs(state)
+    run = _start_n7_run(ticker, buy_date, sell_date, user_reason)
+
+    news_results = await asyncio.to_thread(_search_news, state, ticker, buy_date, sell_date, run)
+    if not news_results:
+        return _empty_result(state, ticker, buy_date, user_reason, run)
+
+    rag_context, _ = await asyncio.gather(
+        asyncio.to_thread(_build_rag_context, ticker, buy_date, sell_date),
+        asyncio.to_thread(_store_news_vectors, news_results),
     )
 
-    run = get_current_run_tree()
-    metrics_enabled = os.getenv("N7_METRICS_ENABLED", "false").lower() in (
+    llm = get_solar_chat("n7_summary")
+    prompt = _build_prompt(ticker, buy_date, sell_date, user_reason, news_results, rag_context)
+    response = None
+    try:
+        response = await llm.ainvoke(prompt)
+        analysis_json = _parse_analysis(response.content)
+    except Exception as e:
+        print(f"[ERROR] LLM analysis failed: {e}")
+        if response is not None:
+            report_llm_outcome(response, "parse_fail")
+        analysis_json = _failed_analysis(user_reason)
+
+    return await asyncio.to_thread(_finish_n7, state, llm, news_results, analysis_json, run)
+
+
+def _read_inputs(state: Dict[str, Any]) -> Tuple[str, str, str | None, str]:
+    return (
+        state.get("layer1_stock", "Unknown"),
+        state.get("layer2_buy_date", "Unknown"),
+        state.get("layer2_sell_date") or None,
+        state.get("layer3_decision_basis", "판단 근거 없음"),
+    )
+
+
+def _metrics_enabled() -> bool:
+    return os.getenv("N7_METRICS_ENABLED", "false").lower() in (
         "1",
         "true",
         "yes",
     )
+
+
+def _start_n7_run(ticker: str, buy_date: str, sell_date: str | None, user_reason: str) -> Any:
+    run = get_current_run_tree()
     if run:
         run.add_metadata(
             {
@@ -82,85 +178,66 @@ def node7_news_summarizer(state: Dict[str, Any]) -> Dict[str, Any]:
                 "user_reason": user_reason,
             }
         )
+    return run
 
-    print(f"[*] N7 searching for: {search_query} around {buy_date}")
 
-    news_results = search_news_with_serper(
-        search_query,
-        date_range=buy_date,
-        end_date=sell_date,
-        num_results=3,
-    )
+def _search_news(
+    state: Dict[str, Any], ticker: str, buy_date: str, sell_date: str | None, run: Any
+) -> list[Dict[str, Any]]:
+    # 배치 분석에서는 같은 종목/기간의 거래끼리 한 번 검색한 뉴스를 공유합니다.
+    prefetched_news = state.get("n7_prefetched_news")
+    if isinstance(prefetched_news, list):
+        news_results = prefetched_news
+        search_meta: Dict[str, Any] = {"prefetched": True}
+    else:
+        news_results, search_meta = fetch_news_results(ticker, buy_date, sell_date)
     if run:
-        run.add_metadata(
+        run.add_metadata({"news_count": len(news_results), **search_meta})
+    return news_results
+
+
+def _empty_result(
+    state: Dict[str, Any], ticker: str, buy_date: str, user_reason: str, run: Any
+) -> Dict[str, Any]:
+    print("[WARNING] N7 no news results after fallback search.")
+    empty_context = {
+        "ticker": ticker,
+        "period": {"buy_date": buy_date, "sell_date": state.get("layer2_sell_date")},
+        "summary": "관련 뉴스 검색 결과가 없습니다.",
+        "market_sentiment": {
+            "index": 50,
+            "label": "neutral",
+            "description": "데이터 부재로 인해 객관적인 시장 심리 판단 불가.",
+        },
+        "key_headlines": [],
+        "news_summaries": [
             {
-                "news_count": len(news_results) if news_results else 0,
-                "query": search_query,
-                "fallback_used": False,
+                "title": "정보 없음",
+                "source": "N/A",
+                "date": "N/A",
+                "link": "N/A",
+                "summary": "분석 가능한 뉴스 데이터 미제공.",
             }
-        )
-    if not news_results:
-        fallback_query = f"{ticker} 실적 OR 가이던스 OR 리스크 OR 악재 OR 호재"
-        print(f"[INFO] N7 fallback search (en/us): {fallback_query} around {buy_date}")
-        news_results = search_news_with_serper(
-            fallback_query,
-            date_range=buy_date,
-            end_date=sell_date,
-            num_results=3,
-            gl="us",
-            hl="en",
-        )
-        if run:
-            run.add_metadata({"fallback_used": True, "fallback_query": fallback_query})
-    if not news_results:
-        print("[WARNING] N7 no news results after fallback search.")
-        empty_context = {
-            "ticker": ticker,
-            "period": {"buy_date": buy_date, "sell_date": state.get("layer2_sell_date")},
-            "summary": "관련 뉴스 검색 결과가 없습니다.",
-            "market_sentiment": {
-                "index": 50,
-                "label": "neutral",
-                "description": "데이터 부재로 인해 객관적인 시장 심리 판단 불가.",
-            },
-            "key_headlines": [],
-            "news_summaries": [
+        ],
+        "fact_check": {
+            "user_belief": user_reason,
+            "actual_fact": "제공된 뉴스 항목 없음.",
+            "verdict": "unknown",
+        },
+        "uncertainty_level": "high",
+    }
+    if run:
+        if _metrics_enabled():
+            run.add_metadata(
                 {
-                    "title": "정보 없음",
-                    "source": "N/A",
-                    "date": "N/A",
-                    "link": "N/A",
-                    "summary": "분석 가능한 뉴스 데이터 미제공.",
+                    "n7_metrics_summary": {"passed": 0, "total": 5, "score": 0.0},
                 }
-            ],
-            "fact_check": {
-                "user_belief": user_reason,
-                "actual_fact": "제공된 뉴스 항목 없음.",
-                "verdict": "unknown",
-            },
-            "uncertainty_level": "high",
-        }
-        if run:
-            if metrics_enabled:
-                run.add_metadata(
-                    {
-                        "n7_metrics_summary": {"passed": 0, "total": 5, "score": 0.0},
-                    }
-                )
-            run.add_outputs({"n7_news_analysis": {"news_context": empty_context}})
-        return {"n7_news_analysis": {"news_context": empty_context}}
-    news_items = [
-        {
-            "title": n.get("title", ""),
-            "source": n.get("source", ""),
-            "date": n.get("date", ""),
-            "snippet": n.get("snippet", ""),
-            "link": n.get("link", ""),
-        }
-        for n in news_results[:3]
-    ]
-    rag_context = _build_rag_context(ticker, buy_date, sell_date)
+            )
+        run.add_outputs({"n7_news_analysis": {"news_context": empty_context}})
+    return {"n7_news_analysis": {"news_context": empty_context}}
+
 
+def _store_news_vectors(news_results: list[Dict[str, Any]]) -> None:
     # ChromaDB 저장 (선택적)
     if HAS_REPOSITORY:
         try:
@@ -188,30 +265,56 @@ def node7_news_summarizer(state: Dict[str, Any]) -> Dict[str, Any]:
         print("[INFO] Skipping ChromaDB storage (repository module not available)")
 
 
-    llm = get_solar_chat()
-    news_payload = json.dumps(news_items, ensure_ascii=False)
-
-    prompt = NODE7_SUMMARY_PROMPT.format(
+def _build_prompt(
+    ticker: str,
+    buy_date: str,
+    sell_date: str | None,
+    user_reason: str,
+    news_results: list[Dict[str, Any]],
+    rag_context: str,
+) -> str:
+    news_items = [
+        {
+            "title": n.get("title", ""),
+            "source": n.get("source", ""),
+            "date": n.get("date", ""),
+            "snippet": n.get("snippet", ""),
+            "link": n.get("link", ""),
+        }
+        for n in news_results[:3]
+    ]
+    return NODE7_SUMMARY_PROMPT.format(
         ticker=ticker,
         buy_date=buy_date,
         sell_date=sell_date or "Unknown",
         user_reason=user_reason,
-        news_items=news_payload,
+        news_items=json.dumps(news_items, ensure_ascii=False),
         rag_context=rag_context,
     )
 
-    try:
-        response = llm.invoke(prompt)
-        content = response.content.replace("```json", "").replace("```", "").strip()
-        analysis_json = json.loads(content)
-    except Exception as e:
-        print(f"[ERROR] LLM analysis failed: {e}")
-        analysis_json = {
-            "summary": "분석 실패",
-            "market_sentiment": {"index": 50, "label": "unknown", "description": ""},
-            "fact_check": {"user_belief": user_reason, "actual_fact": "분석 오류", "verdict": "unknown"},
-        }
 
+def _parse_analysis(content: str) -> Dict[str, Any]:
+    content = content.replace("```json", "").replace("```", "").strip()
+    return json.loads(content)
+
+
+def _failed_analysis(user_reason: str) -> Dict[str, Any]:
+    return {
+        "summary": "분석 실패",
+        "market_sentiment": {"index": 50, "label": "unknown", "description": ""},
+        "fact_check": {"user_belief": user_reason, "actual_fact": "분석 오류", "verdict": "unknown"},
+    }
+
+
+def _finish_n7(
+    state: Dict[str, Any],
+    llm: Any,
+    news_results: list[Dict[str, Any]],
+    analysis_json: Dict[str, Any],
+    run: Any,
+) -> Dict[str, Any]:
+    """응답 구성 + (선택) 메트릭 평가/저장 + (선택) Supabase 저장"""
+    ticker, buy_date, sell_date, user_reason = _read_inputs(state)
     fallback_news_summaries = [
         {
             "title": n.get("title", ""),
@@ -237,7 +340,7 @@ def node7_news_summarizer(state: Dict[str, Any]) -> Dict[str, Any]:
         "uncertainty_level": "low",
     }
 
-    if metrics_enabled:
+    if _metrics_enabled():
         report = evaluate_n7_metrics(
             llm=llm,
             ticker=ticker,
@@ -1,17 +1,18 @@
 # -*- coding: utf-8 -*-
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
 import json
 import time
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from core.llm import get_solar_chat
+from core.llm import get_solar_chat, report_llm_outcome
 from core.db import build_chroma_where, query_chroma_collection
 from langsmith.run_helpers import get_current_run_tree
 from utils.json_parser import parse_json
 from utils.safety import contains_advice
 from utils.validator import validate_node8
-from metrics.llm_judge import judge_consistency_sync
+from metrics.llm_judge import judge_consistency, judge_consistency_sync
 from metrics.models import METRIC_TARGETS
 from .prompt import NODE8_LOSS_ANALYST_PROMPT
 
@@ -46,10 +47,72 @@ def node8_loss_analyst(state: Dict[str, Any]) -> Dict[str, Any]:
     N8: loss analyst.
     Uses N6/N7 outputs to derive loss causes and market context.
     """
+    rag_context = _build_rag_context(
+        state.get("layer1_stock") or "", state.get("layer2_buy_date") or "", state.get("layer2_sell_date")
+    )
+    messages = _build_messages(state, rag_context)
+    llm_with_config = get_solar_chat("n8_analysis").bind(max_tokens=2048)
+
+    try:
+        llm_start = time.perf_counter()
+        response = llm_with_config.invoke(messages)
+        llm_elapsed = time.perf_counter() - llm_start
+        print(f"[TIMING] N8 LLM invoke took {llm_elapsed:.2f}s")
+        raw = response.content if isinstance(response.content, str) else str(response.content)
+    except Exception as exc:
+        return _fallback(f"LLM call failed: {exc}")
+
+    parsed, failure = _parse_output(raw)
+    if parsed is None:
+        report_llm_outcome(response, "parse_fail" if failure == "JSON parse failed" else "fallback")
+        return _fallback(failure)
+
+    n8_eval = _evaluate_n8_metrics(parsed)
+    n8_eval.update(_evaluate_n8_llm_metrics(parsed, state))
+    parsed["n8_eval"] = n8_eval
+    _record_n8_eval_to_langsmith(n8_eval)
+    return parsed
+
+
+async def anode8_loss_analyst(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    N8 비동기 버전
+    - Chroma 조회는 스레드로, LLM 호출(분석/judge)은 ainvoke로 수행합니다.
+    """
+    rag_context = await asyncio.to_thread(
+        _build_rag_context,
+        state.get("layer1_stock") or "",
+        state.get("layer2_buy_date") or "",
+        state.get("layer2_sell_date"),
+    )
+    messages = _build_messages(state, rag_context)
+    llm_with_config = get_solar_chat("n8_analysis").bind(max_tokens=2048)
+
+    try:
+        llm_start = time.perf_counter()
+        response = await llm_with_config.ainvoke(messages)
+        llm_elapsed = time.perf_counter() - llm_start
+        print(f"[TIMING] N8 LLM ainvoke took {llm_elapsed:.2f}s")
+        raw = response.content if isinstance(response.content, str) else str(response.content)
+    except Exception as exc:
+        return _fallback(f"LLM call failed: {exc}")
+
+    parsed, failure = _parse_output(raw)
+    if parsed is None:
+        report_llm_outcome(response, "parse_fail" if failure == "JSON parse failed" else "fallback")
+        return _fallback(failure)
+
+    n8_eval = _evaluate_n8_metrics(parsed)
+    n8_eval.update(await _aevaluate_n8_llm_metrics(parsed, state))
+    parsed["n8_eval"] = n8_eval
+    _record_n8_eval_to_langsmith(n8_eval)
+    return parsed
+
+
+def _build_messages(state: Dict[str, Any], rag_context: str) -> List[Any]:
     ticker = state.get("layer1_stock")
     buy_date = state.get("layer2_buy_date")
     sell_date = state.get("layer2_sell_date")
-    rag_context = _build_rag_context(ticker or "", buy_date or "", sell_date)
     n6_analysis = state.get("n6_stock_analysis")
     if isinstance(n6_analysis, dict):
         stock_analysis = n6_analysis.get("stock_analysis")
@@ -74,37 +137,24 @@ def node8_loss_analyst(state: Dict[str, Any]) -> Dict[str, Any]:
     except Exception:
         print("[DEBUG] N8 payload chars: unavailable")
 
-    llm = get_solar_chat()
-    llm_with_config = llm.bind(max_tokens=2048)
-    messages = [
+    return [
         SystemMessage(content=NODE8_LOSS_ANALYST_PROMPT),
         HumanMessage(content=f"Build JSON using the following input.\n{payload}"),
     ]
 
-    try:
-        llm_start = time.perf_counter()
-        response = llm_with_config.invoke(messages)
-        llm_elapsed = time.perf_counter() - llm_start
-        print(f"[TIMING] N8 LLM invoke took {llm_elapsed:.2f}s")
-        raw = response.content if isinstance(response.content, str) else str(response.content)
-    except Exception as exc:
-        return _fallback(f"LLM call failed: {exc}")
 
+def _parse_output(raw: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """(파싱 결과, 실패 사유) - 실패 시 파싱 결과는 None"""
     if contains_advice(raw):
-        return _fallback("Blocked due to investment advice")
+        return None, "Blocked due to investment advice"
 
     parsed = parse_json(raw)
     if not isinstance(parsed, dict):
-        return _fallback("JSON parse failed")
+        return None, "JSON parse failed"
 
     if not validate_node8(parsed):
-        return _fallback("Output schema validation failed")
-
-    n8_eval = _evaluate_n8_metrics(parsed)
-    n8_eval.update(_evaluate_n8_llm_metrics(parsed, state))
-    parsed["n8_eval"] = n8_eval
-    _record_n8_eval_to_langsmith(n8_eval)
-    return parsed
+        return None, "Output schema validation failed"
+    return parsed, ""
 
 
 def _fallback(reason: str) -> Dict[str, Any]:
@@ -228,7 +278,7 @@ def _evaluate_n8_llm_metrics(
         return {"llm_fact_consistency_score": None}
 
     try:
-        llm = get_solar_chat()
+        llm = get_solar_chat("n8_judge")
         eval_start = time.perf_counter()
         score = judge_consistency_sync(llm, news_text, ai_text)
         eval_elapsed = time.perf_counter() - eval_start
@@ -236,6 +286,31 @@ def _evaluate_n8_llm_metrics(
     except Exception:
         return {"llm_fact_consistency_score": None}
 
+    return _fact_consistency_result(score)
+
+
+async def _aevaluate_n8_llm_metrics(
+    n8_data: Dict[str, Any],
+    state: Dict[str, Any],
+) -> Dict[str, Any]:
+    news_text = _build_news_text(state.get("n7_news_analysis") or {})
+    ai_text = _build_n8_text(n8_data)
+    if not news_text or not ai_text:
+        return {"llm_fact_consistency_score": None}
+
+    try:
+        llm = get_solar_chat("n8_judge")
+        eval_start = time.perf_counter()
+        score = await judge_consistency(llm, news_text, ai_text)
+        eval_elapsed = time.perf_counter() - eval_start
+        print(f"[TIMING] N8 LLM judge took {eval_elapsed:.2f}s")
+    except Exception:
+        return {"llm_fact_consistency_score": None}
+
+    return _fact_consistency_result(score)
+
+
+def _fact_consistency_result(score: float) -> Dict[str, Any]:
     target = METRIC_TARGETS.get("fact_consistency_score", 95.0)
     return {
         "llm_fact_consistency_score": round(score, 2),
@@ -1,8 +1,8 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from core.llm import get_solar_chat
+from core.llm import get_solar_chat, report_llm_outcome
 from .prompt import NODE9_SYSTEM_PROMPT
 from utils.json_parser import parse_json
 from utils.validator import validate_node9
@@ -12,10 +12,29 @@ def node9_learning_pattern_analyzer(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Node9: 학습 패턴 분석 (행동경제학 기반)
     """
-    llm = get_solar_chat()
-    # N9의 새 구조는 출력이 길어서 max_tokens를 충분히 설정
-    llm_with_config = llm.bind(max_tokens=4096)
+    messages, investment_reason = _build_messages(state)
+    try:
+        # N9의 새 구조는 출력이 길어서 max_tokens를 충분히 설정
+        response = get_solar_chat("n9_pattern").bind(max_tokens=4096).invoke(messages)
+    except Exception:
+        # LLM 호출 실패 시에도 fallback 반환
+        return _fallback(investment_reason)
+    return _parse_response(response, investment_reason)
+
+
+async def anode9_learning_pattern_analyzer(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Node9 비동기 버전: LLM 호출을 ainvoke로 수행해 스레드를 점유하지 않습니다.
+    """
+    messages, investment_reason = _build_messages(state)
+    try:
+        response = await get_solar_chat("n9_pattern").bind(max_tokens=4096).ainvoke(messages)
+    except Exception:
+        return _fallback(investment_reason)
+    return _parse_response(response, investment_reason)
 
+
+def _build_messages(state: Dict[str, Any]) -> Tuple[List[Any], str]:
     n9_input = state.get("n9_input")
     if not isinstance(n9_input, dict):
         n9_input = {}
@@ -45,21 +64,25 @@ def node9_learning_pattern_analyzer(state: Dict[str, Any]) -> Dict[str, Any]:
             )
         ),
     ]
+    return messages, investment_reason
+
 
+def _parse_response(response: Any, investment_reason: str) -> Dict[str, Any]:
     try:
-        response = llm_with_config.invoke(messages)
         raw = response.content if isinstance(response.content, str) else str(response.content)
 
         parsed = parse_json(raw)
         if not isinstance(parsed, dict):
+            report_llm_outcome(response, "parse_fail")
             return _fallback(investment_reason)
 
         if not validate_node9(parsed):
+            report_llm_outcome(response, "fallback")
             return _fallback(investment_reason)
 
         return parsed
     except Exception:
-        # LLM 호출 실패 시에도 fallback 반환
+        report_llm_outcome(response, "parse_fail")
         return _fallback(investment_reason)
 
 
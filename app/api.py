@@ -1,24 +1,52 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import functools
 import json
-from collections import OrderedDict
+import os
+import time
 from datetime import datetime, date
 from typing import Any, Dict, List, Tuple, Optional
-from uuid import uuid4
+from uuid import NAMESPACE_URL, uuid4, uuid5
 from pathlib import Path
 
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from N9_Learning_Pattern_Analyzer.n9 import node9_learning_pattern_analyzer
-from workflow.graph import build_graph
+from N9_Learning_Pattern_Analyzer.n9 import anode9_learning_pattern_analyzer
+from N11_Investment_Expert.n11 import BLOCKED_MESSAGE, astream_investment_expert
+from N6_Stock_Analyst.quality_evaluator import get_n6_quality_evaluator
+from N6_Stock_Analyst.ticker_index import get_ticker_index
+from app.service.admission import AdmissionController, AdmissionRejected
+from app.service.analysis_cache import create_analysis_cache
+from app.service.batch_service import run_batch_analysis, strip_prefetched
 from app.service.embedding_service import EmbeddingService
-from core.db import get_chroma_collection, get_supabase_client
-from core.llm import get_solar_chat
+from app.service.job_service import AnalysisJobManager, AnalysisJobQueueFull
+from app.service.request_key import analysis_request_key
+from app.service.response_view import project, resolve_projection
+from app.service.serialization import CompressionMiddleware, FastJSONResponse
+from app.service.shared_state import create_shared_state
+from app.service.single_flight import SingleFlight
+from app.service.write_behind import WriteBehindQueue
+from core.db import get_chroma_client, get_chroma_collection, get_supabase_client, is_supabase_configured
+from core.llm import (
+    aclose_llm_http_clients,
+    flush_llm_usage,
+    get_llm_cache_stats,
+    get_llm_governor_stats,
+    get_llm_hedge_stats,
+    get_llm_inflight_tracker,
+    get_llm_routes,
+    get_llm_usage_stats,
+    get_solar_chat,
+    warmup_llm_clients,
+)
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from utils.json_parser import parse_json
+from utils.safety import contains_advice
 from app.quiz_prompt import QUIZ_SYSTEM_PROMPT
 
 # Metrics imports
@@ -36,6 +64,11 @@ class AnalyzeRequest(BaseModel):
     user_message: str | None = None
 
 
+class BatchAnalyzeRequest(BaseModel):
+    trades: List[AnalyzeRequest]
+    max_concurrency: int | None = None
+
+
 class ChatMessage(BaseModel):
     role: str
     content: str
@@ -51,7 +84,7 @@ class QuizRequest(BaseModel):
     learning_pattern_analysis: Dict[str, Any]
 
 
-app = FastAPI(title="WildCard API", version="0.1.0")
+app = FastAPI(title="WildCard API", version="0.1.0", default_response_class=FastJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -59,12 +92,73 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
 
 _embedding_service: EmbeddingService | None = None
-_graph = build_graph()
-_chat_graph = build_graph(entry_point="N11")
-_analysis_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
-_analysis_cache_limit = 50
+# 그래프는 첫 요청(또는 warmup)에서 만듭니다. (_get_graph/_get_chat_graph)
+_graph: Any = None
+_chat_graph: Any = None
+# true이면 startup에서 그래프/LLM 클라이언트/DB 클라이언트를 미리 만든 뒤 요청을 받습니다. (_warmup)
+_warmup_on_startup = os.getenv("APP_WARMUP_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+# /v1/chat/stream: 이 글자 수 이상 모이면 안전 검사 후 flush
+CHAT_STREAM_MIN_FLUSH_CHARS = 12
+_analysis_cache = create_analysis_cache()
+# 정규화 입력이 같은 최근 분석 결과를 그래프 재실행 없이 재사용할지 여부 (TTL 내)
+_analysis_cache_reuse = os.getenv("ANALYSIS_CACHE_REUSE", "false").lower() in ("1", "true", "yes")
+_graph_single_flight = SingleFlight()
+# 멀티 워커/레플리카 간 공유 상태 (작업 레코드, admission 카운터)
+_shared_state = create_shared_state()
+
+
+# _refresh_cluster_llm_gauge가 마지막으로 읽은 전체 워커 합계와 그때 기록한 이 워커의 값
+_cluster_llm_gauge = {"total": 0, "local": 0}
+_LLM_GAUGE_INTERVAL_SECONDS = 1.0
+
+
+def _cluster_llm_in_flight() -> int:
+    """
+    전체 워커의 진행 중인 LLM 호출 수 (admission acquire/status에서 이벤트 루프 위에서 호출)
+    공유 저장소는 읽지 않고, 주기적으로 갱신한 합계에서 이 워커의 몫만 현재 값으로 바꿔 계산합니다.
+    """
+    local = get_llm_inflight_tracker().in_flight()
+    return max(local, _cluster_llm_gauge["total"] - _cluster_llm_gauge["local"] + local)
+
+
+def _sync_cluster_llm_gauge() -> None:
+    local = get_llm_inflight_tracker().in_flight()
+    _shared_state.set_gauge("llm_in_flight", local)
+    _cluster_llm_gauge.update(total=int(_shared_state.gauge_total("llm_in_flight")), local=local)
+
+
+_admission = AdmissionController(llm_in_flight=_cluster_llm_in_flight)
+
+# 병합된 결과에 호출자 자신의 입력값을 덮어쓸 키
+_CALLER_INPUT_KEYS = (
+    "layer1_stock",
+    "layer2_buy_date",
+    "layer2_sell_date",
+    "layer3_decision_basis",
+    "user_message",
+)
+
+
+def _get_graph() -> Any:
+    """분석 그래프. 비동기 노드(ainvoke)로 구성해 이벤트 루프 하나에서 다수의 분석을 동시에 처리합니다."""
+    global _graph
+    if _graph is None:
+        from workflow.graph import build_graph
+
+        _graph = build_graph(async_nodes=True)
+    return _graph
+
+
+def _get_chat_graph() -> Any:
+    global _chat_graph
+    if _chat_graph is None:
+        from workflow.graph import build_graph
+
+        _chat_graph = build_graph(entry_point="N11")
+    return _chat_graph
 
 
 def _get_embedding_service() -> EmbeddingService:
@@ -84,191 +178,346 @@ def _cache_analysis_result(
     result: Dict[str, Any],
     metrics_summary: Optional[Dict[str, Any]],
 ) -> None:
+    input_key = analysis_request_key(state)
     payload = {
         "request_id": request_id,
+        "input_key": input_key,
         "state": state,
         "result": result,
         "metrics_summary": metrics_summary,
         "cached_at": datetime.now().isoformat(),
     }
-    _analysis_cache[request_id] = payload
-    _analysis_cache.move_to_end(request_id)
-    while len(_analysis_cache) > _analysis_cache_limit:
-        _analysis_cache.popitem(last=False)
-
-
-def _save_to_supabase(request_id: str, state: Dict[str, Any], results: Dict[str, Any]) -> None:
     try:
-        db = get_supabase_client()
-        request_payload = {
-            "id": request_id,
-            "layer1_stock": state.get("layer1_stock"),
-            "layer2_buy_date": state.get("layer2_buy_date"),
-            "layer2_sell_date": state.get("layer2_sell_date"),
-            "layer3_decision_basis": state.get("layer3_decision_basis"),
-            "user_message": state.get("user_message"),
-            "raw_input": state,
-        }
-        db.table("analysis_requests").insert(request_payload).execute()
-
-        result_rows = []
-        for node_key in ("n6", "n7", "n8", "n9", "n10"):
-            node_result = results.get(node_key)
-            if node_result is None:
-                continue
-            result_rows.append(
-                {"request_id": request_id, "node": node_key, "result": node_result}
-            )
-        if result_rows:
-            db.table("analysis_results").insert(result_rows).execute()
+        _analysis_cache.put(request_id, payload, input_key=input_key)
     except Exception as exc:
-        print(f"[WARNING] Supabase save failed: {exc}")
+        print(f"[WARNING] Analysis cache save failed: {exc}")
+
 
+def _personality_cache_id(request_id: str) -> str:
+    # 채팅으로 다시 만든 N9(사용자 성향 반영)는 요청별 별도 항목에 둡니다.
+    # 입력 해시로 재사용되는 분석 항목에 섞이면 같은 입력의 다른 요청이 이 사용자의 N9를 받게 됩니다.
+    return f"{request_id}:personality"
 
-def _save_to_chroma(request_id: str, state: Dict[str, Any], results: Dict[str, Any]) -> None:
+
+def _load_cached_analysis(request_id: str) -> Optional[Dict[str, Any]]:
+    """request_id의 분석 항목 (그 요청에서 성향을 다시 분석했으면 N9를 그 결과로 바꾼 사본)"""
     try:
-        embeddings = _get_embedding_service()
-        external_news_collection = get_chroma_collection("external_news")
-        stock_metrics_collection = get_chroma_collection("stock_metrics")
-        internal_facts_collection = get_chroma_collection("internal_facts")
+        cached = _analysis_cache.get(request_id)
+        if not cached:
+            return cached
+        personality = _analysis_cache.get(_personality_cache_id(request_id))
+    except Exception as exc:
+        print(f"[WARNING] Analysis cache load failed: {exc}")
+        return None
+    if personality and isinstance(cached.get("result"), dict):
+        cached = {
+            **cached,
+            "result": {**cached["result"], "learning_pattern_analysis": personality.get("learning_pattern_analysis")},
+        }
+    return cached
+
+
+def _build_supabase_rows(
+    request_id: str, state: Dict[str, Any], results: Dict[str, Any]
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    request_payload = {
+        "id": request_id,
+        "layer1_stock": state.get("layer1_stock"),
+        "layer2_buy_date": state.get("layer2_buy_date"),
+        "layer2_sell_date": state.get("layer2_sell_date"),
+        "layer3_decision_basis": state.get("layer3_decision_basis"),
+        "user_message": state.get("user_message"),
+        "raw_input": state,
+    }
 
-        def _add_docs(collection, docs: List[str], ids: List[str], metas: List[Dict[str, Any]]) -> None:
-            if not docs:
-                return
-            vectors = embeddings.create_embeddings(docs)
-            collection.add(ids=ids, documents=docs, embeddings=vectors, metadatas=metas)
-
-        # N7 뉴스 요약/헤드라인 저장 (RAG 대비)
-        n7_payload = results.get("n7") or {}
-        n7_context: Dict[str, Any] = {}
-        if isinstance(n7_payload, dict):
-            if isinstance(n7_payload.get("news_context"), dict):
-                n7_context = n7_payload.get("news_context", {})
-            elif isinstance(n7_payload.get("n7_news_analysis"), dict):
-                n7_context = n7_payload.get("n7_news_analysis", {}).get("news_context", {})
-        ticker = n7_context.get("ticker") or state.get("layer1_stock")
-        news_items = []
-        for item in (n7_context.get("news_summaries") or []):
-            if not isinstance(item, dict):
-                continue
-            news_items.append(
-                {
-                    "title": item.get("title"),
-                    "summary": item.get("summary"),
-                    "date": item.get("date"),
-                    "source": item.get("source"),
-                    "link": item.get("link"),
-                }
-            )
-        for item in (n7_context.get("key_headlines") or []):
-            if not isinstance(item, dict):
-                continue
-            news_items.append(
-                {
-                    "title": item.get("title"),
-                    "summary": item.get("snippet"),
-                    "date": item.get("date"),
-                    "source": item.get("source"),
-                    "link": item.get("link"),
-                }
-            )
+    result_rows = []
+    for node_key in ("n6", "n7", "n8", "n9", "n10"):
+        node_result = results.get(node_key)
+        if node_result is None:
+            continue
+        # 재시도 시 중복 행이 생기지 않도록 (request_id, node)로 결정되는 id를 사용합니다.
+        row_id = str(uuid5(NAMESPACE_URL, f"{request_id}:{node_key}"))
+        result_rows.append(
+            {"id": row_id, "request_id": request_id, "node": node_key, "result": node_result}
+        )
+    return request_payload, result_rows
 
-        external_docs = []
-        external_ids = []
-        external_meta = []
-        for idx, item in enumerate(news_items):
-            title = item.get("title") or ""
-            summary = item.get("summary") or ""
-            if not title and not summary:
-                continue
-            text = f"{title}\n{summary}".strip()
-            external_docs.append(text)
-            external_ids.append(f"{request_id}:news:{idx}")
-            external_meta.append(
-                {
-                    "request_id": request_id,
-                    "ticker": ticker,
-                    "date": item.get("date"),
-                    "source": item.get("source"),
-                    "link": item.get("link"),
-                }
-            )
-        _add_docs(external_news_collection, external_docs, external_ids, external_meta)
-
-        # N6 핵심 지표 요약 저장 (RAG 대비)
-        n6_payload = results.get("n6") or {}
-        stock_analysis: Dict[str, Any] = {}
-        if isinstance(n6_payload, dict):
-            if isinstance(n6_payload.get("stock_analysis"), dict):
-                stock_analysis = n6_payload.get("stock_analysis", {})
-            elif isinstance(n6_payload.get("n6_stock_analysis"), dict):
-                stock_analysis = n6_payload.get("n6_stock_analysis", {}).get("stock_analysis", {})
-        if isinstance(stock_analysis, dict) and stock_analysis:
-            period = stock_analysis.get("period", {})
-            price_move = stock_analysis.get("price_move", {})
-            trend = stock_analysis.get("trend")
-            indicators = stock_analysis.get("indicators") or []
-            indicator_text = "; ".join(
-                f"{i.get('name')}={i.get('value')}" for i in indicators if isinstance(i, dict)
-            )
-            summary_text = (
-                f"ticker={stock_analysis.get('ticker')}, "
-                f"pct_change={price_move.get('pct_change')}, "
-                f"trend={trend}, "
-                f"indicators={indicator_text}"
-            )
-            _add_docs(
-                stock_metrics_collection,
-                [summary_text],
-                [f"{request_id}:stock_metrics:0"],
-                [
-                    {
-                        "request_id": request_id,
-                        "ticker": stock_analysis.get("ticker") or ticker,
-                        "buy_date": period.get("buy_date"),
-                        "sell_date": period.get("sell_date"),
-                    }
-                ],
-            )
 
-        # 내부 fact 저장 (검증된 구조 데이터 기반)
-        internal_docs = []
-        internal_ids = []
-        internal_meta = []
-        for idx, item in enumerate(news_items):
-            title = item.get("title") or ""
-            if not title:
-                continue
-            internal_docs.append(title)
-            internal_ids.append(f"{request_id}:fact:news:{idx}")
-            internal_meta.append(
-                {
-                    "request_id": request_id,
-                    "ticker": ticker,
-                    "date": item.get("date"),
-                    "source": item.get("source") or "news",
-                    "topic": "news",
-                }
-            )
-        if isinstance(stock_analysis, dict) and stock_analysis:
-            fact_text = (
-                f"{stock_analysis.get('ticker')} pct_change={price_move.get('pct_change')}, "
-                f"trend={trend}"
-            )
-            internal_docs.append(fact_text)
-            internal_ids.append(f"{request_id}:fact:stock:0")
-            internal_meta.append(
+def _save_to_supabase(items: List[Dict[str, Any]]) -> None:
+    """
+    write-behind 싱크: 배치의 요청/결과 행을 한 번에 upsert합니다. 실패 시 예외를 그대로 전파합니다.
+    (실패한 배치에서 잘못된 행을 골라 격리하는 것은 WriteBehindQueue가 처리)
+    """
+    db = get_supabase_client()
+    request_rows: List[Dict[str, Any]] = []
+    result_rows: List[Dict[str, Any]] = []
+    for item in items:
+        request_payload, rows = _build_supabase_rows(item["request_id"], item["state"], item["results"])
+        request_rows.append(request_payload)
+        result_rows.extend(rows)
+    db.table("analysis_requests").upsert(request_rows).execute()
+    if result_rows:
+        db.table("analysis_results").upsert(result_rows).execute()
+
+
+def _build_chroma_documents(
+    request_id: str, state: Dict[str, Any], results: Dict[str, Any]
+) -> Dict[str, Tuple[List[str], List[str], List[Dict[str, Any]]]]:
+    """
+    컬렉션 이름 → (documents, ids, metadatas)
+    """
+    collections: Dict[str, Tuple[List[str], List[str], List[Dict[str, Any]]]] = {}
+
+    def _add_docs(name: str, docs: List[str], ids: List[str], metas: List[Dict[str, Any]]) -> None:
+        if not docs:
+            return
+        collections[name] = (docs, ids, metas)
+
+    # N7 뉴스 요약/헤드라인 저장 (RAG 대비)
+    n7_payload = results.get("n7") or {}
+    n7_context: Dict[str, Any] = {}
+    if isinstance(n7_payload, dict):
+        if isinstance(n7_payload.get("news_context"), dict):
+            n7_context = n7_payload.get("news_context", {})
+        elif isinstance(n7_payload.get("n7_news_analysis"), dict):
+            n7_context = n7_payload.get("n7_news_analysis", {}).get("news_context", {})
+    ticker = n7_context.get("ticker") or state.get("layer1_stock")
+    news_items = []
+    for item in (n7_context.get("news_summaries") or []):
+        if not isinstance(item, dict):
+            continue
+        news_items.append(
+            {
+                "title": item.get("title"),
+                "summary": item.get("summary"),
+                "date": item.get("date"),
+                "source": item.get("source"),
+                "link": item.get("link"),
+            }
+        )
+    for item in (n7_context.get("key_headlines") or []):
+        if not isinstance(item, dict):
+            continue
+        news_items.append(
+            {
+                "title": item.get("title"),
+                "summary": item.get("snippet"),
+                "date": item.get("date"),
+                "source": item.get("source"),
+                "link": item.get("link"),
+            }
+        )
+
+    external_docs = []
+    external_ids = []
+    external_meta = []
+    for idx, item in enumerate(news_items):
+        title = item.get("title") or ""
+        summary = item.get("summary") or ""
+        if not title and not summary:
+            continue
+        text = f"{title}\n{summary}".strip()
+        external_docs.append(text)
+        external_ids.append(f"{request_id}:news:{idx}")
+        external_meta.append(
+            {
+                "request_id": request_id,
+                "ticker": ticker,
+                "date": item.get("date"),
+                "source": item.get("source"),
+                "link": item.get("link"),
+            }
+        )
+    _add_docs("external_news", external_docs, external_ids, external_meta)
+
+    # N6 핵심 지표 요약 저장 (RAG 대비)
+    n6_payload = results.get("n6") or {}
+    stock_analysis: Dict[str, Any] = {}
+    if isinstance(n6_payload, dict):
+        if isinstance(n6_payload.get("stock_analysis"), dict):
+            stock_analysis = n6_payload.get("stock_analysis", {})
+        elif isinstance(n6_payload.get("n6_stock_analysis"), dict):
+            stock_analysis = n6_payload.get("n6_stock_analysis", {}).get("stock_analysis", {})
+    if isinstance(stock_analysis, dict) and stock_analysis:
+        period = stock_analysis.get("period", {})
+        price_move = stock_analysis.get("price_move", {})
+        trend = stock_analysis.get("trend")
+        indicators = stock_analysis.get("indicators") or []
+        indicator_text = "; ".join(
+            f"{i.get('name')}={i.get('value')}" for i in indicators if isinstance(i, dict)
+        )
+        summary_text = (
+            f"ticker={stock_analysis.get('ticker')}, "
+            f"pct_change={price_move.get('pct_change')}, "
+            f"trend={trend}, "
+            f"indicators={indicator_text}"
+        )
+        _add_docs(
+            "stock_metrics",
+            [summary_text],
+            [f"{request_id}:stock_metrics:0"],
+            [
                 {
                     "request_id": request_id,
                     "ticker": stock_analysis.get("ticker") or ticker,
-                    "date": period.get("sell_date") or period.get("buy_date"),
-                    "source": "indicator",
-                    "topic": "stock_metrics",
+                    "buy_date": period.get("buy_date"),
+                    "sell_date": period.get("sell_date"),
                 }
-            )
-        _add_docs(internal_facts_collection, internal_docs, internal_ids, internal_meta)
-    except Exception as exc:
-        print(f"[WARNING] Chroma save failed: {exc}")
+            ],
+        )
+
+    # 내부 fact 저장 (검증된 구조 데이터 기반)
+    internal_docs = []
+    internal_ids = []
+    internal_meta = []
+    for idx, item in enumerate(news_items):
+        title = item.get("title") or ""
+        if not title:
+            continue
+        internal_docs.append(title)
+        internal_ids.append(f"{request_id}:fact:news:{idx}")
+        internal_meta.append(
+            {
+                "request_id": request_id,
+                "ticker": ticker,
+                "date": item.get("date"),
+                "source": item.get("source") or "news",
+                "topic": "news",
+            }
+        )
+    if isinstance(stock_analysis, dict) and stock_analysis:
+        fact_text = (
+            f"{stock_analysis.get('ticker')} pct_change={price_move.get('pct_change')}, "
+            f"trend={trend}"
+        )
+        internal_docs.append(fact_text)
+        internal_ids.append(f"{request_id}:fact:stock:0")
+        internal_meta.append(
+            {
+                "request_id": request_id,
+                "ticker": stock_analysis.get("ticker") or ticker,
+                "date": period.get("sell_date") or period.get("buy_date"),
+                "source": "indicator",
+                "topic": "stock_metrics",
+            }
+        )
+    _add_docs("internal_facts", internal_docs, internal_ids, internal_meta)
+    return collections
+
+
+def _save_to_chroma(items: List[Dict[str, Any]]) -> None:
+    """
+    write-behind 싱크: 배치 전체의 문서를 컬렉션별로 모아 한 번씩 임베딩/업서트합니다.
+    """
+    merged: Dict[str, Tuple[List[str], List[str], List[Dict[str, Any]]]] = {}
+    for item in items:
+        docs_by_collection = _build_chroma_documents(item["request_id"], item["state"], item["results"])
+        for name, (docs, ids, metas) in docs_by_collection.items():
+            target = merged.setdefault(name, ([], [], []))
+            target[0].extend(docs)
+            target[1].extend(ids)
+            target[2].extend(metas)
+
+    # 컬렉션별로 나누지 않고 한 번에 임베딩합니다. (중복 텍스트/캐시 적중분은 EmbeddingService가 걸러냄)
+    all_docs = [doc for docs, _, _ in merged.values() for doc in docs]
+    vectors = _get_embedding_service().create_embeddings(all_docs)
+    offset = 0
+    for name, (docs, ids, metas) in merged.items():
+        chunk = vectors[offset : offset + len(docs)]
+        offset += len(docs)
+        get_chroma_collection(name).upsert(ids=ids, documents=docs, embeddings=chunk, metadatas=metas)
+
+
+_write_behind = WriteBehindQueue()
+if is_supabase_configured():
+    _write_behind.register_sink("supabase", _save_to_supabase)
+else:
+    print("[INFO] Supabase is not configured; analysis results will not be stored there.")
+_write_behind.register_sink("chroma", _save_to_chroma)
+
+
+_gauge_tasks: List[asyncio.Task] = []
+_GAUGE_INTERVAL_SECONDS = 10.0
+
+
+async def _refresh_cluster_llm_gauge() -> None:
+    """이 워커의 LLM 진행 수를 기록하고 전체 합계를 캐시합니다. (SQLite I/O는 스레드에서)"""
+    while True:
+        try:
+            await asyncio.to_thread(_sync_cluster_llm_gauge)
+        except Exception as exc:
+            print(f"[WARNING] Shared LLM in-flight gauge unavailable: {exc}")
+            # 공유 합계를 모르면 이 워커의 값만 씁니다.
+            _cluster_llm_gauge.update(total=0, local=0)
+        await asyncio.sleep(_LLM_GAUGE_INTERVAL_SECONDS)
+
+
+async def _publish_gauges() -> None:
+    """
+    요청이 없는 동안에도 이 워커의 카운터를 주기적으로 갱신합니다.
+    (갱신이 끊긴 워커의 값은 공유 합계에서 제외되므로 heartbeat 역할을 겸합니다)
+    """
+    while True:
+        try:
+            status = _admission.status()
+            await asyncio.to_thread(_shared_state.set_gauge, "admission_running", status["running"])
+            await asyncio.to_thread(_shared_state.set_gauge, "admission_waiting", status["waiting"])
+        except Exception as exc:
+            print(f"[WARNING] Failed to publish shared gauges: {exc}")
+        await asyncio.sleep(_GAUGE_INTERVAL_SECONDS)
+
+
+def _warmup() -> None:
+    """
+    첫 요청에서 만들던 객체를 미리 만듭니다. (그래프, LLM 클라이언트/모델, Chroma/Supabase 클라이언트, 종목 인덱스)
+    단계별로 실패해도 경고만 남기고 계속합니다. (예: API 키 누락 시에도 서버는 기동)
+    """
+    steps = [
+        ("graph", _get_graph),
+        ("chat_graph", _get_chat_graph),
+        ("llm", warmup_llm_clients),
+        ("embeddings", _get_embedding_service),
+        ("chroma", get_chroma_client),
+        ("ticker_index", get_ticker_index),
+    ]
+    if is_supabase_configured():
+        steps.append(("supabase", get_supabase_client))
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as exc:
+            print(f"[WARNING] Warmup step '{name}' failed: {exc}")
+            continue
+        print(f"[INFO] Warmup step '{name}' done in {time.perf_counter() - started:.2f}s")
+
+
+@app.on_event("startup")
+async def _on_startup() -> None:
+    if _warmup_on_startup:
+        await asyncio.to_thread(_warmup)
+    _write_behind.start()
+    await _job_manager.start()
+    _gauge_tasks.extend(
+        [asyncio.create_task(_publish_gauges()), asyncio.create_task(_refresh_cluster_llm_gauge())]
+    )
+
+
+@app.on_event("shutdown")
+async def _on_shutdown() -> None:
+    for task in _gauge_tasks:
+        task.cancel()
+    await _job_manager.stop()
+    # 응답 이후로 미뤄둔 저장 작업을 마무리(또는 디스크로 스필)합니다.
+    await asyncio.to_thread(
+        _write_behind.drain, float(os.getenv("WRITE_BEHIND_DRAIN_TIMEOUT", "30"))
+    )
+    # 샘플링된 N6 품질 평가 중 남은 것을 마무리합니다. (시간 안에 못 끝낸 건은 버림)
+    await asyncio.to_thread(
+        get_n6_quality_evaluator().drain, float(os.getenv("N6_QUALITY_DRAIN_TIMEOUT", "10"))
+    )
+    await aclose_llm_http_clients()
+    await asyncio.to_thread(flush_llm_usage)
 
 
 @app.get("/v1/health")
@@ -276,6 +525,43 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+def _admission_guard(endpoint: str):
+    """
+    LLM을 호출하는 엔드포인트에 admission control을 적용하는 데코레이터
+    한도를 넘으면 429/503 + Retry-After로 즉시 거절합니다.
+    """
+
+    def _decorator(fn):
+        @functools.wraps(fn)
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                started = await _admission.acquire(endpoint)
+            except AdmissionRejected as exc:
+                raise HTTPException(
+                    status_code=exc.status_code,
+                    detail=exc.reason,
+                    headers={"Retry-After": str(exc.retry_after)},
+                )
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _admission.release(started)
+
+        return _wrapper
+
+    return _decorator
+
+
+@app.get("/v1/admission/status")
+async def admission_status() -> Dict[str, Any]:
+    return {
+        **_admission.status(),
+        "llm": get_llm_inflight_tracker().stats(),
+        "llm_governor": get_llm_governor_stats(),
+        "shared_state": await asyncio.to_thread(_shared_state.stats),
+    }
+
+
 async def _run_node(name: str, fn: Any, state: Dict[str, Any]) -> Dict[str, Any]:
     try:
         return await asyncio.to_thread(fn, dict(state))
@@ -283,11 +569,7 @@ async def _run_node(name: str, fn: Any, state: Dict[str, Any]) -> Dict[str, Any]
         return {f"{name}_error": str(exc)}
 
 
-@app.post("/v1/analyze")
-async def analyze(req: AnalyzeRequest) -> Dict[str, Any]:
-    # 분석 시작 시간 기록
-    start_time = datetime.now()
-
+def _build_analysis_state(req: AnalyzeRequest) -> Dict[str, Any]:
     if hasattr(req, "model_dump"):
         state: Dict[str, Any] = req.model_dump()
     else:
@@ -296,22 +578,16 @@ async def analyze(req: AnalyzeRequest) -> Dict[str, Any]:
         state["user_message"] = state.get("layer3_decision_basis", "")
     if state.get("position_status") == "holding" and not state.get("layer2_sell_date"):
         state["layer2_sell_date"] = datetime.utcnow().date().isoformat()
+    return state
 
-    result = await asyncio.to_thread(_graph.invoke, state)
-
-    # 분석 종료 시간 기록
-    end_time = datetime.now()
-
-    request_id = str(uuid4())
-    merged: Dict[str, Any] = {"request_id": request_id, **result}
 
+def _build_node_results(result: Dict[str, Any]) -> Dict[str, Any]:
     n8_result = {
         "n8_loss_cause_analysis": result.get("n8_loss_cause_analysis"),
         "n8_market_context_analysis": result.get("n8_market_context_analysis"),
         "n9_input": result.get("n9_input"),
     }
-
-    node_results: Dict[str, Any] = {
+    return {
         "n6": result.get("n6_stock_analysis"),
         "n7": result.get("n7_news_analysis"),
         "n8": n8_result,
@@ -319,10 +595,47 @@ async def analyze(req: AnalyzeRequest) -> Dict[str, Any]:
         "n10": result.get("n10_loss_review_report"),
     }
 
-    await asyncio.to_thread(_save_to_supabase, request_id, state, node_results)
-    await asyncio.to_thread(_save_to_chroma, request_id, state, node_results)
 
-    # 메트릭 평가 실행
+async def _invoke_graph(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    _graph.ainvoke 앞단의 single-flight 계층
+    정규화된 입력이 같은 요청이 동시에 들어오면 그래프는 한 번만 실행되고 결과를 공유합니다.
+    """
+    key = analysis_request_key(state)
+    shared = None
+    if _analysis_cache_reuse:
+        cached = await asyncio.to_thread(_analysis_cache.find_by_input, key)
+        if cached and isinstance(cached.get("result"), dict):
+            shared = cached["result"]
+    if shared is None:
+        shared = await _graph_single_flight.do(key, lambda: _get_graph().ainvoke(state))
+
+    result = copy.deepcopy(shared)
+    for field in _CALLER_INPUT_KEYS:
+        if field in result and field in state:
+            result[field] = state[field]
+    return result
+
+
+async def _finalize_analysis(
+    request_id: str,
+    state: Dict[str, Any],
+    result: Dict[str, Any],
+    start_time: datetime,
+    end_time: datetime,
+) -> Dict[str, Any]:
+    """
+    그래프 실행 결과로 응답 페이로드를 구성합니다.
+    Supabase/Chroma 저장은 write-behind 큐에 넘겨 응답 이후에 처리합니다.
+    """
+    merged: Dict[str, Any] = {"request_id": request_id, **result}
+    node_results = _build_node_results(result)
+
+    persist_item = {"request_id": request_id, "state": state, "results": node_results}
+    _write_behind.enqueue("supabase", persist_item)
+    _write_behind.enqueue("chroma", persist_item)
+
+    # 메트릭 평가 실행 (LLM/I/O 없는 기본 메트릭이므로 응답 경로에서 계산)
     metrics_report = await _evaluate_metrics(
         request_id=request_id,
         start_time=start_time,
@@ -335,7 +648,8 @@ async def analyze(req: AnalyzeRequest) -> Dict[str, Any]:
     if metrics_report:
         merged["metrics_summary"] = metrics_report.get("summary", {})
 
-    _cache_analysis_result(
+    await asyncio.to_thread(
+        _cache_analysis_result,
         request_id=request_id,
         state=state,
         result=result,
@@ -345,83 +659,373 @@ async def analyze(req: AnalyzeRequest) -> Dict[str, Any]:
     return merged
 
 
+def _resolve_projection_or_400(fields: Optional[str], view: Optional[str]) -> Optional[List[str]]:
+    try:
+        return resolve_projection(fields, view)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _analysis_response(payload: Dict[str, Any], paths: Optional[List[str]]) -> FastJSONResponse:
+    """projection 적용 후 jsonable_encoder를 거치지 않고 바로 직렬화합니다."""
+    return FastJSONResponse(project(payload, paths) if paths else payload)
+
+
+@app.post("/v1/analyze")
+@_admission_guard("analyze")
+async def analyze(
+    req: AnalyzeRequest,
+    fields: Optional[str] = Query(None, description="쉼표로 구분한 점 경로 (예: n10_loss_review_report,n7_news_analysis.news_context.summary)"),
+    view: Optional[str] = Query(None, description="full(기본) | compact (프론트엔드 렌더링 섹션만)"),
+) -> FastJSONResponse:
+    paths = _resolve_projection_or_400(fields, view)
+
+    # 분석 시작 시간 기록
+    start_time = datetime.now()
+
+    state = _build_analysis_state(req)
+    result = await _invoke_graph(state)
+
+    # 분석 종료 시간 기록
+    end_time = datetime.now()
+
+    request_id = str(uuid4())
+    payload = await _finalize_analysis(request_id, state, result, start_time, end_time)
+    return _analysis_response(payload, paths)
+
+
+_BATCH_MAX_TRADES = int(os.getenv("ANALYZE_BATCH_MAX_TRADES", "20"))
+_BATCH_MAX_CONCURRENCY = int(os.getenv("ANALYZE_BATCH_MAX_CONCURRENCY", "4"))
+
+
+async def _run_batch_trade(state: Dict[str, Any]) -> Dict[str, Any]:
+    # 거래마다 admission 슬롯을 하나씩 씁니다. 거절되면 AdmissionRejected로 그 거래만 rejected 처리됩니다.
+    started = await _admission.acquire("analyze_batch")
+    try:
+        start_time = datetime.now()
+        result = strip_prefetched(await _invoke_graph(state))
+        end_time = datetime.now()
+    finally:
+        _admission.release(started)
+
+    request_id = str(uuid4())
+    return await _finalize_analysis(request_id, strip_prefetched(state), result, start_time, end_time)
+
+
+@app.post("/v1/analyze/batch")
+async def analyze_batch(req: BatchAnalyzeRequest) -> Dict[str, Any]:
+    """
+    여러 거래를 한 번에 분석합니다.
+    티커/기간이 겹치는 거래는 주가·뉴스 조회를 공유하고, 거래별 분석은 동시 실행 개수 제한 안에서 병렬로 실행합니다.
+    거래별 그래프 실행은 admission 슬롯을 하나씩 얻어야 하며, 거절된 거래는 rejected(+retry_after)로 표시합니다.
+    실행한 거래가 모두 거절되면 429/503 + Retry-After로 응답합니다.
+    """
+    if not req.trades:
+        raise HTTPException(status_code=400, detail="trades must not be empty")
+    if len(req.trades) > _BATCH_MAX_TRADES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"too many trades in one batch (max {_BATCH_MAX_TRADES})",
+        )
+
+    start_time = datetime.now()
+    states = [_build_analysis_state(trade) for trade in req.trades]
+    max_concurrency = min(req.max_concurrency or _BATCH_MAX_CONCURRENCY, _BATCH_MAX_CONCURRENCY)
+    batch = await run_batch_analysis(states, _run_batch_trade, max_concurrency)
+    rejected = [trade for trade in batch["trades"] if trade["status"] == "rejected"]
+    if rejected and len(rejected) == batch["dedupe"]["trades"]:
+        raise HTTPException(
+            status_code=max(trade["status_code"] for trade in rejected),
+            detail=rejected[0]["error"],
+            headers={"Retry-After": str(max(trade["retry_after"] for trade in rejected))},
+        )
+    batch["elapsed_sec"] = round((datetime.now() - start_time).total_seconds(), 2)
+    return batch
+
+
+async def _run_analysis_job(job_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    # 작업도 admission 슬롯을 얻은 뒤 그래프를 실행합니다.
+    # 응답을 기다리는 클라이언트가 없으므로 거절되면 실패 처리하지 않고 Retry-After만큼 기다렸다 다시 요청합니다.
+    while True:
+        try:
+            started = await _admission.acquire("analyze_job")
+            break
+        except AdmissionRejected as exc:
+            await asyncio.sleep(exc.retry_after)
+    try:
+        start_time = datetime.now()
+        result = await _invoke_graph(state)
+        end_time = datetime.now()
+    finally:
+        _admission.release(started)
+
+    request_id = str(uuid4())
+    return await _finalize_analysis(request_id, state, result, start_time, end_time)
+
+
+_job_manager = AnalysisJobManager(runner=_run_analysis_job, store=_shared_state)
+
+
+@app.post("/v1/analyze/jobs", status_code=202)
+async def submit_analyze_job(req: AnalyzeRequest) -> Dict[str, Any]:
+    """
+    분석을 비동기 작업으로 접수하고 job_id를 즉시 반환합니다.
+    큐가 가득 차면 429 + Retry-After로 거절합니다.
+    """
+    state = _build_analysis_state(req)
+    try:
+        job = await _job_manager.submit(state)
+    except AnalysisJobQueueFull as exc:
+        raise HTTPException(
+            status_code=429,
+            detail="Analysis queue is full. Please retry later.",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "status_url": f"/v1/analyze/jobs/{job['job_id']}",
+    }
+
+
+@app.get("/v1/analyze/jobs/{job_id}")
+async def get_analyze_job(
+    job_id: str,
+    fields: Optional[str] = Query(None),
+    view: Optional[str] = Query(None),
+) -> Dict[str, Any]:
+    """
+    분석 작업 상태 조회 (queued | running | succeeded | failed)
+    완료된 작업은 /v1/analyze와 동일한 결과를 result 필드에 포함합니다. (fields/view projection 동일 적용)
+    """
+    paths = _resolve_projection_or_400(fields, view)
+    job = await _job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if paths and isinstance(job.get("result"), dict):
+        job = {**job, "result": project(job["result"], paths)}
+    return job
+
+
+@app.get("/v1/analyze/jobs")
+async def analyze_jobs_stats() -> Dict[str, Any]:
+    return _job_manager.stats()
+
+
+@app.get("/v1/analyze/cache/stats")
+async def analyze_cache_stats() -> Dict[str, Any]:
+    """분석 결과 캐시 백엔드 상태"""
+    return await asyncio.to_thread(_analysis_cache.stats)
+
+
+@app.get("/v1/analyze/persistence/stats")
+async def analyze_persistence_stats() -> Dict[str, Any]:
+    """write-behind 저장 큐 상태 (싱크별 대기/기록/재시도/스필 건수)"""
+    return _write_behind.stats()
+
+
+@app.get("/v1/embeddings/stats")
+async def embeddings_stats() -> Dict[str, Any]:
+    """임베딩 캐시 적중률과 micro-batching 배치 크기"""
+    return await asyncio.to_thread(lambda: _get_embedding_service().stats())
+
+
+@app.get("/v1/analyze/prices/stats")
+async def analyze_prices_stats() -> Dict[str, Any]:
+    """N6 로컬 주가 저장소 적중/부분 조회/네트워크 조회 카운터"""
+    # numpy import 비용을 cold start에서 빼기 위해 요청 시점에 import 합니다.
+    from N6_Stock_Analyst.price_store import get_price_store_stats
+
+    return get_price_store_stats()
+
+
+@app.get("/v1/analyze/indicators/stats")
+async def analyze_indicators_stats() -> Dict[str, Any]:
+    """보유 중 포지션 증분 지표 상태: 증분 갱신/재구성 횟수, 새로 반영한 봉/재사용한 봉 수"""
+    from N6_Stock_Analyst.indicator_state import get_indicator_state_stats
+
+    return get_indicator_state_stats()
+
+
+@app.get("/v1/analyze/quality/stats")
+async def analyze_quality_stats() -> Dict[str, Any]:
+    """N6 백그라운드 품질 평가: 샘플링/대기/평가/드롭 건수와 마지막 메트릭 요약"""
+    return get_n6_quality_evaluator().stats()
+
+
+@app.get("/v1/tickers/search")
+async def tickers_search(
+    q: str = Query(..., min_length=1, description="종목명/별칭/티커 일부 (예: 삼성, 카카, tsla)"),
+    limit: int = Query(default=10, ge=1, le=50),
+) -> Dict[str, Any]:
+    """종목 자동완성 (로컬 종목 인덱스, LLM 호출 없음)"""
+    return {"query": q, "results": get_ticker_index().search(q, limit)}
+
+
+@app.get("/v1/tickers/stats")
+async def tickers_stats() -> Dict[str, Any]:
+    """종목명 → 티커 변환의 인덱스 적중(종류별)/미적중/LLM fallback 카운터"""
+    return get_ticker_index().stats()
+
+
+@app.get("/v1/analyze/coalesce/stats")
+async def analyze_coalesce_stats() -> Dict[str, Any]:
+    """동일 분석 요청 병합(single-flight) 적중/미적중 카운터"""
+    return _graph_single_flight.stats()
+
+
+@app.get("/v1/llm/routes")
+async def llm_routes() -> Dict[str, Any]:
+    """purpose별 모델 라우팅 표 (모델/옵션/governor 레인/캐시 사용 여부)"""
+    return get_llm_routes()
+
+
+@app.get("/v1/llm/cache/stats")
+async def llm_cache_stats() -> Dict[str, Any]:
+    """노드별 LLM 응답 캐시 적중/미적중 카운터"""
+    return await asyncio.to_thread(get_llm_cache_stats)
+
+
+# 스트리밍 시 노드별로 내보낼 state 키 (그래프 실행 순서)
+_STREAM_NODE_KEYS: Dict[str, Tuple[str, ...]] = {
+    "N6_N7": ("n6_stock_analysis", "n7_news_analysis"),
+    "N8": ("n8_loss_cause_analysis", "n8_market_context_analysis", "n9_input"),
+    "N9": ("learning_pattern_analysis",),
+    "N10": ("n10_loss_review_report",),
+}
+
+
+def _sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {_safe_json(data)}\n\n"
+
+
+async def _stream_graph(state: Dict[str, Any]):
+    """
+    _graph.astream의 (mode, chunk) 항목을 그대로 전달합니다.
+    클라이언트 연결이 끊기면 제너레이터가 닫히면서 그래프 실행도 함께 취소됩니다.
+    """
+    async for mode, chunk in _get_graph().astream(state, stream_mode=["updates", "values"]):
+        yield mode, chunk
+
+
+@app.post("/v1/analyze/stream")
+async def analyze_stream(req: AnalyzeRequest) -> StreamingResponse:
+    """
+    /v1/analyze와 동일한 분석을 수행하되, 각 노드 결과를 완료 즉시 SSE 이벤트로 전송합니다.
+
+    이벤트 순서: start → N6_N7 → N8 → N9 → N10 → result (실패 시 error)
+    admission은 스트림 시작 전에 확인(초과 시 429/503)하고 스트림이 끝날 때 반납합니다.
+    """
+    start_time = datetime.now()
+    state = _build_analysis_state(req)
+    request_id = str(uuid4())
+    try:
+        started = await _admission.acquire("analyze_stream")
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=exc.status_code,
+            detail=exc.reason,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    async def _events():
+        try:
+            yield _sse_event("start", {"request_id": request_id})
+            result: Dict[str, Any] = {}
+            try:
+                async for mode, chunk in _stream_graph(state):
+                    if mode == "values":
+                        result = chunk
+                        continue
+                    for node_name, update in (chunk or {}).items():
+                        keys = _STREAM_NODE_KEYS.get(node_name)
+                        if not keys or not isinstance(update, dict):
+                            continue
+                        payload = {key: update.get(key) for key in keys if key in update}
+                        yield _sse_event(node_name, {"request_id": request_id, "node": node_name, **payload})
+            except Exception as exc:
+                yield _sse_event("error", {"request_id": request_id, "error": str(exc)})
+                return
+
+            end_time = datetime.now()
+            merged = await _finalize_analysis(request_id, state, dict(result), start_time, end_time)
+            yield _sse_event("result", merged)
+        finally:
+            _admission.release(started)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 def _is_personality_analysis_request(message: str) -> bool:
     """사용자가 투자 성향 분석을 요청하는지 확인"""
     keywords = ["투자 성향", "나의 성향", "성향을 분석", "성향 분석"]
     return any(kw in message for kw in keywords)
 
 
-@app.post("/v1/chat")
-async def chat(req: ChatRequest) -> Dict[str, Any]:
-    if req.request_id:
-        print(f"[CHAT] request_id received: {req.request_id}")
-        cached = _analysis_cache.get(req.request_id)
-        if cached:
-            print(f"[CHAT] cache hit: {req.request_id}")
+async def _update_personality(req: ChatRequest, cached: Dict[str, Any]) -> Dict[str, Any]:
+    """캐시된 정보와 사용자 입력(성향)을 기반으로 N9를 재실행하고 이 요청의 성향 항목에 저장합니다."""
+    cached_result = cached.get("result", {})
+
+    # N9에 전달할 입력 구성 (기존 분석 정보 + 사용자 성향 입력)
+    n9_state = {
+        "user_message": req.message,
+        "investment_reason": req.message,  # 사용자가 입력한 성향 정보
+        "n8_loss_cause_analysis": cached_result.get("n8_loss_cause_analysis"),
+        "n8_market_context_analysis": cached_result.get("n8_market_context_analysis"),
+        "n9_input": {
+            "investment_reason": req.message,
+            "loss_cause_summary": cached_result.get("n8_loss_cause_analysis", {}).get("one_line_summary", ""),
+            "loss_cause_details": [
+                c.get("title", "") for c in cached_result.get("n8_loss_cause_analysis", {}).get("root_causes", [])
+            ],
+        },
+    }
 
-            # 성향 분석 요청인 경우: 캐시된 정보와 사용자 입력을 기반으로 N9 재실행
-            if _is_personality_analysis_request(req.message):
-                print(f"[CHAT] personality analysis request detected")
-                cached_state = cached.get("state", {})
-                cached_result = cached.get("result", {})
-
-                # N9에 전달할 입력 구성 (기존 분석 정보 + 사용자 성향 입력)
-                n9_state = {
-                    "user_message": req.message,
-                    "investment_reason": req.message,  # 사용자가 입력한 성향 정보
-                    "n8_loss_cause_analysis": cached_result.get("n8_loss_cause_analysis"),
-                    "n8_market_context_analysis": cached_result.get("n8_market_context_analysis"),
-                    "n9_input": {
-                        "investment_reason": req.message,
-                        "loss_cause_summary": cached_result.get("n8_loss_cause_analysis", {}).get("one_line_summary", ""),
-                        "loss_cause_details": [
-                            c.get("title", "") for c in cached_result.get("n8_loss_cause_analysis", {}).get("root_causes", [])
-                        ],
-                    },
-                }
+    # N9 재실행
+    n9_result = await anode9_learning_pattern_analyzer(n9_state)
+    learning_pattern = n9_result.get("learning_pattern_analysis", {})
 
-                # N9 재실행
-                n9_result = await asyncio.to_thread(node9_learning_pattern_analyzer, n9_state)
-                learning_pattern = n9_result.get("learning_pattern_analysis", {})
+    # 성향 항목 저장 (공유·재사용되는 분석 항목은 그대로 둠, input_key 없이 저장해 입력 해시 조회에 걸리지 않음)
+    personality = {
+        "request_id": req.request_id,
+        "learning_pattern_analysis": learning_pattern,
+        "cached_at": datetime.now().isoformat(),
+    }
+    try:
+        await asyncio.to_thread(_analysis_cache.put, _personality_cache_id(req.request_id), personality)
+    except Exception as exc:
+        print(f"[WARNING] Personality cache save failed: {exc}")
 
-                # 캐시 업데이트
-                cached["result"]["learning_pattern_analysis"] = learning_pattern
+    # 응답 메시지 생성
+    character = learning_pattern.get("investor_character", {})
+    character_type = character.get("type", "투자자")
+    character_desc = character.get("description", "")
 
-                # 응답 메시지 생성
-                character = learning_pattern.get("investor_character", {})
-                character_type = character.get("type", "투자자")
-                character_desc = character.get("description", "")
+    response_message = f"입력하신 성향을 바탕으로 분석 결과를 업데이트했어요. 당신은 '{character_type}' 유형이에요. {character_desc}"
 
-                response_message = f"입력하신 성향을 바탕으로 분석 결과를 업데이트했어요. 당신은 '{character_type}' 유형이에요. {character_desc}"
+    return {
+        "summary": response_message,
+        "detail": "",
+        "request_id": req.request_id,
+        "raw": {"learning_pattern_analysis": learning_pattern},
+    }
 
-                return {
-                    "summary": response_message,
-                    "detail": "",
-                    "request_id": req.request_id,
-                    "raw": {"learning_pattern_analysis": learning_pattern},
-                }
 
-            # 일반 채팅 요청
-            expert_state = {
-                "user_message": req.message,
-                "analysis_result": cached,
-                "chat_history": [m.model_dump() for m in req.history[-10:]],
-                "chat_mode": True,
-            }
-            expert_result = await asyncio.to_thread(_chat_graph.invoke, expert_state)
-            chat_response = expert_result.get("n11_chat_response") or {}
-            return {
-                "summary": chat_response.get("summary", ""),
-                "detail": chat_response.get("detail", ""),
-                "request_id": req.request_id,
-            }
-        print(f"[CHAT] cache miss: {req.request_id}")
+def _build_expert_state(req: ChatRequest, cached: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "user_message": req.message,
+        "analysis_result": cached,
+        "chat_history": [m.model_dump() for m in req.history[-10:]],
+        "chat_mode": True,
+    }
 
-    context = "\n".join([f"{m.role}: {m.content}" for m in req.history][-10:])
-    state = {"user_message": req.message, "context": context}
-    result = node9_learning_pattern_analyzer(state)
 
-    llm = get_solar_chat()
+def _build_fallback_chat_messages(req: ChatRequest) -> List[Any]:
+    """분석 캐시가 없을 때 사용하는 간단한 대화 프롬프트"""
     messages: List[Any] = [
         SystemMessage(
             content=(
@@ -437,9 +1041,43 @@ async def chat(req: ChatRequest) -> Dict[str, Any]:
         else:
             messages.append(HumanMessage(content=item.content))
     messages.append(HumanMessage(content=req.message))
+    return messages
+
+
+def _build_fallback_n9_state(req: ChatRequest) -> Dict[str, Any]:
+    context = "\n".join([f"{m.role}: {m.content}" for m in req.history][-10:])
+    return {"user_message": req.message, "context": context}
+
 
+@app.post("/v1/chat")
+@_admission_guard("chat")
+async def chat(req: ChatRequest) -> Dict[str, Any]:
+    if req.request_id:
+        print(f"[CHAT] request_id received: {req.request_id}")
+        cached = await asyncio.to_thread(_load_cached_analysis, req.request_id)
+        if cached:
+            print(f"[CHAT] cache hit: {req.request_id}")
+
+            # 성향 분석 요청인 경우: 캐시된 정보와 사용자 입력을 기반으로 N9 재실행
+            if _is_personality_analysis_request(req.message):
+                print(f"[CHAT] personality analysis request detected")
+                return await _update_personality(req, cached)
+
+            # 일반 채팅 요청
+            expert_result = await asyncio.to_thread(_get_chat_graph().invoke, _build_expert_state(req, cached))
+            chat_response = expert_result.get("n11_chat_response") or {}
+            return {
+                "summary": chat_response.get("summary", ""),
+                "detail": chat_response.get("detail", ""),
+                "request_id": req.request_id,
+            }
+        print(f"[CHAT] cache miss: {req.request_id}")
+
+    result = await anode9_learning_pattern_analyzer(_build_fallback_n9_state(req))
+
+    llm = get_solar_chat("chat")
     try:
-        response = llm.invoke(messages)
+        response = await llm.ainvoke(_build_fallback_chat_messages(req))
         message = response.content if isinstance(response.content, str) else str(response.content)
     except Exception as exc:
         message = f"답변을 생성하지 못했습니다. ({exc})"
@@ -447,19 +1085,112 @@ async def chat(req: ChatRequest) -> Dict[str, Any]:
     return {"message": message, "raw": result}
 
 
+async def _stream_fallback_chat(req: ChatRequest):
+    """
+    분석 캐시가 없을 때의 /v1/chat/stream 경로: 답변을 message 조각으로 보냅니다.
+    flush 전마다 누적 텍스트에 contains_advice를 적용합니다.
+    """
+    n9_task = asyncio.create_task(anode9_learning_pattern_analyzer(_build_fallback_n9_state(req)))
+    message = ""
+    sent = 0
+    try:
+        try:
+            async for chunk in get_solar_chat("chat").astream(_build_fallback_chat_messages(req)):
+                message += chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+                if len(message) - sent < CHAT_STREAM_MIN_FLUSH_CHARS:
+                    continue
+                if contains_advice(message):
+                    yield _sse_event("blocked", {"message": BLOCKED_MESSAGE})
+                    return
+                yield _sse_event("message", {"delta": message[sent:]})
+                sent = len(message)
+        except Exception as exc:
+            message = message or f"답변을 생성하지 못했습니다. ({exc})"
+
+        if contains_advice(message):
+            yield _sse_event("blocked", {"message": BLOCKED_MESSAGE})
+            return
+        if len(message) > sent:
+            yield _sse_event("message", {"delta": message[sent:]})
+        try:
+            result = await n9_task
+        except Exception as exc:
+            result = {"error": str(exc)}
+        yield _sse_event("result", {"message": message, "raw": result})
+    finally:
+        if not n9_task.done():
+            n9_task.cancel()
+
+
+@app.post("/v1/chat/stream")
+async def chat_stream(req: ChatRequest) -> StreamingResponse:
+    """
+    /v1/chat과 같은 답변을 모델 토큰 단위로 SSE 전송합니다.
+
+    이벤트 순서
+    - 분석 캐시 있음: start → summary(delta)* → detail(delta)* → result
+    - 분석 캐시 없음: start → message(delta)* → result
+    - 성향 분석 요청: start → result
+    - 누적 텍스트에서 투자 조언이 감지되면 blocked 이벤트 후 종료, 실패 시 error
+    admission은 스트림 시작 전에 확인(초과 시 429/503)하고 스트림이 끝날 때 반납합니다.
+    """
+    try:
+        started = await _admission.acquire("chat")
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=exc.status_code,
+            detail=exc.reason,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    async def _events():
+        try:
+            yield _sse_event("start", {"request_id": req.request_id})
+            cached = None
+            if req.request_id:
+                cached = await asyncio.to_thread(_load_cached_analysis, req.request_id)
+                print(f"[CHAT] stream cache {'hit' if cached else 'miss'}: {req.request_id}")
+
+            if cached and _is_personality_analysis_request(req.message):
+                yield _sse_event("result", await _update_personality(req, cached))
+                return
+
+            if cached:
+                async for event in astream_investment_expert(_build_expert_state(req, cached)):
+                    payload = {key: value for key, value in event.items() if key != "event"}
+                    if event["event"] == "result":
+                        payload["request_id"] = req.request_id
+                    yield _sse_event(event["event"], payload)
+                return
+
+            async for item in _stream_fallback_chat(req):
+                yield item
+        except Exception as exc:
+            yield _sse_event("error", {"request_id": req.request_id, "error": str(exc)})
+        finally:
+            _admission.release(started)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/v1/quiz")
+@_admission_guard("quiz")
 async def quiz(req: QuizRequest) -> Dict[str, Any]:
     payload = {
         "learning_pattern_analysis": req.learning_pattern_analysis,
     }
-    llm = get_solar_chat()
+    llm = get_solar_chat("quiz")
     messages = [
         SystemMessage(content=QUIZ_SYSTEM_PROMPT),
         HumanMessage(content=f"입력을 기반으로 JSON만 출력하세요.\n{payload}"),
     ]
 
     try:
-        response = llm.invoke(messages)
+        response = await llm.ainvoke(messages)
         raw = response.content if isinstance(response.content, str) else str(response.content)
     except Exception as exc:
         return _fallback_quiz(f"LLM 호출 실패: {exc}")
@@ -625,6 +1356,17 @@ async def _evaluate_metrics(
     return None
 
 
+@app.get("/v1/metrics/llm")
+async def llm_usage_metrics() -> Dict[str, Any]:
+    """
+    노드별 LLM 호출 토큰/지연/비용 집계 (최근 N건 rolling window)
+    - 지연 histogram/백분위, 결과(ok/error/parse_fail/fallback) 분포, 비용 비중
+    - hedging: purpose별 hedge 요청 수/승률 (core/llm_hedge.py)
+    """
+    usage = await asyncio.to_thread(get_llm_usage_stats)
+    return {**usage, "hedging": get_llm_hedge_stats()}
+
+
 @app.get("/v1/metrics/{request_id}")
 async def get_metrics(request_id: str) -> Dict[str, Any]:
     """
@@ -662,6 +1404,7 @@ async def metrics_summary() -> Dict[str, Any]:
 
 
 @app.post("/v1/metrics/evaluate")
+@_admission_guard("metrics_evaluate")
 async def evaluate_metrics_full(req: AnalyzeRequest) -> Dict[str, Any]:
     """
     LLM Judge를 포함한 전체 메트릭 평가
@@ -671,17 +1414,10 @@ async def evaluate_metrics_full(req: AnalyzeRequest) -> Dict[str, Any]:
     """
     start_time = datetime.now()
 
-    if hasattr(req, "model_dump"):
-        state: Dict[str, Any] = req.model_dump()
-    else:
-        state = req.dict()
-    if not state.get("user_message"):
-        state["user_message"] = state.get("layer3_decision_basis", "")
-    if state.get("position_status") == "holding" and not state.get("layer2_sell_date"):
-        state["layer2_sell_date"] = datetime.utcnow().date().isoformat()
+    state = _build_analysis_state(req)
 
     # 분석 실행
-    result = await asyncio.to_thread(_graph.invoke, state)
+    result = await _invoke_graph(state)
     end_time = datetime.now()
 
     request_id = str(uuid4())
@@ -709,7 +1445,7 @@ async def evaluate_metrics_full(req: AnalyzeRequest) -> Dict[str, Any]:
 
     # LLM을 사용한 전체 메트릭 평가
     try:
-        llm = get_solar_chat()
+        llm = get_solar_chat("metrics_eval")
         evaluator = MetricsEvaluator(llm=llm)
 
         report = await evaluator.evaluate_all(
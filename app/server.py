@@ -1,3 +1,17 @@
+"""
+API 서버 실행 진입점
+
+선택 환경 변수:
+- UVICORN_HOST (기본값: 0.0.0.0)
+- UVICORN_PORT (기본값: 8000)
+- UVICORN_WORKERS (기본값: 1)
+  2 이상이면 워커 간 작업/카운터 공유를 위해 SHARED_STATE_BACKEND 기본값을 sqlite로 둡니다.
+  로컬 Chroma(PersistentClient)는 여러 프로세스가 같은 파일을 쓰면 인덱스가 깨질 수 있어,
+  CHROMA_HOST(Chroma 서버)가 없으면 워커 1개로 실행합니다.
+  LLM rate limit 버킷은 워커마다 따로 있으므로 LLM_RATE_WORKER_COUNT 기본값도 워커 수로 두어
+  LLM_RATE_RPS/LLM_RATE_TPM 등을 워커들이 나눠 쓰게 합니다. (core/llm_governor.py)
+"""
+
 from __future__ import annotations
 
 import os
@@ -15,7 +29,18 @@ def main() -> None:
     _load_env()
     host = os.getenv("UVICORN_HOST", "0.0.0.0")
     port = int(os.getenv("UVICORN_PORT", "8000"))
-    uvicorn.run("app.api:app", host=host, port=port, reload=False)
+    workers = max(1, int(os.getenv("UVICORN_WORKERS", "1")))
+    if workers > 1 and not os.getenv("CHROMA_HOST"):
+        print(
+            "[WARNING] UVICORN_WORKERS > 1 requires a Chroma server (CHROMA_HOST); "
+            "the local Chroma store is not multi-process safe. Running 1 worker."
+        )
+        workers = 1
+    if workers > 1:
+        # 워커 프로세스는 환경 변수를 상속하므로 app.api import 전에 설정합니다.
+        os.environ.setdefault("SHARED_STATE_BACKEND", "sqlite")
+        os.environ.setdefault("LLM_RATE_WORKER_COUNT", str(workers))
+    uvicorn.run("app.api:app", host=host, port=port, reload=False, workers=workers)
 
 
 if __name__ == "__main__":
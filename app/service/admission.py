@@ -0,0 +1,145 @@
+"""
+Admission control / load shedding
+- LLM을 호출하는 엔드포인트(/v1/analyze, /v1/chat, /v1/quiz, /v1/metrics/evaluate) 앞단에서 동시 처리 수를 제한합니다.
+  그래프를 실행하는 /v1/analyze/stream, /v1/chat/stream은 스트림 시작 전에, /v1/analyze/batch는 거래마다,
+  /v1/analyze/jobs는 작업을 실행할 때마다 슬롯을 하나씩 얻습니다.
+- 한도를 넘는 요청은 느리게 처리하는 대신 빠르게 거절해(429/503 + Retry-After) 업스트림 rate limit을 피합니다.
+
+거절 기준:
+- 진행 중인 Solar 호출 수가 ADMISSION_MAX_INFLIGHT_LLM 이상 → 503 (업스트림 포화)
+- 대기 중인 요청 수가 ADMISSION_MAX_QUEUE 이상 → 429
+- 최근 대기 시간(EMA)이 ADMISSION_MAX_QUEUE_WAIT_MS 초과 → 429 (대기열에 들어가도 제때 처리되지 못함)
+- 대기열에서 ADMISSION_MAX_QUEUE_WAIT_MS 안에 슬롯을 얻지 못함 → 503
+
+선택 환경 변수:
+- ADMISSION_ENABLED (기본값: true)
+- ADMISSION_MAX_CONCURRENT (기본값: 8, 동시에 처리하는 요청 수)
+- ADMISSION_MAX_QUEUE (기본값: 32)
+- ADMISSION_MAX_QUEUE_WAIT_MS (기본값: 5000)
+- ADMISSION_MAX_INFLIGHT_LLM (기본값: 24)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import time
+from typing import Callable, Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """부하 차단으로 요청을 거절할 때 발생합니다."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int) -> None:
+        super().__init__(f"{reason} (retry after {retry_after}s)")
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    asyncio.Semaphore 기반 동시 처리 제한 + 대기열/LLM 진행 수 기반 부하 차단
+    - llm_in_flight()는 현재 진행 중인 LLM 호출 수를 반환하는 함수입니다.
+      acquire()/status()에서 이벤트 루프 위에서 호출되므로 블로킹 I/O 없이 바로 반환해야 합니다.
+    """
+
+    def __init__(
+        self,
+        llm_in_flight: Callable[[], int],
+        max_concurrent: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_queue_wait_ms: Optional[int] = None,
+        max_inflight_llm: Optional[int] = None,
+    ) -> None:
+        self._llm_in_flight = llm_in_flight
+        self.enabled = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.max_concurrent = max(1, max_concurrent or int(os.getenv("ADMISSION_MAX_CONCURRENT", "8")))
+        self.max_queue = max(0, max_queue if max_queue is not None else int(os.getenv("ADMISSION_MAX_QUEUE", "32")))
+        self.max_queue_wait = (
+            max_queue_wait_ms or int(os.getenv("ADMISSION_MAX_QUEUE_WAIT_MS", "5000"))
+        ) / 1000
+        self.max_inflight_llm = max(1, max_inflight_llm or int(os.getenv("ADMISSION_MAX_INFLIGHT_LLM", "24")))
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._running = 0
+        self._waiting = 0
+        # 최근 대기 시간/처리 시간(초)의 지수 이동 평균
+        self._avg_wait = 0.0
+        self._avg_duration = 10.0
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _endpoint_counters(self, endpoint: str) -> Dict[str, int]:
+        return self._counters.setdefault(
+            endpoint, {"admitted": 0, "rejected_429": 0, "rejected_503": 0}
+        )
+
+    def retry_after_seconds(self) -> int:
+        """현재 대기열과 처리 중인 요청이 빠지는 데 걸릴 예상 시간(초)"""
+        pending = self._waiting + self._running
+        return max(1, math.ceil(self._avg_duration * pending / self.max_concurrent))
+
+    def _reject(self, endpoint: str, status_code: int, reason: str) -> AdmissionRejected:
+        self._endpoint_counters(endpoint)[f"rejected_{status_code}"] += 1
+        return AdmissionRejected(status_code, reason, self.retry_after_seconds())
+
+    async def acquire(self, endpoint: str) -> float:
+        """
+        슬롯을 얻으면 시작 시각을 반환합니다. 거절 시 AdmissionRejected를 발생시킵니다.
+        반환값은 release()에 그대로 넘겨야 합니다.
+        """
+        if not self.enabled:
+            return time.monotonic()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        if self._llm_in_flight() >= self.max_inflight_llm:
+            raise self._reject(endpoint, 503, "Upstream LLM capacity is saturated")
+        # 슬롯을 기다리는 요청까지 포함해 계산 (세마포어 상태는 acquire 태스크가 실행되기 전까지 반영되지 않음)
+        pending = self._running + self._waiting
+        if pending >= self.max_concurrent + self.max_queue:
+            raise self._reject(endpoint, 429, "Too many requests are waiting")
+        if pending >= self.max_concurrent and self._avg_wait > self.max_queue_wait:
+            raise self._reject(endpoint, 429, "Queue wait time is over the limit")
+
+        queued_at = time.monotonic()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_queue_wait)
+        except asyncio.TimeoutError:
+            self._avg_wait = self._avg_wait * 0.8 + self.max_queue_wait * 0.2
+            raise self._reject(endpoint, 503, "Timed out waiting for a processing slot") from None
+        finally:
+            self._waiting -= 1
+
+        started = time.monotonic()
+        self._avg_wait = self._avg_wait * 0.8 + (started - queued_at) * 0.2
+        self._running += 1
+        self._endpoint_counters(endpoint)["admitted"] += 1
+        return started
+
+    def release(self, started: float) -> None:
+        if not self.enabled or self._semaphore is None:
+            return
+        self._running -= 1
+        self._avg_duration = self._avg_duration * 0.8 + (time.monotonic() - started) * 0.2
+        self._semaphore.release()
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "running": self._running,
+            "waiting": self._waiting,
+            "llm_in_flight": self._llm_in_flight(),
+            "avg_queue_wait_ms": round(self._avg_wait * 1000, 1),
+            "avg_duration_sec": round(self._avg_duration, 2),
+            "retry_after_sec": self.retry_after_seconds(),
+            "limits": {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "max_queue_wait_ms": int(self.max_queue_wait * 1000),
+                "max_inflight_llm": self.max_inflight_llm,
+            },
+            "endpoints": self._counters,
+        }
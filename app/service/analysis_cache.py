@@ -0,0 +1,238 @@
+"""
+분석 결과 캐시
+- /v1/analyze 결과(state/result/metrics_summary)를 request_id 및 정규화 입력 해시로 저장합니다.
+- /v1/chat은 request_id로, 결과 재사용은 입력 해시로 조회합니다.
+
+백엔드:
+- memory: 프로세스 로컬 LRU (기존 동작, 재시작 시 소실)
+- sqlite: 로컬 디스크 파일 (재시작 후에도 유지, 같은 노드의 여러 워커가 공유)
+
+선택 환경 변수:
+- ANALYSIS_CACHE_BACKEND (기본값: sqlite, memory|sqlite)
+- ANALYSIS_CACHE_PATH (기본값: ./data/analysis_cache.sqlite3)
+- ANALYSIS_CACHE_TTL_SECONDS (기본값: 604800, 7일)
+- ANALYSIS_CACHE_MAX_BYTES (기본값: 268435456, 압축 후 기준)
+- ANALYSIS_CACHE_MEMORY_LIMIT (기본값: 50, memory 백엔드 항목 수)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+
+class AnalysisCache(ABC):
+    """분석 결과 캐시 백엔드 인터페이스"""
+
+    @abstractmethod
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_by_input(self, input_key: str) -> Optional[Dict[str, Any]]:
+        """같은 정규화 입력으로 가장 최근에 저장된 항목"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, request_id: str, payload: Dict[str, Any], input_key: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class MemoryAnalysisCache(AnalysisCache):
+    """프로세스 로컬 OrderedDict LRU"""
+
+    def __init__(self, limit: int = 50) -> None:
+        self.limit = max(1, limit)
+        self._items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._input_index: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            payload = self._items.get(request_id)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(request_id)
+            self.hits += 1
+            return payload
+
+    def find_by_input(self, input_key: str) -> Optional[Dict[str, Any]]:
+        request_id = self._input_index.get(input_key)
+        return self.get(request_id) if request_id else None
+
+    def put(self, request_id: str, payload: Dict[str, Any], input_key: Optional[str] = None) -> None:
+        with self._lock:
+            self._items[request_id] = payload
+            self._items.move_to_end(request_id)
+            if input_key:
+                self._input_index[input_key] = request_id
+            while len(self._items) > self.limit:
+                evicted_id, evicted = self._items.popitem(last=False)
+                evicted_key = evicted.get("input_key")
+                if evicted_key and self._input_index.get(evicted_key) == evicted_id:
+                    del self._input_index[evicted_key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._items),
+            "limit": self.limit,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class SQLiteAnalysisCache(AnalysisCache):
+    """
+    SQLite 파일 기반 캐시
+    - payload는 JSON 직렬화 후 zlib 압축해 저장합니다.
+    - TTL이 지난 항목은 조회 시 무시되고, 쓰기 시 정리됩니다.
+    - 압축 크기 합계가 max_bytes를 넘으면 가장 오래 조회되지 않은 항목부터 제거합니다.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int, max_bytes: int) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    request_id TEXT PRIMARY KEY,
+                    input_key TEXT,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    payload BLOB NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_analysis_cache_input ON analysis_cache (input_key, created_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_analysis_cache_accessed ON analysis_cache (accessed_at)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        return self._fetch("request_id = ?", (request_id,))
+
+    def find_by_input(self, input_key: str) -> Optional[Dict[str, Any]]:
+        return self._fetch("input_key = ? ORDER BY created_at DESC LIMIT 1", (input_key,))
+
+    def _fetch(self, where: str, params: tuple) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT request_id, created_at, payload FROM analysis_cache WHERE {where}",
+                params,
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE analysis_cache SET accessed_at = ? WHERE request_id = ?", (now, row[0])
+            )
+        try:
+            payload = json.loads(zlib.decompress(row[2]).decode("utf-8"))
+        except Exception as exc:
+            print(f"[WARNING] Analysis cache entry unreadable ({row[0]}): {exc}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return payload
+
+    def put(self, request_id: str, payload: Dict[str, Any], input_key: Optional[str] = None) -> None:
+        raw = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        blob = zlib.compress(raw, 6)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO analysis_cache (request_id, input_key, created_at, accessed_at, size, payload)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(request_id) DO UPDATE SET
+                    input_key = COALESCE(excluded.input_key, analysis_cache.input_key),
+                    accessed_at = excluded.accessed_at,
+                    size = excluded.size,
+                    payload = excluded.payload
+                """,
+                (request_id, input_key, now, now, len(blob), sqlite3.Binary(blob)),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM analysis_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM analysis_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT request_id, size FROM analysis_cache ORDER BY accessed_at ASC"
+        ).fetchall()
+        victims = []
+        for request_id, size in rows:
+            if total <= self.max_bytes:
+                break
+            victims.append((request_id,))
+            total -= size
+        conn.executemany("DELETE FROM analysis_cache WHERE request_id = ?", victims)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analysis_cache"
+            ).fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def create_analysis_cache() -> AnalysisCache:
+    backend = os.getenv("ANALYSIS_CACHE_BACKEND", "sqlite").lower()
+    if backend == "memory":
+        return MemoryAnalysisCache(limit=int(os.getenv("ANALYSIS_CACHE_MEMORY_LIMIT", "50")))
+
+    path = os.getenv(
+        "ANALYSIS_CACHE_PATH",
+        str(Path(__file__).resolve().parent.parent.parent / "data" / "analysis_cache.sqlite3"),
+    )
+    return SQLiteAnalysisCache(
+        path=path,
+        ttl_seconds=int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60))),
+        max_bytes=int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    )
@@ -0,0 +1,223 @@
+"""
+다중 거래 일괄 분석 (POST /v1/analyze/batch)
+- 프론트엔드가 보내는 metadata.stocks(사용자의 전체 거래)를 한 번에 분석합니다.
+- 그래프 실행 전에 종목/기간을 중복 제거해 공통 I/O를 한 번만 수행합니다.
+  - resolve_ticker: 종목명별 1회
+  - fetch_stock_data: 같은 티커에서 확장 기간(±30일)이 겹치는 거래끼리 묶어 묶음별 1회 조회 후 거래별로 잘라서 사용
+  - search_news_with_serper: (종목, 매수일, 매도일)이 같은 거래끼리 1회
+- 거래별 N6~N10 실행은 동시 실행 개수 제한(semaphore) 안에서 병렬로 처리합니다.
+- Chroma 임베딩은 write-behind 배치 싱크에서 거래들을 모아 한 번에 계산합니다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.service.admission import AdmissionRejected
+from N1_Input_Handler.n1 import node1_input_handler
+from N6_Stock_Analyst.n6 import extend_date_window, fetch_stock_data, resolve_ticker, slice_stock_data
+from N7_News_Summarizer.n7 import fetch_news_results
+
+# 그래프 state에만 필요하고 응답/저장에는 포함하지 않을 키
+PREFETCH_KEYS = ("n6_prefetched_stock_data", "n7_prefetched_news")
+
+TradeRunner = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def strip_prefetched(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in payload.items() if key not in PREFETCH_KEYS}
+
+
+def _cluster_windows(trades: List[Tuple[int, Dict[str, Any]]]) -> List[List[Tuple[int, Dict[str, Any]]]]:
+    """확장 기간이 겹치거나 맞닿는 거래끼리 묶습니다. (매수일 기준 정렬 후 한 번 훑기)"""
+    windows = []
+    for index, state in trades:
+        try:
+            window = extend_date_window(state["layer2_buy_date"], state["layer2_sell_date"])
+        except ValueError:
+            # 날짜 형식이 잘못된 거래는 묶지 않고 N6이 기존 경로로 처리하게 둡니다.
+            continue
+        windows.append((window, index, state))
+    windows.sort(key=lambda item: item[0])
+
+    clusters: List[List[Tuple[int, Dict[str, Any]]]] = []
+    cluster_end = ""
+    for (start, end), index, state in windows:
+        if clusters and start <= cluster_end:
+            clusters[-1].append((index, state))
+            cluster_end = max(cluster_end, end)
+        else:
+            clusters.append([(index, state)])
+            cluster_end = end
+    return clusters
+
+
+async def _prefetch_stock_data(
+    states: Dict[int, Dict[str, Any]],
+    semaphore: asyncio.Semaphore,
+    stats: Dict[str, int],
+) -> None:
+    async def _limited(fn: Callable[..., Any], *args: Any) -> Any:
+        async with semaphore:
+            return await asyncio.to_thread(fn, *args)
+
+    names = sorted({state["layer1_stock"] for state in states.values()})
+    tickers = await asyncio.gather(*(_limited(resolve_ticker, name) for name in names))
+    ticker_by_name = dict(zip(names, tickers))
+    stats["ticker_resolves"] = len(names)
+
+    by_ticker: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+    for index, state in states.items():
+        by_ticker.setdefault(ticker_by_name[state["layer1_stock"]], []).append((index, state))
+
+    jobs = []
+    for ticker, trades in by_ticker.items():
+        for cluster in _cluster_windows(trades):
+            buy = min(state["layer2_buy_date"] for _, state in cluster)
+            sell = max(state["layer2_sell_date"] for _, state in cluster)
+            jobs.append((ticker, cluster, _limited(fetch_stock_data, ticker, buy, sell)))
+    stats["price_fetches"] = len(jobs)
+
+    fetched = await asyncio.gather(*(job[2] for job in jobs), return_exceptions=True)
+    for (ticker, cluster, _), stock_data in zip(jobs, fetched):
+        if not isinstance(stock_data, dict):
+            continue
+        for index, state in cluster:
+            sliced = slice_stock_data(stock_data, state["layer2_buy_date"], state["layer2_sell_date"])
+            if sliced:
+                sliced["ticker"] = ticker
+                states[index]["n6_prefetched_stock_data"] = sliced
+
+
+async def _prefetch_news(
+    states: Dict[int, Dict[str, Any]],
+    semaphore: asyncio.Semaphore,
+    stats: Dict[str, int],
+) -> None:
+    groups: Dict[Tuple[str, str, str], List[int]] = {}
+    for index, state in states.items():
+        key = (state["layer1_stock"], state["layer2_buy_date"], state["layer2_sell_date"])
+        groups.setdefault(key, []).append(index)
+    stats["news_searches"] = len(groups)
+
+    async def _search(key: Tuple[str, str, str]) -> List[Dict[str, Any]]:
+        async with semaphore:
+            results, _ = await asyncio.to_thread(fetch_news_results, *key)
+            return results
+
+    keys = list(groups.keys())
+    fetched = await asyncio.gather(*(_search(key) for key in keys), return_exceptions=True)
+    for key, news in zip(keys, fetched):
+        # 검색 실패 시 프리페치 없이 두면 N7이 직접 다시 검색합니다.
+        if isinstance(news, list):
+            for index in groups[key]:
+                states[index]["n7_prefetched_news"] = news
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_batch_aggregate(trades: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """거래별 결과를 사용자 단위로 요약합니다. (성공한 거래만 집계)"""
+    succeeded = [trade["result"] for trade in trades if trade.get("status") == "succeeded"]
+    pct_changes: List[float] = []
+    trends: Counter = Counter()
+    cause_categories: Counter = Counter()
+    biases: Counter = Counter()
+    characters: Counter = Counter()
+    tickers: List[str] = []
+
+    for result in succeeded:
+        stock = (result.get("n6_stock_analysis") or {}).get("stock_analysis") or {}
+        ticker = stock.get("ticker") or result.get("layer1_stock")
+        if ticker and ticker not in tickers:
+            tickers.append(ticker)
+        pct = _as_float((stock.get("price_move") or {}).get("pct_change"))
+        if pct is not None:
+            pct_changes.append(pct)
+        if stock.get("trend"):
+            trends[stock["trend"]] += 1
+
+        loss = result.get("n8_loss_cause_analysis") or {}
+        for cause in loss.get("root_causes") or []:
+            if isinstance(cause, dict) and cause.get("category"):
+                cause_categories[cause["category"]] += 1
+
+        pattern = result.get("learning_pattern_analysis") or {}
+        bias = ((pattern.get("cognitive_analysis") or {}).get("primary_bias")) or {}
+        if bias.get("name"):
+            biases[bias["name"]] += 1
+        character = (pattern.get("investor_character") or {}).get("type")
+        if character:
+            characters[character] += 1
+
+    return {
+        "trade_count": len(trades),
+        "succeeded": len(succeeded),
+        "failed": len(trades) - len(succeeded),
+        "tickers": tickers,
+        "avg_pct_change": round(sum(pct_changes) / len(pct_changes), 2) if pct_changes else None,
+        "trend_distribution": dict(trends),
+        "root_cause_categories": dict(cause_categories),
+        "primary_biases": [{"name": name, "count": count} for name, count in biases.most_common()],
+        "investor_characters": [{"type": name, "count": count} for name, count in characters.most_common()],
+    }
+
+
+async def run_batch_analysis(
+    states: List[Dict[str, Any]],
+    runner: TradeRunner,
+    max_concurrency: int,
+) -> Dict[str, Any]:
+    """
+    states: 거래별 분석 입력 state 목록
+    runner(state): 그래프 실행 + 결과 마무리(저장/캐시) 후 응답 페이로드를 반환하는 코루틴
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    trades: List[Dict[str, Any]] = [{"index": index, "status": "pending"} for index in range(len(states))]
+
+    prepared: Dict[int, Dict[str, Any]] = {}
+    for index, state in enumerate(states):
+        normalized = node1_input_handler(state)
+        if "n1_input_error" in normalized:
+            trades[index].update({"status": "failed", "error": normalized["n1_input_error"]})
+            continue
+        prepared[index] = {**state, **normalized}
+
+    dedupe_stats = {"trades": len(prepared)}
+    if prepared:
+        await asyncio.gather(
+            _prefetch_stock_data(prepared, semaphore, dedupe_stats),
+            _prefetch_news(prepared, semaphore, dedupe_stats),
+        )
+
+    async def _run(index: int, state: Dict[str, Any]) -> None:
+        async with semaphore:
+            try:
+                result = await runner(state)
+                trades[index].update({"status": "succeeded", "result": strip_prefetched(result)})
+            except AdmissionRejected as exc:
+                trades[index].update(
+                    {
+                        "status": "rejected",
+                        "error": exc.reason,
+                        "status_code": exc.status_code,
+                        "retry_after": exc.retry_after,
+                    }
+                )
+            except Exception as exc:
+                trades[index].update({"status": "failed", "error": str(exc)})
+
+    await asyncio.gather(*(_run(index, state) for index, state in prepared.items()))
+
+    return {
+        "trades": trades,
+        "aggregate": build_batch_aggregate(trades),
+        "dedupe": dedupe_stats,
+    }
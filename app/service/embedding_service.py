@@ -1,14 +1,340 @@
-from typing import List
+"""
+임베딩 서비스 (캐시 + 요청 간 micro-batching)
+- 캐시: 텍스트 내용의 SHA-256(모델명 포함)을 키로 float32 벡터를 SQLite에 저장합니다.
+  같은 종목을 다시 분석할 때 같은 헤드라인/지표 요약은 Upstage를 다시 호출하지 않습니다.
+  (query 임베딩은 문서 임베딩과 별도 키로 저장합니다)
+- micro-batching: 동시에 들어온 여러 요청의 캐시 미스 텍스트를 모아 embed_documents 한 번으로 처리합니다.
+  EMBEDDING_BATCH_MAX_SIZE개가 모이거나 첫 텍스트 이후 EMBEDDING_BATCH_WAIT_MS가 지나면 전송합니다.
+- 캐시/배처는 프로세스 안의 모든 EmbeddingService 인스턴스가 공유합니다.
+
+선택 환경 변수:
+- EMBEDDING_CACHE_ENABLED (기본값: true)
+- EMBEDDING_CACHE_PATH (기본값: ./data/embedding_cache.sqlite3)
+- EMBEDDING_CACHE_MAX_ENTRIES (기본값: 50000, 초과 시 가장 오래 조회되지 않은 항목부터 제거)
+- EMBEDDING_BATCH_MAX_SIZE (기본값: 100, embed_documents 한 번에 보낼 텍스트 수 상한)
+- EMBEDDING_BATCH_WAIT_MS (기본값: 20, 배치를 모으는 최대 대기 시간)
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from core.llm import get_upstage_embeddings
 
+# SQLite 바인딩 변수 수 제한(기본 999) 안에서 한 번에 조회할 키 수
+_LOOKUP_CHUNK = 500
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """
+    SQLite 파일 기반 임베딩 LRU 저장소
+    - 값은 float32 바이트열로 저장합니다. (4096차원 기준 16KB)
+    """
+
+    def __init__(self, path: str, max_entries: int) -> None:
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    key TEXT PRIMARY KEY,
+                    accessed_at REAL NOT NULL,
+                    vector BLOB NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embedding_cache_accessed ON embedding_cache (accessed_at)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(model: str, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\n{kind}\n{text}".encode("utf-8")).hexdigest()
+
+    def _count(self, hits: int, misses: int, errors: int = 0) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.errors += errors
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(keys))
+        if not unique:
+            return found
+        try:
+            now = time.time()
+            with self._connect() as conn:
+                for start in range(0, len(unique), _LOOKUP_CHUNK):
+                    chunk = unique[start : start + _LOOKUP_CHUNK]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})", chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = _unpack(blob)
+                    if rows:
+                        conn.executemany(
+                            "UPDATE embedding_cache SET accessed_at = ? WHERE key = ?",
+                            [(now, key) for key, _ in rows],
+                        )
+        except Exception as exc:
+            print(f"[WARNING] Embedding cache lookup failed: {exc}")
+            self._count(0, len(unique), errors=1)
+            return {}
+        self._count(len(found), len(unique) - len(found))
+        return found
+
+    def put_many(self, items: Dict[str, Sequence[float]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    """
+                    INSERT INTO embedding_cache (key, accessed_at, vector) VALUES (?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET accessed_at = excluded.accessed_at, vector = excluded.vector
+                    """,
+                    [(key, now, sqlite3.Binary(_pack(vector))) for key, vector in items.items()],
+                )
+                with self._lock:
+                    self._writes += len(items)
+                    evict = self._writes >= max(1, self.max_entries // 100)
+                    if evict:
+                        self._writes = 0
+                # 쓰기마다 정리하면 비용이 커서 max_entries의 1%가 쌓일 때마다 정리합니다.
+                if evict:
+                    conn.execute(
+                        """
+                        DELETE FROM embedding_cache WHERE key IN (
+                            SELECT key FROM embedding_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                        )
+                        """,
+                        (self.max_entries,),
+                    )
+        except Exception as exc:
+            print(f"[WARNING] Embedding cache update failed: {exc}")
+            self._count(0, 0, errors=1)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        result: Dict[str, Any] = {
+            "enabled": True,
+            "path": self.path,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+        try:
+            with self._connect() as conn:
+                result["entries"] = conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+        except Exception as exc:
+            print(f"[WARNING] Embedding cache stats unavailable: {exc}")
+        return result
+
+
+class EmbeddingBatcher:
+    """
+    여러 스레드에서 들어온 텍스트를 모아 embed_documents 한 번으로 보내는 micro-batcher
+    - submit()은 텍스트별 Future를 반환하고, 전용 스레드가 배치를 모아 호출합니다.
+    - 같은 배치 안의 중복 텍스트는 한 번만 보냅니다.
+    """
+
+    def __init__(self, embeddings: Any, max_size: int, wait_seconds: float) -> None:
+        self.embeddings = embeddings
+        self.max_size = max(1, max_size)
+        self.wait_seconds = max(0.0, wait_seconds)
+        self.batches = 0
+        self.texts = 0
+        self.max_batch = 0
+        self.failures = 0
+        self._pending: Deque[Tuple[str, concurrent.futures.Future]] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+            self._thread.start()
+
+    def submit(self, texts: Sequence[str]) -> List[concurrent.futures.Future]:
+        futures: List[concurrent.futures.Future] = [concurrent.futures.Future() for _ in texts]
+        with self._cond:
+            self._ensure_thread()
+            self._pending.extend(zip(texts, futures))
+            self._cond.notify()
+        return futures
+
+    def _take_batch(self) -> List[Tuple[str, concurrent.futures.Future]]:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.wait_seconds
+            while len({text for text, _ in self._pending}) < self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch: List[Tuple[str, concurrent.futures.Future]] = []
+            unique: set = set()
+            while self._pending:
+                text = self._pending[0][0]
+                if text not in unique and len(unique) >= self.max_size:
+                    break
+                unique.add(text)
+                batch.append(self._pending.popleft())
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = self.embeddings.embed_documents(texts)
+                if len(vectors) != len(texts):
+                    raise ValueError(f"expected {len(texts)} embeddings, got {len(vectors)}")
+            except Exception as exc:
+                self.failures += 1
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            by_text = dict(zip(texts, vectors))
+            self.batches += 1
+            self.texts += len(texts)
+            self.max_batch = max(self.max_batch, len(texts))
+            for text, future in batch:
+                future.set_result(by_text[text])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_size": self.max_size,
+            "wait_ms": round(self.wait_seconds * 1000, 1),
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch": round(self.texts / self.batches, 2) if self.batches else None,
+            "max_batch": self.max_batch,
+            "failures": self.failures,
+            "pending": len(self._pending),
+        }
+
+
+_shared_lock = threading.Lock()
+_shared_cache: Optional[EmbeddingCache] = None
+_shared_cache_ready = False
+_shared_batcher: Optional[EmbeddingBatcher] = None
+
+
+def _get_shared_cache() -> Optional[EmbeddingCache]:
+    global _shared_cache, _shared_cache_ready
+    if not _shared_cache_ready:
+        with _shared_lock:
+            if not _shared_cache_ready:
+                if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"):
+                    path = os.getenv(
+                        "EMBEDDING_CACHE_PATH",
+                        str(Path(__file__).resolve().parent.parent.parent / "data" / "embedding_cache.sqlite3"),
+                    )
+                    try:
+                        _shared_cache = EmbeddingCache(
+                            path=path, max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+                        )
+                    except Exception as exc:
+                        print(f"[WARNING] Embedding cache unavailable: {exc}")
+                _shared_cache_ready = True
+    return _shared_cache
+
+
+def _get_shared_batcher(embeddings: Any) -> EmbeddingBatcher:
+    global _shared_batcher
+    if _shared_batcher is None:
+        with _shared_lock:
+            if _shared_batcher is None:
+                _shared_batcher = EmbeddingBatcher(
+                    embeddings,
+                    max_size=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "100")),
+                    wait_seconds=int(os.getenv("EMBEDDING_BATCH_WAIT_MS", "20")) / 1000,
+                )
+    return _shared_batcher
+
 
 class EmbeddingService:
     def __init__(self) -> None:
         self._embeddings = get_upstage_embeddings()
+        self._model = str(getattr(self._embeddings, "model", ""))
+        self._cache = _get_shared_cache()
+        self._batcher = _get_shared_batcher(self._embeddings)
 
     def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        return self._embeddings.embed_documents(texts)
+        if not texts:
+            return []
+        keys = [EmbeddingCache.make_key(self._model, "document", text) for text in texts]
+        found = self._cache.get_many(keys) if self._cache is not None else {}
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            futures = self._batcher.submit(list(missing.values()))
+            created = {key: future.result() for key, future in zip(missing, futures)}
+            if self._cache is not None:
+                self._cache.put_many(created)
+            found.update(created)
+        return [found[key] for key in keys]
 
     def create_embedding(self, text: str) -> List[float]:
-        return self._embeddings.embed_query(text)
+        key = EmbeddingCache.make_key(self._model, "query", text)
+        if self._cache is not None:
+            cached = self._cache.get_many([key]).get(key)
+            if cached is not None:
+                return cached
+        vector = self._embeddings.embed_query(text)
+        if self._cache is not None:
+            self._cache.put_many({key: vector})
+        return vector
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self._model,
+            "cache": self._cache.stats() if self._cache is not None else {"enabled": False},
+            "batcher": self._batcher.stats(),
+        }
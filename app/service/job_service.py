@@ -0,0 +1,214 @@
+"""
+분석 작업(Job) 큐
+- POST /v1/analyze/jobs 로 접수된 분석을 고정 개수의 워커가 순서대로 처리합니다.
+- 큐가 가득 차면 AnalysisJobQueueFull을 발생시켜 API가 429 + Retry-After로 응답하도록 합니다.
+- 공유 상태 저장소(store)가 주어지면 작업 레코드를 함께 기록해, 다른 워커/Pod에서도 상태를 조회할 수 있습니다.
+  (작업 실행 자체는 접수한 워커가 담당합니다. 저장소 I/O는 이벤트 루프 밖(asyncio.to_thread)에서 순서대로 처리합니다)
+- 종료(stop) 시 아직 끝나지 않은(queued/running) 작업은 failed로 기록합니다. (다른 워커가 영원히 대기 상태로 보지 않도록)
+
+선택 환경 변수:
+- ANALYZE_JOB_WORKERS (기본값: 4)
+- ANALYZE_JOB_QUEUE_SIZE (기본값: 32)
+- ANALYZE_JOB_RETENTION (기본값: 200, 완료된 작업 보관 개수)
+- ANALYZE_JOB_TTL_SECONDS (기본값: 3600, 공유 저장소의 작업 레코드 보관 시간)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+from app.service.shared_state import SharedStateBackend
+
+JobRunner = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+# 워커 종료로 끝내지 못한 작업의 error
+JOB_SHUTDOWN_ERROR = "worker shut down before the job finished"
+
+
+class AnalysisJobQueueFull(Exception):
+    """작업 큐가 가득 차 새 작업을 받을 수 없을 때 발생합니다."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"analysis job queue is full (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+class AnalysisJobManager:
+    """
+    bounded asyncio.Queue + 고정 워커 풀 기반 분석 작업 관리자
+    - runner(job_id, state)는 분석 결과 dict를 반환하는 코루틴입니다.
+    """
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        retention: Optional[int] = None,
+        store: Optional[SharedStateBackend] = None,
+    ) -> None:
+        self._runner = runner
+        self._store = store
+        self.ttl_seconds = float(os.getenv("ANALYZE_JOB_TTL_SECONDS", "3600"))
+        self.workers = max(1, workers or int(os.getenv("ANALYZE_JOB_WORKERS", "4")))
+        self.queue_size = max(1, queue_size or int(os.getenv("ANALYZE_JOB_QUEUE_SIZE", "32")))
+        self.retention = max(1, retention or int(os.getenv("ANALYZE_JOB_RETENTION", "200")))
+
+        self._queue: Optional["asyncio.Queue[str]"] = None
+        self._tasks: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._running = 0
+        # 공유 저장소 기록 순서 보장용 (queued 기록이 running/완료 기록을 덮어쓰지 않도록)
+        self._publish_lock = asyncio.Lock()
+        # 최근 작업 소요 시간(초)의 지수 이동 평균 - Retry-After 추정용
+        self._avg_duration = 20.0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"analysis-job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # 큐에 남았거나 실행 중 취소된 작업은 이 워커가 다시 처리하지 않으므로 실패로 기록합니다.
+        finished_at = datetime.now().isoformat()
+        for job_id, job in self._jobs.items():
+            if job["status"] in (JOB_QUEUED, JOB_RUNNING):
+                job.update(status=JOB_FAILED, error=JOB_SHUTDOWN_ERROR, finished_at=finished_at)
+                self._states.pop(job_id, None)
+                await self._publish_async(job)
+
+    async def submit(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        if self._queue is None:
+            raise RuntimeError("AnalysisJobManager.start() must be awaited before submit().")
+
+        job_id = str(uuid4())
+        job = {
+            "job_id": job_id,
+            "status": JOB_QUEUED,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "request_id": None,
+            "result": None,
+            "error": None,
+        }
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull:
+            raise AnalysisJobQueueFull(self.retry_after_seconds()) from None
+
+        self._states[job_id] = state
+        self._jobs[job_id] = job
+        self._evict_finished()
+        # 기록을 기다리는 동안 워커가 실행을 시작할 수 있어 접수 시점의 사본을 돌려줍니다.
+        accepted = dict(job)
+        await self._publish_async(job)
+        return accepted
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job is None and self._store is not None:
+            # 다른 워커가 접수한 작업
+            try:
+                job = await asyncio.to_thread(self._store.get, "analysis_jobs", job_id)
+            except Exception as exc:
+                print(f"[WARNING] Failed to read job state ({job_id}): {exc}")
+        return job
+
+    async def _publish_async(self, job: Dict[str, Any]) -> None:
+        """호출 시점의 작업 상태를 저장소에 기록합니다. (호출 순서대로 기록됨)"""
+        if self._store is None:
+            return
+        snapshot = dict(job)
+        async with self._publish_lock:
+            await asyncio.to_thread(self._publish, snapshot)
+
+    def _publish(self, job: Dict[str, Any]) -> None:
+        if self._store is None:
+            return
+        try:
+            self._store.put("analysis_jobs", job["job_id"], job, ttl_seconds=self.ttl_seconds)
+        except Exception as exc:
+            print(f"[WARNING] Failed to publish job state ({job['job_id']}): {exc}")
+
+    def retry_after_seconds(self) -> int:
+        """대기 중인 작업을 모두 처리하는 데 걸릴 예상 시간(초)"""
+        pending = (self._queue.qsize() if self._queue else 0) + self._running
+        return max(1, math.ceil(self._avg_duration * pending / self.workers))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self._running,
+            "tracked_jobs": len(self._jobs),
+            "avg_duration_sec": round(self._avg_duration, 2),
+        }
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str) -> None:
+        job = self._jobs.get(job_id)
+        state = self._states.pop(job_id, None)
+        if job is None or state is None:
+            return
+
+        job["status"] = JOB_RUNNING
+        job["started_at"] = datetime.now().isoformat()
+        self._running += 1
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            await self._publish_async(job)
+            result = await self._runner(job_id, state)
+            job["result"] = result
+            job["request_id"] = result.get("request_id") if isinstance(result, dict) else None
+            job["status"] = JOB_SUCCEEDED
+        except Exception as exc:
+            job["error"] = str(exc)
+            job["status"] = JOB_FAILED
+        finally:
+            self._running -= 1
+        # 종료 중 취소(CancelledError)되면 여기까지 오지 않고 stop()이 실패로 기록합니다.
+        elapsed = loop.time() - started
+        self._avg_duration = self._avg_duration * 0.8 + elapsed * 0.2
+        job["finished_at"] = datetime.now().isoformat()
+        await self._publish_async(job)
+
+    def _evict_finished(self) -> None:
+        overflow = len(self._jobs) - self.retention
+        if overflow <= 0:
+            return
+        for job_id in list(self._jobs.keys()):
+            if overflow <= 0:
+                break
+            if self._jobs[job_id]["status"] in (JOB_SUCCEEDED, JOB_FAILED):
+                del self._jobs[job_id]
+                overflow -= 1
@@ -0,0 +1,46 @@
+"""
+분석 요청 정규화/해시 유틸
+- 같은 종목·기간·판단 근거를 가진 요청을 동일한 키로 묶기 위해 사용합니다.
+- 판단 근거는 대소문자, 공백, 문장부호 차이를 무시합니다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any, Dict
+
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _normalize_text(value: Any) -> str:
+    if not isinstance(value, str):
+        return ""
+    text = unicodedata.normalize("NFKC", value)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def _normalize_free_text(value: Any) -> str:
+    text = _normalize_text(value).lower()
+    return _SPACE_RE.sub(" ", _NON_WORD_RE.sub(" ", text)).strip()
+
+
+def normalize_analysis_input(state: Dict[str, Any]) -> Dict[str, str]:
+    """그래프 결과에 영향을 주는 입력 필드만 정규화해 반환합니다."""
+    return {
+        "layer1_stock": _normalize_text(state.get("layer1_stock")).upper(),
+        "layer2_buy_date": _normalize_text(state.get("layer2_buy_date")),
+        "layer2_sell_date": _normalize_text(state.get("layer2_sell_date")),
+        "layer3_decision_basis": _normalize_free_text(state.get("layer3_decision_basis")),
+        "position_status": _normalize_text(state.get("position_status")).lower(),
+    }
+
+
+def analysis_request_key(state: Dict[str, Any]) -> str:
+    """정규화된 입력의 sha256 해시"""
+    normalized = normalize_analysis_input(state)
+    raw = json.dumps(normalized, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
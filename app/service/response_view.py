@@ -0,0 +1,82 @@
+"""
+분석 응답 필드 projection
+- /v1/analyze 응답은 그래프 state 전체(입력값, n9_input, N6 judge/metrics 등)를 담고 있어 큽니다.
+- fields= (쉼표 구분 점 경로) 또는 view=compact 로 프론트엔드가 렌더링하는 부분만 골라 반환합니다.
+
+예)
+- ?view=compact
+- ?fields=n10_loss_review_report,n7_news_analysis.news_context.summary
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+# 프론트엔드(AnalysisResult 타입)가 실제로 렌더링하는 섹션
+COMPACT_FIELDS = (
+    "request_id",
+    "n7_news_analysis.news_context.ticker",
+    "n7_news_analysis.news_context.period",
+    "n7_news_analysis.news_context.summary",
+    "n7_news_analysis.news_context.market_sentiment",
+    "n7_news_analysis.news_context.key_headlines",
+    "n7_news_analysis.news_context.news_summaries",
+    "n7_news_analysis.news_context.fact_check",
+    "n8_loss_cause_analysis",
+    "n8_market_context_analysis",
+    "learning_pattern_analysis",
+    "n10_loss_review_report",
+)
+
+VIEWS = ("full", "compact")
+
+# 어떤 projection이든 항상 포함하는 키
+_ALWAYS_INCLUDED = ("request_id",)
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return []
+    return [path.strip() for path in fields.split(",") if path.strip()]
+
+
+def resolve_projection(fields: Optional[str], view: Optional[str]) -> Optional[List[str]]:
+    """
+    요청 파라미터로 projection 경로 목록을 만듭니다. (None이면 전체 응답)
+    알 수 없는 view는 ValueError를 발생시킵니다.
+    """
+    view = (view or "full").lower()
+    if view not in VIEWS:
+        raise ValueError(f"unknown view: {view} (expected one of {', '.join(VIEWS)})")
+
+    paths = parse_fields(fields)
+    if view == "compact":
+        paths = list(COMPACT_FIELDS) + paths
+    if not paths:
+        return None
+    return list(_ALWAYS_INCLUDED) + paths
+
+
+def project(payload: Dict[str, Any], paths: Iterable[str]) -> Dict[str, Any]:
+    """
+    점 경로 목록에 해당하는 값만 원래 중첩 구조를 유지한 채 복사합니다.
+    존재하지 않는 경로는 무시합니다. (값 자체는 복사하지 않고 참조를 공유합니다)
+    """
+    projected: Dict[str, Any] = {}
+    for path in paths:
+        keys = path.split(".")
+        source: Any = payload
+        for key in keys:
+            if not isinstance(source, dict) or key not in source:
+                break
+            source = source[key]
+        else:
+            target = projected
+            for key in keys[:-1]:
+                existing = target.get(key)
+                if not isinstance(existing, dict):
+                    existing = {}
+                    target[key] = existing
+                target = existing
+            target[keys[-1]] = source
+    return projected
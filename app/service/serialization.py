@@ -0,0 +1,114 @@
+"""
+JSON 응답 직렬화/압축
+- FastJSONResponse: orjson이 설치되어 있으면 orjson으로, 없으면 표준 json으로 직렬화합니다.
+- CompressionMiddleware: application/json 응답을 brotli(설치 시) 또는 gzip으로 압축합니다.
+  SSE(text/event-stream) 등 스트리밍 응답은 버퍼링하지 않고 그대로 전달합니다.
+
+선택 환경 변수:
+- RESPONSE_COMPRESSION (기본값: auto, auto|gzip|br|off)
+- RESPONSE_COMPRESSION_MIN_BYTES (기본값: 1024)
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from typing import Any, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def dumps_json(content: Any) -> bytes:
+    if orjson is not None:
+        # non-str 키(예: 날짜)는 문자열로, 직렬화 불가 타입은 str()로 변환합니다.
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    # starlette JSONResponse와 같은 설정 (엔드포인트가 Response를 직접 반환할 때를 위해 default=str 추가)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, mode: Optional[str] = None, minimum_size: Optional[int] = None) -> None:
+        self.app = app
+        self.mode = (mode or os.getenv("RESPONSE_COMPRESSION", "auto")).lower()
+        self.minimum_size = (
+            minimum_size if minimum_size is not None else int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+        )
+
+    def _negotiate(self, scope: Scope) -> Optional[str]:
+        if self.mode == "off":
+            return None
+        accepted = Headers(scope=scope).get("accept-encoding", "")
+        accepted_tokens = {token.split(";")[0].strip() for token in accepted.split(",")}
+        if self.mode in ("auto", "br") and brotli is not None and "br" in accepted_tokens:
+            return "br"
+        if self.mode in ("auto", "gzip", "br") and "gzip" in accepted_tokens:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = self._negotiate(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+        body_parts = []
+
+        async def _send(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if not content_type.startswith("application/json") or "content-encoding" in headers:
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if passthrough or start_message is None:
+                await send(message)
+                return
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(body_parts)
+            headers = MutableHeaders(raw=start_message["headers"])
+            if len(body) >= self.minimum_size:
+                body = compress_body(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+            headers["Content-Length"] = str(len(body))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, _send)
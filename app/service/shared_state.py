@@ -0,0 +1,215 @@
+"""
+워커/레플리카 간 공유 상태
+- uvicorn 멀티 워커 또는 여러 Pod에서 실행할 때 프로세스 로컬 상태를 공유하기 위한 저장소입니다.
+- 사용처: 분석 작업(Job) 레코드, admission control 카운터(LLM 진행 수 등)
+
+백엔드:
+- memory: 프로세스 로컬 (단일 워커 기본값)
+- sqlite: 로컬 디스크 파일 (같은 노드의 워커끼리 공유, Pod 간 공유는 공유 볼륨 필요)
+
+게이지(gauge)는 워커별 값을 따로 기록하고 합계를 조회합니다.
+일정 시간 갱신되지 않은 워커의 값은 합계에서 제외해 죽은 워커의 값이 남지 않게 합니다.
+
+선택 환경 변수:
+- SHARED_STATE_BACKEND (기본값: memory, memory|sqlite)
+- SHARED_STATE_PATH (기본값: ./data/shared_state.sqlite3)
+- SHARED_STATE_GAUGE_TTL_SECONDS (기본값: 30)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SharedStateBackend(ABC):
+    """공유 상태 저장소 인터페이스"""
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, namespace: str, key: str, value: Dict[str, Any], ttl_seconds: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_gauge(self, name: str, value: float) -> None:
+        """현재 워커의 게이지 값을 기록합니다."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def gauge_total(self, name: str) -> float:
+        """살아있는 모든 워커의 게이지 합계"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class MemorySharedState(SharedStateBackend):
+    def __init__(self) -> None:
+        self._items: Dict[tuple, tuple] = {}
+        self._gauges: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._items.get((namespace, key))
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._items[(namespace, key)]
+                return None
+            return value
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any], ttl_seconds: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self._items[(namespace, key)] = (value, expires_at)
+            now = time.time()
+            for item_key in [k for k, (_, exp) in self._items.items() if exp is not None and exp < now]:
+                del self._items[item_key]
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self._gauges[name] = value
+
+    def gauge_total(self, name: str) -> float:
+        return self._gauges.get(name, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "worker_id": WORKER_ID, "entries": len(self._items), "gauges": dict(self._gauges)}
+
+
+class SQLiteSharedState(SharedStateBackend):
+    """
+    SQLite 파일 기반 공유 상태 (WAL 모드)
+    - kv: (namespace, key) → JSON, 만료 시각
+    - gauges: (name, worker_id) → 값, 갱신 시각
+    """
+
+    def __init__(self, path: str, gauge_ttl_seconds: float = 30.0) -> None:
+        self.path = path
+        self.gauge_ttl_seconds = gauge_ttl_seconds
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS shared_kv (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS shared_gauges (
+                    name TEXT NOT NULL,
+                    worker_id TEXT NOT NULL,
+                    value REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (name, worker_id)
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM shared_kv WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        try:
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any], ttl_seconds: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds else None
+        raw = json.dumps(value, ensure_ascii=False, default=str)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO shared_kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+                """,
+                (namespace, key, raw, expires_at),
+            )
+            conn.execute("DELETE FROM shared_kv WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO shared_gauges (name, worker_id, value, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(name, worker_id) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+                """,
+                (name, WORKER_ID, value, time.time()),
+            )
+
+    def gauge_total(self, name: str) -> float:
+        cutoff = time.time() - self.gauge_ttl_seconds
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COALESCE(SUM(value), 0) FROM shared_gauges WHERE name = ? AND updated_at >= ?",
+                (name, cutoff),
+            ).fetchone()
+        return row[0]
+
+    def stats(self) -> Dict[str, Any]:
+        cutoff = time.time() - self.gauge_ttl_seconds
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM shared_kv").fetchone()[0]
+            gauges = conn.execute(
+                "SELECT name, SUM(value), COUNT(*) FROM shared_gauges WHERE updated_at >= ? GROUP BY name",
+                (cutoff,),
+            ).fetchall()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "worker_id": WORKER_ID,
+            "entries": entries,
+            "gauges": {name: {"total": total, "workers": workers} for name, total, workers in gauges},
+        }
+
+
+def create_shared_state() -> SharedStateBackend:
+    backend = os.getenv("SHARED_STATE_BACKEND", "memory").lower()
+    if backend != "sqlite":
+        return MemorySharedState()
+
+    path = os.getenv(
+        "SHARED_STATE_PATH",
+        str(Path(__file__).resolve().parent.parent.parent / "data" / "shared_state.sqlite3"),
+    )
+    return SQLiteSharedState(
+        path=path,
+        gauge_ttl_seconds=float(os.getenv("SHARED_STATE_GAUGE_TTL_SECONDS", "30")),
+    )
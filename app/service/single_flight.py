@@ -0,0 +1,45 @@
+"""
+Single-flight 요청 병합
+- 같은 키로 동시에 들어온 작업은 최초 1회만 실행하고, 나머지 호출자는 그 결과를 함께 기다립니다.
+- 실행이 끝나면 키가 해제되므로 이후 요청은 새로 실행됩니다(결과 캐시가 아님).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        key에 대해 진행 중인 실행이 있으면 그 결과를 기다리고, 없으면 fn()을 실행합니다.
+        호출자 한 명이 취소되어도 공유 실행은 중단되지 않습니다.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.hits += 1
+        return await asyncio.shield(task)
+
+    def _release(self, key: str, task: "asyncio.Future[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "in_flight": len(self._inflight),
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
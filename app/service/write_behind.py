@@ -0,0 +1,371 @@
+"""
+Write-behind 저장 파이프라인
+- Supabase/Chroma 저장을 응답 경로에서 분리해 백그라운드 스레드에서 배치로 처리합니다.
+- 싱크(sink)마다 bounded 큐와 워커 스레드를 하나씩 둡니다.
+- 실패한 배치는 지수 백오프로 재시도하고, 끝내 실패하면 반씩 나눠 한 번씩 다시 기록해 실패한 행을 골라냅니다.
+  - 같은 배치의 다른 행은 기록되는데 실패하는 행은 잘못된 데이터로 보고 격리 파일({sink}.deadletter.jsonl)로 옮깁니다.
+  - 모든 행이 실패하면 싱크 장애로 보고 디스크(JSONL)에 스필합니다.
+  - 스필된 행이 싱크가 그 사이 다른 기록에 성공했는데도 WRITE_BEHIND_POISON_STRIKES번 실패하면 격리합니다.
+    (혼자 남은 잘못된 행이 replay 때마다 재시도되지 않게 함)
+- 스필된 항목은 싱크가 다시 성공하거나 유휴 시간에 재처리합니다.
+- 큐가 가득 차면 메모리에 쌓지 않고 바로 디스크로 스필합니다.
+- 여러 워커 프로세스가 같은 스필 디렉터리를 공유해도 replay 파일을 파일 락으로 나눠 처리합니다.
+
+선택 환경 변수:
+- WRITE_BEHIND_MAX_PENDING (기본값: 1000, 싱크별 메모리 큐 크기)
+- WRITE_BEHIND_BATCH_SIZE (기본값: 16)
+- WRITE_BEHIND_BATCH_WAIT_MS (기본값: 200)
+- WRITE_BEHIND_MAX_RETRIES (기본값: 5)
+- WRITE_BEHIND_BACKOFF_SECONDS (기본값: 0.5)
+- WRITE_BEHIND_SPILL_DIR (기본값: ./data/write_behind)
+- WRITE_BEHIND_SPILL_MAX_BYTES (기본값: 104857600, 싱크별, 격리 파일도 같은 한도)
+- WRITE_BEHIND_POISON_STRIKES (기본값: 3)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+BatchHandler = Callable[[List[Dict[str, Any]]], None]
+
+_REPLAY_INTERVAL_SECONDS = 30.0
+_POLL_SECONDS = 1.0
+# 스필/격리 파일에만 남기는 항목별 실패 기록 (handler에는 넘기지 않음)
+_META_KEY = "_write_behind"
+
+
+class WriteBehindQueue:
+    def __init__(self) -> None:
+        self.max_pending = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "1000"))
+        self.batch_size = max(1, int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "16")))
+        self.batch_wait = int(os.getenv("WRITE_BEHIND_BATCH_WAIT_MS", "200")) / 1000
+        self.max_retries = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "5"))
+        self.backoff_seconds = float(os.getenv("WRITE_BEHIND_BACKOFF_SECONDS", "0.5"))
+        self.spill_max_bytes = int(os.getenv("WRITE_BEHIND_SPILL_MAX_BYTES", str(100 * 1024 * 1024)))
+        self.poison_strikes = max(1, int(os.getenv("WRITE_BEHIND_POISON_STRIKES", "3")))
+        self.spill_dir = Path(
+            os.getenv(
+                "WRITE_BEHIND_SPILL_DIR",
+                str(Path(__file__).resolve().parent.parent.parent / "data" / "write_behind"),
+            )
+        )
+        self._sinks: Dict[str, Dict[str, Any]] = {}
+        self._stopping = threading.Event()
+
+    def register_sink(self, name: str, handler: BatchHandler) -> None:
+        """handler(batch)는 실패 시 예외를 발생시켜야 재시도/스필 대상이 됩니다."""
+        self._sinks[name] = {
+            "handler": handler,
+            "queue": queue.Queue(maxsize=self.max_pending),
+            "lock": threading.Lock(),
+            "thread": None,
+            "last_replay": 0.0,
+            # 마지막으로 handler가 성공한 시각 (time.time, 스필된 행의 failed_at과 비교)
+            "last_success": 0.0,
+            "last_error": None,
+            "counters": {
+                "enqueued": 0,
+                "written": 0,
+                "retries": 0,
+                "spilled": 0,
+                "replayed": 0,
+                "quarantined": 0,
+                "dropped": 0,
+            },
+        }
+
+    def start(self) -> None:
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._stopping.clear()
+        for name, sink in self._sinks.items():
+            thread = sink["thread"]
+            if thread is not None and thread.is_alive():
+                continue
+            thread = threading.Thread(
+                target=self._run_sink, args=(name,), name=f"write-behind-{name}", daemon=True
+            )
+            sink["thread"] = thread
+            thread.start()
+
+    def enqueue(self, sink_name: str, item: Dict[str, Any]) -> None:
+        sink = self._sinks.get(sink_name)
+        if sink is None:
+            return
+        sink["counters"]["enqueued"] += 1
+        if self._stopping.is_set():
+            self._spill(sink_name, [item])
+            return
+        try:
+            sink["queue"].put_nowait(item)
+        except queue.Full:
+            self._spill(sink_name, [item])
+
+    def drain(self, timeout: float = 30.0) -> None:
+        """
+        종료 시 호출: 큐에 남은 항목을 가능한 만큼 기록하고, 시간 안에 못 끝낸 항목은 디스크로 스필합니다.
+        """
+        self._stopping.set()
+        deadline = time.monotonic() + timeout
+        for sink in self._sinks.values():
+            thread = sink["thread"]
+            if thread is not None:
+                thread.join(max(0.0, deadline - time.monotonic()))
+        for name, sink in self._sinks.items():
+            leftovers = self._take_all(sink["queue"])
+            if leftovers:
+                self._spill(name, leftovers)
+
+    def stats(self) -> Dict[str, Any]:
+        result = {}
+        for name, sink in self._sinks.items():
+            spill_path = self._spill_path(name)
+            quarantine_path = self._quarantine_path(name)
+            result[name] = {
+                **sink["counters"],
+                "pending": sink["queue"].qsize(),
+                "spill_bytes": spill_path.stat().st_size if spill_path.exists() else 0,
+                "quarantine_bytes": quarantine_path.stat().st_size if quarantine_path.exists() else 0,
+            }
+        return result
+
+    # ---- 워커 ----
+
+    def _run_sink(self, name: str) -> None:
+        sink = self._sinks[name]
+        self._replay_spill(name)
+        while True:
+            batch = self._next_batch(sink["queue"])
+            if batch:
+                if self._write_batch(name, batch) is not None:
+                    self._maybe_replay(name)
+                continue
+            if self._stopping.is_set():
+                return
+            self._maybe_replay(name)
+
+    def _next_batch(self, pending: "queue.Queue[Dict[str, Any]]") -> List[Dict[str, Any]]:
+        try:
+            first = pending.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, name: str, batch: List[Dict[str, Any]]) -> Optional[int]:
+        """
+        배치를 기록하고 기록한 행 수를 돌려줍니다.
+        실패하면 행을 골라내 잘못된 행은 격리합니다. 모든 행이 실패하면 스필하고 None을 돌려줍니다. (싱크 장애)
+        """
+        if self._write_with_retry(name, batch):
+            return len(batch)
+        failures = self._isolate(name, batch)
+        if len(failures) < len(batch):
+            self._quarantine(name, failures)
+            return len(batch) - len(failures)
+        self._defer(name, failures)
+        return None
+
+    def _isolate(
+        self, name: str, batch: List[Dict[str, Any]], healthy: bool = False
+    ) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        실패한 배치를 반씩 나눠 한 번씩 다시 기록하고, 끝까지 실패한 행과 오류를 돌려줍니다.
+        아직 아무 행도 기록되지 않았는데 두 쪽이 모두 실패하면 싱크 장애로 보고 더 나누지 않습니다.
+        """
+        if len(batch) == 1:
+            return [(batch[0], self._last_error(name))]
+        middle = len(batch) // 2
+        halves = [batch[:middle], batch[middle:]]
+        errors = [self._call_handler(name, half) for half in halves]
+        if not healthy and all(errors):
+            return [(item, str(errors[-1])) for item in batch]
+        failures: List[Tuple[Dict[str, Any], str]] = []
+        for half, error in zip(halves, errors):
+            if error is not None:
+                failures.extend(self._isolate(name, half, healthy=True))
+        return failures
+
+    def _call_handler(self, name: str, batch: List[Dict[str, Any]]) -> Optional[Exception]:
+        """handler를 한 번 호출합니다. 실패하면 예외를 돌려줍니다."""
+        sink = self._sinks[name]
+        try:
+            sink["handler"]([{key: value for key, value in item.items() if key != _META_KEY} for item in batch])
+        except Exception as exc:
+            sink["last_error"] = exc
+            return exc
+        sink["counters"]["written"] += len(batch)
+        sink["last_success"] = time.time()
+        return None
+
+    def _last_error(self, name: str) -> str:
+        return str(self._sinks[name].get("last_error") or "")
+
+    def _write_with_retry(self, name: str, batch: List[Dict[str, Any]]) -> bool:
+        sink = self._sinks[name]
+        for attempt in range(self.max_retries + 1):
+            exc = self._call_handler(name, batch)
+            if exc is None:
+                return True
+            if attempt >= self.max_retries:
+                print(f"[WARNING] Write-behind sink '{name}' failed after {attempt + 1} attempts: {exc}")
+                return False
+            sink["counters"]["retries"] += 1
+            delay = self.backoff_seconds * (2 ** attempt)
+            # 종료 중에는 대기 시간을 줄여 drain 시간 안에 스필까지 끝낼 수 있게 합니다.
+            if self._stopping.is_set():
+                delay = min(delay, 0.5)
+            time.sleep(delay + random.uniform(0, delay / 2))
+        return False
+
+    def _defer(self, name: str, failures: List[Tuple[Dict[str, Any], str]]) -> None:
+        """
+        싱크 장애로 실패한 행을 스필합니다. 지난번 실패 이후 싱크가 다른 행을 기록했는데도
+        다시 실패한 행은 strike를 쌓고, WRITE_BEHIND_POISON_STRIKES번이면 격리합니다.
+        """
+        sink = self._sinks[name]
+        now = time.time()
+        retry: List[Dict[str, Any]] = []
+        poisoned: List[Tuple[Dict[str, Any], str]] = []
+        for item, error in failures:
+            meta = dict(item.get(_META_KEY) or {})
+            if meta.get("failed_at") is not None and sink["last_success"] > meta["failed_at"]:
+                meta["strikes"] = meta.get("strikes", 0) + 1
+            meta.update(failed_at=now, error=error[:500])
+            record = {**item, _META_KEY: meta}
+            if meta.get("strikes", 0) >= self.poison_strikes:
+                poisoned.append((record, error))
+            else:
+                retry.append(record)
+        self._spill(name, retry)
+        if poisoned:
+            self._quarantine(name, poisoned)
+
+    # ---- 디스크 스필 / 격리 ----
+
+    def _spill_path(self, name: str) -> Path:
+        return self.spill_dir / f"{name}.jsonl"
+
+    def _quarantine_path(self, name: str) -> Path:
+        return self.spill_dir / f"{name}.deadletter.jsonl"
+
+    def _spill(self, name: str, items: List[Dict[str, Any]]) -> None:
+        self._append(name, self._spill_path(name), items, "spilled")
+
+    def _quarantine(self, name: str, failures: List[Tuple[Dict[str, Any], str]]) -> None:
+        """싱크가 계속 거부하는 행을 격리 파일로 옮깁니다. (자동 재처리하지 않음, 원인 확인 후 수동 처리)"""
+        now = time.time()
+        records = []
+        for item, error in failures:
+            meta = {**(item.get(_META_KEY) or {}), "error": error[:500], "quarantined_at": now}
+            records.append({**item, _META_KEY: meta})
+            print(f"[WARNING] Write-behind sink '{name}' quarantined request {item.get('request_id')}: {error[:200]}")
+        self._append(name, self._quarantine_path(name), records, "quarantined")
+
+    def _append(self, name: str, path: Path, items: List[Dict[str, Any]], counter: str) -> None:
+        if not items:
+            return
+        sink = self._sinks[name]
+        with sink["lock"]:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                size = path.stat().st_size if path.exists() else 0
+                with path.open("a", encoding="utf-8") as handle:
+                    for item in items:
+                        line = json.dumps(item, ensure_ascii=False, default=str) + "\n"
+                        # 한국어 본문은 UTF-8로 글자당 3바이트라 한도는 인코딩한 바이트 수로 비교합니다.
+                        line_bytes = len(line.encode("utf-8"))
+                        if size + line_bytes > self.spill_max_bytes:
+                            sink["counters"]["dropped"] += 1
+                            continue
+                        handle.write(line)
+                        size += line_bytes
+                        sink["counters"][counter] += 1
+            except Exception as exc:
+                sink["counters"]["dropped"] += len(items)
+                print(f"[WARNING] Write-behind {counter} write failed for '{name}': {exc}")
+
+    def _maybe_replay(self, name: str) -> None:
+        sink = self._sinks[name]
+        if self._stopping.is_set() or time.monotonic() - sink["last_replay"] < _REPLAY_INTERVAL_SECONDS:
+            return
+        self._replay_spill(name)
+
+    def _replay_spill(self, name: str) -> None:
+        sink = self._sinks[name]
+        sink["last_replay"] = time.monotonic()
+        path = self._spill_path(name)
+        with sink["lock"]:
+            # 여러 워커 프로세스가 같은 스필 디렉터리를 쓰므로 프로세스마다 고유한 replay 파일로 옮깁니다.
+            try:
+                path.replace(self.spill_dir / f"{name}.replay.{os.getpid()}.{time.time_ns()}.jsonl")
+            except FileNotFoundError:
+                pass
+
+        # 죽은 워커가 남긴 replay 파일도 함께 처리합니다.
+        for replay_path in sorted(self.spill_dir.glob(f"{name}.replay*.jsonl")):
+            self._replay_file(name, replay_path)
+
+    def _replay_file(self, name: str, replay_path: Path) -> None:
+        sink = self._sinks[name]
+        try:
+            handle = replay_path.open("r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with handle:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    # 다른 워커가 처리 중
+                    return
+                if os.fstat(handle.fileno()).st_nlink == 0:
+                    # 락을 기다리는 사이 다른 워커가 처리를 끝내고 삭제함
+                    return
+
+            items: List[Dict[str, Any]] = []
+            for line in handle.read().splitlines():
+                try:
+                    items.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+            # 처리 도중 프로세스가 죽으면 replay 파일이 남아 다음 주기에 다시 처리됩니다(at-least-once).
+            for start in range(0, len(items), self.batch_size):
+                written = self._write_batch(name, items[start:start + self.batch_size])
+                if written is None:
+                    # 싱크가 아직 복구되지 않았으면 실패한 배치는 _write_batch가 스필했고,
+                    # 시도하지 않은 나머지도 그대로 다시 스필해 다음 주기에 재시도합니다.
+                    self._spill(name, items[start + self.batch_size:])
+                    break
+                sink["counters"]["replayed"] += written
+            replay_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _take_all(pending: "queue.Queue[Dict[str, Any]]") -> List[Dict[str, Any]]:
+        items = []
+        while True:
+            try:
+                items.append(pending.get_nowait())
+            except queue.Empty:
+                return items
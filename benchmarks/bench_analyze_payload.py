@@ -0,0 +1,171 @@
+"""
+/v1/analyze 응답 크기/직렬화 시간 벤치마크
+
+실행: python -m benchmarks.bench_analyze_payload [--payload result.json] [--repeat 200]
+- --payload를 주면 실제 /v1/analyze 응답(JSON 파일)을, 없으면 실제 응답 구조를 흉내 낸 합성 페이로드를 사용합니다.
+- full vs view=compact 크기, json vs orjson 직렬화 시간, gzip/brotli 압축 크기를 비교합니다.
+- orjson/brotli는 설치되어 있을 때만 측정합니다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+import time
+from typing import Any, Callable, Dict
+
+from app.service.response_view import project, resolve_projection
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _synthetic_payload(days: int = 90) -> Dict[str, Any]:
+    rng = random.Random(7)
+    closes = [100 + rng.uniform(-5, 5) + i * 0.1 for i in range(days)]
+    headline = {
+        "title": "삼성전자, 4분기 실적 가이던스 하향 조정",
+        "link": "https://news.example.com/articles/123456",
+        "snippet": "반도체 업황 둔화로 4분기 영업이익 전망치가 하향 조정됐다. " * 3,
+        "date": "2024-03-14",
+        "source": "Example News",
+        "imageUrl": "https://news.example.com/images/123456.jpg",
+        "position": 1,
+    }
+    root_cause = {
+        "id": "RC001",
+        "category": "internal",
+        "subcategory": "judgment_error",
+        "title": "실적 발표 전 기대감 매수",
+        "description": "실적 발표를 앞두고 기대감만으로 진입해 가이던스 하향에 그대로 노출되었습니다.",
+        "impact_score": 8,
+        "impact_level": "high",
+        "evidence": [
+            {"source": "n6", "type": "indicator", "data_point": "RSI 74", "interpretation": "과매수 구간 진입"},
+            {"source": "n7", "type": "news", "data_point": "가이던스 하향", "interpretation": "실적 기대 훼손"},
+        ],
+        "timeline_relevance": "pre_buy",
+    }
+    return {
+        "request_id": "3f1c2b7e-0000-4000-8000-000000000000",
+        "layer1_stock": "005930.KS",
+        "layer2_buy_date": "2024-03-12",
+        "layer2_sell_date": "2024-04-18",
+        "layer3_decision_basis": "실적 기대감, 유튜브 추천",
+        "user_message": "실적 기대감, 유튜브 추천",
+        "trade_period": {"buy_date": "2024-03-12", "sell_date": "2024-04-18", "position_status": "sold"},
+        "n6_stock_analysis": {
+            "stock_analysis": {
+                "ticker": "005930.KS",
+                "summary": "기간 동안 -8.21%의 수익률을 기록했습니다.",
+                "price_move": {"start_price": 78000, "end_price": 71600, "pct_change": -8.21},
+                "trend": "downtrend",
+                "indicators": [
+                    {"name": "RSI", "values": [round(rng.uniform(20, 80), 2) for _ in range(days)]},
+                    {"name": "MACD", "values": [round(rng.uniform(-2, 2), 4) for _ in range(days)]},
+                    {"name": "Bollinger", "upper": closes, "middle": closes, "lower": closes},
+                ],
+                "volume_analysis": {"average_volume": 15234567, "trend": "increasing", "anomalies": []},
+                "llm_chart_analysis": "차트 해석 요약 " * 80,
+                "judge_metrics": {"consistency": 90.0, "indicator_coverage": 100.0, "notes": "ok " * 40},
+                "metrics_summary": {"passed": 5, "total": 6, "score": 83.3, "details": ["metric"] * 20},
+            }
+        },
+        "n7_news_analysis": {
+            "news_context": {
+                "ticker": "005930.KS",
+                "period": {"buy_date": "2024-03-12", "sell_date": "2024-04-18"},
+                "summary": "반도체 업황 둔화와 가이던스 하향이 주가에 부담으로 작용했습니다. " * 3,
+                "market_sentiment": {"index": 35, "label": "fear", "description": "투자 심리 위축"},
+                "key_headlines": [dict(headline, position=i) for i in range(3)],
+                "news_summaries": [
+                    {"title": headline["title"], "source": "Example", "date": "2024-03-14", "link": headline["link"], "summary": "요약 " * 30}
+                    for _ in range(3)
+                ],
+                "fact_check": {"user_belief": "실적 기대감", "actual_fact": "가이던스 하향", "verdict": "mismatch"},
+                "metrics_summary": {"passed": 4, "total": 5, "score": 80.0},
+            }
+        },
+        "n8_loss_cause_analysis": {
+            "loss_check": "손실 확인",
+            "one_line_summary": "기대감 매수 후 가이던스 하향으로 손실",
+            "root_causes": [dict(root_cause, id=f"RC00{i}") for i in range(1, 5)],
+            "cause_breakdown": {"internal_ratio": 60, "external_ratio": 40},
+            "detailed_explanation": "상세 설명 " * 60,
+            "confidence_level": "medium",
+        },
+        "n8_market_context_analysis": {"news_at_loss_time": ["뉴스"] * 3, "market_situation_analysis": "시장 분석 " * 40, "related_news": ["관련 뉴스"] * 3},
+        "n9_input": {
+            "investment_reason": "실적 기대감",
+            "loss_cause_summary": "가이던스 하향",
+            "loss_cause_details": ["세부 원인 " * 10] * 4,
+            "objective_signals": {"price_trend": "downtrend", "technical_indicators": ["RSI 74"] * 5, "news_facts": ["가이던스 하향"] * 5},
+        },
+        "learning_pattern_analysis": {
+            "investor_character": {"type": "직감파 트레이더", "description": "설명 " * 20},
+            "profile_metrics": {name: {"score": 50, "label": name} for name in ("a", "b", "c", "d", "e", "f")},
+            "cognitive_analysis": {"primary_bias": {"name": "확증 편향", "english": "Confirmation Bias", "description": "설명 " * 10}},
+            "decision_problems": [{"problem_type": "분석 부족", "situation": "상황 " * 10}] * 3,
+        },
+        "n10_loss_review_report": {"learning_tutor": {"custom_learning_path": {"steps": ["단계 " * 10] * 5}, "action_missions": [{"mission": "미션 " * 10}] * 3}},
+        "metrics_summary": {"tier1": {"score": 80}, "tier2": {"score": 75}, "details": ["metric"] * 30},
+    }
+
+
+def _time_ms(fn: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _json_dumps(payload: Dict[str, Any]) -> bytes:
+    # starlette JSONResponse 기본 설정
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--payload", help="/v1/analyze 응답을 저장한 JSON 파일")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.payload:
+        with open(args.payload, encoding="utf-8") as handle:
+            payload = json.load(handle)
+    else:
+        payload = _synthetic_payload()
+
+    views = {
+        "full": payload,
+        "compact": project(payload, resolve_projection(None, "compact")),
+    }
+
+    print(f"{'view':<8} {'bytes':>9} {'gzip':>9} {'br':>9} {'json ms':>9} {'orjson ms':>10} {'project ms':>11}")
+    for name, body in views.items():
+        raw = _json_dumps(body)
+        gz = len(gzip.compress(raw, compresslevel=6))
+        br = len(brotli.compress(raw, quality=5)) if brotli else None
+        json_ms = _time_ms(lambda: _json_dumps(body), args.repeat)
+        orjson_ms = _time_ms(lambda: orjson.dumps(body), args.repeat) if orjson else None
+        paths = resolve_projection(None, "compact")
+        project_ms = _time_ms(lambda: project(payload, paths), args.repeat) if name == "compact" else 0.0
+        br_text = str(br) if br is not None else "-"
+        orjson_text = f"{orjson_ms:.3f}" if orjson_ms is not None else "-"
+        print(
+            f"{name:<8} {len(raw):>9} {gz:>9} {br_text:>9} "
+            f"{json_ms:>9.3f} {orjson_text:>10} {project_ms:>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
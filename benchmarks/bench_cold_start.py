@@ -0,0 +1,144 @@
+"""
+API 프로세스 cold start 벤치마크 (import 시간 / 첫 /v1/health 응답까지 시간)
+
+실행: python -m benchmarks.bench_cold_start [--runs 5] [--warmup] [--top 10]
+- import: 새 인터프리터에서 `import app.api`에 걸리는 시간 (프로세스 기동 시간 제외)
+- healthy: uvicorn 프로세스를 띄운 시점부터 /v1/health가 200을 돌려줄 때까지 시간
+- --warmup: APP_WARMUP_ON_STARTUP=true로 띄워 warmup 포함 시간을 측정합니다.
+- 같은 환경 변수를 그대로 물려주며, LLM_BACKEND가 없으면 fake로 실행합니다. (API 키 없이 측정 가능)
+- 마지막에 python -X importtime 기준 import 비용이 큰 최상위 모듈을 출력합니다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+_ROOT = Path(__file__).resolve().parent.parent
+_IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.api; "
+    "print(f'IMPORT_SECONDS={time.perf_counter() - started:.4f}')"
+)
+
+
+def _env(warmup: bool) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("LLM_BACKEND", "fake")
+    env["APP_WARMUP_ON_STARTUP"] = "true" if warmup else "false"
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(_ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _measure_import(env: Dict[str, str]) -> Optional[float]:
+    result = subprocess.run(
+        [sys.executable, "-c", _IMPORT_SNIPPET], cwd=_ROOT, env=env, capture_output=True, text=True
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("IMPORT_SECONDS="):
+            return float(line.split("=", 1)[1])
+    print(f"[WARNING] import app.api failed:\n{result.stderr[-2000:]}")
+    return None
+
+
+def _measure_healthy(env: Dict[str, str], timeout: float) -> Optional[float]:
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.api:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    print(f"[WARNING] uvicorn exited with code {process.returncode}")
+                    return None
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/v1/health").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.02)
+        print(f"[WARNING] /v1/health did not respond within {timeout:.0f}s")
+        return None
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _top_imports(env: Dict[str, str], top: int) -> List[Tuple[int, str]]:
+    """importtime 출력에서 app.api가 직접 import한 모듈의 누적 시간(us)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.api"],
+        cwd=_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    rows: List[Tuple[int, str]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()[1:]
+        # 들여쓰기 2칸 = app.api 바로 아래 단계
+        if name.startswith("  ") and not name.startswith("   "):
+            rows.append((int(parts[1]), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def _summary(label: str, values: List[float]) -> None:
+    if not values:
+        print(f"{label:<10} failed")
+        return
+    print(
+        f"{label:<10} min={min(values):.3f}s median={statistics.median(values):.3f}s "
+        f"max={max(values):.3f}s runs={len(values)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", action="store_true", help="APP_WARMUP_ON_STARTUP=true로 측정")
+    parser.add_argument("--timeout", type=float, default=60.0, help="/v1/health 대기 상한(초)")
+    parser.add_argument("--top", type=int, default=10, help="import 비용 상위 모듈 수")
+    args = parser.parse_args()
+
+    env = _env(args.warmup)
+    imports = [value for value in (_measure_import(env) for _ in range(args.runs)) if value is not None]
+    healthy = [value for value in (_measure_healthy(env, args.timeout) for _ in range(args.runs)) if value is not None]
+
+    print(f"LLM_BACKEND={env['LLM_BACKEND']} warmup={args.warmup}")
+    _summary("import", imports)
+    _summary("healthy", healthy)
+    print(f"{'module':<45} {'cumulative ms':>14}")
+    for micros, name in _top_imports(env, args.top):
+        print(f"{name:<45} {micros / 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+분석 그래프 오프라인 부하 테스트 (Upstage/Serper/Yahoo 호출 없음)
+
+실행: python -m benchmarks.bench_graph_offline [--trades 100] [--concurrency 16] [--latency-ms 400]
+- LLM_BACKEND=fake(core/llm_fake.py)로 모든 Solar 호출/임베딩을 가짜 백엔드가 처리합니다.
+- 주가는 종목별 시드로 만든 합성 OHLCV를 n6_prefetched_stock_data로 넣고,
+  뉴스는 SERPER_API_KEY를 비워 search_tool의 mock 데이터를 사용합니다.
+- governor(LLM_RATE_*)/hedging(LLM_HEDGE_*) 등 나머지 설정은 환경 변수 그대로 적용됩니다.
+- 출력: 분석 1건 지연 p50/p95/p99, 처리량, 노드별 LLM 호출 결과(ok/parse_fail/fallback), governor 대기
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+_TICKERS = ("005930.KS", "000660.KS", "AAPL", "TSLA", "NVDA", "MSFT")
+
+
+def _configure_env(args: argparse.Namespace) -> None:
+    # core.llm import 전에 설정해야 합니다. (.env는 이미 설정된 값을 덮어쓰지 않음)
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["SERPER_API_KEY"] = ""
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    os.environ["LANGSMITH_TRACING"] = "false"
+    os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+    os.environ["LLM_FAKE_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["LLM_FAKE_LATENCY_SIGMA"] = str(args.latency_sigma)
+    os.environ["LLM_FAKE_TAIL_RATE"] = str(args.tail_rate)
+
+
+def _synthetic_stock_data(ticker: str, buy_date: str, sell_date: str) -> Dict[str, Any]:
+    rng = random.Random(f"{ticker}:{buy_date}:{sell_date}")
+    start = datetime.strptime(buy_date, "%Y-%m-%d") - timedelta(days=30)
+    end = datetime.strptime(sell_date, "%Y-%m-%d") + timedelta(days=30)
+    dates, opens, highs, lows, closes, volumes = [], [], [], [], [], []
+    price = rng.uniform(50, 500)
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            open_price = price
+            price = max(1.0, price * (1 + rng.gauss(-0.001, 0.02)))
+            dates.append(day.strftime("%Y-%m-%d"))
+            opens.append(round(open_price, 2))
+            closes.append(round(price, 2))
+            highs.append(round(max(open_price, price) * (1 + rng.uniform(0, 0.01)), 2))
+            lows.append(round(min(open_price, price) * (1 - rng.uniform(0, 0.01)), 2))
+            volumes.append(rng.randint(100_000, 5_000_000))
+        day += timedelta(days=1)
+    return {
+        "ticker": ticker,
+        "start_date": buy_date,
+        "end_date": sell_date,
+        "extended_start": start.strftime("%Y-%m-%d"),
+        "extended_end": end.strftime("%Y-%m-%d"),
+        "open": opens,
+        "high": highs,
+        "low": lows,
+        "close": closes,
+        "volume": volumes,
+        "dates": dates,
+    }
+
+
+def _trades(count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(42)
+    trades = []
+    for index in range(count):
+        ticker = _TICKERS[index % len(_TICKERS)]
+        buy = datetime(2024, 1, 2) + timedelta(days=rng.randint(0, 300))
+        sell = buy + timedelta(days=rng.randint(5, 60))
+        buy_date, sell_date = buy.strftime("%Y-%m-%d"), sell.strftime("%Y-%m-%d")
+        trades.append(
+            {
+                "layer1_stock": ticker,
+                "layer2_buy_date": buy_date,
+                "layer2_sell_date": sell_date,
+                "layer3_decision_basis": f"실적 기대감으로 매수 #{index}",
+                "user_message": f"실적 기대감으로 매수 #{index}",
+                "n6_prefetched_stock_data": _synthetic_stock_data(ticker, buy_date, sell_date),
+            }
+        )
+    return trades
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def _run(trades: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    from workflow.graph import build_graph
+
+    graph = build_graph(async_nodes=True)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def _one(state: Dict[str, Any]) -> None:
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await graph.ainvoke(state)
+            except Exception as exc:
+                failures += 1
+                print(f"[WARNING] analysis failed: {exc}")
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(state) for state in trades))
+    return {"latencies": sorted(latencies), "failures": failures, "elapsed": time.perf_counter() - started}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trades", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="가짜 LLM 지연 중앙값")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="꼬리 지연(10배) 확률")
+    args = parser.parse_args()
+    _configure_env(args)
+
+    from core.llm import get_llm_governor_stats, get_llm_usage_stats
+
+    outcome = asyncio.run(_run(_trades(args.trades), args.concurrency))
+    latencies = outcome["latencies"]
+
+    print(
+        f"trades={args.trades} concurrency={args.concurrency} "
+        f"fake_latency={args.latency_ms:.0f}ms sigma={args.latency_sigma} tail_rate={args.tail_rate}"
+    )
+    if latencies:
+        print(
+            f"analysis latency: p50={statistics.median(latencies):.2f}s "
+            f"p95={_percentile(latencies, 0.95):.2f}s p99={_percentile(latencies, 0.99):.2f}s "
+            f"throughput={len(latencies) / outcome['elapsed']:.2f}/s failures={outcome['failures']}"
+        )
+
+    usage = get_llm_usage_stats()
+    print(f"{'node':<14} {'calls':>6} {'ok':>5} {'parse_fail':>10} {'fallback':>8} {'error':>6} {'p95 ms':>8}")
+    for node, row in sorted(usage["nodes"].items()):
+        outcomes = row["outcomes"]
+        print(
+            f"{node:<14} {row['calls']:>6} {outcomes['ok']:>5} {outcomes['parse_fail']:>10} "
+            f"{outcomes['fallback']:>8} {outcomes['error']:>6} {row['latency_ms']['p95']:>8.0f}"
+        )
+    governor = get_llm_governor_stats()
+    print(
+        f"governor: throttled={governor['throttled_429']} timeouts={governor['timeouts']} "
+        + " ".join(f"{lane}_avg_wait={row['avg_wait_ms']}ms" for lane, row in governor["lanes"].items())
+    )
+
+
+if __name__ == "__main__":
+    main()
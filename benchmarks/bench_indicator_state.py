@@ -0,0 +1,151 @@
+"""
+보유 중 포지션 재확인 벤치마크 (증분 지표 상태 vs 전체 재계산)
+
+실행: python -m benchmarks.bench_indicator_state [--sizes 250,2500,25000] [--repeat 5]
+- 오늘까지의 합성 일봉(평일) n개를 만들고, 어제까지 데이터로 상태를 한 번 만든 뒤
+  "오늘 봉이 하나 더 생긴" 재확인을 두 방식으로 측정합니다.
+  - full: perform_technical_analysis(stock_data, ...) (기존처럼 전체 구간 재계산)
+  - incremental: IndicatorStateStore.advance(새 봉 + 확정 전 최근 봉만 반영) + perform_technical_analysis(state)
+- 동등성: 지표/가격 값이 상대 오차 --rtol 이내이고 분석 결과 dict가 같아야 하며, 다르면 종료 코드 1로 끝납니다.
+- 상태는 임시 디렉터리의 SQLite 파일에 저장합니다. (data/ 아래 파일은 건드리지 않음)
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from N6_Stock_Analyst.indicator_state import IndicatorStateStore
+from N6_Stock_Analyst.n6 import perform_technical_analysis
+
+
+def _weekdays_until_today(count: int) -> List[str]:
+    days: List[str] = []
+    current = date.today()
+    while len(days) < count:
+        if current.weekday() < 5:
+            days.append(current.isoformat())
+        current -= timedelta(days=1)
+    return days[::-1]
+
+
+def _stock_data(count: int, seed: int = 7) -> Dict[str, Any]:
+    """평균 회귀 로그 랜덤워크 종가 + 고가/저가/거래량"""
+    rng = random.Random(seed)
+    anchor = math.log(100.0)
+    log_price = anchor
+    data: Dict[str, Any] = {"ticker": "BENCH", "open": [], "high": [], "low": [], "close": [], "volume": []}
+    for _ in range(count):
+        log_price += -0.001 * (log_price - anchor) + rng.gauss(0, 0.02)
+        close = round(math.exp(log_price), 4)
+        data["open"].append(close)
+        data["high"].append(round(close * (1 + abs(rng.gauss(0, 0.01))), 4))
+        data["low"].append(round(close * (1 - abs(rng.gauss(0, 0.01))), 4))
+        data["close"].append(close)
+        data["volume"].append(rng.randint(100_000, 5_000_000))
+    data["dates"] = _weekdays_until_today(count)
+    return data
+
+
+def _head(stock_data: Dict[str, Any], count: int) -> Dict[str, Any]:
+    return {key: value[:count] if isinstance(value, list) else value for key, value in stock_data.items()}
+
+
+def _mismatches(full: Dict[str, Any], incremental: Dict[str, Any], snapshot: Dict[str, Any], stock_data: Dict[str, Any], buy_date: str, rtol: float) -> List[str]:
+    from N6_Stock_Analyst.indicators import bollinger_bands, macd, rsi
+
+    closes = stock_data["close"]
+    buy_idx = next(i for i, d in enumerate(stock_data["dates"]) if d >= buy_date)
+    expected = {
+        "upper": float(bollinger_bands(closes)["upper"][-1]),
+        "lower": float(bollinger_bands(closes)["lower"][-1]),
+        "rsi": float(rsi(closes)[-1]),
+        "macd": float(macd(closes)["macd"][-1]),
+        "signal": float(macd(closes)["signal"][-1]),
+        "average_volume": sum(stock_data["volume"]) / len(stock_data["volume"]),
+        "start_price": closes[buy_idx],
+        "highest": max(stock_data["high"][buy_idx:]),
+        "lowest": min(stock_data["low"][buy_idx:]),
+    }
+    actual = {
+        "upper": snapshot["bollinger"]["upper"],
+        "lower": snapshot["bollinger"]["lower"],
+        "rsi": snapshot["rsi"],
+        "macd": snapshot["macd"]["macd"],
+        "signal": snapshot["macd"]["signal"],
+        "average_volume": snapshot["average_volume"],
+        "start_price": snapshot["start_price"],
+        "highest": snapshot["highest"],
+        "lowest": snapshot["lowest"],
+    }
+    problems = [
+        f"{name}: {expected[name]!r} vs {actual[name]!r}"
+        for name in expected
+        if not math.isclose(expected[name], actual[name], rel_tol=rtol, abs_tol=rtol)
+    ]
+    if full != incremental:
+        problems.append("analysis dict differs")
+    return problems
+
+
+def _time_ms(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="250,2500,25000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    ok = True
+    print(f"{'bars':>7} {'full ms':>9} {'incremental ms':>15} {'speedup':>8} {'new bars':>9} {'equal':>6}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(value) for value in args.sizes.split(",")):
+            stock_data = _stock_data(size)
+            buy_date = stock_data["dates"][size // 2]
+            sell_date = date.today().isoformat()
+            store = IndicatorStateStore(str(Path(directory) / f"state_{size}.sqlite3"))
+            # 어제까지 데이터로 상태를 만들어 둡니다. (확정된 봉까지만 저장됨)
+            store.advance(_head(stock_data, size - 1), buy_date)
+
+            def incremental() -> Dict[str, Any]:
+                state = store.advance(stock_data, buy_date)
+                return perform_technical_analysis(stock_data, buy_date, sell_date, state)
+
+            def full() -> Dict[str, Any]:
+                return perform_technical_analysis(stock_data, buy_date, sell_date)
+
+            full_ms = _time_ms(full, args.repeat)
+            before = store.stats()["new_bars"]
+            incremental_ms = _time_ms(incremental, args.repeat)
+            new_bars = (store.stats()["new_bars"] - before) // args.repeat
+
+            snapshot = store.advance(stock_data, buy_date).snapshot()
+            problems = _mismatches(full(), incremental(), snapshot, stock_data, buy_date, args.rtol)
+            for problem in problems:
+                print(f"[MISMATCH] {size} bars: {problem}")
+            ok = ok and not problems
+            print(
+                f"{size:>7} {full_ms:>9.2f} {incremental_ms:>15.2f} {full_ms / incremental_ms:>7.1f}x "
+                f"{new_bars:>9} {'yes' if not problems else 'NO':>6}"
+            )
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
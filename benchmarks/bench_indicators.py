@@ -0,0 +1,179 @@
+"""
+N6 기술 지표 벤치마크 + 동등성 확인 (NumPy 구현 vs 기존 순수 Python 반복문)
+
+실행: python -m benchmarks.bench_indicators [--sizes 1000,10000,100000,1000000] [--repeat 3]
+- 합성 종가(평균 회귀 로그 랜덤워크)로 N6_Stock_Analyst/indicators.py와 아래 reference 구현을 비교합니다.
+  reference는 NumPy 전환 전 n6.py의 calculate_bollinger_bands/calculate_rsi/calculate_macd와 같은 코드입니다.
+- 동등성: 길이/None 여부가 같고 값이 상대 오차 --rtol 이내여야 하며, 하나라도 다르면 종료 코드 1로 끝납니다.
+  (짧은 시계열, 상승만 하는 시계열(RSI 100), 가격이 변하지 않는 구간 등 경계 사례 포함, 회귀 테스트는 tests/test_indicators.py)
+- --reference-max-bars보다 긴 시계열은 reference 측정을 건너뜁니다. (1M bar 볼린저는 수 초 걸림)
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from N6_Stock_Analyst import indicators
+
+
+# ---- reference (기존 순수 Python 구현) ----
+def _reference_bollinger(prices: List[float], period: int = 20, std_dev: int = 2) -> Optional[Dict[str, List[float]]]:
+    if len(prices) < period:
+        return None
+    upper, middle, lower = [], [], []
+    for i in range(period - 1, len(prices)):
+        window = prices[i - period + 1 : i + 1]
+        sma = sum(window) / period
+        variance = sum((x - sma) ** 2 for x in window) / period
+        std = variance**0.5
+        middle.append(sma)
+        upper.append(sma + (std * std_dev))
+        lower.append(sma - (std * std_dev))
+    return {"upper": upper, "middle": middle, "lower": lower}
+
+
+def _reference_rsi(prices: List[float], period: int = 14) -> Optional[List[float]]:
+    if len(prices) < period + 1:
+        return None
+    gains, losses = [], []
+    for i in range(1, len(prices)):
+        change = prices[i] - prices[i - 1]
+        gains.append(change if change > 0 else 0)
+        losses.append(0 if change > 0 else abs(change))
+    avg_gain = sum(gains[:period]) / period
+    avg_loss = sum(losses[:period]) / period
+    values = [100 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))]
+    for i in range(period, len(gains)):
+        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+        values.append(100 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss)))
+    return values
+
+
+def _reference_ema(data: List[float], period: int) -> List[float]:
+    multiplier = 2 / (period + 1)
+    ema = [sum(data[:period]) / period]
+    for i in range(period, len(data)):
+        ema.append((data[i] - ema[-1]) * multiplier + ema[-1])
+    return ema
+
+
+def _reference_macd(prices: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Optional[Dict[str, List[float]]]:
+    if len(prices) < slow + signal:
+        return None
+    fast_ema = _reference_ema(prices, fast)
+    slow_ema = _reference_ema(prices, slow)
+    offset = slow - fast
+    macd_line = [fast_ema[i + offset] - slow_ema[i] for i in range(len(slow_ema))]
+    signal_line = _reference_ema(macd_line, signal)
+    histogram = [macd_line[i + signal - 1] - signal_line[i] for i in range(len(signal_line))]
+    return {"macd": macd_line[signal - 1 :], "signal": signal_line, "histogram": histogram}
+
+
+_CASES: Dict[str, Dict[str, Callable[[List[float]], Any]]] = {
+    "bollinger": {"reference": _reference_bollinger, "numpy": indicators.bollinger_bands},
+    "rsi": {"reference": _reference_rsi, "numpy": indicators.rsi},
+    "macd": {"reference": _reference_macd, "numpy": indicators.macd},
+}
+
+
+def _series(size: int, seed: int = 7) -> List[float]:
+    """평균 회귀하는 로그 가격 랜덤워크 (1M bar에서도 가격이 0으로 수렴하지 않음)"""
+    rng = random.Random(seed)
+    anchor = math.log(100.0)
+    log_price, prices = anchor, []
+    for _ in range(size):
+        log_price += -0.001 * (log_price - anchor) + rng.gauss(0, 0.02)
+        prices.append(round(math.exp(log_price), 4))
+    return prices
+
+
+def _edge_series() -> Dict[str, List[float]]:
+    return {
+        "empty": [],
+        "short": [100.0, 101.0, 99.5],
+        "exact_period": _series(20),
+        "rising": [100.0 + i for i in range(80)],
+        "flat": [50.0] * 60,
+        "flat_then_move": [50.0] * 40 + _series(60, seed=3),
+        "large_prices": [p * 1e6 for p in _series(500, seed=11)],
+    }
+
+
+def _mismatch(expected: Any, actual: Any, rtol: float) -> Optional[str]:
+    if expected is None or actual is None:
+        return None if expected is None and actual is None else f"None mismatch ({expected is None} vs {actual is None})"
+    if isinstance(expected, dict):
+        for key in expected:
+            problem = _mismatch(expected[key], actual[key], rtol)
+            if problem:
+                return f"{key}: {problem}"
+        return None
+    expected_array = np.asarray(expected, dtype=np.float64)
+    actual_array = np.asarray(actual, dtype=np.float64)
+    if expected_array.shape != actual_array.shape:
+        return f"length {expected_array.shape} vs {actual_array.shape}"
+    # 값이 0 근처(MACD 등)인 경우를 위해 시계열 크기 기준 절대 오차도 허용합니다.
+    atol = rtol * max(1.0, float(np.max(np.abs(expected_array))) if expected_array.size else 1.0)
+    if not np.allclose(actual_array, expected_array, rtol=rtol, atol=atol):
+        worst = int(np.argmax(np.abs(actual_array - expected_array)))
+        return f"index {worst}: {expected_array[worst]!r} vs {actual_array[worst]!r}"
+    return None
+
+
+def _check(prices: List[float], label: str, rtol: float) -> bool:
+    ok = True
+    for name, impls in _CASES.items():
+        problem = _mismatch(impls["reference"](prices), impls["numpy"](prices), rtol)
+        if problem:
+            ok = False
+            print(f"[MISMATCH] {name} on {label}: {problem}")
+    return ok
+
+
+def _time_ms(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    parser.add_argument("--reference-max-bars", type=int, default=100000)
+    args = parser.parse_args()
+
+    ok = all(_check(prices, label, args.rtol) for label, prices in _edge_series().items())
+    print(f"{'bars':>9} {'indicator':<10} {'reference ms':>13} {'numpy ms':>10} {'speedup':>8} {'equal':>6}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        prices = _series(size)
+        for name, impls in _CASES.items():
+            numpy_ms = _time_ms(lambda: impls["numpy"](prices), args.repeat)
+            if size > args.reference_max_bars:
+                print(f"{size:>9} {name:<10} {'-':>13} {numpy_ms:>10.2f} {'-':>8} {'-':>6}")
+                continue
+            reference_ms = _time_ms(lambda: impls["reference"](prices), 1)
+            equal = _mismatch(impls["reference"](prices), impls["numpy"](prices), args.rtol) is None
+            ok = ok and equal
+            print(
+                f"{size:>9} {name:<10} {reference_ms:>13.2f} {numpy_ms:>10.2f} "
+                f"{reference_ms / numpy_ms:>7.1f}x {'yes' if equal else 'NO':>6}"
+            )
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
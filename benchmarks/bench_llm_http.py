@@ -0,0 +1,138 @@
+"""
+Upstage 호출 HTTP 전송 계층 벤치마크 (커넥션 풀/keep-alive 효과)
+
+실행: python -m benchmarks.bench_llm_http [--url URL] [--requests 200] [--threads 8]
+- --url이 없으면 로컬 HTTP 서버(응답 지연 --server-delay-ms)를 띄워 측정합니다.
+  TLS 핸드셰이크 비용까지 보려면 실제 HTTPS 엔드포인트를 지정합니다.
+  예) --url https://api.upstage.ai/v1/models --bearer $UPSTAGE_API_KEY
+- 비교 대상
+  - per-call: 호출마다 새 httpx.Client (기존처럼 커넥션을 재사용하지 못하는 경우)
+  - pooled: core/llm.py와 같은 공유 httpx.Client (asyncio.to_thread처럼 여러 스레드에서 호출)
+  - pooled-async: 공유 httpx.AsyncClient (ainvoke 경로)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+
+    def do_GET(self) -> None:
+        time.sleep(self.delay)
+        body = b'{"ok":true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+def _start_local_server(delay_ms: float) -> ThreadingHTTPServer:
+    _Handler.delay = delay_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _limits(threads: int) -> httpx.Limits:
+    return httpx.Limits(max_connections=max(threads, 1) * 2, max_keepalive_connections=max(threads, 1), keepalive_expiry=60)
+
+
+def _summary(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "p50": statistics.median(ordered) * 1000,
+        "p95": ordered[int(len(ordered) * 0.95) - 1] * 1000,
+        "rps": len(ordered) / elapsed,
+    }
+
+
+def _run_threaded(call: Callable[[], None], requests: int, threads: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def _timed(_: int) -> None:
+        start = time.perf_counter()
+        call()
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(_timed, range(requests)))
+    return _summary(latencies, time.perf_counter() - start)
+
+
+async def _run_async(url: str, headers: Dict[str, str], requests: int, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(limits=_limits(concurrency), headers=headers) as client:
+
+        async def _timed() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                (await client.get(url)).raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(_timed() for _ in range(requests)))
+    return _summary(latencies, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="측정할 엔드포인트 (없으면 로컬 서버)")
+    parser.add_argument("--bearer", help="Authorization: Bearer 토큰")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--server-delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    server: Optional[ThreadingHTTPServer] = None
+    url = args.url
+    if not url:
+        server = _start_local_server(args.server_delay_ms)
+        url = f"http://127.0.0.1:{server.server_address[1]}/v1/models"
+    headers = {"Authorization": f"Bearer {args.bearer}"} if args.bearer else {}
+
+    def _per_call() -> None:
+        with httpx.Client(headers=headers) as client:
+            client.get(url).raise_for_status()
+
+    pooled = httpx.Client(limits=_limits(args.threads), headers=headers)
+
+    def _pooled() -> None:
+        pooled.get(url).raise_for_status()
+
+    results = {
+        "per-call": _run_threaded(_per_call, args.requests, args.threads),
+        "pooled": _run_threaded(_pooled, args.requests, args.threads),
+        "pooled-async": asyncio.run(_run_async(url, headers, args.requests, args.threads)),
+    }
+    pooled.close()
+    if server is not None:
+        server.shutdown()
+
+    print(f"url={url} requests={args.requests} concurrency={args.threads}")
+    print(f"{'transport':<13} {'p50 ms':>9} {'p95 ms':>9} {'req/s':>9}")
+    for name, row in results.items():
+        print(f"{name:<13} {row['p50']:>9.2f} {row['p95']:>9.2f} {row['rps']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
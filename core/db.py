@@ -1,15 +1,26 @@
 from __future__ import annotations
 
 import os
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
 
-import chromadb
-from chromadb.config import Settings
-from supabase import Client, create_client
+# chromadb/supabase는 import 비용이 커서 클라이언트를 처음 만들 때 import 합니다. (API 기동 시간 단축)
+if TYPE_CHECKING:
+    import chromadb
+    from supabase import Client
 
 _supabase_client: Optional[Client] = None
 _chroma_client: Optional[chromadb.ClientAPI] = None
+# 여러 스레드가 동시에 첫 호출을 해도 클라이언트는 하나만 만듭니다.
+_client_lock = threading.Lock()
+
+
+def is_supabase_configured() -> bool:
+    return bool(
+        os.getenv("SUPABASE_URL")
+        and (os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY"))
+    )
 
 
 def get_supabase_client() -> Client:
@@ -19,21 +30,36 @@ def get_supabase_client() -> Client:
         key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")
         if not url or not key:
             raise ValueError("SUPABASE_URL or SUPABASE key is missing.")
-        _supabase_client = create_client(url, key)
+        with _client_lock:
+            if _supabase_client is None:
+                from supabase import create_client
+
+                _supabase_client = create_client(url, key)
     return _supabase_client
 
 
 def get_chroma_client() -> chromadb.ClientAPI:
     global _chroma_client
     if _chroma_client is None:
-        persist_path = os.getenv(
-            "CHROMA_PERSIST_PATH",
-            str(Path(__file__).resolve().parent.parent / "data" / "chroma_db"),
-        )
-        Path(persist_path).mkdir(parents=True, exist_ok=True)
-        _chroma_client = chromadb.PersistentClient(
-            path=persist_path, settings=Settings(anonymized_telemetry=False)
-        )
+        with _client_lock:
+            if _chroma_client is None:
+                import chromadb
+                from chromadb.config import Settings
+
+                settings = Settings(anonymized_telemetry=False)
+                host = os.getenv("CHROMA_HOST")
+                if host:
+                    # 여러 워커/레플리카는 Chroma 서버 하나를 공유합니다. (PersistentClient는 멀티 프로세스 안전하지 않음)
+                    _chroma_client = chromadb.HttpClient(
+                        host=host, port=int(os.getenv("CHROMA_PORT", "8000")), settings=settings
+                    )
+                else:
+                    persist_path = os.getenv(
+                        "CHROMA_PERSIST_PATH",
+                        str(Path(__file__).resolve().parent.parent / "data" / "chroma_db"),
+                    )
+                    Path(persist_path).mkdir(parents=True, exist_ok=True)
+                    _chroma_client = chromadb.PersistentClient(path=persist_path, settings=settings)
     return _chroma_client
 
 
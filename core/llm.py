@@ -3,25 +3,63 @@ WildCard LLM 코어(팩토리)
 - Upstage Solar(Pro2) Chat 모델과 Upstage Embeddings를 로드하는 모듈
 
 필수 환경 변수:
-- UPSTAGE_API_KEY
+- UPSTAGE_API_KEY (LLM_BACKEND=fake이면 필요 없음)
 
 선택 환경 변수:
+- LLM_BACKEND (기본값: upstage, fake이면 네트워크 없이 동작하는 가짜 백엔드 사용, core/llm_fake.py 참고)
 - UPSTAGE_CHAT_MODEL (기본값: solar-pro2)
 - UPSTAGE_EMBEDDING_MODEL (기본값: solar-embedding-1-large)
+- UPSTAGE_SMALL_CHAT_MODEL (기본값: solar-mini, 보조 호출(ticker 해석/judge/퀴즈)에 쓰는 소형 모델)
+- LLM_ROUTE_<PURPOSE> (purpose별 라우팅 덮어쓰기, 예: LLM_ROUTE_N6_JUDGE="solar-pro2?temperature=0&max_tokens=512")
+- LLM_INFLIGHT_STALE_SECONDS (기본값: 300, 종료 콜백 없이 남은 호출을 집계에서 제외하는 시간)
+- LLM_CACHE_* (응답 디스크 캐시, core/llm_cache.py 참고)
+- LLM_HTTP_MAX_CONNECTIONS (기본값: 64, Upstage 호출 커넥션 풀 크기)
+- LLM_HTTP_MAX_KEEPALIVE (기본값: 32, 유지할 유휴 커넥션 수)
+- LLM_HTTP_KEEPALIVE_EXPIRY (기본값: 60, 초)
+- LLM_HTTP_CONNECT_TIMEOUT (기본값: 5, 초)
+- LLM_HTTP_READ_TIMEOUT (기본값: 120, 초)
+- LLM_HTTP_POOL_TIMEOUT (기본값: 10, 풀에서 커넥션을 기다리는 시간, 초)
+- LLM_HTTP2 (기본값: false, h2 패키지가 설치된 경우에만 적용)
+- LLM_RATE_* / LLM_MAX_CONCURRENCY (호출 rate limiter, core/llm_governor.py 참고)
+- LLM_USAGE_* / LLM_PRICE_* (호출별 토큰/지연/비용 집계, core/llm_usage.py 참고)
+- LLM_HEDGE_* (느린 호출 hedging, core/llm_hedge.py 참고)
 
 주의:
 - Kubernetes 배포 환경에서는 ConfigMap/Secret로 env가 주입되므로 .env 로드를 건너뜁니다.
 - 로컬 개발 환경에서는 .env.local (우선) 또는 .env를 자동으로 로드합니다.
+- Chat/Embedding 모델은 같은 httpx 커넥션 풀(sync/async 각 1개)을 공유합니다.
+  asyncio.to_thread 워커 스레드와 이벤트 루프에서 동시에 호출해도 keep-alive 커넥션을 재사용합니다.
+- 모든 Chat/Embedding 호출은 프로세스 전역 governor(RPS/TPM 버킷 + 우선순위 레인)를 거칩니다.
+  캐시 적중(core/llm_cache.py)은 governor를 거치지 않습니다.
+- LLM_BACKEND=fake에서는 모델명 앞에 "fake-"를 붙여 응답 캐시 키와 호출 기록이 실제 호출과 섞이지 않게 합니다.
+- Upstage 클라이언트와 모델(langchain_upstage)은 첫 호출 시 만듭니다. import만으로는 API 키를 검사하지 않습니다.
+  미리 만들어 두려면 warmup_llm_clients()를 호출합니다.
+- hedge가 설정된 purpose(기본: n8_analysis, n9_pattern)는 LLM_HEDGE_ENABLED=true일 때
+  느린 응답에 중복 요청을 보내 먼저 온 응답을 씁니다. (stream 호출은 제외)
 """
 
 from __future__ import annotations
 
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+from uuid import UUID
 
+import httpx
 from dotenv import load_dotenv
-from langchain_upstage import ChatUpstage, UpstageEmbeddings
+from langchain_core.callbacks import BaseCallbackHandler
+
+from core.llm_cache import LLMCacheRegistry
+from core.llm_fake import PURPOSE_HEADER, build_fake_transports
+from core.llm_governor import LLMGovernor
+from core.llm_hedge import HedgePolicy
+from core.llm_usage import LLMUsageRecorder
+
+if TYPE_CHECKING:
+    from langchain_upstage import ChatUpstage, UpstageEmbeddings
 
 
 def _load_env_if_local() -> None:
@@ -46,10 +84,202 @@ def _load_env_if_local() -> None:
         load_dotenv(override=False)
 
 
+class LLMInFlightTracker(BaseCallbackHandler):
+    """
+    진행 중인 Chat 모델 호출 수를 집계하는 콜백 (admission control 용)
+    - sync/async 호출 모두 시작/종료 콜백으로 run_id를 추적합니다.
+    - 취소 등으로 종료 콜백이 오지 않은 호출은 stale_seconds 이후 집계에서 제외합니다.
+    """
+
+    # 이벤트 루프에서 바로 실행 (executor로 넘기지 않음)
+    run_inline = True
+
+    def __init__(self, stale_seconds: float = 300.0) -> None:
+        self.stale_seconds = stale_seconds
+        self._runs: Dict[UUID, float] = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.failed = 0
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._runs[run_id] = time.monotonic()
+            self.started += 1
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            if self._runs.pop(run_id, None) is not None:
+                self.failed += 1
+
+    def in_flight(self) -> int:
+        cutoff = time.monotonic() - self.stale_seconds
+        with self._lock:
+            for run_id in [run_id for run_id, started in self._runs.items() if started < cutoff]:
+                del self._runs[run_id]
+            return len(self._runs)
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": self.in_flight(), "started": self.started, "failed": self.failed}
+
+
+# 모듈 전역 설정(캐시/governor 등)도 .env 값을 읽도록 클라이언트 생성보다 먼저 로드합니다.
+_load_env_if_local()
+
+_inflight_tracker = LLMInFlightTracker(
+    stale_seconds=float(os.getenv("LLM_INFLIGHT_STALE_SECONDS", "300"))
+)
+_llm_cache = LLMCacheRegistry()
+_governor = LLMGovernor()
+_hedging = HedgePolicy(saturated=_governor.saturated)
+
+
+def _append_usage_records(records: List[Dict[str, Any]]) -> None:
+    # metrics 패키지는 core.llm을 import하는 모듈이 있어 지연 import 합니다.
+    from metrics.storage import append_llm_calls_csv
+
+    append_llm_calls_csv(records)
+
+
+_usage = LLMUsageRecorder(sink=_append_usage_records)
+
+# ---- purpose별 모델 라우팅 ----
+# model: 모델명 ("default"=UPSTAGE_CHAT_MODEL, "small"=UPSTAGE_SMALL_CHAT_MODEL)
+# lane: governor 레인 (interactive/normal/low), cache: 응답 디스크 캐시 사용 여부
+# hedge: 최근 지연의 이 백분위를 넘으면 중복 요청을 보냄 (LLM_HEDGE_ENABLED=true일 때만, 분석 critical path)
+# 그 외 키(temperature, max_tokens 등)는 모델 기본 옵션이며, 호출부의 bind()가 우선합니다.
+_MODEL_ROUTES: Dict[str, Dict[str, Any]] = {
+    # 핵심 분석: 기본 모델
+    "n6_chart": {"model": "default"},
+    "n7_summary": {"model": "default"},
+    "n8_analysis": {"model": "default", "hedge": 0.95},
+    "n9_pattern": {"model": "default", "hedge": 0.95},
+    "n10_tutor": {"model": "default"},
+    # 보조 호출: 소형 모델
+    "n6_ticker": {"model": "small", "temperature": 0, "max_tokens": 32},
+    "n6_judge": {"model": "small", "temperature": 0, "lane": "low"},
+    "n8_judge": {"model": "small", "temperature": 0, "lane": "low"},
+    "metrics_eval": {"model": "small", "temperature": 0, "lane": "low"},
+    # 사용자 대화형 호출: 캐시하지 않음
+    "chat": {"model": "default", "lane": "interactive", "cache": False},
+    "n11_expert": {"model": "default", "lane": "interactive", "cache": False},
+    "quiz": {"model": "small", "lane": "interactive", "cache": False},
+}
+# purpose 없이 호출할 때 (스크립트 등)
+_DEFAULT_ROUTE: Dict[str, Any] = {"model": "default", "lane": "interactive", "cache": False}
+
+
+def _parse_route_value(value: str) -> Any:
+    lowered = value.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            continue
+    return value
+
+
+def resolve_route(purpose: Optional[str]) -> Dict[str, Any]:
+    """
+    purpose의 라우팅 설정(model/lane/cache/모델 옵션)을 반환합니다.
+    LLM_ROUTE_<PURPOSE> 환경 변수가 있으면 "모델명?키=값&..." 형식으로 덮어씁니다.
+    """
+    route = {"lane": "normal", "cache": True, "hedge": None, **_MODEL_ROUTES.get(purpose or "", _DEFAULT_ROUTE)}
+    override = os.getenv(f"LLM_ROUTE_{purpose.upper()}") if purpose else None
+    if override:
+        model, _, query = override.partition("?")
+        if model:
+            route["model"] = model
+        for key, value in parse_qsl(query):
+            route[key] = _parse_route_value(value)
+    return route
+
+
+def resolve_model_name(model: str) -> str:
+    """route의 model("default"/"small"/모델명)을 실제 모델명으로 바꿉니다. (클라이언트 없이 환경 변수만 사용)"""
+    if model == "default":
+        model = os.getenv("UPSTAGE_CHAT_MODEL", "solar-pro2")
+    elif model == "small":
+        model = os.getenv("UPSTAGE_SMALL_CHAT_MODEL", "solar-mini")
+    return f"fake-{model}" if os.getenv("LLM_BACKEND", "upstage").lower() == "fake" else model
+
+
+def _http2_enabled() -> bool:
+    if os.getenv("LLM_HTTP2", "false").lower() not in ("1", "true", "yes"):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        print("[WARNING] LLM_HTTP2 requires the 'h2' package; falling back to HTTP/1.1")
+        return False
+    return True
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _on_response(response: httpx.Response) -> None:
+    # openai 클라이언트 내부 재시도에서 받은 429도 여기서 모두 governor에 알립니다.
+    if response.status_code == 429:
+        _governor.report_throttled(_retry_after_seconds(response))
+
+
+async def _aon_response(response: httpx.Response) -> None:
+    _on_response(response)
+
+
+def build_http_clients(
+    transports: Optional[Tuple[httpx.BaseTransport, httpx.AsyncBaseTransport]] = None,
+) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    환경 변수 설정으로 Upstage 호출용 sync/async httpx 클라이언트를 만듭니다.
+    - transports: (sync, async) transport를 바꿔 끼울 때 지정 (가짜 백엔드)
+    """
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "64")),
+        max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "32")),
+        keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60")),
+    )
+    timeout = httpx.Timeout(
+        connect=float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "5")),
+        read=float(os.getenv("LLM_HTTP_READ_TIMEOUT", "120")),
+        write=float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "5")) * 2,
+        pool=float(os.getenv("LLM_HTTP_POOL_TIMEOUT", "10")),
+    )
+    http2 = _http2_enabled() if transports is None else False
+    transport, async_transport = transports or (None, None)
+    return (
+        httpx.Client(
+            limits=limits,
+            timeout=timeout,
+            http2=http2,
+            transport=transport,
+            event_hooks={"response": [_on_response]},
+        ),
+        httpx.AsyncClient(
+            limits=limits,
+            timeout=timeout,
+            http2=http2,
+            transport=async_transport,
+            event_hooks={"response": [_aon_response]},
+        ),
+    )
+
+
 class UpstageClient:
     """
     Upstage Solar Chat/Embedding 인스턴스를 캐시하는 경량 클라이언트
     - 모델 인스턴스 생성 비용/오버헤드를 줄이기 위해 최초 1회만 생성 후 캐시합니다.
+    - 인스턴스 생성은 lock으로 보호해 여러 스레드가 동시에 요청해도 한 번만 만듭니다.
     """
 
     _instance: Optional["UpstageClient"] = None
@@ -64,49 +294,103 @@ class UpstageClient:
         if getattr(self, "_initialized", False):
             return
 
-        _load_env_if_local()
-
-        self.api_key = os.getenv("UPSTAGE_API_KEY")
+        self.backend = os.getenv("LLM_BACKEND", "upstage").lower()
+        self.fake = self.backend == "fake"
+        self.api_key = os.getenv("UPSTAGE_API_KEY") or ("fake" if self.fake else None)
         if not self.api_key:
             raise ValueError("UPSTAGE_API_KEY 환경 변수가 필요합니다.")
 
-        self.chat_model_name = os.getenv("UPSTAGE_CHAT_MODEL", "solar-pro2")
         self.embedding_model_name = os.getenv(
             "UPSTAGE_EMBEDDING_MODEL", "solar-embedding-1-large"
         )
 
-        self._chat_instance: Optional[ChatUpstage] = None
+        # purpose(노드)별 인스턴스: 응답 캐시/governor 레인만 다르고 모델/콜백/커넥션 풀은 같습니다.
+        self._chat_instances: Dict[Optional[str], ChatUpstage] = {}
         self._embedding_instance: Optional[UpstageEmbeddings] = None
+        self.http_client, self.http_async_client = build_http_clients(
+            build_fake_transports() if self.fake else None
+        )
+        if self.fake:
+            print("[INFO] LLM_BACKEND=fake: Upstage calls are served by the offline fake backend.")
+        self._lock = threading.Lock()
         self._initialized = True
 
-    def get_chat_model(self) -> ChatUpstage:
-        if self._chat_instance is None:
-            self._chat_instance = ChatUpstage(
-                api_key=self.api_key,
-                model=self.chat_model_name,
-            )
-        return self._chat_instance
+    def get_chat_model(self, purpose: Optional[str] = None) -> ChatUpstage:
+        instance = self._chat_instances.get(purpose)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._chat_instances.get(purpose)
+            if instance is None:
+                options = resolve_route(purpose)
+                model = resolve_model_name(options.pop("model"))
+                lane = options.pop("lane")
+                hedge = options.pop("hedge")
+                cache = _llm_cache.for_node(purpose) if options.pop("cache") else None
+                from core.llm_models import GovernedChatUpstage
+
+                instance = GovernedChatUpstage(
+                    purpose=purpose,
+                    lane=lane,
+                    hedge=hedge,
+                    api_key=self.api_key,
+                    model=model,
+                    callbacks=[_inflight_tracker],
+                    # False: 전역 캐시(set_llm_cache)도 사용하지 않음
+                    cache=cache if cache is not None else False,
+                    http_client=self.http_client,
+                    http_async_client=self.http_async_client,
+                    # 가짜 백엔드가 purpose별 응답을 고를 수 있도록 전달 (실제 Upstage 호출에는 보내지 않음)
+                    default_headers={PURPOSE_HEADER: purpose} if self.fake and purpose else None,
+                    **options,
+                )
+                self._chat_instances[purpose] = instance
+        return instance
 
     def get_embedding_model(self) -> UpstageEmbeddings:
-        if self._embedding_instance is None:
-            self._embedding_instance = UpstageEmbeddings(
-                api_key=self.api_key,
-                model=self.embedding_model_name,
-            )
+        if self._embedding_instance is not None:
+            return self._embedding_instance
+        with self._lock:
+            if self._embedding_instance is None:
+                from core.llm_models import GovernedUpstageEmbeddings
+
+                self._embedding_instance = GovernedUpstageEmbeddings(
+                    api_key=self.api_key,
+                    model=resolve_model_name(self.embedding_model_name),
+                    http_client=self.http_client,
+                    http_async_client=self.http_async_client,
+                )
         return self._embedding_instance
 
+    async def aclose(self) -> None:
+        """공유 커넥션 풀을 닫습니다. (서버 종료 시)"""
+        self.http_client.close()
+        await self.http_async_client.aclose()
+
 
 # ---- 팩토리 함수 (프로젝트 전역에서 사용) ----
-_client = UpstageClient()
+# 클라이언트는 첫 모델 요청 시 만듭니다. (import만으로 API 키 검사/커넥션 풀 생성을 하지 않음)
+_client: Optional[UpstageClient] = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> UpstageClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = UpstageClient()
+    return _client
 
 
-def get_solar_chat() -> ChatUpstage:
+def get_solar_chat(purpose: Optional[str] = None) -> ChatUpstage:
     """
     Upstage Solar Chat 모델을 반환합니다.
+    - purpose: 호출 노드 이름(예: "n8_analysis"). _MODEL_ROUTES에 따라 모델/옵션/레인/응답 캐시가 정해집니다.
     사용처:
     - WildCard/N3/node.py 등 LLM 호출이 필요한 모든 노드
     """
-    return _client.get_chat_model()
+    return _get_client().get_chat_model(purpose)
 
 
 def get_upstage_embeddings() -> UpstageEmbeddings:
@@ -115,5 +399,105 @@ def get_upstage_embeddings() -> UpstageEmbeddings:
     사용처:
     - VectorDB 구축/검색 RAG 등
     """
-    return _client.get_embedding_model()
+    return _get_client().get_embedding_model()
 
+
+def get_llm_inflight_tracker() -> LLMInFlightTracker:
+    """
+    진행 중인 Solar Chat 호출 수 집계기를 반환합니다.
+    사용처:
+    - app/service/admission.py (부하 차단 기준)
+    """
+    return _inflight_tracker
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """
+    LLM 응답 캐시의 노드별 hit/miss 통계를 반환합니다.
+    사용처:
+    - app/api.py (/v1/llm/cache/stats)
+    """
+    return _llm_cache.stats()
+
+
+async def aclose_llm_http_clients() -> None:
+    """
+    Upstage 호출용 커넥션 풀을 닫습니다.
+    사용처:
+    - app/api.py (shutdown)
+    """
+    if _client is not None:
+        await _client.aclose()
+
+
+def get_llm_governor_stats() -> Dict[str, Any]:
+    """
+    Upstage 호출 rate limiter의 대기열 깊이/대기 시간/429 횟수를 반환합니다.
+    사용처:
+    - app/api.py (/v1/admission/status)
+    """
+    return _governor.stats()
+
+
+def report_llm_outcome(response: Any, outcome: str) -> None:
+    """
+    노드가 LLM 응답을 처리한 결과를 호출 기록에 반영합니다.
+    - outcome: "parse_fail" (JSON 파싱 실패) 또는 "fallback" (검증 실패 등으로 fallback 사용)
+    사용처:
+    - N6~N10 노드의 응답 파싱 단계
+    """
+    _usage.mark(getattr(response, "id", None), outcome)
+
+
+def get_llm_usage_stats() -> Dict[str, Any]:
+    """
+    노드별 LLM 호출 토큰/지연/비용 집계를 반환합니다.
+    사용처:
+    - app/api.py (/v1/metrics/llm)
+    """
+    return _usage.stats()
+
+
+def flush_llm_usage() -> None:
+    """
+    버퍼링된 LLM 호출 기록을 metrics store에 모두 기록합니다.
+    사용처:
+    - app/api.py (shutdown)
+    """
+    _usage.flush(force=True)
+
+
+def get_llm_routes() -> Dict[str, Any]:
+    """
+    purpose별 모델 라우팅 표(환경 변수 덮어쓰기 반영)를 반환합니다.
+    정적 설정만 읽으므로 Upstage 클라이언트를 만들지 않습니다. (UPSTAGE_API_KEY 없이도 조회 가능)
+    사용처:
+    - app/api.py (/v1/llm/routes)
+    """
+    table = {}
+    for purpose in _MODEL_ROUTES:
+        route = resolve_route(purpose)
+        table[purpose] = {**route, "model": resolve_model_name(route["model"])}
+    return table
+
+
+def get_llm_hedge_stats() -> Dict[str, Any]:
+    """
+    purpose별 hedge 요청 수/승률/예산 거절 수를 반환합니다.
+    사용처:
+    - app/api.py (/v1/metrics/llm)
+    """
+    return _hedging.stats()
+
+
+def warmup_llm_clients() -> None:
+    """
+    Upstage 클라이언트와 purpose별 Chat 모델, Embedding 모델을 미리 만듭니다.
+    (첫 요청에서 langchain_upstage import/모델 생성 지연을 없애려는 경우)
+    사용처:
+    - app/api.py (APP_WARMUP_ON_STARTUP=true일 때 startup)
+    """
+    client = _get_client()
+    for purpose in (None, *_MODEL_ROUTES):
+        client.get_chat_model(purpose)
+    client.get_embedding_model()
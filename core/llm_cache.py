@@ -0,0 +1,228 @@
+"""
+LLM 응답 디스크 캐시
+- 같은 거래를 다시 분석하거나 golden dataset을 재실행할 때 동일한 프롬프트의 Solar 호출을 건너뜁니다.
+- LangChain BaseCache 구현이므로 ChatUpstage(cache=...)로 연결되어 invoke/ainvoke 모두 적용됩니다.
+  (stream/astream 호출은 캐시하지 않습니다)
+- 키: LangChain llm_string(모델명 + bind()로 묶인 max_tokens 등 호출 파라미터) + 메시지 직렬화 값의 SHA-256
+- 노드(purpose)별로 캐시를 켜고 끌 수 있고, 노드별 hit/miss를 집계합니다.
+  대화형 호출(chat/quiz/n11_expert)과 purpose 없이 생성한 모델은 캐시하지 않습니다. (core/llm.py _MODEL_ROUTES)
+
+선택 환경 변수:
+- LLM_CACHE_ENABLED (기본값: true)
+- LLM_CACHE_PATH (기본값: ./data/llm_cache.sqlite3)
+- LLM_CACHE_TTL_SECONDS (기본값: 86400, 1일)
+- LLM_CACHE_MAX_ENTRIES (기본값: 5000, 초과 시 가장 오래 조회되지 않은 항목부터 제거)
+- LLM_CACHE_DISABLED_NODES (기본값: 없음, 쉼표 구분 purpose 목록. 예: n6_judge,n8_judge)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+
+class SQLiteLLMStore:
+    """
+    SQLite 파일 기반 LRU + TTL 저장소
+    - 값은 LangChain 직렬화(JSON) 후 zlib 압축해 저장합니다.
+    - 만료 항목과 max_entries 초과분은 쓰기 시 정리합니다.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    node TEXT,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    value BLOB NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT created_at, value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[0] > self.ttl_seconds:
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return zlib.decompress(row[1])
+
+    def put(self, key: str, node: str, value: bytes) -> None:
+        now = time.time()
+        blob = zlib.compress(value, 6)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO llm_cache (key, node, created_at, accessed_at, value) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    created_at = excluded.created_at,
+                    accessed_at = excluded.accessed_at,
+                    value = excluded.value
+                """,
+                (key, node, now, now, sqlite3.Binary(blob)),
+            )
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def clear(self, node: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            if node is None:
+                conn.execute("DELETE FROM llm_cache")
+            else:
+                conn.execute("DELETE FROM llm_cache WHERE node = ?", (node,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+class NodeLLMCache(BaseCache):
+    """
+    노드(purpose)별 캐시 뷰
+    - 저장소는 모든 노드가 공유하고, hit/miss 집계와 on/off만 노드별로 둡니다.
+    """
+
+    def __init__(self, store: SQLiteLLMStore, node: str) -> None:
+        self.store = store
+        self.node = node
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Any]]:
+        try:
+            raw = self.store.get(self.store.make_key(prompt, llm_string))
+            if raw is None:
+                self._count("misses")
+                return None
+            generations = loads(raw.decode("utf-8"))
+        except Exception as exc:
+            print(f"[WARNING] LLM cache lookup failed ({self.node}): {exc}")
+            self._count("errors")
+            return None
+        self._count("hits")
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        try:
+            raw = dumps(list(return_val)).encode("utf-8")
+            self.store.put(self.store.make_key(prompt, llm_string), self.node, raw)
+        except Exception as exc:
+            print(f"[WARNING] LLM cache update failed ({self.node}): {exc}")
+            self._count("errors")
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear(node=self.node)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+class LLMCacheRegistry:
+    """purpose별 NodeLLMCache를 만들고 설정(on/off)을 관리합니다."""
+
+    def __init__(self) -> None:
+        self.enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.disabled_nodes = {
+            node.strip() for node in os.getenv("LLM_CACHE_DISABLED_NODES", "").split(",") if node.strip()
+        }
+        self._store: Optional[SQLiteLLMStore] = None
+        self._caches: Dict[str, NodeLLMCache] = {}
+        self._lock = threading.Lock()
+
+    def _get_store(self) -> SQLiteLLMStore:
+        if self._store is None:
+            path = os.getenv(
+                "LLM_CACHE_PATH",
+                str(Path(__file__).resolve().parent.parent / "data" / "llm_cache.sqlite3"),
+            )
+            self._store = SQLiteLLMStore(
+                path=path,
+                ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 60 * 60))),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+            )
+        return self._store
+
+    def is_enabled(self, node: Optional[str]) -> bool:
+        return self.enabled and bool(node) and node not in self.disabled_nodes
+
+    def for_node(self, node: Optional[str]) -> Optional[NodeLLMCache]:
+        """캐시를 쓰지 않는 purpose면 None을 반환합니다."""
+        if not self.is_enabled(node):
+            return None
+        with self._lock:
+            cache = self._caches.get(node)
+            if cache is None:
+                try:
+                    cache = NodeLLMCache(self._get_store(), node)
+                except Exception as exc:
+                    print(f"[WARNING] LLM cache unavailable: {exc}")
+                    return None
+                self._caches[node] = cache
+            return cache
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "disabled_nodes": sorted(self.disabled_nodes),
+            "nodes": {node: cache.stats() for node, cache in self._caches.items()},
+        }
+        if self._store is not None:
+            result["store"] = self._store.stats()
+        return result
@@ -0,0 +1,620 @@
+"""
+오프라인 가짜 Upstage 백엔드 (부하 테스트/벤치마크용)
+- LLM_BACKEND=fake이면 core/llm.py가 Upstage 대신 이 모듈의 httpx transport로 요청을 보냅니다.
+  HTTP 계층에서 바꿔 끼우므로 governor/응답 캐시/사용량 기록/hedging/스트리밍 경로는 실제와 똑같이 동작합니다.
+- /chat/completions: 요청 헤더의 purpose(X-WildCard-Purpose)별로 각 노드의 스키마 검증을 통과하는 JSON/텍스트를 돌려줍니다.
+  (N6 ticker/chart/judge, N7 요약, N8 분석/judge, N9, N10, N11, 퀴즈, 메트릭 평가, 일반 채팅)
+  값 일부는 프롬프트 해시로 정해지므로 같은 입력에는 항상 같은 응답을 돌려줍니다.
+- /embeddings: 단어/글자 3-gram feature hashing으로 만든 결정적 벡터 (비슷한 문장은 코사인 유사도가 높음)
+- 지연: 로그정규 분포(중앙값, sigma) + 일정 확률의 꼬리 지연. 스트리밍은 첫 토큰까지 20%, 나머지는 조각별로 나눠 기다립니다.
+
+선택 환경 변수:
+- LLM_FAKE_LATENCY_MS (기본값: 400, 지연 중앙값)
+- LLM_FAKE_LATENCY_SIGMA (기본값: 0.5, 로그정규 sigma, 0이면 고정 지연)
+- LLM_FAKE_LATENCY_<PURPOSE> (purpose별 "중앙값ms[,sigma]", 예: LLM_FAKE_LATENCY_N8_ANALYSIS="2500,0.6")
+- LLM_FAKE_TAIL_RATE (기본값: 0, 꼬리 지연 확률)
+- LLM_FAKE_TAIL_MULTIPLIER (기본값: 10, 꼬리 지연 배수)
+- LLM_FAKE_EMBEDDING_LATENCY_MS (기본값: 50)
+- LLM_FAKE_EMBEDDING_DIM (기본값: 4096, solar-embedding-1-large와 같은 차원)
+- LLM_FAKE_SEED (기본값: 없음, 지정하면 지연 난수열도 재현 가능)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import struct
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+PURPOSE_HEADER = "X-WildCard-Purpose"
+
+_STREAM_CHUNK_CHARS = 24
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# ---- 지연 ----
+class FakeLatency:
+    def __init__(self) -> None:
+        self.median_ms = float(os.getenv("LLM_FAKE_LATENCY_MS", "400"))
+        self.sigma = float(os.getenv("LLM_FAKE_LATENCY_SIGMA", "0.5"))
+        self.tail_rate = float(os.getenv("LLM_FAKE_TAIL_RATE", "0"))
+        self.tail_multiplier = float(os.getenv("LLM_FAKE_TAIL_MULTIPLIER", "10"))
+        self.embedding_ms = float(os.getenv("LLM_FAKE_EMBEDDING_LATENCY_MS", "50"))
+        seed = os.getenv("LLM_FAKE_SEED")
+        self._rng = random.Random(int(seed)) if seed else random.Random()
+        self._overrides: Dict[str, Tuple[float, float]] = {}
+
+    def _distribution(self, purpose: Optional[str]) -> Tuple[float, float]:
+        if not purpose:
+            return self.median_ms, self.sigma
+        if purpose not in self._overrides:
+            median, sigma = self.median_ms, self.sigma
+            raw = os.getenv(f"LLM_FAKE_LATENCY_{purpose.upper()}")
+            if raw:
+                parts = [part.strip() for part in raw.split(",")]
+                median = float(parts[0])
+                if len(parts) > 1 and parts[1]:
+                    sigma = float(parts[1])
+            self._overrides[purpose] = (median, sigma)
+        return self._overrides[purpose]
+
+    def sample(self, purpose: Optional[str]) -> float:
+        """이번 요청의 지연(초)"""
+        median, sigma = self._distribution(purpose)
+        latency = median * math.exp(self._rng.gauss(0, sigma)) if sigma > 0 else median
+        if self.tail_rate > 0 and self._rng.random() < self.tail_rate:
+            latency *= self.tail_multiplier
+        return latency / 1000
+
+
+# ---- 결정적 임베딩 ----
+def fake_embedding(text: str, dim: int) -> List[float]:
+    """
+    단어와 단어 안의 글자 3-gram을 feature hashing한 L2 정규화 벡터
+    (한국어 조사가 붙어도 3-gram이 겹쳐 비슷한 벡터가 됩니다)
+    """
+    vector = [0.0] * dim
+    features: List[str] = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        features.append(f"w:{token}")
+        padded = f"<{token}>"
+        features.extend(f"g:{padded[i:i + 3]}" for i in range(max(1, len(padded) - 2)))
+    if not features:
+        features = [f"raw:{text}"]
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        vector[digest % dim] += 1.0 if (digest >> 63) & 1 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+# ---- purpose별 응답 ----
+def _seeded(prompt: str) -> random.Random:
+    return random.Random(int.from_bytes(hashlib.sha256(prompt.encode("utf-8")).digest()[:8], "big"))
+
+
+def _find(pattern: str, prompt: str, default: str) -> str:
+    match = re.search(pattern, prompt)
+    return match.group(1).strip() if match else default
+
+
+def _ticker_in(prompt: str) -> str:
+    return _find(r"['\"]?ticker['\"]?\s*[:=]\s*['\"]?([^'\",\n}]+)", prompt, "TICKER")
+
+
+_TICKERS = {
+    "삼성전자": "005930.KS",
+    "sk하이닉스": "000660.KS",
+    "네이버": "035420.KS",
+    "카카오": "035720.KS",
+    "현대차": "005380.KS",
+    "애플": "AAPL",
+    "테슬라": "TSLA",
+    "엔비디아": "NVDA",
+    "마이크로소프트": "MSFT",
+}
+
+
+def _n6_ticker(prompt: str, rng: random.Random) -> str:
+    name = _find(r"Company name:\s*(.+)", prompt, "").lower().replace(" ", "")
+    return _TICKERS.get(name, "AAPL")
+
+
+def _n6_chart(prompt: str, rng: random.Random) -> str:
+    return (
+        "분석 기간 동안 주가는 변동성이 확대된 가운데 하락 흐름을 보였습니다. "
+        "RSI는 중립 구간에서 점차 낮아졌고 MACD는 시그널선 아래에 머물렀습니다. "
+        "볼린저밴드 하단 부근에서 거래량이 늘어난 점이 눈에 띕니다."
+    )
+
+
+def _n6_judge(prompt: str, rng: random.Random) -> str:
+    return json.dumps(
+        {
+            "consistency": round(rng.uniform(0.8, 1.0), 2),
+            "indicator_coverage": round(rng.uniform(0.8, 1.0), 2),
+            "trend_consistency": round(rng.uniform(0.8, 1.0), 2),
+            "advice_free": 1,
+            "clarity": round(rng.uniform(0.7, 1.0), 2),
+            "notes": "fake judge",
+        }
+    )
+
+
+def _n7_summary(prompt: str, rng: random.Random) -> str:
+    try:
+        news_items = json.loads(_find(r"news_items:\s*(\[.*?\])\s*\n", prompt, "[]"))
+    except json.JSONDecodeError:
+        news_items = []
+    summaries = [
+        {
+            "title": str(item.get("title", "")),
+            "source": str(item.get("source", "")),
+            "date": str(item.get("date", "")),
+            "link": str(item.get("link", "")),
+            "summary": f"{item.get('title', '해당 기사')}에 관한 보도입니다. 기사에 나온 사실 관계만 간단히 정리했습니다.",
+        }
+        for item in news_items[:3]
+        if isinstance(item, dict)
+    ]
+    index = rng.randint(20, 80)
+    return json.dumps(
+        {
+            "summary": "분석 기간 동안 실적 전망과 업황 관련 뉴스가 주가에 영향을 준 것으로 보입니다.",
+            "market_sentiment": {
+                "index": index,
+                "label": "fear" if index < 40 else "greed" if index > 60 else "neutral",
+                "description": "관련 뉴스의 논조를 종합한 시장 심리입니다.",
+            },
+            "fact_check": {
+                "user_belief": _find(r"user_reason:\s*(.+)", prompt, ""),
+                "actual_fact": "뉴스에서는 기대와 다른 실적 전망이 확인됩니다.",
+                "verdict": rng.choice(["mismatch", "match", "biased"]),
+            },
+            "news_summaries": summaries,
+        },
+        ensure_ascii=False,
+    )
+
+
+def _n8_analysis(prompt: str, rng: random.Random) -> str:
+    internal = rng.choice([40, 50, 60, 70])
+    causes = [
+        {
+            "id": "RC001",
+            "category": "internal",
+            "subcategory": "judgment_error",
+            "title": "기대감에 의존한 진입",
+            "description": "실적 발표를 앞두고 기대감만으로 진입해 전망 하향에 그대로 노출되었습니다.",
+            "impact_score": rng.randint(6, 9),
+            "impact_level": "high",
+            "evidence": [
+                {"source": "n6", "type": "indicator", "data_point": "RSI 과매수 구간", "interpretation": "단기 과열 상태에서 진입"},
+                {"source": "user_input", "type": "user_decision", "data_point": "매수 근거", "interpretation": "근거가 기대감 위주"},
+            ],
+            "timeline_relevance": "before_buy",
+        },
+        {
+            "id": "RC002",
+            "category": "external",
+            "subcategory": "company_news",
+            "title": "실적 가이던스 하향",
+            "description": "보유 기간 중 발표된 가이던스 하향이 주가 하락으로 이어졌습니다.",
+            "impact_score": rng.randint(5, 8),
+            "impact_level": "medium",
+            "evidence": [
+                {"source": "n7", "type": "news", "data_point": "가이던스 하향 보도", "interpretation": "실적 기대 훼손"},
+            ],
+            "timeline_relevance": "during_hold",
+        },
+        {
+            "id": "RC003",
+            "category": "internal",
+            "subcategory": "risk_management",
+            "title": "손절 기준 부재",
+            "description": "사전에 정한 손절 기준이 없어 손실 구간에서 대응이 늦어졌습니다.",
+            "impact_score": rng.randint(4, 7),
+            "impact_level": "medium",
+            "evidence": [
+                {"source": "n6", "type": "price", "data_point": "보유 기간 하락 폭", "interpretation": "하락 추세가 이어짐"},
+            ],
+            "timeline_relevance": "throughout",
+        },
+    ]
+    return json.dumps(
+        {
+            "n8_loss_cause_analysis": {
+                "loss_check": f"{_ticker_in(prompt)} 보유 기간 동안 손실이 발생했습니다.",
+                "loss_amount_pct": f"-{rng.uniform(3, 25):.1f}%",
+                "one_line_summary": "기대감에 의존한 진입과 가이던스 하향이 겹친 손실입니다.",
+                "root_causes": causes,
+                "cause_breakdown": {"internal_ratio": internal, "external_ratio": 100 - internal},
+                "detailed_explanation": "진입 시점의 판단 근거가 약했고, 보유 중 나온 악재에 대응할 기준이 없었습니다.",
+                "confidence_level": "medium",
+            },
+            "n8_market_context_analysis": {
+                "news_at_loss_time": ["실적 가이던스 하향 보도"],
+                "market_situation_analysis": "업종 전반의 투자 심리가 위축된 구간이었습니다.",
+                "related_news": ["업황 둔화 우려", "환율 변동성 확대"],
+            },
+            "n9_input": {
+                "investment_reason": _find(r"['\"]user_decision_basis['\"]\s*:\s*['\"]([^'\"]*)", prompt, ""),
+                "loss_cause_summary": "기대감 위주의 진입과 손절 기준 부재",
+                "loss_cause_details": [cause["title"] for cause in causes],
+                "objective_signals": {
+                    "price_trend": "down",
+                    "volatility_level": "high",
+                    "technical_indicators": [
+                        {"name": "RSI", "value": str(rng.randint(25, 75)), "interpretation": "중립 구간"},
+                    ],
+                    "news_facts": ["실적 가이던스 하향"],
+                },
+                "uncertainty_level": "medium",
+            },
+        },
+        ensure_ascii=False,
+    )
+
+
+def _n8_judge(prompt: str, rng: random.Random) -> str:
+    return str(rng.randint(85, 99))
+
+
+_PROFILE_KEYS = (
+    "information_sensitivity",
+    "analysis_depth",
+    "risk_management",
+    "decisiveness",
+    "emotional_control",
+    "learning_adaptability",
+)
+
+
+def _n9_pattern(prompt: str, rng: random.Random) -> str:
+    return json.dumps(
+        {
+            "learning_pattern_analysis": {
+                "investor_character": {
+                    "type": "확신형 탐험가",
+                    "description": "새로운 정보에 빠르게 반응하지만 반대 근거를 확인하는 데는 시간을 덜 씁니다.",
+                    "behavioral_bias": "confirmation_bias",
+                },
+                "profile_metrics": {
+                    key: {"score": rng.randint(30, 90), "label": "보통", "bias_detected": None}
+                    for key in _PROFILE_KEYS
+                },
+                "cognitive_analysis": {
+                    "primary_bias": {
+                        "name": "확증 편향",
+                        "english": "Confirmation Bias",
+                        "description": "믿고 싶은 정보 위주로 판단 근거를 모았습니다.",
+                        "impact": "악재 신호를 늦게 인식했습니다.",
+                    },
+                    "secondary_biases": [
+                        {"name": "손실 회피", "english": "Loss Aversion", "description": "손실 확정을 미루는 경향"},
+                    ],
+                },
+                "decision_problems": [
+                    {
+                        "problem_type": "근거 검증 부족",
+                        "psychological_trigger": "기대감",
+                        "situation": "실적 발표 직전 진입",
+                        "thought_pattern": "이번에는 좋을 것이라는 확신",
+                        "consequence": "전망 하향에 그대로 노출",
+                        "frequency": "medium",
+                    }
+                ],
+                "uncertainty_level": "medium",
+            }
+        },
+        ensure_ascii=False,
+    )
+
+
+def _n10_tutor(prompt: str, rng: random.Random) -> str:
+    missions = [
+        {
+            "mission_id": f"M{index}",
+            "priority": index,
+            "title": title,
+            "description": description,
+            "behavioral_target": "확증 편향 완화",
+            "expected_outcome": "판단 근거의 균형 회복",
+            "difficulty": "easy",
+            "estimated_impact": "medium",
+            "if_then_plan": {
+                "trigger_situation": "매수 버튼을 누르기 직전",
+                "trigger_emotion": "확신이 들 때",
+                "then_action": "리스크 요인 1개를 먼저 기록한다",
+                "commitment_phrase": "확신이 들 때일수록 리스크 1개를 먼저 적는다",
+            },
+        }
+        for index, (title, description) in enumerate(
+            [
+                ("반대 의견 1개 찾기", "관심 종목의 부정적 의견을 하나만 찾아 기록합니다."),
+                ("매매 일지 쓰기", "진입 이유와 손절 기준을 한 줄씩 적습니다."),
+            ],
+            start=1,
+        )
+    ]
+    return json.dumps(
+        {
+            "learning_tutor": {
+                "custom_learning_path": {
+                    "path_summary": "판단 근거를 검증하는 습관부터 시작하는 학습 경로입니다.",
+                    "learning_materials": ["확증 편향 기초", "실적 발표 읽는 법"],
+                    "practice_steps": ["반대 근거 1개 기록", "손절 기준 사전 설정"],
+                    "recommended_topics": ["행동재무학", "리스크 관리"],
+                },
+                "investment_advisor": {
+                    "advisor_message": "이번 경험은 판단 근거를 점검하는 좋은 계기가 될 수 있습니다.",
+                    "recommended_questions": ["손절 기준은 어떻게 정하나요?", "가이던스는 어떻게 읽나요?"],
+                },
+                "learning_frame": {
+                    "loss_reframe": {
+                        "original": "손실을 봤다",
+                        "reframed": "판단 과정을 점검할 데이터를 얻었다",
+                        "learning_value": "다음 결정의 기준이 생겼습니다.",
+                    },
+                    "mistake_reframe": {
+                        "original": "성급하게 들어갔다",
+                        "reframed": "정보에 빠르게 반응했다",
+                        "strength_focus": "빠른 정보 반응력",
+                    },
+                    "progress_frame": {
+                        "message": "기록을 시작한 것만으로도 한 걸음 나아갔습니다.",
+                        "comparison_anchor": "지난 거래 대비",
+                    },
+                },
+                "action_missions": missions,
+                "uncertainty_level": "medium",
+            }
+        },
+        ensure_ascii=False,
+    )
+
+
+def _n11_expert(prompt: str, rng: random.Random) -> str:
+    return json.dumps(
+        {
+            "summary": "분석 결과를 보면 손실은 진입 근거와 보유 중 악재가 겹친 결과로 보입니다.",
+            "detail": "기술적 지표는 진입 시점의 과열을 보여 주었고, 뉴스에서는 실적 전망 하향이 확인됩니다. "
+            "판단 근거를 사전에 기록해 두면 비슷한 상황을 점검하는 데 도움이 됩니다.",
+        },
+        ensure_ascii=False,
+    )
+
+
+def _quiz(prompt: str, rng: random.Random) -> str:
+    def _options(reflection: bool) -> List[Dict[str, str]]:
+        options = []
+        for label in ("A", "B", "C", "D"):
+            option = {"text": f"선택지 {label}"}
+            if reflection:
+                option["solution"] = f"{label}를 고른 경우, 판단 기준을 한 번 더 적어 보는 연습이 도움이 됩니다."
+            options.append(option)
+        return options
+
+    return json.dumps(
+        {
+            "quiz_set": {
+                "quiz_purpose": "판단 근거를 점검하는 습관 만들기",
+                "quizzes": [
+                    {
+                        "quiz_id": "Q1",
+                        "quiz_type": "multiple_choice",
+                        "question": "확증 편향을 줄이는 데 가장 도움이 되는 습관은?",
+                        "options": _options(False),
+                        "has_fixed_answer": True,
+                        "correct_answer_index": 0,
+                    },
+                    {
+                        "quiz_id": "Q2",
+                        "quiz_type": "multiple_choice",
+                        "question": "가이던스 하향 발표가 의미하는 것은?",
+                        "options": _options(False),
+                        "has_fixed_answer": True,
+                        "correct_answer_index": 1,
+                    },
+                    {
+                        "quiz_id": "Q3",
+                        "quiz_type": "reflection",
+                        "question": "확신이 강하게 들 때 나는 주로 어떻게 행동하나요?",
+                        "options": _options(True),
+                        "has_fixed_answer": False,
+                    },
+                ],
+            }
+        },
+        ensure_ascii=False,
+    )
+
+
+def _metrics_eval(prompt: str, rng: random.Random) -> str:
+    if "Signal" in prompt:
+        return f"판정: {rng.choice(['Signal', 'Signal', 'Noise'])}\n근거: 실적 관련 보도"
+    if "1-5" in prompt:
+        return str(rng.randint(3, 5))
+    if "0-100" in prompt:
+        return str(rng.randint(80, 99))
+    return f"{rng.uniform(0.6, 0.95):.2f}"
+
+
+def _chat(prompt: str, rng: random.Random) -> str:
+    return "분석 결과를 기준으로 보면 진입 근거를 점검해 보는 것이 도움이 됩니다. 궁금한 지표가 있으면 더 자세히 설명해 드릴게요."
+
+
+_RESPONDERS: Dict[str, Callable[[str, random.Random], str]] = {
+    "n6_ticker": _n6_ticker,
+    "n6_chart": _n6_chart,
+    "n6_judge": _n6_judge,
+    "n7_summary": _n7_summary,
+    "n8_analysis": _n8_analysis,
+    "n8_judge": _n8_judge,
+    "n9_pattern": _n9_pattern,
+    "n10_tutor": _n10_tutor,
+    "n11_expert": _n11_expert,
+    "quiz": _quiz,
+    "metrics_eval": _metrics_eval,
+    "chat": _chat,
+}
+
+
+def fake_completion(purpose: Optional[str], prompt: str) -> str:
+    """purpose에 맞는 가짜 응답 본문 (모르는 purpose는 일반 채팅 응답)"""
+    return _RESPONDERS.get(purpose or "", _chat)(prompt, _seeded(prompt))
+
+
+# ---- OpenAI 호환 응답 ----
+def _prompt_text(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(str(message.get("content", "")) for message in messages)
+
+
+def _usage(prompt: str, completion: str) -> Dict[str, int]:
+    # llm_governor.estimate_tokens와 같은 2글자당 1토큰 근사
+    prompt_tokens = max(1, len(prompt) // 2)
+    completion_tokens = max(1, len(completion) // 2)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _completion_body(model: str, content: str, usage: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "id": f"fake-{time.time_ns()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+        ],
+        "usage": usage,
+    }
+
+
+def _stream_events(model: str, content: str, usage: Dict[str, int]) -> List[bytes]:
+    completion_id = f"fake-{time.time_ns()}"
+    events = []
+    pieces = [content[i:i + _STREAM_CHUNK_CHARS] for i in range(0, len(content), _STREAM_CHUNK_CHARS)] or [""]
+    for index, piece in enumerate(pieces):
+        delta: Dict[str, Any] = {"content": piece}
+        if index == 0:
+            delta["role"] = "assistant"
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+        }
+        events.append(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+    final = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        "usage": usage,
+    }
+    events.append(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+    events.append(b"data: [DONE]\n\n")
+    return events
+
+
+def _encode_embedding(vector: List[float], encoding_format: Optional[str]) -> Any:
+    if encoding_format == "base64":
+        return base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+    return vector
+
+
+class FakeUpstageBackend:
+    """요청을 받아 (지연 초, httpx.Response 생성 함수)를 만드는 가짜 Upstage API"""
+
+    def __init__(self) -> None:
+        self.latency = FakeLatency()
+        self.embedding_dim = int(os.getenv("LLM_FAKE_EMBEDDING_DIM", "4096"))
+
+    def _chat(self, request: httpx.Request, body: Dict[str, Any]) -> Tuple[float, Any, Optional[List[bytes]]]:
+        purpose = request.headers.get(PURPOSE_HEADER) or None
+        prompt = _prompt_text(body.get("messages") or [])
+        content = fake_completion(purpose, prompt)
+        usage = _usage(prompt, content)
+        latency = self.latency.sample(purpose)
+        model = body.get("model", "fake")
+        if body.get("stream"):
+            return latency, None, _stream_events(model, content, usage)
+        return latency, _completion_body(model, content, usage), None
+
+    def _embeddings(self, body: Dict[str, Any]) -> Tuple[float, Any, None]:
+        inputs = body.get("input")
+        texts = [inputs] if isinstance(inputs, str) else list(inputs or [])
+        encoding_format = body.get("encoding_format")
+        payload = {
+            "object": "list",
+            "data": [
+                {
+                    "object": "embedding",
+                    "index": index,
+                    "embedding": _encode_embedding(fake_embedding(text, self.embedding_dim), encoding_format),
+                }
+                for index, text in enumerate(texts)
+            ],
+            "model": body.get("model", "fake-embedding"),
+            "usage": {"prompt_tokens": sum(len(text) for text in texts) // 2, "total_tokens": sum(len(text) for text in texts) // 2},
+        }
+        return self.latency.embedding_ms / 1000, payload, None
+
+    def plan(self, request: httpx.Request) -> Tuple[float, Any, Optional[List[bytes]]]:
+        """(지연 초, JSON 본문, 스트리밍 이벤트 목록) - 둘 중 하나는 None"""
+        body = json.loads(request.content or b"{}")
+        path = request.url.path
+        if path.endswith("/chat/completions"):
+            return self._chat(request, body)
+        if path.endswith("/embeddings"):
+            return self._embeddings(body)
+        return 0.0, {"error": {"message": f"fake backend does not serve {path}"}}, None
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        latency, payload, events = self.plan(request)
+        if events is None:
+            time.sleep(latency)
+            return httpx.Response(200 if "error" not in payload else 404, json=payload)
+
+        def _stream() -> Iterator[bytes]:
+            time.sleep(latency * 0.2)
+            for event in events:
+                time.sleep(latency * 0.8 / len(events))
+                yield event
+
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=_stream())
+
+    async def ahandle(self, request: httpx.Request) -> httpx.Response:
+        latency, payload, events = self.plan(request)
+        if events is None:
+            await asyncio.sleep(latency)
+            return httpx.Response(200 if "error" not in payload else 404, json=payload)
+
+        async def _stream() -> AsyncIterator[bytes]:
+            await asyncio.sleep(latency * 0.2)
+            for event in events:
+                await asyncio.sleep(latency * 0.8 / len(events))
+                yield event
+
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=_stream())
+
+
+def build_fake_transports() -> Tuple[httpx.MockTransport, httpx.MockTransport]:
+    """core/llm.py build_http_clients에 넘길 sync/async transport"""
+    backend = FakeUpstageBackend()
+    return httpx.MockTransport(backend.handle), httpx.MockTransport(backend.ahandle)
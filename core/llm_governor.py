@@ -0,0 +1,288 @@
+"""
+Upstage 호출 rate limiter / 동시 실행 governor
+- 프로세스 안의 모든 Solar Chat/Embedding 호출이 같은 Upstage quota를 나눠 쓰도록 조정합니다.
+- 초당 요청 수(RPS)와 분당 토큰 수(TPM) 버킷을 따로 두고, 둘 다 여유가 있을 때만 호출을 내보냅니다.
+  토큰은 호출 전에 추정치(프롬프트 길이 + max_tokens)로 예약하고, 응답의 usage로 정산합니다.
+- 우선순위 레인: interactive(채팅/퀴즈) > normal(분석 노드) > low(judge 평가)
+  대기열의 맨 앞(가장 높은 우선순위, 먼저 온 순서)만 버킷에서 꺼낼 수 있습니다.
+- 429 응답을 받으면 허용 속도를 절반으로 줄이고 Retry-After(없으면 지수 백오프) 동안 모든 호출을 멈춥니다.
+  이후 성공할 때마다 조금씩 원래 속도로 회복합니다.
+- sync 호출(asyncio.to_thread 워커 스레드)과 async 호출(이벤트 루프)을 같은 상태로 조정합니다.
+- 버킷은 프로세스마다 따로 있으므로, 여러 uvicorn 워커가 같은 quota를 쓸 때는 아래 한도(RPS/버스트/TPM/동시 실행)를
+  LLM_RATE_WORKER_COUNT로 나눈 값을 각 워커의 한도로 씁니다. (app/server.py가 UVICORN_WORKERS로 설정)
+
+선택 환경 변수:
+- LLM_RATE_LIMIT_ENABLED (기본값: true)
+- LLM_RATE_RPS (기본값: 10, 초당 요청 수, 전체 워커 합계)
+- LLM_RATE_BURST (기본값: 20, RPS 버킷 크기, 전체 워커 합계)
+- LLM_RATE_TPM (기본값: 300000, 분당 토큰 수, 전체 워커 합계)
+- LLM_MAX_CONCURRENCY (기본값: 16, 동시에 진행하는 호출 수, 전체 워커 합계)
+- LLM_RATE_WORKER_COUNT (기본값: 1, 위 한도를 나눠 쓰는 프로세스 수)
+- LLM_RATE_MAX_WAIT_SECONDS (기본값: 60, 이 시간 안에 차례가 오지 않으면 LLMRateLimitTimeout)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+LANES = ("interactive", "normal", "low")
+
+_MIN_RATE_SCALE = 0.1
+_RECOVERY_STEP = 0.05
+_MAX_BACKOFF_SECONDS = 30.0
+# 대기 중 재확인 간격 (async 대기자는 notify를 받지 못하므로 이 간격으로 폴링)
+_POLL_SECONDS = 0.05
+
+
+class LLMRateLimitTimeout(Exception):
+    """LLM_RATE_MAX_WAIT_SECONDS 안에 호출 차례를 얻지 못했을 때 발생합니다."""
+
+
+def estimate_tokens(text_chars: int, max_tokens: Optional[int] = None) -> int:
+    """
+    프롬프트 글자 수로 토큰 수를 대략 추정합니다. (한국어 비중이 높아 2글자당 1토큰으로 계산)
+    응답 토큰은 max_tokens, 없으면 1024로 예약합니다.
+    """
+    return text_chars // 2 + (max_tokens or 1024)
+
+
+class _Slot:
+    """호출 1건의 예약 정보 (응답 후 실제 토큰 수로 정산)"""
+
+    def __init__(self, lane: str, reserved_tokens: int, waited: float) -> None:
+        self.lane = lane
+        self.reserved_tokens = reserved_tokens
+        self.waited = waited
+        self.actual_tokens: Optional[int] = None
+
+    def settle(self, total_tokens: Optional[int]) -> None:
+        if total_tokens:
+            self.actual_tokens = int(total_tokens)
+
+
+class LLMGovernor:
+    def __init__(
+        self,
+        rps: Optional[float] = None,
+        burst: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_wait_seconds: Optional[float] = None,
+        worker_count: Optional[int] = None,
+    ) -> None:
+        self.enabled = os.getenv("LLM_RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+        # 한도는 전체 워커 합계로 받아 이 프로세스의 몫으로 나눕니다.
+        self.worker_count = max(1, worker_count or int(os.getenv("LLM_RATE_WORKER_COUNT", "1")))
+        self.rps = (rps or float(os.getenv("LLM_RATE_RPS", "10"))) / self.worker_count
+        self.burst = max(1.0, (burst or float(os.getenv("LLM_RATE_BURST", "20"))) / self.worker_count)
+        self.tpm = (tpm or float(os.getenv("LLM_RATE_TPM", "300000"))) / self.worker_count
+        self.max_concurrency = max(
+            1, (max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "16"))) // self.worker_count
+        )
+        self.max_wait_seconds = max_wait_seconds or float(os.getenv("LLM_RATE_MAX_WAIT_SECONDS", "60"))
+
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._request_tokens = self.burst
+        self._minute_tokens = self.tpm
+        self._refilled_at = time.monotonic()
+        self._running = 0
+        self._scale = 1.0
+        self._paused_until = 0.0
+        self._backoff = 1.0
+
+        self._acquired = {lane: 0 for lane in LANES}
+        self._waiting = {lane: 0 for lane in LANES}
+        self._wait_total = {lane: 0.0 for lane in LANES}
+        self._wait_max = {lane: 0.0 for lane in LANES}
+        self._timeouts = 0
+        self._throttled = 0
+
+    # ---- 버킷 ----
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._request_tokens = min(self.burst, self._request_tokens + elapsed * self.rps * self._scale)
+        self._minute_tokens = min(self.tpm, self._minute_tokens + elapsed * self.tpm * self._scale / 60)
+
+    def _try_take(self, ticket: Tuple[int, int], tokens: int, now: float) -> float:
+        """차례가 되어 버킷에서 꺼냈으면 0, 아니면 다시 확인할 때까지 기다릴 시간(초)"""
+        if self._queue[0] != ticket or self._running >= self.max_concurrency:
+            return _POLL_SECONDS
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        self._refill(now)
+        # TPM보다 큰 단일 호출도 통과할 수 있도록 버킷 크기로 자릅니다.
+        tokens = min(tokens, self.tpm)
+        wait = 0.0
+        if self._request_tokens < 1:
+            wait = max(wait, (1 - self._request_tokens) / (self.rps * self._scale))
+        if self._minute_tokens < tokens:
+            wait = max(wait, (tokens - self._minute_tokens) / (self.tpm * self._scale / 60))
+        if wait > 0:
+            return wait
+
+        self._request_tokens -= 1
+        self._minute_tokens -= tokens
+        heapq.heappop(self._queue)
+        self._running += 1
+        return 0.0
+
+    def _enqueue(self, lane: str) -> Tuple[int, int]:
+        ticket = (LANES.index(lane), next(self._seq))
+        heapq.heappush(self._queue, ticket)
+        self._waiting[lane] += 1
+        return ticket
+
+    def _admitted(self, lane: str, waited: float) -> None:
+        self._waiting[lane] -= 1
+        self._acquired[lane] += 1
+        self._wait_total[lane] += waited
+        self._wait_max[lane] = max(self._wait_max[lane], waited)
+
+    def _abandon(self, ticket: Tuple[int, int], lane: str, timed_out: bool = True) -> None:
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        self._waiting[lane] -= 1
+        if timed_out:
+            self._timeouts += 1
+        self._cond.notify_all()
+
+    # ---- 획득/반납 ----
+    def acquire(self, lane: str, tokens: int) -> _Slot:
+        started = time.monotonic()
+        deadline = started + self.max_wait_seconds
+        with self._cond:
+            ticket = self._enqueue(lane)
+            while True:
+                now = time.monotonic()
+                wait = self._try_take(ticket, tokens, now)
+                if wait == 0:
+                    self._admitted(lane, now - started)
+                    return _Slot(lane, tokens, now - started)
+                if now >= deadline:
+                    self._abandon(ticket, lane)
+                    raise LLMRateLimitTimeout(f"LLM call waited over {self.max_wait_seconds:.0f}s ({lane})")
+                self._cond.wait(min(wait, deadline - now))
+
+    async def aacquire(self, lane: str, tokens: int) -> _Slot:
+        started = time.monotonic()
+        deadline = started + self.max_wait_seconds
+        with self._cond:
+            ticket = self._enqueue(lane)
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    wait = self._try_take(ticket, tokens, now)
+                    if wait == 0:
+                        self._admitted(lane, now - started)
+                        return _Slot(lane, tokens, now - started)
+                    if now >= deadline:
+                        self._abandon(ticket, lane)
+                        raise LLMRateLimitTimeout(f"LLM call waited over {self.max_wait_seconds:.0f}s ({lane})")
+                await asyncio.sleep(min(wait, _POLL_SECONDS, deadline - now))
+        except asyncio.CancelledError:
+            with self._cond:
+                if ticket in self._queue:
+                    self._abandon(ticket, lane, timed_out=False)
+            raise
+
+    def release(self, slot: _Slot, ok: bool) -> None:
+        with self._cond:
+            self._running -= 1
+            if slot.actual_tokens is not None:
+                # 예약한 토큰과 실제 사용량의 차이를 정산합니다. (초과분은 버킷을 음수로 만들어 이후 호출을 늦춤)
+                self._minute_tokens = min(self.tpm, self._minute_tokens + slot.reserved_tokens - slot.actual_tokens)
+            if ok:
+                self._scale = min(1.0, self._scale + _RECOVERY_STEP)
+                self._backoff = 1.0
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, lane: str, tokens: int) -> Iterator[_Slot]:
+        if not self.enabled:
+            yield _Slot(lane, tokens, 0.0)
+            return
+        slot = self.acquire(lane, tokens)
+        ok = False
+        try:
+            yield slot
+            ok = True
+        finally:
+            self.release(slot, ok)
+
+    @asynccontextmanager
+    async def aslot(self, lane: str, tokens: int) -> AsyncIterator[_Slot]:
+        if not self.enabled:
+            yield _Slot(lane, tokens, 0.0)
+            return
+        slot = await self.aacquire(lane, tokens)
+        ok = False
+        try:
+            yield slot
+            ok = True
+        finally:
+            self.release(slot, ok)
+
+    # ---- 429 적응형 백오프 ----
+    def report_throttled(self, retry_after: Optional[float] = None) -> None:
+        """업스트림이 429를 반환했을 때 호출합니다. (httpx response hook)"""
+        with self._cond:
+            now = time.monotonic()
+            self._throttled += 1
+            self._scale = max(_MIN_RATE_SCALE, self._scale * 0.5)
+            pause = retry_after if retry_after is not None else self._backoff
+            self._backoff = min(_MAX_BACKOFF_SECONDS, self._backoff * 2)
+            self._paused_until = max(self._paused_until, now + pause)
+            # 버킷에 남은 여유도 비워 재개 직후 몰리지 않게 합니다.
+            self._request_tokens = min(self._request_tokens, 0.0)
+
+    def saturated(self) -> bool:
+        """대기 중인 호출이 있거나 동시 실행 한도에 닿았는지 (추가 호출이 바로 나가지 못하는 상태)"""
+        with self._cond:
+            return bool(self._queue) or self._running >= self.max_concurrency or time.monotonic() < self._paused_until
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "enabled": self.enabled,
+                "running": self._running,
+                "queue_depth": sum(self._waiting.values()),
+                "rate_scale": round(self._scale, 3),
+                "paused_for_sec": round(max(0.0, self._paused_until - now), 2),
+                "available_requests": round(self._request_tokens, 2),
+                "available_tokens": int(self._minute_tokens),
+                "throttled_429": self._throttled,
+                "timeouts": self._timeouts,
+                "lanes": {
+                    lane: {
+                        "waiting": self._waiting[lane],
+                        "acquired": self._acquired[lane],
+                        "avg_wait_ms": round(self._wait_total[lane] / self._acquired[lane] * 1000, 1)
+                        if self._acquired[lane]
+                        else 0.0,
+                        "max_wait_ms": round(self._wait_max[lane] * 1000, 1),
+                    }
+                    for lane in LANES
+                },
+                "limits": {
+                    "worker_count": self.worker_count,
+                    "rps": self.rps,
+                    "burst": self.burst,
+                    "tpm": self.tpm,
+                    "max_concurrency": self.max_concurrency,
+                    "max_wait_seconds": self.max_wait_seconds,
+                },
+            }
@@ -0,0 +1,227 @@
+"""
+LLM 호출 hedging (꼬리 지연 완화)
+- 응답이 purpose별 최근 지연의 백분위(예: p95)를 넘도록 돌아오지 않으면 같은 요청을 한 번 더 보내고,
+  먼저 끝난 응답을 사용합니다. 느린 쪽은 async 경로에서는 취소하고, sync 경로에서는 결과만 버립니다.
+- 백분위(budget)는 purpose별로 core/llm.py _MODEL_ROUTES의 "hedge" 값으로 정합니다. (없으면 hedging 안 함)
+- 추가 비용 상한: purpose별 최근 호출 중 hedge를 보낸 비율이 LLM_HEDGE_MAX_EXTRA_RATIO를 넘지 않게 합니다.
+  governor가 포화 상태(대기열 있음)이면 hedge를 보내지 않습니다. (대기열에서 기다리면 효과가 없음)
+- 최근 지연 표본이 LLM_HEDGE_MIN_SAMPLES보다 적으면 hedge하지 않습니다.
+
+선택 환경 변수:
+- LLM_HEDGE_ENABLED (기본값: false)
+- LLM_HEDGE_MAX_EXTRA_RATIO (기본값: 0.1, hedge 호출 수 / 전체 호출 수 상한)
+- LLM_HEDGE_MIN_SAMPLES (기본값: 20)
+- LLM_HEDGE_MIN_DELAY_SECONDS (기본값: 1.0, hedge 대기 시간 하한)
+- LLM_HEDGE_WINDOW (기본값: 200, purpose별 지연/호출 표본 수)
+- LLM_HEDGE_THREADS (기본값: 16, sync 호출 hedging에 쓰는 스레드 수)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# hedge를 보내지 않아야 할 때 True를 반환하는 함수 (예: governor 포화)
+SaturationCheck = Callable[[], bool]
+
+
+class _PurposeStats:
+    def __init__(self, window: int) -> None:
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.hedged_flags: Deque[int] = deque(maxlen=window)
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+        self.denied_budget = 0
+        self.denied_saturated = 0
+        self.last_delay: Optional[float] = None
+
+
+class HedgePolicy:
+    def __init__(self, saturated: Optional[SaturationCheck] = None) -> None:
+        self.enabled = os.getenv("LLM_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.max_extra_ratio = float(os.getenv("LLM_HEDGE_MAX_EXTRA_RATIO", "0.1"))
+        self.min_samples = max(1, int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")))
+        self.min_delay = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "1.0"))
+        self.window = max(self.min_samples, int(os.getenv("LLM_HEDGE_WINDOW", "200")))
+        self.threads = max(2, int(os.getenv("LLM_HEDGE_THREADS", "16")))
+        self.saturated = saturated
+        self._stats: Dict[str, _PurposeStats] = {}
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _purpose(self, purpose: str) -> _PurposeStats:
+        stats = self._stats.get(purpose)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(purpose, _PurposeStats(self.window))
+        return stats
+
+    def applies(self, purpose: Optional[str], percentile: Optional[float]) -> bool:
+        return self.enabled and bool(purpose) and bool(percentile)
+
+    def delay_for(self, purpose: str, percentile: float) -> Optional[float]:
+        """hedge를 보내기까지 기다릴 시간(초). 표본이 부족하면 None"""
+        stats = self._purpose(purpose)
+        with self._lock:
+            ordered = sorted(stats.latencies)
+        if len(ordered) < self.min_samples:
+            return None
+        index = min(len(ordered) - 1, max(0, int(round(percentile * (len(ordered) - 1)))))
+        delay = max(self.min_delay, ordered[index])
+        stats.last_delay = delay
+        return delay
+
+    def _start_call(self, purpose: str) -> None:
+        stats = self._purpose(purpose)
+        with self._lock:
+            stats.calls += 1
+
+    def _allow_hedge(self, purpose: str) -> bool:
+        stats = self._purpose(purpose)
+        if self.saturated is not None and self.saturated():
+            with self._lock:
+                stats.denied_saturated += 1
+            return False
+        with self._lock:
+            budget = self.max_extra_ratio * max(len(stats.hedged_flags), self.min_samples)
+            if sum(stats.hedged_flags) + 1 > budget:
+                stats.denied_budget += 1
+                return False
+            stats.hedged += 1
+            return True
+
+    def _finish_call(self, purpose: str, hedged: bool, winner: Optional[int], latency: Optional[float]) -> None:
+        """winner: 먼저 성공한 시도 번호 (0=원 요청, 1=hedge), 모두 실패하면 None"""
+        stats = self._purpose(purpose)
+        with self._lock:
+            stats.hedged_flags.append(int(hedged))
+            if latency is not None:
+                stats.latencies.append(latency)
+            if hedged and winner == 1:
+                stats.hedge_wins += 1
+            elif hedged and winner == 0:
+                stats.primary_wins += 1
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.threads, thread_name_prefix="llm-hedge"
+                    )
+        return self._executor
+
+    # ---- 실행 ----
+    def run(self, purpose: str, percentile: float, attempt: Callable[[int], T]) -> T:
+        """
+        sync 호출 hedging. attempt(0)이 원 요청, attempt(1)이 hedge 요청입니다.
+        두 시도 모두 별도 스레드에서 실행하고 호출 스레드는 먼저 성공한 결과를 기다립니다.
+        """
+        delay = self.delay_for(purpose, percentile)
+        self._start_call(purpose)
+        started = hedge_started = time.perf_counter()
+        if delay is None:
+            result = attempt(0)
+            self._finish_call(purpose, False, 0, time.perf_counter() - started)
+            return result
+
+        executor = self._get_executor()
+        futures: Dict[concurrent.futures.Future, int] = {
+            executor.submit(contextvars.copy_context().run, attempt, 0): 0
+        }
+        done, _ = concurrent.futures.wait(futures, timeout=delay)
+        hedged = False
+        if not done and self._allow_hedge(purpose):
+            hedged = True
+            hedge_started = time.perf_counter()
+            futures[executor.submit(contextvars.copy_context().run, attempt, 1)] = 1
+
+        pending = set(futures)
+        first_error: Optional[BaseException] = None
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    # 남은 시도는 취소할 수 없으므로(실행 중인 스레드) 결과만 버립니다.
+                    winner = futures[future]
+                    # 지연 표본은 시도 자체의 소요 시간으로 기록합니다. (hedge로 잘린 관측 지연을 쓰면 백분위가 계속 낮아짐)
+                    attempt_started = hedge_started if winner == 1 else started
+                    self._finish_call(purpose, hedged, winner, time.perf_counter() - attempt_started)
+                    return future.result()
+                first_error = first_error or error
+        self._finish_call(purpose, hedged, None, None)
+        raise first_error  # type: ignore[misc]
+
+    async def arun(self, purpose: str, percentile: float, attempt: Callable[[int], Awaitable[T]]) -> T:
+        """async 호출 hedging. 먼저 성공한 결과를 반환하고 남은 시도는 취소합니다."""
+        delay = self.delay_for(purpose, percentile)
+        self._start_call(purpose)
+        started = hedge_started = time.perf_counter()
+        if delay is None:
+            result = await attempt(0)
+            self._finish_call(purpose, False, 0, time.perf_counter() - started)
+            return result
+
+        tasks: Dict[asyncio.Task, int] = {asyncio.ensure_future(attempt(0)): 0}
+        hedged = False
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._allow_hedge(purpose):
+                hedged = True
+                hedge_started = time.perf_counter()
+                tasks[asyncio.ensure_future(attempt(1))] = 1
+
+            pending = set(tasks)
+            first_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        winner = tasks[task]
+                        attempt_started = hedge_started if winner == 1 else started
+                        self._finish_call(purpose, hedged, winner, time.perf_counter() - attempt_started)
+                        return task.result()
+                    first_error = first_error or error
+            self._finish_call(purpose, hedged, None, None)
+            raise first_error  # type: ignore[misc]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        purposes: Dict[str, Any] = {}
+        with self._lock:
+            for purpose, stats in self._stats.items():
+                decided = stats.hedge_wins + stats.primary_wins
+                purposes[purpose] = {
+                    "calls": stats.calls,
+                    "hedged": stats.hedged,
+                    "hedge_rate": round(stats.hedged / stats.calls, 4) if stats.calls else 0.0,
+                    "hedge_wins": stats.hedge_wins,
+                    "primary_wins": stats.primary_wins,
+                    "hedge_win_rate": round(stats.hedge_wins / decided, 4) if decided else None,
+                    "denied_budget": stats.denied_budget,
+                    "denied_saturated": stats.denied_saturated,
+                    "samples": len(stats.latencies),
+                    "delay_ms": round(stats.last_delay * 1000, 1) if stats.last_delay is not None else None,
+                }
+        return {
+            "enabled": self.enabled,
+            "max_extra_ratio": self.max_extra_ratio,
+            "min_samples": self.min_samples,
+            "min_delay_seconds": self.min_delay,
+            "purposes": purposes,
+        }
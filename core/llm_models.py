@@ -0,0 +1,225 @@
+"""
+governor/호출 기록/hedging을 적용한 Upstage Chat/Embedding 모델 클래스
+- langchain_upstage(openai SDK 포함)는 import 비용이 커서 core/llm.py가 모델을 처음 만들 때 이 모듈을 import 합니다.
+  (API 프로세스 기동 시간 단축, UPSTAGE_API_KEY가 없어도 import 단계에서 실패하지 않음)
+- governor/호출 기록/hedge 정책은 core/llm.py의 프로세스 전역 인스턴스를 공유합니다.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_upstage import ChatUpstage, UpstageEmbeddings
+
+from core.llm import _governor, _hedging, _usage
+from core.llm_governor import estimate_tokens
+
+
+def _message_tokens(messages: List[BaseMessage], max_tokens: Optional[int]) -> int:
+    return estimate_tokens(_prompt_chars(messages), max_tokens)
+
+
+def _token_usage(result: ChatResult) -> Dict[str, Any]:
+    return (result.llm_output or {}).get("token_usage") or {}
+
+
+def _prompt_chars(messages: List[BaseMessage]) -> int:
+    return sum(len(str(message.content)) for message in messages)
+
+
+def _tag_result(result: ChatResult, call_id: str) -> None:
+    # report_llm_outcome(response)가 같은 기록을 찾을 수 있도록 메시지 id를 고정합니다.
+    for generation in result.generations:
+        if generation.message.id is None:
+            generation.message.id = call_id
+
+
+def _attempt_call_id(call_id: str, attempt: int) -> str:
+    return call_id if attempt == 0 else f"{call_id}-hedge"
+
+
+class GovernedChatUpstage(ChatUpstage):
+    """
+    실제 API 호출(_generate/_stream) 직전에 governor 슬롯을 얻고,
+    호출마다 토큰/지연/결과를 core/llm_usage.py에 기록하는 ChatUpstage
+    """
+
+    purpose: Optional[str] = None
+    lane: str = "interactive"
+    hedge: Optional[float] = None
+
+    def _reserve(self, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> Tuple[str, int]:
+        max_tokens = kwargs.get("max_tokens") or self.max_tokens
+        return self.lane, _message_tokens(messages, max_tokens)
+
+    def _record(
+        self,
+        call_id: str,
+        messages: List[BaseMessage],
+        started: float,
+        queue_wait: float,
+        usage: Optional[Dict[str, Any]],
+    ) -> None:
+        """usage가 None이면 호출 실패로 기록합니다."""
+        _usage.record(
+            call_id=call_id,
+            node=self.purpose or "interactive",
+            model=self.model_name,
+            prompt_chars=_prompt_chars(messages),
+            prompt_tokens=int((usage or {}).get("prompt_tokens") or (usage or {}).get("input_tokens") or 0),
+            completion_tokens=int((usage or {}).get("completion_tokens") or (usage or {}).get("output_tokens") or 0),
+            latency_ms=(time.perf_counter() - started) * 1000,
+            queue_wait_ms=queue_wait * 1000,
+            outcome="ok" if usage is not None else "error",
+        )
+
+    @staticmethod
+    def _call_id(run_manager: Any) -> str:
+        return f"run-{run_manager.run_id}" if run_manager else f"call-{time.time_ns()}"
+
+    def _governed_generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        run_manager: Any,
+        call_id: str,
+        **kwargs: Any,
+    ) -> ChatResult:
+        with _governor.slot(*self._reserve(messages, kwargs)) as slot:
+            started = time.perf_counter()
+            try:
+                result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception:
+                self._record(call_id, messages, started, slot.waited, None)
+                raise
+            usage = _token_usage(result)
+            _tag_result(result, call_id)
+            self._record(call_id, messages, started, slot.waited, usage)
+            slot.settle(usage.get("total_tokens"))
+        return result
+
+    async def _agoverned_generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        run_manager: Any,
+        call_id: str,
+        **kwargs: Any,
+    ) -> ChatResult:
+        async with _governor.aslot(*self._reserve(messages, kwargs)) as slot:
+            started = time.perf_counter()
+            try:
+                result = await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception:
+                self._record(call_id, messages, started, slot.waited, None)
+                raise
+            usage = _token_usage(result)
+            _tag_result(result, call_id)
+            self._record(call_id, messages, started, slot.waited, usage)
+            slot.settle(usage.get("total_tokens"))
+        return result
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.streaming:
+            # _stream에서 슬롯을 얻고 기록합니다.
+            return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        call_id = self._call_id(run_manager)
+        if not _hedging.applies(self.purpose, self.hedge):
+            return self._governed_generate(messages, stop, run_manager, call_id, **kwargs)
+        # hedge 요청은 별도 call_id로 기록해 추가 비용이 호출 기록에 드러나게 합니다.
+        return _hedging.run(
+            self.purpose,
+            self.hedge,
+            lambda attempt: self._governed_generate(
+                messages, stop, run_manager, _attempt_call_id(call_id, attempt), **kwargs
+            ),
+        )
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.streaming:
+            return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        call_id = self._call_id(run_manager)
+        if not _hedging.applies(self.purpose, self.hedge):
+            return await self._agoverned_generate(messages, stop, run_manager, call_id, **kwargs)
+        return await _hedging.arun(
+            self.purpose,
+            self.hedge,
+            lambda attempt: self._agoverned_generate(
+                messages, stop, run_manager, _attempt_call_id(call_id, attempt), **kwargs
+            ),
+        )
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        with _governor.slot(*self._reserve(messages, kwargs)) as slot:
+            started = time.perf_counter()
+            usage: Dict[str, Any] = {}
+            try:
+                for chunk in super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    usage = getattr(chunk.message, "usage_metadata", None) or usage
+                    yield chunk
+            except Exception:
+                self._record(self._call_id(run_manager), messages, started, slot.waited, None)
+                raise
+            self._record(self._call_id(run_manager), messages, started, slot.waited, usage)
+            slot.settle(usage.get("total_tokens"))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        async with _governor.aslot(*self._reserve(messages, kwargs)) as slot:
+            started = time.perf_counter()
+            usage: Dict[str, Any] = {}
+            try:
+                async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    usage = getattr(chunk.message, "usage_metadata", None) or usage
+                    yield chunk
+            except Exception:
+                self._record(self._call_id(run_manager), messages, started, slot.waited, None)
+                raise
+            self._record(self._call_id(run_manager), messages, started, slot.waited, usage)
+            slot.settle(usage.get("total_tokens"))
+
+
+class GovernedUpstageEmbeddings(UpstageEmbeddings):
+    """임베딩 호출도 같은 governor(normal 레인)를 거칩니다."""
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with _governor.slot("normal", estimate_tokens(sum(len(text) for text in texts), 0)):
+            return super().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with _governor.slot("normal", estimate_tokens(len(text), 0)):
+            return super().embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        async with _governor.aslot("normal", estimate_tokens(sum(len(text) for text in texts), 0)):
+            return await super().aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        async with _governor.aslot("normal", estimate_tokens(len(text), 0)):
+            return await super().aembed_query(text)
@@ -0,0 +1,199 @@
+"""
+LLM 호출별 토큰/지연/비용 집계
+- core/llm.py의 Chat 모델 래퍼가 실제 API 호출마다 한 건씩 기록합니다. (캐시 적중은 기록하지 않음)
+  기록 항목: 호출 노드(purpose), prompt/completion 토큰, 프롬프트 글자 수, 지연, governor 대기, 결과
+- 결과(outcome)
+  - ok: 정상 응답
+  - error: 호출 실패 (예외)
+  - parse_fail: 응답을 JSON으로 파싱하지 못함 (노드가 report_llm_outcome으로 표시)
+  - fallback: 파싱은 됐지만 검증 실패 등으로 노드가 fallback 결과를 사용함
+- 노드별 최근 N건(rolling window)으로 지연 histogram/백분위, 토큰/비용 합계를 계산합니다.
+- 각 기록은 metrics/results/llm_calls.csv에 append 됩니다. (outcome 표시를 기다리도록 잠시 버퍼링)
+  record()는 버퍼에 넣기만 하고, CSV 기록은 첫 기록 때 시작하는 백그라운드 스레드(llm-usage-flush)가 합니다.
+  (LLM 호출 경로(이벤트 루프, governor 슬롯 보유 중)에서 파일 I/O를 하지 않도록)
+
+선택 환경 변수:
+- LLM_USAGE_WINDOW (기본값: 1000, 노드별 보관 건수)
+- LLM_USAGE_FLUSH_SECONDS (기본값: 10, CSV 기록 전 버퍼링 시간)
+- LLM_PRICE_INPUT_PER_1M (기본값: 0.15, USD / 입력 토큰 100만 개)
+- LLM_PRICE_OUTPUT_PER_1M (기본값: 0.60, USD / 출력 토큰 100만 개)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# 지연 histogram 버킷 상한(ms)
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+OUTCOMES = ("ok", "error", "parse_fail", "fallback")
+
+# outcome 표시를 위해 기억해 둘 최근 호출 수 (CSV 기록 대기 건수 상한도 겸함)
+_RECENT_LIMIT = 512
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class LLMUsageRecorder:
+    def __init__(
+        self,
+        sink: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        window: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+    ) -> None:
+        self.sink = sink
+        self.window = max(1, window or int(os.getenv("LLM_USAGE_WINDOW", "1000")))
+        self.flush_seconds = (
+            flush_seconds if flush_seconds is not None else float(os.getenv("LLM_USAGE_FLUSH_SECONDS", "10"))
+        )
+        self.price_input = float(os.getenv("LLM_PRICE_INPUT_PER_1M", "0.15"))
+        self.price_output = float(os.getenv("LLM_PRICE_OUTPUT_PER_1M", "0.60"))
+        self._records: Dict[str, Deque[Dict[str, Any]]] = {}
+        # call_id → 기록 (outcome 표시 대상)
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # CSV 기록 대기
+        self._unflushed: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        # 백그라운드 flush 스레드 (첫 record 때 시작) 와 즉시 flush 요청 신호
+        self._flusher: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        # 백그라운드 flush와 종료 시 flush(force=True)가 겹쳐도 CSV에 순서대로 한 번씩 기록되도록 (record()는 잡지 않음)
+        self._flush_lock = threading.Lock()
+
+    def cost_usd(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.price_input + completion_tokens * self.price_output) / 1_000_000
+
+    def record(
+        self,
+        call_id: str,
+        node: str,
+        model: str,
+        prompt_chars: int,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency_ms: float,
+        queue_wait_ms: float,
+        outcome: str,
+    ) -> None:
+        entry = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "call_id": call_id,
+            "node": node,
+            "model": model,
+            "prompt_chars": prompt_chars,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency_ms": round(latency_ms, 1),
+            "queue_wait_ms": round(queue_wait_ms, 1),
+            "cost_usd": round(self.cost_usd(prompt_tokens, completion_tokens), 8),
+            "outcome": outcome,
+            "_recorded_at": time.monotonic(),
+        }
+        with self._lock:
+            self._records.setdefault(node, deque(maxlen=self.window)).append(entry)
+            self._recent[call_id] = entry
+            while len(self._recent) > _RECENT_LIMIT:
+                self._recent.popitem(last=False)
+            self._unflushed.append(entry)
+            if self.flush_seconds <= 0 or len(self._unflushed) > _RECENT_LIMIT:
+                self._wake.set()
+            self._ensure_flusher()
+
+    def _ensure_flusher(self) -> None:
+        # self._lock 안에서 호출
+        if self.sink is None or (self._flusher is not None and self._flusher.is_alive()):
+            return
+        self._flusher = threading.Thread(target=self._flush_loop, name="llm-usage-flush", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        # 기록이 flush_seconds보다 너무 오래 머물지 않도록 그 절반 간격으로 확인합니다.
+        interval = max(0.5, self.flush_seconds / 2)
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            self.flush()
+
+    def mark(self, call_id: Optional[str], outcome: str) -> None:
+        """노드가 응답을 처리한 결과(parse_fail/fallback)를 기록에 반영합니다."""
+        if not call_id or outcome not in OUTCOMES:
+            return
+        with self._lock:
+            entry = self._recent.get(call_id)
+            if entry is not None and entry["outcome"] == "ok":
+                entry["outcome"] = outcome
+
+    def flush(self, force: bool = False) -> None:
+        with self._flush_lock:
+            now = time.monotonic()
+            ready: List[Dict[str, Any]] = []
+            with self._lock:
+                while self._unflushed:
+                    entry = self._unflushed[0]
+                    if (
+                        not force
+                        and len(self._unflushed) <= _RECENT_LIMIT
+                        and now - entry["_recorded_at"] < self.flush_seconds
+                    ):
+                        break
+                    self._unflushed.popleft()
+                    ready.append({key: value for key, value in entry.items() if not key.startswith("_")})
+            if ready and self.sink is not None:
+                try:
+                    self.sink(ready)
+                except Exception as exc:
+                    print(f"[WARNING] Failed to append LLM usage records: {exc}")
+
+    def _summarize(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        latencies = sorted(entry["latency_ms"] for entry in entries)
+        histogram: Dict[str, int] = {f"le_{bound}": 0 for bound in LATENCY_BUCKETS_MS}
+        histogram["inf"] = 0
+        for latency in latencies:
+            bucket = next((f"le_{bound}" for bound in LATENCY_BUCKETS_MS if latency <= bound), "inf")
+            histogram[bucket] += 1
+        prompt_tokens = sum(entry["prompt_tokens"] for entry in entries)
+        completion_tokens = sum(entry["completion_tokens"] for entry in entries)
+        outcomes = {outcome: 0 for outcome in OUTCOMES}
+        for entry in entries:
+            outcomes[entry["outcome"]] += 1
+        return {
+            "calls": len(entries),
+            "outcomes": outcomes,
+            "latency_ms": {
+                "p50": _percentile(latencies, 0.5),
+                "p95": _percentile(latencies, 0.95),
+                "p99": _percentile(latencies, 0.99),
+                "max": latencies[-1] if latencies else 0.0,
+                "histogram": histogram,
+            },
+            "avg_queue_wait_ms": round(sum(entry["queue_wait_ms"] for entry in entries) / len(entries), 1)
+            if entries
+            else 0.0,
+            "prompt_chars": sum(entry["prompt_chars"] for entry in entries),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": round(self.cost_usd(prompt_tokens, completion_tokens), 6),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {node: list(entries) for node, entries in self._records.items()}
+        nodes = {node: self._summarize(entries) for node, entries in snapshot.items()}
+        total = self._summarize([entry for entries in snapshot.values() for entry in entries])
+        for summary in nodes.values():
+            summary["cost_share"] = round(summary["cost_usd"] / total["cost_usd"], 4) if total["cost_usd"] else 0.0
+        return {
+            "window_per_node": self.window,
+            "pricing_usd_per_1m": {"input": self.price_input, "output": self.price_output},
+            "total": total,
+            "nodes": dict(sorted(nodes.items(), key=lambda item: item[1]["cost_usd"], reverse=True)),
+        }
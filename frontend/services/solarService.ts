@@ -12,7 +12,7 @@ export const analyzeInvestmentLoss = async (
       ? latestStock.customPeriod.split(" ~ ").map(value => value.trim())
       : ["", ""];
 
-  const response = await fetch(`${API_BASE_URL}/v1/analyze`, {
+  const response = await fetch(`${API_BASE_URL}/v1/analyze?view=compact`, {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
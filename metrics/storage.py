@@ -93,6 +93,47 @@ def append_metrics_csv(report: EvaluationReport) -> Path:
     return filepath
 
 
+LLM_CALL_FIELDS = [
+    "timestamp",
+    "call_id",
+    "node",
+    "model",
+    "prompt_chars",
+    "prompt_tokens",
+    "completion_tokens",
+    "latency_ms",
+    "queue_wait_ms",
+    "cost_usd",
+    "outcome",
+]
+
+
+def append_llm_calls_csv(records: List[Dict[str, Any]]) -> Path:
+    """
+    LLM 호출 기록(core/llm_usage.py)을 CSV 파일에 추가 (노드별 비용/지연 분석용)
+
+    Args:
+        records: 호출 기록 리스트
+
+    Returns:
+        CSV 파일 경로
+    """
+    ensure_metrics_dir()
+    filepath = METRICS_DIR / "llm_calls.csv"
+
+    file_exists = filepath.exists()
+
+    with open(filepath, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=LLM_CALL_FIELDS, extrasaction="ignore")
+
+        if not file_exists:
+            writer.writeheader()
+
+        writer.writerows(records)
+
+    return filepath
+
+
 def load_metrics_json(request_id: str) -> Optional[EvaluationReport]:
     """
     특정 요청의 메트릭 결과 로드
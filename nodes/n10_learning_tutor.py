@@ -1,5 +1,6 @@
 from typing import Any, Dict
 
+from N10_Learning_Tutor.n10 import anode10_learning_tutor as _anode10_learning_tutor
 from N10_Learning_Tutor.n10 import node10_learning_tutor as _node10_learning_tutor
 
 
@@ -8,3 +9,10 @@ def node10_learning_tutor(state: Dict[str, Any]) -> Dict[str, Any]:
     N10: 투자 학습 튜터 래퍼
     """
     return _node10_learning_tutor(state)
+
+
+async def anode10_learning_tutor(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    N10: 투자 학습 튜터 래퍼 (비동기)
+    """
+    return await _anode10_learning_tutor(state)
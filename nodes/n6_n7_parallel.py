@@ -6,8 +6,8 @@ import asyncio
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict
 
-from N6_Stock_Analyst.n6 import node6_stock_analyst
-from N7_News_Summarizer.n7 import node7_news_summarizer
+from N6_Stock_Analyst.n6 import anode6_stock_analyst, node6_stock_analyst
+from N7_News_Summarizer.n7 import anode7_news_summarizer, node7_news_summarizer
 
 
 def node6_n7_parallel(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -32,3 +32,22 @@ def node6_n7_parallel(state: Dict[str, Any]) -> Dict[str, Any]:
         merged_result.update(result_n7)
 
     return merged_result
+
+
+async def anode6_n7_parallel(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    N6과 N7의 비동기 버전을 같은 이벤트 루프에서 동시에 실행합니다.
+    요청마다 스레드 풀을 만들지 않으므로 동시 분석 수가 늘어도 스레드를 점유하지 않습니다.
+    """
+    result_n6, result_n7 = await asyncio.gather(
+        anode6_stock_analyst(state),
+        anode7_news_summarizer(state),
+    )
+
+    merged_result = {}
+    if isinstance(result_n6, dict):
+        merged_result.update(result_n6)
+    if isinstance(result_n7, dict):
+        merged_result.update(result_n7)
+
+    return merged_result
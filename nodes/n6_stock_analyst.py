@@ -1,6 +1,6 @@
 from typing import Any, Dict
 
-from N6_Stock_Analyst.n6 import node6_stock_analyst
+from N6_Stock_Analyst.n6 import anode6_stock_analyst, node6_stock_analyst
 
 
 def node6_stock_analyst_wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -8,3 +8,10 @@ def node6_stock_analyst_wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
     N6: 주가/지표 분석 래퍼
     """
     return node6_stock_analyst(state)
+
+
+async def anode6_stock_analyst_wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    N6: 주가/지표 분석 래퍼 (비동기)
+    """
+    return await anode6_stock_analyst(state)
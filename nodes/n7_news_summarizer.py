@@ -1,6 +1,6 @@
 from typing import Any, Dict
 
-from N7_News_Summarizer.n7 import node7_news_summarizer
+from N7_News_Summarizer.n7 import anode7_news_summarizer, node7_news_summarizer
 
 
 def node7_news_summarizer_wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -8,3 +8,10 @@ def node7_news_summarizer_wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
     N7: 뉴스/시장 요약 래퍼
     """
     return node7_news_summarizer(state)
+
+
+async def anode7_news_summarizer_wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    N7: 뉴스/시장 요약 래퍼 (비동기)
+    """
+    return await anode7_news_summarizer(state)
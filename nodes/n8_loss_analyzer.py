@@ -1,6 +1,6 @@
 from typing import Any, Dict
 
-from N8_Loss_Analyst.n8 import node8_loss_analyst
+from N8_Loss_Analyst.n8 import anode8_loss_analyst, node8_loss_analyst
 
 
 def node8_loss_analyzer(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -8,3 +8,10 @@ def node8_loss_analyzer(state: Dict[str, Any]) -> Dict[str, Any]:
     N8: 손실 분석 래퍼
     """
     return node8_loss_analyst(state)
+
+
+async def anode8_loss_analyzer(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    N8: 손실 분석 래퍼 (비동기)
+    """
+    return await anode8_loss_analyst(state)
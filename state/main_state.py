@@ -13,9 +13,13 @@ class MainState(TypedDict, total=False):
 
     # N6: 기술분석
     n6_stock_analysis: Dict[str, object]
+    # 배치 분석에서 미리 조회해 둔 주가 데이터 (있으면 N6이 재조회하지 않음)
+    n6_prefetched_stock_data: Dict[str, object]
 
     # N7: 뉴스 요약/시장 상황
     n7_news_analysis: Dict[str, object]
+    # 배치 분석에서 미리 검색해 둔 뉴스 목록 (있으면 N7이 재검색하지 않음)
+    n7_prefetched_news: list
 
     # N8: 손실 분석 + 시장상황 분석 + N9 입력 요약
     n8_loss_cause_analysis: Dict[str, object]
@@ -0,0 +1,8 @@
+"""
+테스트 공통 설정
+- app.api는 import 시점에 분석 캐시를 만들므로, 저장소 data/에 SQLite 파일이 생기지 않도록 memory 백엔드를 기본으로 둡니다.
+"""
+
+import os
+
+os.environ.setdefault("ANALYSIS_CACHE_BACKEND", "memory")
@@ -0,0 +1,139 @@
+"""
+app/service/admission.py 테스트 (동시 처리/대기열 한도, 429/503 거절과 Retry-After)
+
+실행: python -m pytest tests/test_admission.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api as api
+from app.service.admission import AdmissionController, AdmissionRejected
+
+_ANALYZE_BODY = {
+    "layer1_stock": "005930",
+    "layer2_buy_date": "2024-01-02",
+    "layer2_sell_date": "2024-02-01",
+    "layer3_decision_basis": "실적 기대",
+}
+
+
+@pytest.fixture(autouse=True)
+def _enabled(monkeypatch):
+    monkeypatch.setenv("ADMISSION_ENABLED", "true")
+
+
+def _controller(llm_in_flight: int = 0, **limits) -> AdmissionController:
+    return AdmissionController(llm_in_flight=lambda: llm_in_flight, **limits)
+
+
+def test_queued_request_gets_the_released_slot():
+    async def scenario():
+        admission = _controller(max_concurrent=1, max_queue=1, max_queue_wait_ms=1000)
+        first = await admission.acquire("analyze")
+        waiter = asyncio.create_task(admission.acquire("analyze"))
+        await asyncio.sleep(0.01)
+        assert admission.status()["waiting"] == 1
+        admission.release(first)
+        admission.release(await waiter)
+        return admission.status()
+
+    status = asyncio.run(scenario())
+    assert status["running"] == 0 and status["waiting"] == 0
+    assert status["endpoints"]["analyze"]["admitted"] == 2
+
+
+def test_full_queue_is_rejected_with_429():
+    async def scenario():
+        admission = _controller(max_concurrent=1, max_queue=1, max_queue_wait_ms=1000)
+        first = await admission.acquire("analyze")
+        waiter = asyncio.create_task(admission.acquire("analyze"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("analyze")
+        admission.release(first)
+        admission.release(await waiter)
+        return admission, rejected.value
+
+    admission, exc = asyncio.run(scenario())
+    assert exc.status_code == 429
+    assert exc.retry_after >= 1
+    assert admission.status()["endpoints"]["analyze"]["rejected_429"] == 1
+
+
+def test_queue_wait_timeout_is_rejected_with_503():
+    async def scenario():
+        admission = _controller(max_concurrent=1, max_queue=4, max_queue_wait_ms=20)
+        started = await admission.acquire("chat")
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("chat")
+        admission.release(started)
+        return admission, rejected.value
+
+    admission, exc = asyncio.run(scenario())
+    assert exc.status_code == 503
+    status = admission.status()
+    assert status["waiting"] == 0
+    assert status["endpoints"]["chat"]["rejected_503"] == 1
+
+
+def test_slow_queue_is_rejected_before_waiting():
+    async def scenario():
+        admission = _controller(max_concurrent=1, max_queue=4, max_queue_wait_ms=20)
+        admission._avg_wait = 1.0
+        started = await admission.acquire("analyze")
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("analyze")
+        admission.release(started)
+        return rejected.value
+
+    assert asyncio.run(scenario()).status_code == 429
+
+
+def test_saturated_llm_is_rejected_with_503():
+    admission = _controller(llm_in_flight=3, max_inflight_llm=3)
+    with pytest.raises(AdmissionRejected) as rejected:
+        asyncio.run(admission.acquire("quiz"))
+    assert rejected.value.status_code == 503
+
+
+def test_disabled_controller_admits_everything(monkeypatch):
+    monkeypatch.setenv("ADMISSION_ENABLED", "false")
+    admission = _controller(llm_in_flight=100, max_concurrent=1, max_queue=0, max_inflight_llm=1)
+
+    async def scenario():
+        return [await admission.acquire("analyze") for _ in range(3)]
+
+    asyncio.run(scenario())
+    assert admission.status()["endpoints"] == {}
+
+
+def test_retry_after_grows_with_pending_requests():
+    admission = _controller(max_concurrent=2)
+    admission._avg_duration = 4.0
+    assert admission.retry_after_seconds() == 1
+    admission._running, admission._waiting = 2, 4
+    assert admission.retry_after_seconds() == 12
+
+
+@pytest.mark.parametrize("path", ["/v1/analyze", "/v1/analyze/stream"])
+def test_endpoints_reject_with_retry_after_header(monkeypatch, path):
+    client = TestClient(api.app)
+
+    saturated = _controller(llm_in_flight=5, max_inflight_llm=5)
+    monkeypatch.setattr(api, "_admission", saturated)
+    response = client.post(path, json=_ANALYZE_BODY)
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+
+    full = _controller(max_concurrent=1, max_queue=0)
+    full._running = 1
+    full._avg_duration = 7.0
+    monkeypatch.setattr(api, "_admission", full)
+    response = client.post(path, json=_ANALYZE_BODY)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
@@ -0,0 +1,125 @@
+"""
+app/service/analysis_cache.py 백엔드와 /v1/chat 성향 재분석 저장 위치 테스트
+
+실행: python -m pytest tests/test_analysis_cache.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.service.analysis_cache import AnalysisCache, MemoryAnalysisCache, SQLiteAnalysisCache
+
+
+def _payload(request_id: str, input_key: str = "key-a", filler: str = "") -> dict:
+    return {"request_id": request_id, "input_key": input_key, "result": {"learning_pattern_analysis": {"v": request_id}, "filler": filler}}
+
+
+@pytest.fixture
+def sqlite_cache(tmp_path) -> SQLiteAnalysisCache:
+    return SQLiteAnalysisCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=3600, max_bytes=1024 * 1024)
+
+
+def test_interface_is_abstract():
+    with pytest.raises(TypeError):
+        AnalysisCache()
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_get_and_find_by_input(backend, tmp_path):
+    cache = MemoryAnalysisCache() if backend == "memory" else SQLiteAnalysisCache(str(tmp_path / "c.sqlite3"), 3600, 1 << 20)
+    assert cache.get("missing") is None
+    cache.put("r1", _payload("r1"), input_key="key-a")
+    cache.put("r2", _payload("r2"), input_key="key-a")
+    cache.put("r3", _payload("r3", "key-b"), input_key="key-b")
+    assert cache.get("r1")["request_id"] == "r1"
+    assert cache.find_by_input("key-a")["request_id"] == "r2"
+    assert cache.find_by_input("key-b")["request_id"] == "r3"
+    assert cache.find_by_input("key-c") is None
+    # input_key 없이 저장한 항목은 입력 해시 조회에 걸리지 않음
+    cache.put("r4", _payload("r4", None))
+    assert cache.find_by_input("key-a")["request_id"] == "r2"
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryAnalysisCache(limit=2)
+    cache.put("r1", _payload("r1", "k1"), input_key="k1")
+    cache.put("r2", _payload("r2", "k2"), input_key="k2")
+    cache.get("r1")
+    cache.put("r3", _payload("r3", "k3"), input_key="k3")
+    assert cache.get("r2") is None
+    assert cache.find_by_input("k2") is None
+    assert cache.get("r1") is not None and cache.get("r3") is not None
+
+
+def test_sqlite_cache_ignores_and_purges_expired_entries(sqlite_cache, monkeypatch):
+    import app.service.analysis_cache as module
+
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "time", lambda: now[0])
+    sqlite_cache.put("old", _payload("old"), input_key="key-a")
+    now[0] += sqlite_cache.ttl_seconds + 1
+    assert sqlite_cache.get("old") is None
+    assert sqlite_cache.find_by_input("key-a") is None
+    sqlite_cache.put("new", _payload("new", "key-b"), input_key="key-b")
+    assert sqlite_cache.stats()["entries"] == 1
+
+
+def test_sqlite_cache_evicts_least_recently_accessed_over_byte_budget(tmp_path, monkeypatch):
+    import app.service.analysis_cache as module
+
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "time", lambda: now[0])
+    probe = SQLiteAnalysisCache(str(tmp_path / "probe.sqlite3"), 3600, 1 << 30)
+    probe.put("p", _payload("p", filler="x" * 50))
+    entry_size = probe.stats()["bytes"]
+
+    cache = SQLiteAnalysisCache(str(tmp_path / "c.sqlite3"), 3600, max_bytes=entry_size * 2 + entry_size // 2)
+    for request_id in ("r1", "r2"):
+        now[0] += 1
+        cache.put(request_id, _payload(request_id, filler="x" * 50))
+    now[0] += 1
+    cache.get("r1")
+    now[0] += 1
+    cache.put("r3", _payload("r3", filler="x" * 50))
+    assert cache.get("r2") is None
+    assert cache.get("r1") is not None and cache.get("r3") is not None
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_sqlite_cache_skips_unreadable_entries(sqlite_cache):
+    with sqlite3.connect(sqlite_cache.path) as conn:
+        conn.execute(
+            "INSERT INTO analysis_cache VALUES ('bad', NULL, strftime('%s','now'), strftime('%s','now'), 3, x'000102')"
+        )
+    assert sqlite_cache.get("bad") is None
+
+
+def test_personality_update_does_not_leak_into_reused_analysis(monkeypatch):
+    from app import api
+
+    cache = MemoryAnalysisCache()
+    monkeypatch.setattr(api, "_analysis_cache", cache)
+    base = {
+        "request_id": "req-1",
+        "input_key": "shared-input",
+        "result": {"learning_pattern_analysis": {"investor_character": {"type": "기본"}}, "n8_loss_cause_analysis": {}},
+    }
+    cache.put("req-1", base, input_key="shared-input")
+
+    async def fake_n9(state):
+        return {"learning_pattern_analysis": {"investor_character": {"type": "개인화", "description": state["investment_reason"]}}}
+
+    monkeypatch.setattr(api, "anode9_learning_pattern_analyzer", fake_n9)
+    request = api.ChatRequest(message="나의 성향은 공격적이에요", request_id="req-1")
+    response = asyncio.run(api._update_personality(request, api._load_cached_analysis("req-1")))
+    assert response["raw"]["learning_pattern_analysis"]["investor_character"]["type"] == "개인화"
+
+    # 같은 요청의 채팅은 개인화된 N9를 보고, 입력 해시로 재사용되는 항목은 그대로입니다.
+    assert api._load_cached_analysis("req-1")["result"]["learning_pattern_analysis"]["investor_character"]["type"] == "개인화"
+    reused = cache.find_by_input("shared-input")
+    assert reused["request_id"] == "req-1"
+    assert reused["result"]["learning_pattern_analysis"]["investor_character"]["type"] == "기본"
@@ -0,0 +1,96 @@
+"""
+/v1/analyze/stream SSE 테스트 (start → 노드 → result 이벤트 순서, 실패 시 error 이벤트, admission 반납)
+
+실행: python -m pytest tests/test_analyze_stream.py
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api as api
+from app.service.admission import AdmissionController
+
+_ANALYZE_BODY = {
+    "layer1_stock": "005930",
+    "layer2_buy_date": "2024-01-02",
+    "layer2_sell_date": "2024-02-01",
+    "layer3_decision_basis": "실적 기대",
+}
+
+
+def _parse_sse(text: str):
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    monkeypatch.setenv("ADMISSION_ENABLED", "true")
+    controller = AdmissionController(llm_in_flight=lambda: 0, max_concurrent=1, max_queue=0)
+    monkeypatch.setattr(api, "_admission", controller)
+    return controller
+
+
+@pytest.fixture
+def finalized(monkeypatch):
+    calls = []
+
+    async def fake_finalize(request_id, state, result, start_time, end_time):
+        calls.append((request_id, state, result))
+        return {"request_id": request_id, "result": result}
+
+    monkeypatch.setattr(api, "_finalize_analysis", fake_finalize)
+    return calls
+
+
+def test_stream_emits_node_events_then_result(monkeypatch, admission, finalized):
+    async def fake_stream(state):
+        yield "updates", {"N6_N7": {"n6_stock_analysis": {"ticker": "005930"}, "n7_news_analysis": {}, "extra": 1}}
+        yield "values", {"n6_stock_analysis": {"ticker": "005930"}}
+        yield "updates", {"N8": {"n8_loss_cause_analysis": {"one_line_summary": "고점 매수"}}}
+        yield "updates", {"unknown_node": {"ignored": True}}
+        yield "updates", {"N10": {"n10_loss_review_report": {"title": "리뷰"}}}
+        yield "values", {"n6_stock_analysis": {"ticker": "005930"}, "n10_loss_review_report": {"title": "리뷰"}}
+
+    monkeypatch.setattr(api, "_stream_graph", fake_stream)
+    response = TestClient(api.app).post("/v1/analyze/stream", json=_ANALYZE_BODY)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    assert [name for name, _ in events] == ["start", "N6_N7", "N8", "N10", "result"]
+    request_id = events[0][1]["request_id"]
+    assert all(data["request_id"] == request_id for _, data in events)
+    assert events[1][1] == {
+        "request_id": request_id,
+        "node": "N6_N7",
+        "n6_stock_analysis": {"ticker": "005930"},
+        "n7_news_analysis": {},
+    }
+    # result는 마지막 values 스냅샷으로 만든 최종 분석입니다.
+    assert events[-1][1]["result"]["n10_loss_review_report"] == {"title": "리뷰"}
+    assert finalized[0][1]["user_message"] == "실적 기대"
+    assert admission.status()["running"] == 0
+    assert admission.status()["endpoints"]["analyze_stream"]["admitted"] == 1
+
+
+def test_stream_failure_emits_error_event(monkeypatch, admission, finalized):
+    async def failing_stream(state):
+        yield "updates", {"N6_N7": {"n6_stock_analysis": {}, "n7_news_analysis": {}}}
+        raise RuntimeError("graph failed")
+
+    monkeypatch.setattr(api, "_stream_graph", failing_stream)
+    response = TestClient(api.app).post("/v1/analyze/stream", json=_ANALYZE_BODY)
+
+    events = _parse_sse(response.text)
+    assert [name for name, _ in events] == ["start", "N6_N7", "error"]
+    assert events[-1][1]["error"] == "graph failed"
+    assert finalized == []
+    assert admission.status()["running"] == 0
@@ -0,0 +1,128 @@
+"""
+N6_Stock_Analyst/indicators.py의 NumPy 커널(누적합 볼린저, 점화식 EMA/Wilder)이
+NumPy 전환 전 순수 Python 구현과 상대 오차 1e-9 안에서 같은지, 동률 해석이 유지되는지 확인합니다.
+(reference 구현은 benchmarks/bench_indicators.py의 것을 그대로 사용)
+
+실행: python -m pytest tests/test_indicators.py
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_indicators import (
+    _edge_series,
+    _mismatch,
+    _reference_bollinger,
+    _reference_macd,
+    _reference_rsi,
+    _series,
+)
+from N6_Stock_Analyst import indicators
+from N6_Stock_Analyst.n6 import calculate_bollinger_bands, calculate_macd, calculate_rsi, perform_technical_analysis
+
+RTOL = 1e-9
+
+
+def _near_flat(level: float, size: int = 120, seed: int = 5) -> list:
+    # 1e6 근처에서 아주 작게만 흔들리는 시계열 (합산 순서 오차가 동률 비교를 뒤집기 쉬운 경우)
+    rng = np.random.default_rng(seed)
+    return [level + float(step) * 1e-7 for step in rng.integers(-2, 3, size)]
+
+
+_SERIES = {
+    **_edge_series(),
+    "random_300": _series(300),
+    "random_20000": _series(20000, seed=42),
+    "flat_int": [100] * 60,
+    "near_flat_1e6": _near_flat(1e6),
+    "steps": [100.0, 100.0, 100.5, 100.5, 100.0] * 20,
+    "falling": [200.0 - i * 0.25 for i in range(90)],
+    "int_prices": [int(p) for p in _series(200, seed=13)],
+}
+
+
+def _stock_data(closes: list) -> dict:
+    start = date(2024, 1, 1)
+    return {
+        "ticker": "TEST",
+        "dates": [(start + timedelta(days=i)).isoformat() for i in range(len(closes))],
+        "close": closes,
+        "high": closes,
+        "low": closes,
+        "volume": [1000] * len(closes),
+    }
+
+
+def _interpretations(closes: list) -> dict:
+    dates = _stock_data(closes)["dates"]
+    analysis = perform_technical_analysis(_stock_data(closes), dates[0], dates[-1])["stock_analysis"]
+    return {item["name"]: item["interpretation"] for item in analysis["indicators"]}
+
+
+@pytest.mark.parametrize("name", sorted(_SERIES))
+def test_kernels_match_reference_loops(name):
+    prices = _SERIES[name]
+    cases = [
+        (_reference_bollinger(prices), indicators.bollinger_bands(prices)),
+        (_reference_bollinger(prices, period=5, std_dev=3), indicators.bollinger_bands(prices, period=5, std_dev=3)),
+        (_reference_rsi(prices), indicators.rsi(prices)),
+        (_reference_rsi(prices, period=3), indicators.rsi(prices, period=3)),
+        (_reference_macd(prices), indicators.macd(prices)),
+        (_reference_macd(prices, 5, 10, 4), indicators.macd(prices, 5, 10, 4)),
+    ]
+    for expected, actual in cases:
+        assert _mismatch(expected, actual, RTOL) is None
+
+
+def test_flat_series_is_exact():
+    bands = calculate_bollinger_bands([100.0] * 30)
+    assert bands["upper"][-1] == bands["middle"][-1] == bands["lower"][-1] == 100.0
+    assert calculate_rsi([100.0] * 30)[-1] == 100
+
+
+@pytest.mark.parametrize("level", [100.0, 1e6, 0.37])
+def test_flat_series_ties_keep_reference_interpretation(level):
+    closes = [level] * 60
+    expected = _reference_macd(closes)
+    assert expected["macd"][-1] == expected["signal"][-1]
+    interpretations = _interpretations(closes)
+    # 기존 구현: macd == signal 이면 골든크로스 아님, 가격 == 밴드면 밴드 안
+    assert interpretations["macd"] == "데드크로스 - 하락 신호"
+    assert interpretations["bollinger_band"] == "밴드 내 정상 범위"
+
+
+def test_rising_then_flat_ties_keep_reference_interpretation():
+    # 상승 후 오래 횡보하면 MACD와 signal이 같은 값으로 수렴합니다.
+    closes = [100.0 + i for i in range(40)] + [139.0] * 400
+    expected = _reference_macd(closes)
+    assert abs(expected["macd"][-1] - expected["signal"][-1]) < 1e-9
+    assert _interpretations(closes)["macd"] == "데드크로스 - 하락 신호"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_interpretations_match_reference_on_random_series(seed):
+    closes = _series(250, seed=seed)
+    expected_macd = _reference_macd(closes)
+    expected_bands = _reference_bollinger(closes)
+    expected_rsi = _reference_rsi(closes)[-1]
+    interpretations = _interpretations(closes)
+    golden = expected_macd["macd"][-1] > expected_macd["signal"][-1]
+    assert interpretations["macd"] == ("골든크로스 - 상승 신호" if golden else "데드크로스 - 하락 신호")
+    if closes[-1] > expected_bands["upper"][-1]:
+        assert interpretations["bollinger_band"] == "상단 밴드 돌파 - 과매수 구간"
+    elif closes[-1] < expected_bands["lower"][-1]:
+        assert interpretations["bollinger_band"] == "하단 밴드 이탈 - 과매도 구간"
+    else:
+        assert interpretations["bollinger_band"] == "밴드 내 정상 범위"
+    assert interpretations["rsi"] == ("과매수 구간" if expected_rsi > 70 else "과매도 구간" if expected_rsi < 30 else "중립 구간")
+
+
+def test_n6_wrappers_return_lists():
+    prices = _series(120)
+    assert isinstance(calculate_rsi(prices), list)
+    assert isinstance(calculate_macd(prices)["macd"], list)
+    assert isinstance(calculate_bollinger_bands(prices)["upper"], list)
@@ -0,0 +1,166 @@
+"""
+app/service/job_service.py 작업 수명 주기 테스트 (접수 → 실행 → 완료/실패, 큐 포화, 공유 저장소, 종료 처리)
+
+실행: python -m pytest tests/test_job_service.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.service.job_service import (
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_SHUTDOWN_ERROR,
+    JOB_SUCCEEDED,
+    AnalysisJobManager,
+    AnalysisJobQueueFull,
+)
+from app.service.shared_state import MemorySharedState, SQLiteSharedState
+
+
+class _RecordingStore(MemorySharedState):
+    """저장소 호출이 어느 스레드에서 일어났는지 기록하고, 첫 put은 느리게 처리합니다."""
+
+    def __init__(self, slow_first_put: float = 0.0) -> None:
+        super().__init__()
+        self.threads = set()
+        self.statuses = []
+        self._slow_first_put = slow_first_put
+
+    def get(self, namespace, key):
+        self.threads.add(threading.get_ident())
+        return super().get(namespace, key)
+
+    def put(self, namespace, key, value, ttl_seconds=None):
+        self.threads.add(threading.get_ident())
+        if not self.statuses and self._slow_first_put:
+            time.sleep(self._slow_first_put)
+        self.statuses.append(value["status"])
+        super().put(namespace, key, value, ttl_seconds)
+
+
+async def _wait_for(manager: AnalysisJobManager, job_id: str, status: str) -> dict:
+    for _ in range(200):
+        job = await manager.get(job_id)
+        if job and job["status"] == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+
+def test_job_runs_to_success_and_is_published_off_the_event_loop():
+    store = _RecordingStore(slow_first_put=0.05)
+
+    async def runner(job_id, state):
+        return {"request_id": f"req-{state['n']}", "value": state["n"] * 2}
+
+    async def scenario():
+        manager = AnalysisJobManager(runner, workers=1, queue_size=4, store=store)
+        await manager.start()
+        job = await manager.submit({"n": 21})
+        assert job["status"] == JOB_QUEUED
+        done = await _wait_for(manager, job["job_id"], JOB_SUCCEEDED)
+        await manager.stop()
+        return threading.get_ident(), set(store.threads), done
+
+    loop_thread, store_threads, done = asyncio.run(scenario())
+    assert done["result"] == {"request_id": "req-21", "value": 42}
+    assert done["request_id"] == "req-21"
+    assert done["finished_at"] is not None
+    # 느린 queued 기록이 이후 기록을 덮어쓰지 않고 호출 순서대로 남습니다.
+    assert store.statuses == ["queued", "running", "succeeded"]
+    assert store.get("analysis_jobs", done["job_id"])["status"] == JOB_SUCCEEDED
+    assert loop_thread not in store_threads
+
+
+def test_runner_error_marks_job_failed():
+    async def runner(job_id, state):
+        raise ValueError("graph exploded")
+
+    async def scenario():
+        manager = AnalysisJobManager(runner, workers=1, queue_size=4)
+        await manager.start()
+        job = await manager.submit({})
+        failed = await _wait_for(manager, job["job_id"], JOB_FAILED)
+        await manager.stop()
+        return failed, manager.stats()
+
+    failed, stats = asyncio.run(scenario())
+    assert failed["error"] == "graph exploded"
+    assert stats["running"] == 0
+
+
+def test_full_queue_rejects_with_retry_after():
+    release = None
+
+    async def runner(job_id, state):
+        await release.wait()
+        return {}
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        manager = AnalysisJobManager(runner, workers=1, queue_size=1)
+        await manager.start()
+        await manager.submit({})
+        await asyncio.sleep(0.01)  # 첫 작업이 실행 상태로
+        await manager.submit({})
+        with pytest.raises(AnalysisJobQueueFull) as excinfo:
+            await manager.submit({})
+        release.set()
+        await manager.stop()
+        return excinfo.value.retry_after
+
+    assert asyncio.run(scenario()) >= 1
+
+
+def test_job_from_another_worker_is_read_from_shared_store(tmp_path):
+    store = SQLiteSharedState(str(tmp_path / "shared.sqlite3"))
+
+    async def runner(job_id, state):
+        return {"request_id": "req-x"}
+
+    async def scenario():
+        owner = AnalysisJobManager(runner, workers=1, store=store)
+        other = AnalysisJobManager(runner, workers=1, store=store)
+        await owner.start()
+        job = await owner.submit({})
+        await _wait_for(owner, job["job_id"], JOB_SUCCEEDED)
+        seen = await other.get(job["job_id"])
+        missing = await other.get("no-such-job")
+        await owner.stop()
+        return seen, missing
+
+    seen, missing = asyncio.run(scenario())
+    assert seen["status"] == JOB_SUCCEEDED and seen["request_id"] == "req-x"
+    assert missing is None
+
+
+def test_stop_marks_unfinished_jobs_failed_in_shared_store():
+    store = MemorySharedState()
+
+    async def runner(job_id, state):
+        await asyncio.sleep(60)
+        return {}
+
+    async def scenario():
+        manager = AnalysisJobManager(runner, workers=1, queue_size=4, store=store)
+        await manager.start()
+        running = await manager.submit({})
+        await asyncio.sleep(0.01)
+        queued = await manager.submit({})
+        await manager.stop()
+        return running["job_id"], queued["job_id"], manager.stats()
+
+    running_id, queued_id, stats = asyncio.run(scenario())
+    for job_id in (running_id, queued_id):
+        record = store.get("analysis_jobs", job_id)
+        assert record["status"] == JOB_FAILED
+        assert record["error"] == JOB_SHUTDOWN_ERROR
+        assert record["finished_at"] is not None
+    assert stats["running"] == 0
@@ -0,0 +1,59 @@
+"""
+core/llm_governor.py 테스트 (워커 수로 나눈 한도, 우선순위 레인, 429 백오프)
+
+실행: python -m pytest tests/test_llm_governor.py
+"""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from core.llm_governor import LLMGovernor, LLMRateLimitTimeout
+
+
+@pytest.fixture(autouse=True)
+def _governor_env(monkeypatch):
+    monkeypatch.setenv("LLM_RATE_LIMIT_ENABLED", "true")
+    monkeypatch.delenv("LLM_RATE_WORKER_COUNT", raising=False)
+
+
+def test_limits_are_split_across_workers(monkeypatch):
+    monkeypatch.setenv("LLM_RATE_WORKER_COUNT", "4")
+    governor = LLMGovernor(rps=10, burst=20, tpm=300000, max_concurrency=16)
+    assert governor.worker_count == 4
+    assert governor.rps == pytest.approx(2.5)
+    assert governor.burst == pytest.approx(5.0)
+    assert governor.tpm == pytest.approx(75000)
+    assert governor.max_concurrency == 4
+    assert governor.stats()["limits"]["worker_count"] == 4
+
+
+def test_split_limits_never_drop_below_one_call():
+    governor = LLMGovernor(rps=1, burst=1, tpm=1000, max_concurrency=2, worker_count=8)
+    assert governor.burst == 1.0
+    assert governor.max_concurrency == 1
+    with governor.slot("normal", 10_000):
+        pass
+
+
+def test_burst_is_enforced_per_worker():
+    governor = LLMGovernor(rps=0.01, burst=4, tpm=10**9, max_concurrency=8, max_wait_seconds=0.1, worker_count=2)
+    for _ in range(2):
+        with governor.slot("normal", 1):
+            pass
+    with pytest.raises(LLMRateLimitTimeout):
+        with governor.slot("normal", 1):
+            pass
+
+
+def test_throttled_pauses_new_calls():
+    governor = LLMGovernor(rps=100, burst=100, tpm=10**9, max_concurrency=8, max_wait_seconds=1)
+    governor.report_throttled(retry_after=0.2)
+    assert governor.saturated()
+    started = time.monotonic()
+    with governor.slot("interactive", 1):
+        pass
+    assert time.monotonic() - started >= 0.15
+    assert governor.stats()["throttled_429"] == 1
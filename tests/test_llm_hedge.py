@@ -0,0 +1,137 @@
+"""
+core/llm_hedge.py 테스트 (느린 호출 hedging, 먼저 끝난 응답 사용, 추가 비용 상한, governor 포화 시 생략)
+
+실행: python -m pytest tests/test_llm_hedge.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.llm_hedge import HedgePolicy
+
+_PURPOSE = "n8_analysis"
+
+
+@pytest.fixture
+def make_policy(monkeypatch):
+    def factory(samples: int = 5, saturated=None, **env):
+        defaults = {
+            "LLM_HEDGE_ENABLED": "true",
+            "LLM_HEDGE_MIN_SAMPLES": "5",
+            "LLM_HEDGE_MIN_DELAY_SECONDS": "0.05",
+            "LLM_HEDGE_MAX_EXTRA_RATIO": "0.5",
+        }
+        for key, value in {**defaults, **env}.items():
+            monkeypatch.setenv(key, str(value))
+        policy = HedgePolicy(saturated=saturated)
+        for _ in range(samples):
+            policy._finish_call(_PURPOSE, False, 0, 0.01)
+        return policy
+
+    return factory
+
+
+def _async_attempts(delays, calls, cancelled):
+    async def attempt(index):
+        calls.append(index)
+        try:
+            await asyncio.sleep(delays[index])
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        return f"attempt-{index}"
+
+    return attempt
+
+
+def test_applies_only_when_enabled_with_a_budget(make_policy):
+    policy = make_policy()
+    assert policy.applies(_PURPOSE, 0.95)
+    assert not policy.applies(_PURPOSE, None)
+    assert not policy.applies(None, 0.95)
+    assert not make_policy(LLM_HEDGE_ENABLED="false").applies(_PURPOSE, 0.95)
+
+
+def test_without_enough_samples_the_call_is_not_hedged(make_policy):
+    policy = make_policy(samples=2)
+    calls, cancelled = [], []
+    result = asyncio.run(policy.arun(_PURPOSE, 0.95, _async_attempts([0.1, 0.0], calls, cancelled)))
+    assert result == "attempt-0" and calls == [0]
+    assert policy.stats()["purposes"][_PURPOSE]["hedged"] == 0
+
+
+def test_slow_async_call_is_hedged_and_the_loser_cancelled(make_policy):
+    policy = make_policy()
+    calls, cancelled = [], []
+    result = asyncio.run(policy.arun(_PURPOSE, 0.95, _async_attempts([1.0, 0.0], calls, cancelled)))
+    assert result == "attempt-1"
+    assert calls == [0, 1] and cancelled == [0]
+    stats = policy.stats()["purposes"][_PURPOSE]
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    assert stats["delay_ms"] == 50.0
+
+
+def test_fast_async_call_is_not_hedged(make_policy):
+    policy = make_policy()
+    calls, cancelled = [], []
+    result = asyncio.run(policy.arun(_PURPOSE, 0.95, _async_attempts([0.0, 0.0], calls, cancelled)))
+    assert result == "attempt-0" and calls == [0]
+
+
+def test_extra_call_budget_and_saturation_deny_hedges(make_policy):
+    # 표본 5개 x 비율 0.2 = 1회까지만 hedge
+    policy = make_policy(LLM_HEDGE_MAX_EXTRA_RATIO="0.2")
+    for expected in ("attempt-1", "attempt-0"):
+        calls, cancelled = [], []
+        assert asyncio.run(policy.arun(_PURPOSE, 0.5, _async_attempts([0.2, 0.0], calls, cancelled))) == expected
+    assert policy.stats()["purposes"][_PURPOSE]["denied_budget"] == 1
+
+    saturated = make_policy(saturated=lambda: True)
+    calls, cancelled = [], []
+    assert asyncio.run(saturated.arun(_PURPOSE, 0.5, _async_attempts([0.2, 0.0], calls, cancelled))) == "attempt-0"
+    assert calls == [0]
+    assert saturated.stats()["purposes"][_PURPOSE]["denied_saturated"] == 1
+
+
+def test_hedge_result_is_used_when_the_primary_fails(make_policy):
+    policy = make_policy()
+
+    async def attempt(index):
+        if index == 0:
+            await asyncio.sleep(0.1)
+            raise ConnectionError("primary failed")
+        await asyncio.sleep(0.2)
+        return "hedge"
+
+    assert asyncio.run(policy.arun(_PURPOSE, 0.95, attempt)) == "hedge"
+
+
+def test_all_attempts_failing_raises_the_first_error(make_policy):
+    policy = make_policy()
+
+    async def attempt(index):
+        await asyncio.sleep(0.1 if index == 0 else 0.3)
+        raise ValueError(f"attempt {index} failed")
+
+    with pytest.raises(ValueError, match="attempt 0 failed"):
+        asyncio.run(policy.arun(_PURPOSE, 0.95, attempt))
+
+
+def test_slow_sync_call_is_hedged_on_worker_threads(make_policy):
+    policy = make_policy()
+    caller = threading.get_ident()
+    threads = []
+
+    def attempt(index):
+        threads.append(threading.get_ident())
+        time.sleep(0.5 if index == 0 else 0.0)
+        return f"attempt-{index}"
+
+    assert policy.run(_PURPOSE, 0.95, attempt) == "attempt-1"
+    assert caller not in threads
+    assert policy.stats()["purposes"][_PURPOSE]["hedge_wins"] == 1
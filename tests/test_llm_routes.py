@@ -0,0 +1,35 @@
+"""
+core/llm.py 라우팅 표 테스트 (/v1/llm/routes는 Upstage 클라이언트 없이 동작해야 함)
+
+실행: python -m pytest tests/test_llm_routes.py
+"""
+
+from __future__ import annotations
+
+import core.llm as llm
+
+
+def test_routes_do_not_need_an_api_key(monkeypatch):
+    monkeypatch.delenv("UPSTAGE_API_KEY", raising=False)
+    monkeypatch.delenv("UPSTAGE_CHAT_MODEL", raising=False)
+    monkeypatch.delenv("UPSTAGE_SMALL_CHAT_MODEL", raising=False)
+    monkeypatch.delenv("LLM_ROUTE_N8_ANALYSIS", raising=False)
+    monkeypatch.setenv("LLM_BACKEND", "upstage")
+    monkeypatch.setattr(llm, "_client", None)
+    monkeypatch.setattr(llm, "_get_client", lambda: (_ for _ in ()).throw(AssertionError("client created")))
+
+    routes = llm.get_llm_routes()
+    assert set(routes) == set(llm._MODEL_ROUTES)
+    assert routes["n8_analysis"]["model"] == "solar-pro2"
+    assert routes["n6_ticker"]["model"] == "solar-mini"
+    assert routes["chat"]["lane"] == "interactive" and routes["chat"]["cache"] is False
+
+
+def test_routes_apply_env_overrides(monkeypatch):
+    monkeypatch.setenv("UPSTAGE_SMALL_CHAT_MODEL", "solar-mini-250422")
+    monkeypatch.setenv("LLM_ROUTE_N8_ANALYSIS", "small?temperature=0.2&cache=false")
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    route = llm.get_llm_routes()["n8_analysis"]
+    assert route["model"] == "fake-solar-mini-250422"
+    assert route["temperature"] == 0.2
+    assert route["cache"] is False
@@ -0,0 +1,70 @@
+"""
+core/llm_usage.py 테스트 (record는 버퍼링만, CSV 기록은 백그라운드 flush 스레드)
+
+실행: python -m pytest tests/test_llm_usage.py
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from core.llm_usage import LLMUsageRecorder
+
+
+def _record(recorder: LLMUsageRecorder, call_id: str, outcome: str = "ok") -> None:
+    recorder.record(call_id, "n8_analysis", "solar-pro2", 100, 50, 20, 812.0, 3.0, outcome)
+
+
+class _SlowSink:
+    def __init__(self) -> None:
+        self.batches = []
+        self.threads = set()
+
+    def __call__(self, rows) -> None:
+        self.threads.add(threading.get_ident())
+        time.sleep(0.05)
+        self.batches.append([row["call_id"] for row in rows])
+
+
+def _wait_until(predicate, timeout: float = 3.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_record_only_buffers_and_background_thread_writes():
+    sink = _SlowSink()
+    recorder = LLMUsageRecorder(sink=sink, flush_seconds=0)
+    started = time.monotonic()
+    for index in range(5):
+        _record(recorder, f"c{index}")
+    # record()는 느린 sink를 기다리지 않습니다.
+    assert time.monotonic() - started < 0.05
+    _wait_until(lambda: sum(len(batch) for batch in sink.batches) == 5)
+    assert [call_id for batch in sink.batches for call_id in batch] == [f"c{index}" for index in range(5)]
+    assert threading.get_ident() not in sink.threads
+
+
+def test_records_wait_for_outcome_before_flush():
+    sink = _SlowSink()
+    recorder = LLMUsageRecorder(sink=sink, flush_seconds=60)
+    _record(recorder, "c1")
+    recorder.mark("c1", "parse_fail")
+    time.sleep(0.1)
+    assert sink.batches == []
+    recorder.flush(force=True)
+    assert sink.batches == [["c1"]]
+    assert recorder.stats()["total"]["outcomes"]["parse_fail"] == 1
+
+
+def test_force_flush_and_background_flush_write_each_record_once():
+    rows = []
+    recorder = LLMUsageRecorder(sink=lambda batch: rows.extend(row["call_id"] for row in batch), flush_seconds=0)
+    for index in range(200):
+        _record(recorder, f"c{index}")
+    recorder.flush(force=True)
+    _wait_until(lambda: len(rows) >= 200)
+    time.sleep(0.05)
+    assert rows == [f"c{index}" for index in range(200)]
@@ -0,0 +1,126 @@
+"""
+app/service/single_flight.py / request_key.py와 /v1/analyze 앞단 병합(_invoke_graph) 테스트
+
+실행: python -m pytest tests/test_single_flight.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.service.request_key import analysis_request_key
+from app.service.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"value": calls}
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"hits": 4, "misses": 1, "in_flight": 0, "hit_rate": 0.8}
+
+
+def test_key_is_released_after_completion_and_is_not_a_cache():
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def scenario():
+        flight = SingleFlight()
+        return [await flight.do("k", work), await flight.do("k", work)]
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+def test_errors_reach_every_waiter_and_release_the_key():
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("graph failed")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("k", boom) for _ in range(3)), return_exceptions=True)
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_shared_execution():
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_request_key_ignores_formatting_differences():
+    base = {
+        "layer1_stock": "aapl",
+        "layer2_buy_date": "2024-03-12",
+        "layer2_sell_date": "2024-04-18",
+        "layer3_decision_basis": "Earnings 기대감으로 매수!",
+    }
+    same = {**base, "layer1_stock": " AAPL ", "layer3_decision_basis": "earnings   기대감으로 매수", "user_message": "x"}
+    assert analysis_request_key(base) == analysis_request_key(same)
+    assert analysis_request_key(base) != analysis_request_key({**base, "layer2_sell_date": "2024-04-19"})
+    assert analysis_request_key(base) != analysis_request_key({**base, "position_status": "holding"})
+
+
+def test_invoke_graph_runs_once_and_keeps_each_callers_inputs(monkeypatch):
+    from app import api
+
+    runs = 0
+
+    class _Graph:
+        async def ainvoke(self, state):
+            nonlocal runs
+            runs += 1
+            await asyncio.sleep(0.02)
+            return {**state, "n8_loss_cause_analysis": {"summary": "shared"}}
+
+    monkeypatch.setattr(api, "_get_graph", lambda: _Graph())
+    monkeypatch.setattr(api, "_analysis_cache_reuse", False)
+    monkeypatch.setattr(api, "_graph_single_flight", SingleFlight())
+    first = {"layer1_stock": "AAPL", "layer2_buy_date": "2024-03-12", "layer2_sell_date": "2024-04-18",
+             "layer3_decision_basis": "실적 기대", "user_message": "첫 번째"}
+    second = {**first, "layer1_stock": "aapl", "layer3_decision_basis": "실적 기대!", "user_message": "두 번째"}
+
+    async def scenario():
+        return await asyncio.gather(api._invoke_graph(first), api._invoke_graph(second))
+
+    a, b = asyncio.run(scenario())
+    assert runs == 1
+    assert a["user_message"] == "첫 번째" and b["user_message"] == "두 번째"
+    assert b["layer1_stock"] == "aapl" and b["layer3_decision_basis"] == "실적 기대!"
+    # 공유 결과를 호출자마다 복사하므로 한쪽을 바꿔도 다른 쪽에 영향이 없습니다.
+    a["n8_loss_cause_analysis"]["summary"] = "changed"
+    assert b["n8_loss_cause_analysis"]["summary"] == "shared"
@@ -0,0 +1,63 @@
+"""
+N6_Stock_Analyst/ticker_index.py 조회 회귀 테스트 (번들 tickers.csv 사용)
+
+실행: python -m pytest tests/test_ticker_index.py
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from N6_Stock_Analyst.ticker_index import TickerIndex
+
+
+@pytest.fixture(scope="module")
+def index() -> TickerIndex:
+    return TickerIndex()
+
+
+@pytest.mark.parametrize(
+    "query, ticker",
+    [
+        ("005930", "005930.KS"),
+        ("AAPL", "AAPL"),
+        ("삼성전자", "005930.KS"),
+        ("삼성 전자", "005930.KS"),
+        ("(주)삼성전자", "005930.KS"),
+        ("삼전", "005930.KS"),
+        # 우선주는 보통주 이름 + 접미사라 유사도로 보통주에 붙으면 안 됨
+        ("삼성전자우", "005935.KS"),
+        ("005935", "005935.KS"),
+        ("현대차우", "005385.KS"),
+        ("현대차2우B", "005387.KS"),
+        ("LG화학우", "051915.KS"),
+        ("LG전자우", "066575.KS"),
+        ("LG우", "003555.KS"),
+    ],
+)
+def test_exact_lookups(index, query, ticker):
+    assert index.resolve(query) == ticker
+
+
+@pytest.mark.parametrize("query, ticker", [("테슬러", "TSLA"), ("Nvidea", "NVDA")])
+def test_fuzzy_accepts_typos(index, query, ticker):
+    assert index.resolve(query) == ticker
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        # 인덱스에 없는 우선주/파생 이름은 보통주로 판별하지 않고 LLM fallback으로 넘깁니다.
+        "SK하이닉스우",
+        "삼성바이오로직스우",
+        "삼성전자2우B",
+        "현대차4우B",
+        "삼성전자 주식",
+    ],
+)
+def test_fuzzy_rejects_name_plus_suffix(index, query):
+    assert index.resolve(query) is None
+
+
+def test_unknown_ticker_shaped_query_is_not_fuzzed(index):
+    assert index.resolve("XYZQ") is None
@@ -0,0 +1,156 @@
+"""
+app/service/write_behind.py 테스트 (배치 기록, 재시도, 잘못된 행 격리, 장애 시 스필과 replay)
+
+실행: python -m pytest tests/test_write_behind.py
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.service.write_behind import _META_KEY, WriteBehindQueue
+
+
+@pytest.fixture
+def make_queue(tmp_path, monkeypatch):
+    def factory(**env):
+        defaults = {
+            "WRITE_BEHIND_SPILL_DIR": str(tmp_path / "spill"),
+            "WRITE_BEHIND_MAX_RETRIES": "1",
+            "WRITE_BEHIND_BACKOFF_SECONDS": "0",
+            "WRITE_BEHIND_BATCH_WAIT_MS": "20",
+            "WRITE_BEHIND_POISON_STRIKES": "2",
+        }
+        for key, value in {**defaults, **env}.items():
+            monkeypatch.setenv(key, str(value))
+        return WriteBehindQueue()
+
+    return factory
+
+
+class _Sink:
+    """request_id가 bad에 있는 행이 섞이면 배치 전체를 거부하고, down이면 모든 배치를 거부합니다."""
+
+    def __init__(self, bad=(), fail_first=0) -> None:
+        self.bad = set(bad)
+        self.down = False
+        self.fail_first = fail_first
+        self.calls = 0
+        self.rows = []
+
+    def __call__(self, batch) -> None:
+        self.calls += 1
+        if self.calls <= self.fail_first:
+            raise ConnectionError("transient")
+        if self.down:
+            raise ConnectionError("sink down")
+        if any(row["request_id"] in self.bad for row in batch):
+            raise ValueError("invalid row")
+        assert all(_META_KEY not in row for row in batch)
+        self.rows.extend(row["request_id"] for row in batch)
+
+
+def _items(*ids):
+    return [{"request_id": request_id, "payload": "본문"} for request_id in ids]
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()] if path.exists() else []
+
+
+def test_enqueued_rows_are_written_in_batches_and_drained(make_queue):
+    sink = _Sink()
+    wb = make_queue(WRITE_BEHIND_BATCH_SIZE=4)
+    wb.register_sink("supabase", sink)
+    wb.start()
+    for item in _items(*(f"r{i}" for i in range(10))):
+        wb.enqueue("supabase", item)
+    wb.drain(timeout=5)
+    assert sorted(sink.rows) == sorted(f"r{i}" for i in range(10))
+    stats = wb.stats()["supabase"]
+    assert stats["written"] == 10 and stats["spilled"] == 0 and stats["pending"] == 0
+
+
+def test_transient_failure_is_retried(make_queue):
+    sink = _Sink(fail_first=1)
+    wb = make_queue()
+    wb.register_sink("supabase", sink)
+    assert wb._write_batch("supabase", _items("a", "b")) == 2
+    assert sink.rows == ["a", "b"]
+    assert wb.stats()["supabase"]["retries"] == 1
+
+
+def test_bad_row_is_quarantined_and_the_rest_written(make_queue):
+    sink = _Sink(bad={"r5"})
+    wb = make_queue(WRITE_BEHIND_MAX_RETRIES=0)
+    wb.register_sink("chroma", sink)
+    written = wb._write_batch("chroma", _items(*(f"r{i}" for i in range(8))))
+    assert written == 7
+    assert sorted(sink.rows) == sorted(f"r{i}" for i in range(8) if i != 5)
+    quarantined = _lines(wb._quarantine_path("chroma"))
+    assert [row["request_id"] for row in quarantined] == ["r5"]
+    assert quarantined[0][_META_KEY]["error"] == "invalid row"
+    assert not wb._spill_path("chroma").exists()
+    assert wb.stats()["chroma"]["quarantined"] == 1
+
+
+def test_outage_spills_everything_and_replay_recovers(make_queue):
+    sink = _Sink()
+    sink.down = True
+    wb = make_queue(WRITE_BEHIND_MAX_RETRIES=0)
+    wb.register_sink("supabase", sink)
+    assert wb._write_batch("supabase", _items("a", "b", "c")) is None
+    assert [row["request_id"] for row in _lines(wb._spill_path("supabase"))] == ["a", "b", "c"]
+    assert not wb._quarantine_path("supabase").exists()
+
+    # 아직 장애 중이면 replay해도 다시 스필되고 잃어버리지 않습니다.
+    wb._replay_spill("supabase")
+    assert [row["request_id"] for row in _lines(wb._spill_path("supabase"))] == ["a", "b", "c"]
+
+    sink.down = False
+    wb._replay_spill("supabase")
+    assert sink.rows == ["a", "b", "c"]
+    assert not wb._spill_path("supabase").exists()
+    assert list(wb.spill_dir.glob("supabase.replay*.jsonl")) == []
+    assert wb.stats()["supabase"]["replayed"] == 3
+
+
+def test_lone_bad_row_is_quarantined_after_strikes(make_queue):
+    sink = _Sink(bad={"bad"})
+    wb = make_queue(WRITE_BEHIND_MAX_RETRIES=0)
+    wb.register_sink("supabase", sink)
+    # 혼자 실패하면 장애와 구분할 수 없어 일단 스필합니다.
+    assert wb._write_batch("supabase", _items("bad")) is None
+    for round_id in range(2):
+        # 그 사이 싱크가 다른 행을 기록하면 strike가 쌓입니다.
+        assert wb._write_batch("supabase", _items(f"ok{round_id}")) == 1
+        wb._replay_spill("supabase")
+    assert not wb._spill_path("supabase").exists()
+    quarantined = _lines(wb._quarantine_path("supabase"))
+    assert [row["request_id"] for row in quarantined] == ["bad"]
+    assert quarantined[0][_META_KEY]["strikes"] == 2
+
+
+def test_full_queue_and_stopping_spill_to_disk(make_queue):
+    sink = _Sink()
+    wb = make_queue(WRITE_BEHIND_MAX_PENDING=1)
+    wb.register_sink("supabase", sink)
+    wb.enqueue("supabase", _items("queued")[0])
+    wb.enqueue("supabase", _items("overflow")[0])
+    wb.drain(timeout=0)
+    wb.enqueue("supabase", _items("late")[0])
+    assert [row["request_id"] for row in _lines(wb._spill_path("supabase"))] == ["overflow", "queued", "late"]
+    wb.enqueue("unknown", _items("ignored")[0])
+
+
+def test_spill_limit_counts_utf8_bytes(make_queue):
+    wb = make_queue(WRITE_BEHIND_SPILL_MAX_BYTES=200)
+    wb.register_sink("supabase", _Sink())
+    # 60글자 한국어 = 180바이트 이상: 글자 수로는 한도 안이지만 바이트로는 한 줄만 들어갑니다.
+    rows = [{"request_id": f"r{i}", "payload": "가" * 40} for i in range(2)]
+    wb._spill("supabase", rows)
+    assert [row["request_id"] for row in _lines(wb._spill_path("supabase"))] == ["r0"]
+    assert wb._spill_path("supabase").stat().st_size <= 200
+    assert wb.stats()["supabase"]["dropped"] == 1
@@ -2,27 +2,36 @@ from langgraph.graph import StateGraph, END
 
 from state.main_state import MainState
 from nodes.n1_loss_input import node1_loss_input
-from nodes.n6_n7_parallel import node6_n7_parallel
-from nodes.n8_loss_analyzer import node8_loss_analyzer
-from nodes.n9_learning_pattern import node9_learning_pattern
-from nodes.n10_learning_tutor import node10_learning_tutor
+from nodes.n6_n7_parallel import anode6_n7_parallel, node6_n7_parallel
+from nodes.n8_loss_analyzer import anode8_loss_analyzer, node8_loss_analyzer
+from nodes.n9_learning_pattern import anode9_learning_pattern, node9_learning_pattern
+from nodes.n10_learning_tutor import anode10_learning_tutor, node10_learning_tutor
 from nodes.n4_chat_entry import node4_chat_entry
 from nodes.n11_investment_expert import node11_investment_expert_wrapper
 
 
-def build_graph(entry_point: str = "N1"):
+def build_graph(entry_point: str = "N1", async_nodes: bool = False):
     """
     투자 손실 분석 워크플로우 그래프 빌드
     N6(기술분석)과 N7(뉴스분석)은 병렬로 실행됩니다.
+
+    async_nodes=True이면 N6~N10을 ainvoke 기반 비동기 노드로 구성합니다.
+    이 경우 그래프는 ainvoke/astream으로만 실행해야 합니다.
     """
     g = StateGraph(MainState)
 
     g.add_node("N1", node1_loss_input)
-    # N6과 N7을 병렬로 실행하는 통합 노드
-    g.add_node("N6_N7", node6_n7_parallel)
-    g.add_node("N8", node8_loss_analyzer)
-    g.add_node("N9", node9_learning_pattern)
-    g.add_node("N10", node10_learning_tutor)
+    if async_nodes:
+        g.add_node("N6_N7", anode6_n7_parallel)
+        g.add_node("N8", anode8_loss_analyzer)
+        g.add_node("N9", anode9_learning_pattern)
+        g.add_node("N10", anode10_learning_tutor)
+    else:
+        # N6과 N7을 병렬로 실행하는 통합 노드
+        g.add_node("N6_N7", node6_n7_parallel)
+        g.add_node("N8", node8_loss_analyzer)
+        g.add_node("N9", node9_learning_pattern)
+        g.add_node("N10", node10_learning_tutor)
     g.add_node("N4", node4_chat_entry)
     g.add_node("N11", node11_investment_expert_wrapper)
 